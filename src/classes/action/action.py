@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING
 from src.i18n import t
 from src.classes.event import Event
 from src.classes.action_runtime import ActionResult, ActionStatus
-from src.utils.params import filter_kwargs_for_callable
+from src.classes.action.registry import ActionRegistry
 
 if TYPE_CHECKING:
     from src.classes.avatar import Avatar
@@ -240,7 +240,7 @@ class InstantAction(DefineAction, ActualActionMixin):
     """
 
     def step(self, **params) -> ActionResult:
-        params_for_execute = filter_kwargs_for_callable(self._execute, params)
+        params_for_execute = ActionRegistry.dispatch_for(type(self)).kwargs_for("_execute", params)
         self._execute(**params_for_execute)
         return ActionResult(status=ActionStatus.COMPLETED, events=[])
 
@@ -256,7 +256,7 @@ class TimedAction(DefineAction, ActualActionMixin):
     def step(self, **params) -> ActionResult:
         if not hasattr(self, 'start_monthstamp') or self.start_monthstamp is None:
             self.start_monthstamp = self.world.month_stamp
-        params_for_execute = filter_kwargs_for_callable(self._execute, params)
+        params_for_execute = ActionRegistry.dispatch_for(type(self)).kwargs_for("_execute", params)
         self._execute(**params_for_execute)
         done = (self.world.month_stamp - self.start_monthstamp) >= (self.duration_months - 1)
         return ActionResult(status=(ActionStatus.COMPLETED if done else ActionStatus.RUNNING), events=[])
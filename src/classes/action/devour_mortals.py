@@ -30,6 +30,8 @@ class DevourMortals(TimedAction):
             gain = random.randint(10, 100)
             current_souls = auxiliary.special_data.get("devoured_souls", 0)
             auxiliary.special_data["devoured_souls"] = min(10000, int(current_souls) + gain)
+            # 魂魄数参与万魂幡的战力表达式，原地修改后需刷新效果缓存
+            self.avatar.invalidate_effects()
 
     def can_start(self) -> tuple[bool, str]:
         legal = self.avatar.effects.get("legal_actions", [])
@@ -1,18 +1,54 @@
 from __future__ import annotations
 
-from typing import Callable, Dict, Type, Iterable
+import inspect
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Type, Iterable
+
+from src.utils.params import filter_kwargs, get_allowed_kwarg_names
+
+# 模拟主循环按参数字典调用的动作入口方法
+DISPATCH_METHODS = ("can_start", "start", "step", "finish", "_execute")
+
+
+@dataclass(frozen=True)
+class ActionDispatch:
+    """
+    动作类的调度表：各入口方法可接收的参数名在注册时计算一次，
+    避免每个角色每月都对 can_start/start/step/finish 做 inspect.signature。
+    """
+    action_cls: type
+    # 方法名 -> 可接收的参数名（None 表示接收任意关键字参数）
+    allowed: Mapping[str, Optional[frozenset[str]]]
+
+    @classmethod
+    def build(cls, action_cls: type) -> "ActionDispatch":
+        allowed: dict[str, Optional[frozenset[str]]] = {}
+        for name in DISPATCH_METHODS:
+            fn = getattr(action_cls, name, None)
+            if fn is None:
+                continue
+            # 从类上取到的普通方法未绑定，签名第一个参数是 self
+            skip_first = not isinstance(inspect.getattr_static(action_cls, name), (staticmethod, classmethod))
+            allowed[name] = get_allowed_kwarg_names(fn, skip_first=skip_first)
+        return cls(action_cls, allowed)
+
+    def kwargs_for(self, method: str, params: Mapping[str, Any]) -> dict[str, Any]:
+        """过滤出 method 可接收的参数。"""
+        return filter_kwargs(params, self.allowed.get(method))
 
 
 class ActionRegistry:
     """
     动作注册表：维护动作名到类的映射，并标注哪些是“可实际执行”的动作。
 
-    - register(action_cls, actual): 注册一个动作类
+    - register(action_cls, actual): 注册一个动作类（同时构建其调度表）
     - get(name): 按名称获取动作类
+    - get_dispatch(name)/dispatch_for(cls): 获取动作类的调度表
     - all()/all_actual(): 获取全部/实际可执行的动作类集合
     """
     _name_to_cls: Dict[str, type] = {}
     _actual_name_to_cls: Dict[str, type] = {}
+    _dispatch: Dict[type, ActionDispatch] = {}
 
     @classmethod
     def register(cls, action_cls: type, *, actual: bool) -> None:
@@ -20,11 +56,25 @@ class ActionRegistry:
         cls._name_to_cls[name] = action_cls
         if actual:
             cls._actual_name_to_cls[name] = action_cls
+        cls._dispatch[action_cls] = ActionDispatch.build(action_cls)
 
     @classmethod
     def get(cls, name: str) -> type:
         return cls._name_to_cls[name]
 
+    @classmethod
+    def dispatch_for(cls, action_cls: type) -> ActionDispatch:
+        """按动作类取调度表；未注册的类（如测试里的子类）首次使用时构建并缓存。"""
+        dispatch = cls._dispatch.get(action_cls)
+        if dispatch is None:
+            dispatch = cls._dispatch[action_cls] = ActionDispatch.build(action_cls)
+        return dispatch
+
+    @classmethod
+    def get_dispatch(cls, name: str) -> ActionDispatch:
+        """按动作名取调度表（KeyError 同 get）。"""
+        return cls.dispatch_for(cls._name_to_cls[name])
+
     @classmethod
     def all(cls) -> Iterable[type]:
         # 去重保持稳定顺序
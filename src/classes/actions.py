@@ -32,4 +32,19 @@ ACTION_INFOS = {
 }
 ACTION_INFOS_STR = json.dumps(ACTION_INFOS, ensure_ascii=False, indent=2)
 
+# 语言 -> 动作说明 JSON。动作描述经过翻译，ACTION_INFOS_STR 只对应导入时的语言。
+_ACTION_INFOS_STR_BY_LANG: dict[str, str] = {}
+
+
+def get_action_infos_str() -> str:
+    """当前语言的动作说明 JSON（每种语言只渲染一次）。"""
+    from src.classes.language import language_manager
+
+    lang = str(language_manager)
+    cached = _ACTION_INFOS_STR_BY_LANG.get(lang)
+    if cached is None:
+        infos = {action.__name__: _build_action_info(action) for action in ALL_ACTUAL_ACTION_CLASSES}
+        cached = _ACTION_INFOS_STR_BY_LANG[lang] = json.dumps(infos, ensure_ascii=False, indent=2)
+    return cached
+
 
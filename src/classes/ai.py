@@ -11,7 +11,7 @@ from src.classes.world import World
 from src.classes.event import Event, NULL_EVENT
 from src.utils.llm import call_llm_with_task_name
 from src.classes.typings import ACTION_NAME_PARAMS_PAIRS
-from src.classes.actions import ACTION_INFOS_STR
+from src.classes.prompt_context import get_action_infos_prompt
 from src.utils.config import CONFIG
 
 if TYPE_CHECKING:
@@ -45,17 +45,44 @@ class AI(ABC):
 class LLMAI(AI):
     """
     LLM AI
+
+    默认每个角色单独发送一次决策提示词。
+    配置 ai.decision_batch.size > 1 时启用批量决策：同一分组（同区域或同宗门）内的
+    至多 size 个角色合并为一次请求，共用世界背景与动作列表两大段，只为每个角色
+    附上各自的信息与已知区域。批量结果中缺失或无法解析的角色，再单独决策一次。
     """
 
     async def _decide(self, world: World, avatars_to_decide: list[Avatar]) -> dict[Avatar, tuple[ACTION_NAME_PARAMS_PAIRS, str, str]]:
         """
         异步决策逻辑：通过LLM决定执行什么动作和参数
         """
-        general_action_infos = ACTION_INFOS_STR
+        batch_conf = getattr(CONFIG.ai, "decision_batch", None)
+        batch_size = int(getattr(batch_conf, "size", 1)) if batch_conf else 1
+        if batch_size <= 1:
+            return await self._decide_each(world, avatars_to_decide)
+
+        group_by = str(getattr(batch_conf, "group_by", "region"))
+        batches, singles = _group_avatars(avatars_to_decide, batch_size, group_by)
+
+        results: dict[Avatar, tuple[ACTION_NAME_PARAMS_PAIRS, str, str]] = {}
+        batch_results = await asyncio.gather(*(self._decide_batch(world, batch) for batch in batches))
+        for batch, decided in zip(batches, batch_results):
+            results.update(decided)
+            singles.extend(avatar for avatar in batch if avatar not in decided)
+
+        # 单独决策：无法组批的角色，以及批量结果中缺失/解析失败的角色
+        results.update(await self._decide_each(world, singles))
+        # 保持与输入一致的顺序
+        return {avatar: results[avatar] for avatar in avatars_to_decide if avatar in results}
+
+    async def _decide_each(self, world: World, avatars_to_decide: list[Avatar]) -> dict[Avatar, tuple[ACTION_NAME_PARAMS_PAIRS, str, str]]:
+        """每个角色单独请求一次。"""
+        general_action_infos = get_action_infos_prompt()
+        context = world.get_prompt_context()
         
         async def decide_one(avatar: Avatar):
-            # 获取基于该角色已知区域的世界信息（包含距离计算）
-            world_info = world.get_info(avatar=avatar, detailed=True)
+            # 获取基于该角色已知区域的世界信息（包含距离计算）；与角色无关的部分按月缓存
+            world_info = context.render_world_info(world, avatar=avatar, detailed=True)
             
             # 在提示中包含处于角色观测范围内的其他角色
             observed = world.get_observable_avatars(avatar)
@@ -79,39 +106,122 @@ class LLMAI(AI):
         for avatar, res in results_list:
             if not res or avatar.name not in res:
                 continue
-                
-            r = res[avatar.name]
-            # 仅接受 action_name_params_pairs，不再支持单个 action_name/action_params
-            raw_pairs = r.get("action_name_params_pairs", [])
-            pairs: ACTION_NAME_PARAMS_PAIRS = []
+            decision = _parse_decision(avatar, res[avatar.name])
+            if decision is not None:
+                results[avatar] = decision
             
-            for p in raw_pairs:
-                if isinstance(p, list) and len(p) == 2:
-                    # LLM 可能返回 null 作为 params，需要转为空字典。
-                    pairs.append((p[0], p[1] or {}))
-                elif isinstance(p, dict) and "action_name" in p and "action_params" in p:
-                    pairs.append((p["action_name"], p["action_params"] or {}))
-                else:
-                    continue
-            
-            # 至少有一个
-            if not pairs:
-                continue # Skip if no valid actions found
+        return results
 
-            avatar_thinking = r.get("avatar_thinking", r.get("thinking", ""))
-            short_term_objective = r.get("short_term_objective", "")
-            
-            # 更新情绪
-            from src.classes.emotions import EmotionType
-            raw_emotion = r.get("current_emotion", "emotion_calm")
-            try:
-                # 尝试通过 value 获取枚举
-                avatar.emotion = EmotionType(raw_emotion)
-            except ValueError:
-                avatar.emotion = EmotionType.CALM
-                
-            results[avatar] = (pairs, avatar_thinking, short_term_objective)
-            
+    async def _decide_batch(self, world: World, avatars: list[Avatar]) -> dict[Avatar, tuple[ACTION_NAME_PARAMS_PAIRS, str, str]]:
+        """
+        一次请求为一组角色决策（组内角色名互不相同）。
+        请求失败时返回空结果，由调用方逐个重试。
+        """
+        context = world.get_prompt_context()
+        avatar_infos = {}
+        for avatar in avatars:
+            observed = world.get_observable_avatars(avatar)
+            info = avatar.get_expanded_info(co_region_avatars=observed)
+            avatar_infos[avatar.name] = {
+                "info": info,
+                "known_regions": context.region_info(avatar=avatar, detailed=True),
+            }
+
+        info = {
+            "avatar_names": ", ".join(avatar.name for avatar in avatars),
+            "avatar_infos": avatar_infos,
+            "world_info": context.render_shared_info(world),
+            "general_action_infos": get_action_infos_prompt(),
+        }
+        template_path = CONFIG.paths.templates / "ai_batch.txt"
+        try:
+            res = await call_llm_with_task_name("action_decision", template_path, info)
+        except Exception as e:
+            from src.run.log import get_logger
+            get_logger().logger.warning(f"Batched decision for {len(avatars)} avatars failed, retrying individually: {e}")
+            return {}
+
+        results: dict[Avatar, tuple[ACTION_NAME_PARAMS_PAIRS, str, str]] = {}
+        if not isinstance(res, dict):
+            return results
+        for avatar in avatars:
+            r = res.get(avatar.name)
+            if not isinstance(r, dict):
+                continue
+            decision = _parse_decision(avatar, r)
+            if decision is not None:
+                results[avatar] = decision
         return results
 
+
+def _group_avatars(avatars: list[Avatar], batch_size: int, group_by: str) -> tuple[list[list[Avatar]], list[Avatar]]:
+    """
+    按区域或宗门把角色分批，每批至多 batch_size 个且角色名互不相同（结果按名字回填）。
+
+    Returns:
+        (batches, singles)：singles 为只剩一人、无需合并的角色。
+    """
+    groups: dict[object, list[Avatar]] = {}
+    for avatar in avatars:
+        if group_by == "sect":
+            key = avatar.sect.id if avatar.sect else None
+        else:
+            key = avatar.tile.region.id if avatar.tile and avatar.tile.region else None
+        groups.setdefault(key, []).append(avatar)
+
+    batches: list[list[Avatar]] = []
+    singles: list[Avatar] = []
+    for members in groups.values():
+        current: list[Avatar] = []
+        names: set[str] = set()
+        for avatar in members:
+            if avatar.name in names:
+                # 同名角色无法在同一份结果中区分，单独决策
+                singles.append(avatar)
+                continue
+            current.append(avatar)
+            names.add(avatar.name)
+            if len(current) >= batch_size:
+                batches.append(current)
+                current, names = [], set()
+        if len(current) > 1:
+            batches.append(current)
+        else:
+            singles.extend(current)
+    return batches, singles
+
+
+def _parse_decision(avatar: Avatar, r: dict) -> tuple[ACTION_NAME_PARAMS_PAIRS, str, str] | None:
+    """解析单个角色的决策结果，并更新情绪。没有合法动作时返回 None。"""
+    # 仅接受 action_name_params_pairs，不再支持单个 action_name/action_params
+    raw_pairs = r.get("action_name_params_pairs", [])
+    pairs: ACTION_NAME_PARAMS_PAIRS = []
+    
+    for p in raw_pairs:
+        if isinstance(p, list) and len(p) == 2:
+            # LLM 可能返回 null 作为 params，需要转为空字典。
+            pairs.append((p[0], p[1] or {}))
+        elif isinstance(p, dict) and "action_name" in p and "action_params" in p:
+            pairs.append((p["action_name"], p["action_params"] or {}))
+        else:
+            continue
+    
+    # 至少有一个
+    if not pairs:
+        return None
+
+    avatar_thinking = r.get("avatar_thinking", r.get("thinking", ""))
+    short_term_objective = r.get("short_term_objective", "")
+    
+    # 更新情绪
+    from src.classes.emotions import EmotionType
+    raw_emotion = r.get("current_emotion", "emotion_calm")
+    try:
+        # 尝试通过 value 获取枚举
+        avatar.emotion = EmotionType(raw_emotion)
+    except ValueError:
+        avatar.emotion = EmotionType.CALM
+        
+    return pairs, avatar_thinking, short_term_objective
+
 llm_ai = LLMAI()
@@ -13,7 +13,6 @@ from src.classes.action_runtime import ActionStatus, ActionResult, ActionPlan, A
 from src.classes.action.registry import ActionRegistry
 from src.classes.event import Event
 from src.classes.typings import ACTION_NAME, ACTION_NAME_PARAMS_PAIRS
-from src.utils.params import filter_kwargs_for_callable
 from src.run.log import get_logger
 
 
@@ -33,8 +32,7 @@ class ActionMixin:
         Raises:
             ValueError: 如果找不到对应的动作类
         """
-        action_cls = ActionRegistry.get(action_name)
-        return action_cls(self, self.world)
+        return ActionRegistry.get_dispatch(action_name).action_cls(self, self.world)
 
     def load_decide_result_chain(
         self: "Avatar",
@@ -78,7 +76,8 @@ class ActionMixin:
         while self.planned_actions:
             plan = self.planned_actions.pop(0)
             try:
-                action = self.create_action(plan.action_name)
+                dispatch = ActionRegistry.get_dispatch(plan.action_name)
+                action = dispatch.action_cls(self, self.world)
             except Exception as e:
                 logger = get_logger().logger
                 logger.warning(
@@ -94,7 +93,7 @@ class ActionMixin:
                 )
                 continue
 
-            params_for_can_start = filter_kwargs_for_callable(action.can_start, plan.params)
+            params_for_can_start = dispatch.kwargs_for("can_start", plan.params)
             try:
                 can_start, reason = action.can_start(**params_for_can_start)
             except TypeError as e:
@@ -113,7 +112,7 @@ class ActionMixin:
                 )
                 continue
             # 启动
-            params_for_start = filter_kwargs_for_callable(action.start, plan.params)
+            params_for_start = dispatch.kwargs_for("start", plan.params)
             start_event = action.start(**params_for_start)
             self.current_action = ActionInstance(action=action, params=plan.params, status="running")
             # 标记为"本轮新设动作"，用于本月补充执行
@@ -131,10 +130,11 @@ class ActionMixin:
         action_instance_before = self.current_action
         action = action_instance_before.action
         params = action_instance_before.params
-        params_for_step = filter_kwargs_for_callable(action.step, params)
+        dispatch = ActionRegistry.dispatch_for(type(action))
+        params_for_step = dispatch.kwargs_for("step", params)
         result: ActionResult = action.step(**params_for_step)
         if result.status == ActionStatus.COMPLETED:
-            params_for_finish = filter_kwargs_for_callable(action.finish, params)
+            params_for_finish = dispatch.kwargs_for("finish", params)
             finish_events = await action.finish(**params_for_finish)
             # 仅当当前动作仍然是刚才执行的那个实例时才清空
             # 若在 step() 内部通过"抢占"机制切换了动作（如 Escape 失败立即切到 Attack），不要清空新动作
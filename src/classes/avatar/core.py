@@ -18,6 +18,7 @@ from src.sim.save.avatar_save_mixin import AvatarSaveMixin
 from src.sim.load.avatar_load_mixin import AvatarLoadMixin
 from src.classes.tile import Tile
 from src.classes.region import Region
+from src.classes.region_catalog import KnownRegionCatalog
 from src.classes.cultivation import CultivationProgress
 from src.classes.root import Root
 from src.classes.technique import Technique, get_technique_by_sect
@@ -41,9 +42,11 @@ from src.classes.emotions import EmotionType
 from src.utils.config import CONFIG
 from src.classes.elixir import ConsumedElixir, Elixir
 from src.classes.avatar_metrics import AvatarMetrics
+from src.classes.spatial_index import SPATIAL_FIELDS, notify_spatial_change
 
 # Mixin 导入
 from src.classes.effect import EffectsMixin
+from src.classes.effect.mixin import EFFECT_SOURCE_FIELDS
 from src.classes.avatar.inventory_mixin import InventoryMixin
 from src.classes.avatar.action_mixin import ActionMixin
 
@@ -101,6 +104,8 @@ class Avatar(
     materials: dict[Material, int] = field(default_factory=dict)
     hp: HP = field(default_factory=lambda: HP(0, 0))
     relations: dict["Avatar", Relation] = field(default_factory=dict)
+    # 读档后指向尚未物化的已故角色的关系：target_id -> relation value（见 DeadAvatarStore）
+    unresolved_relations: dict[str, str] = field(default_factory=dict, repr=False, compare=False)
     alignment: Alignment | None = None
     sect: Sect | None = None
     sect_rank: "SectRank | None" = None
@@ -124,6 +129,8 @@ class Avatar(
     _action_cd_last_months: dict[str, int] = field(default_factory=dict)
     
     known_regions: set[int] = field(default_factory=set)
+    # known_regions 的分组有序视图与旅行月数缓存（见 src/classes/region_catalog.py）
+    region_catalog: KnownRegionCatalog = field(default_factory=KnownRegionCatalog, init=False, repr=False, compare=False)
 
     # 状态追踪（可选）
     metrics_history: List[AvatarMetrics] = field(default_factory=list)
@@ -341,14 +348,20 @@ class Avatar(
     def _init_known_regions(self):
         """初始化已知区域：当前位置 + 宗门驻地"""
         if self.tile and self.tile.region:
-            self.known_regions.add(self.tile.region.id)
+            self.learn_region(self.tile.region)
         
         if self.sect:
             for r in self.world.map.sect_regions.values():
                 if r.sect_id == self.sect.id:
-                    self.known_regions.add(r.id)
+                    self.learn_region(r)
                     break
 
+    def learn_region(self, region: Region) -> None:
+        """记入已知区域，并同步已知区域目录。"""
+        if region.id not in self.known_regions:
+            self.known_regions.add(region.id)
+            self.region_catalog.add(region)
+
     # ========== 关系相关 ==========
 
     def set_relation(self, other: "Avatar", relation: Relation) -> None:
@@ -431,6 +444,15 @@ class Avatar(
         self.recalc_effects()
         self._init_known_regions()
 
+    def __setattr__(self, name: str, value) -> None:
+        super().__setattr__(name, value)
+        # 位置/所在 tile 变化时同步 AvatarManager 的空间索引
+        if name in SPATIAL_FIELDS:
+            notify_spatial_change(self)
+        # 效果来源被替换时使 effects 缓存失效
+        elif name in EFFECT_SOURCE_FIELDS:
+            self.invalidate_effects()
+
     def __hash__(self) -> int:
         if not hasattr(self, 'id'):
             # 防御性编程：如果id尚未初始化（例如deepcopy过程中），使用对象内存地址
@@ -6,19 +6,36 @@ import itertools
 if TYPE_CHECKING:
     from src.classes.avatar import Avatar
 
-from src.classes.observe import get_observable_avatars
+from src.classes.dead_avatar_store import DeadAvatarStore
+from src.classes.observe import get_avatar_observation_radius
+from src.classes.spatial_index import AvatarSpatialIndex, IndexedAvatarDict
 
 @dataclass
 class AvatarManager:
     # 仅存储存活的角色，用于主循环遍历
     avatars: Dict[str, "Avatar"] = field(default_factory=dict)
-    # 存储已死亡的角色（归档）
-    dead_avatars: Dict[str, "Avatar"] = field(default_factory=dict)
+    # 存储已死亡的角色（归档；读档后未访问过的死者以压缩数据休眠，按需物化）
+    dead_avatars: Dict[str, "Avatar"] = field(default_factory=DeadAvatarStore)
     
     # --- 变更缓冲区 (不参与序列化) ---
     _newly_dead_buffer: List[str] = field(default_factory=list, init=False)
     _newly_born_buffer: List[str] = field(default_factory=list, init=False)
 
+    # --- 存活角色的空间索引 (不参与序列化) ---
+    spatial_index: AvatarSpatialIndex = field(default_factory=AvatarSpatialIndex, init=False, repr=False)
+
+    def __setattr__(self, name: str, value) -> None:
+        # avatars 可能被整体替换（如读档），统一包装为与空间索引同步的字典
+        if name == "avatars" and "spatial_index" in self.__dict__:
+            self.spatial_index.clear()
+            value = IndexedAvatarDict(self.spatial_index, value)
+        elif name == "dead_avatars" and not isinstance(value, DeadAvatarStore):
+            value = DeadAvatarStore(value)
+        super().__setattr__(name, value)
+
+    def __post_init__(self) -> None:
+        self.avatars = self.avatars
+
     def register_avatar(self, avatar: "Avatar", is_newly_born: bool = False) -> None:
         """
         注册一个角色到管理器中。
@@ -44,7 +61,7 @@ class AvatarManager:
 
     def get_avatar(self, avatar_id: str) -> "Avatar | None":
         """
-        根据 ID 获取角色对象，优先查找活人，再查找死者
+        根据 ID 获取角色对象，优先查找活人，再查找死者（休眠的死者在此物化）
         """
         aid = str(avatar_id)
         return self.avatars.get(aid) or self.dead_avatars.get(aid)
@@ -70,15 +87,7 @@ class AvatarManager:
         """
         if avatar is None or getattr(avatar, "tile", None) is None or avatar.tile.region is None:
             return []
-        region = avatar.tile.region
-        same_region: list["Avatar"] = []
-        # 只遍历活人
-        for other in self.avatars.values():
-            if other is avatar or getattr(other, "tile", None) is None:
-                continue
-            if other.tile.region == region:
-                same_region.append(other)
-        return same_region
+        return self.spatial_index.query_region(avatar.tile.region.id, exclude=avatar)
 
     def get_living_avatars(self) -> List["Avatar"]:
         """
@@ -91,11 +100,12 @@ class AvatarManager:
         """
         返回处于 avatar 交互范围内的其他【存活】角色列表（不含自己）。
         """
-        return get_observable_avatars(avatar, self.avatars.values())
+        radius = get_avatar_observation_radius(avatar)
+        return self.spatial_index.query_radius(avatar.pos_x, avatar.pos_y, radius, exclude=avatar)
     
     def _iter_all_avatars(self) -> Iterable["Avatar"]:
-        """辅助方法：遍历所有角色（活人+死者）"""
-        return itertools.chain(self.avatars.values(), self.dead_avatars.values())
+        """辅助方法：遍历所有已加载的角色（活人+已物化的死者，不触发休眠死者的物化）"""
+        return itertools.chain(self.avatars.values(), self.dead_avatars.materialized())
 
     def remove_avatar(self, avatar_id: str) -> None:
         """
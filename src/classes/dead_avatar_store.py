@@ -0,0 +1,158 @@
+"""
+已故角色的懒加载存储
+
+长期运行的世界里已故角色远多于存活角色，但模拟主循环只遍历存活角色，已故角色只在
+查看生平、事件详情或作为关系对象时才用到。读档时已故角色先以压缩后的原始 JSON 按 id
+存放（"休眠"），第一次通过 AvatarManager.get_avatar（或 dead_avatars[aid]）访问时才
+反序列化为 Avatar 对象（"物化"）。
+
+关系网络：物化时，指向已物化角色的关系直接建立；指向仍在休眠的角色的关系记在
+avatar.unresolved_relations 中，等对方物化时再补上。存档时 unresolved_relations 会
+与 relations 一起写出，因此休眠不会丢失任何关系。
+"""
+from __future__ import annotations
+
+import json
+import zlib
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.classes.avatar import Avatar
+    from src.classes.world import World
+
+
+class DeadAvatarStore(MutableMapping):
+    """
+    AvatarManager.dead_avatars：id -> 已故 Avatar。
+
+    行为与普通字典一致（in / len / 迭代 key 不会触发物化，取值会），
+    另外提供 dormant_* 系列方法供存档直接使用休眠数据。
+    """
+
+    def __init__(self, *args, **kwargs):
+        # 已物化的角色
+        self._avatars: Dict[str, "Avatar"] = {}
+        # 休眠角色：id -> zlib 压缩的 JSON
+        self._dormant: Dict[str, bytes] = {}
+        # 休眠角色 id -> 等待它物化的角色 id 集合（这些角色的 unresolved_relations 里有它）
+        self._waiting: Dict[str, set[str]] = {}
+        self._world: Optional["World"] = None
+        self.update(*args, **kwargs)
+
+    # --- MutableMapping ---
+
+    def __getitem__(self, key: str) -> "Avatar":
+        avatar = self._avatars.get(key)
+        if avatar is not None:
+            return avatar
+        if key in self._dormant:
+            return self.materialize(key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, avatar: "Avatar") -> None:
+        self._dormant.pop(key, None)
+        self._avatars[key] = avatar
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._avatars:
+            del self._avatars[key]
+        elif key in self._dormant:
+            del self._dormant[key]
+            self._waiting.pop(key, None)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._avatars or key in self._dormant
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self._avatars)
+        yield from list(self._dormant)
+
+    def __len__(self) -> int:
+        return len(self._avatars) + len(self._dormant)
+
+    def __repr__(self) -> str:
+        return f"DeadAvatarStore(materialized={len(self._avatars)}, dormant={len(self._dormant)})"
+
+    # --- 休眠数据 ---
+
+    @staticmethod
+    def pack(raw_json: str) -> bytes:
+        return zlib.compress(raw_json.encode("utf-8"), 1)
+
+    @staticmethod
+    def unpack(blob: bytes) -> dict:
+        return json.loads(zlib.decompress(blob))
+
+    def load_dormant(self, world: "World", records: Dict[str, bytes]) -> None:
+        """读档时放入休眠角色（records 的值由 pack 生成）。"""
+        self._world = world
+        for aid, blob in records.items():
+            if aid not in self._avatars:
+                self._dormant[aid] = blob
+
+    def is_dormant(self, avatar_id: str) -> bool:
+        return avatar_id in self._dormant
+
+    def dormant_ids(self) -> list[str]:
+        return list(self._dormant)
+
+    def dormant_data(self, avatar_id: str) -> dict:
+        return self.unpack(self._dormant[avatar_id])
+
+    def materialized(self) -> list["Avatar"]:
+        """已物化的已故角色（不会触发物化）。"""
+        return list(self._avatars.values())
+
+    # --- 物化 ---
+
+    def materialize(self, avatar_id: str) -> "Avatar":
+        from src.classes.avatar import Avatar
+
+        data = self.unpack(self._dormant.pop(avatar_id))
+        avatar = Avatar.from_save_dict(data, self._world)
+        self._avatars[avatar_id] = avatar
+        self.link_relations(avatar, data.get("relations", {}))
+        self._resolve_waiting(avatar)
+        return avatar
+
+    def materialize_all(self) -> None:
+        for aid in list(self._dormant):
+            if aid in self._dormant:
+                self.materialize(aid)
+
+    def link_relations(self, avatar: "Avatar", relations_data: dict) -> None:
+        """
+        按存档中的 relations（other_id -> relation value）建立 avatar 一侧的关系。
+        对方仍在休眠时记入 unresolved_relations；对方不存在时忽略（与完整读档一致）。
+        """
+        from src.classes.relation import Relation
+
+        for other_id, relation_value in relations_data.items():
+            other = self._find_loaded(other_id)
+            if other is not None:
+                avatar.relations[other] = Relation(relation_value)
+            elif other_id in self._dormant:
+                avatar.unresolved_relations[other_id] = relation_value
+                self._waiting.setdefault(other_id, set()).add(str(avatar.id))
+
+    def _resolve_waiting(self, avatar: "Avatar") -> None:
+        from src.classes.relation import Relation
+
+        aid = str(avatar.id)
+        for owner_id in self._waiting.pop(aid, ()):
+            owner = self._find_loaded(owner_id)
+            if owner is None:
+                continue
+            relation_value = owner.unresolved_relations.pop(aid, None)
+            if relation_value is not None:
+                owner.relations[avatar] = Relation(relation_value)
+
+    def _find_loaded(self, avatar_id: str) -> Optional["Avatar"]:
+        if self._world is not None:
+            avatar = self._world.avatar_manager.avatars.get(avatar_id)
+            if avatar is not None:
+                return avatar
+        return self._avatars.get(avatar_id)
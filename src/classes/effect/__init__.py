@@ -36,6 +36,7 @@ from .process import (
     _evaluate_conditional_effect,
     _merge_effects,
 )
-from .mixin import EffectsMixin
+from .compiler import compile_expression, precompile_effects
+from .mixin import EffectsMixin, set_effects_cache_check
 from .desc import format_effects_to_text, translate_condition
 
@@ -0,0 +1,68 @@
+"""
+效果表达式编译器
+
+配表中的 effects 含两类需要求值的字符串：
+- 条件：{"when": "avatar.weapon.type == 'SWORD'", ...}
+- 动态值：{"extra_battle_strength_points": "3 + avatar.weapon_proficiency * 0.02"} 或 "eval(...)"
+
+原先每次读取 effects 都对这些字符串调用 eval()，需要重新词法/语法分析。
+这里在配表加载时把它们编译成 code object，存入全局共享的注册表，
+运行期只执行已编译的字节码。
+"""
+from __future__ import annotations
+
+from types import CodeType
+from typing import Any, Optional
+
+# 表达式字符串 -> 编译结果（None 表示语法错误，求值时按失败处理）
+_CODE_REGISTRY: dict[str, Optional[CodeType]] = {}
+
+
+def compile_expression(expr: str) -> Optional[CodeType]:
+    """编译（或从注册表取出）一个表达式。语法错误返回 None。"""
+    try:
+        return _CODE_REGISTRY[expr]
+    except KeyError:
+        pass
+    try:
+        code: Optional[CodeType] = compile(expr, "<effect>", "eval")
+    except (SyntaxError, ValueError):
+        code = None
+    _CODE_REGISTRY[expr] = code
+    return code
+
+
+def get_value_expression(value: Any) -> Optional[str]:
+    """
+    判断效果值是否为动态表达式，是则返回待求值的表达式文本。
+    支持明确的 'eval(...)' 格式，以及包含 'avatar.' 的隐式表达式。
+    """
+    if not isinstance(value, str):
+        return None
+    s = value.strip()
+    if s.startswith("eval(") and s.endswith(")"):
+        return s[5:-1]
+    if "avatar." in s:  # 启发式：包含 avatar. 则视为表达式
+        return s
+    return None
+
+
+def precompile_effects(effect: Any) -> None:
+    """预编译 effects（dict 或 list[dict]）中的全部条件与动态值。"""
+    items = effect if isinstance(effect, list) else [effect]
+    for eff in items:
+        if not isinstance(eff, dict):
+            continue
+        for key, value in eff.items():
+            if key == "when":
+                if isinstance(value, str) and value:
+                    compile_expression(value)
+                continue
+            expr = get_value_expression(value)
+            if expr is not None:
+                compile_expression(expr)
+
+
+def get_registry_size() -> int:
+    """已注册的表达式数量（调试/统计用）。"""
+    return len(_CODE_REGISTRY)
@@ -11,11 +11,73 @@ if TYPE_CHECKING:
     from src.classes.avatar.core import Avatar
 
 from .process import _merge_effects, _evaluate_conditional_effect
+from .compiler import compile_expression, get_value_expression
 from src.classes.hp import HP_MAX_BY_REALM
+from src.utils.config import CONFIG
+
+
+# 参与 effects 计算的角色属性：被重新赋值时自动使 effects 缓存失效
+EFFECT_SOURCE_FIELDS = frozenset({
+    "sect",
+    "technique",
+    "root",
+    "personas",
+    "weapon",
+    "weapon_proficiency",
+    "auxiliary",
+    "spirit_animal",
+    "alignment",
+    "elixirs",
+    "temporary_effects",
+    "cultivation_progress",
+})
+
+# 动态值表达式的公共求值上下文
+_VALUE_CONTEXT: dict[str, Any] = {
+    "__builtins__": {},
+    "max": max,
+    "min": min,
+    "int": int,
+    "float": float,
+    "round": round,
+}
+
+# 调试开关：开启后每次命中缓存都与重新计算的结果比对，不一致时记录错误并以重算结果为准
+_effects_cache_check: bool = bool(CONFIG.get("system", {}).get("effects_cache_check", False))
+
+
+def set_effects_cache_check(enabled: bool) -> None:
+    """运行时开关 effects 缓存校验模式。"""
+    global _effects_cache_check
+    _effects_cache_check = bool(enabled)
 
 
 class EffectsMixin:
     """效果计算相关方法"""
+
+    def invalidate_effects(self) -> None:
+        """
+        使 effects 缓存失效。
+        EFFECT_SOURCE_FIELDS 中的属性被重新赋值时会自动调用；
+        对效果来源做原地修改（如 list.append、special_data 写入）后需要手动调用或调用 recalc_effects。
+        """
+        self.__dict__["_effects_version"] = self.__dict__.get("_effects_version", 0) + 1
+
+    def _effects_cache_key(self: "Avatar") -> tuple:
+        """
+        缓存键：版本号 + 随时间/世界变化的输入。
+        - 月份：丹药与临时效果按月过期
+        - 天地灵机：世界级效果来源
+        - 等级/境界：修炼会原地修改 cultivation_progress，且部分条件依赖境界
+        """
+        cp = self.cultivation_progress
+        return (
+            self.__dict__.get("_effects_version", 0),
+            int(self.world.month_stamp),
+            self.world.current_phenomenon,
+            cp.level,
+            cp.realm,
+        )
     
     def get_active_temporary_effects(self: "Avatar") -> list[dict[str, Any]]:
         """获取当前生效的临时效果列表"""
@@ -29,39 +91,30 @@ class EffectsMixin:
         """
         评估效果字典中的动态值（字符串表达式）。
         支持明确的 'eval(...)' 格式，以及包含 'avatar.' 的隐式表达式。
+        表达式由 compiler 预编译，这里只执行字节码。
         """
         result = {}
-        # 安全的 eval 上下文
-        context = {
-            "__builtins__": {},
-            "avatar": self,
-            "max": max,
-            "min": min,
-            "int": int,
-            "float": float,
-            "round": round,
-        }
+        context = None
 
         for k, v in effects.items():
-            if isinstance(v, str):
-                s = v.strip()
-                expr = None
-                
-                # 检查是否为表达式
-                if s.startswith("eval(") and s.endswith(")"):
-                    expr = s[5:-1]
-                elif "avatar." in s: # 启发式：包含 avatar. 则视为表达式
-                    expr = s
-                
-                if expr:
-                    try:
-                        result[k] = eval(expr, context)
-                    except Exception:
-                        # 评估失败，保留原值（可能是普通字符串，或者表达式有误）
-                        result[k] = v
-                else:
-                    result[k] = v
-            else:
+            expr = get_value_expression(v)
+            if expr is None:
+                result[k] = v
+                continue
+
+            code = compile_expression(expr)
+            if code is None:
+                result[k] = v
+                continue
+
+            if context is None:
+                # 安全的 eval 上下文
+                context = dict(_VALUE_CONTEXT)
+                context["avatar"] = self
+            try:
+                result[k] = eval(code, context)
+            except Exception:
+                # 评估失败，保留原值（可能是普通字符串，或者表达式有误）
                 result[k] = v
         return result
 
@@ -69,6 +122,33 @@ class EffectsMixin:
     def effects(self: "Avatar") -> dict[str, object]:
         """
         合并所有来源的效果：宗门、功法、灵根、特质、兵器、辅助装备、灵兽、天地灵机、丹药
+        结果按 _effects_cache_key 缓存，调用方只读不改。
+        """
+        key = self._effects_cache_key()
+        cached = self.__dict__.get("_effects_cache")
+        if cached is not None and cached[0] == key:
+            if _effects_cache_check:
+                return self._check_effects_cache(key, cached[1])
+            return cached[1]
+
+        merged = self._compute_effects()
+        self.__dict__["_effects_cache"] = (key, merged)
+        return merged
+
+    def _check_effects_cache(self: "Avatar", key: tuple, cached: dict[str, object]) -> dict[str, object]:
+        fresh = self._compute_effects()
+        if fresh != cached:
+            from src.run.log import get_logger
+            get_logger().logger.error(
+                "Effects cache mismatch for avatar %s (%s): cached=%r fresh=%r",
+                getattr(self, "id", "?"), getattr(self, "name", "?"), cached, fresh,
+            )
+            self.__dict__["_effects_cache"] = (key, fresh)
+        return fresh
+
+    def _compute_effects(self: "Avatar") -> dict[str, object]:
+        """
+        不经缓存地重新合并效果。
         直接复用 get_effect_breakdown 的逻辑，确保显示与实际效果一致。
         """
         merged: dict[str, object] = {}
@@ -164,6 +244,8 @@ class EffectsMixin:
         - HP 最大值
         - 寿命最大值
         """
+        self.invalidate_effects()
+
         # 计算基础最大值（基于境界）
         base_max_hp = HP_MAX_BY_REALM.get(self.cultivation_progress.realm, 100)
         
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import json
+import re
+from functools import lru_cache
 from typing import Any, Callable, Optional, TYPE_CHECKING
 
+from .compiler import compile_expression, precompile_effects
+
 if TYPE_CHECKING:
     from src.classes.avatar import Avatar
 
@@ -21,10 +25,12 @@ def load_effect_from_str(value: object) -> dict[str, Any] | list[dict[str, Any]]
     - value 为 None/空字符串/'nan' 时返回 {}
     - 解析失败时返回 {}
     - 支持返回 dict（单个effect）或 list[dict]（多个条件effect）
+    - 其中的 when 条件与动态值表达式会同时预编译到共享注册表
     """
     if value is None:
         return {}
     if isinstance(value, (dict, list)):
+        precompile_effects(value)
         return value
     s = str(value).strip()
     if not s or s == "nan":
@@ -34,6 +40,7 @@ def load_effect_from_str(value: object) -> dict[str, Any] | list[dict[str, Any]]
     try:
         obj = json.loads(s)
         if isinstance(obj, (dict, list)):
+            precompile_effects(obj)
             return obj
         return {}
     except Exception:
@@ -41,51 +48,88 @@ def load_effect_from_str(value: object) -> dict[str, Any] | list[dict[str, Any]]
     
     # 尝试宽松解析：单引号转双引号 + 无引号key处理
     try:
-        import re
-        
-        # 1. 先保护所有引号内的内容（包括单引号和双引号字符串）
-        strings = []
-        def save_string(match):
-            strings.append(match.group(0))
-            return f"__STRING_{len(strings)-1}__"
-        
-        relaxed = s
-        # 保护双引号字符串
-        relaxed = re.sub(r'"(?:[^"\\]|\\.)*"', save_string, relaxed)
-        # 保护单引号字符串
-        relaxed = re.sub(r"'(?:[^'\\]|\\.)*'", save_string, relaxed)
-        
-        # 2. 给无引号的key添加引号（此时所有字符串都已被保护）
-        # 匹配: 开始位置后的标识符 + 冒号
-        relaxed = re.sub(r'([{\[,]\s*)([a-zA-Z_][a-zA-Z0-9_]*)(\s*):', r'\1"__KEY_\2__"\3:', relaxed)
-        
-        # 3. 恢复字符串，并将单引号转为双引号
-        for i, s_val in enumerate(strings):
-            # 如果是单引号字符串，转为双引号
-            if s_val.startswith("'"):
-                # 需要转义内部的双引号，但要先恢复其中的__STRING_占位符
-                content = s_val[1:-1]  # 去掉单引号
-                # 恢复内部的字符串占位符
-                for j, inner_str in enumerate(strings):
-                    if f"__STRING_{j}__" in content and j != i:
-                        content = content.replace(f"__STRING_{j}__", inner_str)
-                # 转义处理
-                content = content.replace('\\', '\\\\').replace('"', '\\"')
-                s_val = f'"{content}"'
-            relaxed = relaxed.replace(f"__STRING_{i}__", s_val)
-        
-        # 4. 恢复key（去掉__KEY_标记）
-        relaxed = relaxed.replace('"__KEY_', '"').replace('__"', '"')
-        
-        # 5. 尝试解析
-        obj = json.loads(relaxed)
+        obj = json.loads(_relax_json(s))
         if isinstance(obj, (dict, list)):
+            precompile_effects(obj)
             return obj
         return {}
     except Exception:
         return {}
 
 
+_DOUBLE_QUOTED_RE = re.compile(r'"(?:[^"\\]|\\.)*"')
+_SINGLE_QUOTED_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+# 匹配: 开始位置后的标识符 + 冒号
+_BARE_KEY_RE = re.compile(r'([{\[,]\s*)([a-zA-Z_][a-zA-Z0-9_]*)(\s*):')
+
+
+@lru_cache(maxsize=4096)
+def _relax_json(s: str) -> str:
+    """
+    将宽松JSON文本规范化为标准JSON文本。
+    结果按原文缓存：同一配表值（如多语言重载、同款效果）只做一次正则改写。
+    """
+    # 1. 先保护所有引号内的内容（包括单引号和双引号字符串）
+    strings = []
+    def save_string(match):
+        strings.append(match.group(0))
+        return f"__STRING_{len(strings)-1}__"
+    
+    relaxed = s
+    # 保护双引号字符串
+    relaxed = _DOUBLE_QUOTED_RE.sub(save_string, relaxed)
+    # 保护单引号字符串
+    relaxed = _SINGLE_QUOTED_RE.sub(save_string, relaxed)
+    
+    # 2. 给无引号的key添加引号（此时所有字符串都已被保护）
+    relaxed = _BARE_KEY_RE.sub(r'\1"__KEY_\2__"\3:', relaxed)
+    
+    # 3. 恢复字符串，并将单引号转为双引号
+    for i, s_val in enumerate(strings):
+        # 如果是单引号字符串，转为双引号
+        if s_val.startswith("'"):
+            # 需要转义内部的双引号，但要先恢复其中的__STRING_占位符
+            content = s_val[1:-1]  # 去掉单引号
+            # 恢复内部的字符串占位符
+            for j, inner_str in enumerate(strings):
+                if f"__STRING_{j}__" in content and j != i:
+                    content = content.replace(f"__STRING_{j}__", inner_str)
+            # 转义处理
+            content = content.replace('\\', '\\\\').replace('"', '\\"')
+            s_val = f'"{content}"'
+        relaxed = relaxed.replace(f"__STRING_{i}__", s_val)
+    
+    # 4. 恢复key（去掉__KEY_标记）
+    return relaxed.replace('"__KEY_', '"').replace('__"', '"')
+
+
+_CONDITION_CONTEXT: dict[str, Any] | None = None
+
+
+def _get_condition_context() -> dict[str, Any]:
+    """条件表达式的公共求值上下文（首次使用时构建，避免循环导入）。"""
+    global _CONDITION_CONTEXT
+    if _CONDITION_CONTEXT is None:
+        from src.classes.weapon_type import WeaponType
+        from src.classes.cultivation import Realm
+        from src.classes.alignment import Alignment
+        _CONDITION_CONTEXT = {
+            "__builtins__": {},
+            "WeaponType": WeaponType,
+            "Realm": Realm,
+            "Alignment": Alignment,
+            # 常用内置函数
+            "any": any,
+            "all": all,
+            "len": len,
+            "set": set,
+            "list": list,
+            "max": max,
+            "min": min,
+        }
+    return _CONDITION_CONTEXT
+
+
 def _evaluate_conditional_effect(effect: dict[str, Any] | list[dict[str, Any]], avatar: "Avatar") -> dict[str, Any]:
     """
     评估带条件的effect，返回实际生效的effect dict。
@@ -102,33 +146,21 @@ def _evaluate_conditional_effect(effect: dict[str, Any] | list[dict[str, Any]],
     Returns:
         评估后实际生效的effect dict（合并所有满足条件的effects）
     """
-    from src.classes.weapon_type import WeaponType
-    from src.classes.cultivation import Realm
-    from src.classes.alignment import Alignment
-    
-    # 构建安全的eval上下文
-    safe_context = {
-        "__builtins__": {},
-        "avatar": avatar,
-        "WeaponType": WeaponType,
-        "Realm": Realm,
-        "Alignment": Alignment,
-        # 常用内置函数
-        "any": any,
-        "all": all,
-        "len": len,
-        "set": set,
-        "list": list,
-        "max": max,
-        "min": min,
-    }
+    # 构建安全的eval上下文（avatar 需放在 globals 中，表达式内的推导式才能访问）
+    safe_context = dict(_get_condition_context())
+    safe_context["avatar"] = avatar
     
     def _check_condition(when_expr: str) -> bool:
         """检查条件表达式是否为真"""
         if not when_expr:
             return True
+        if not isinstance(when_expr, str):
+            return False
+        code = compile_expression(when_expr)
+        if code is None:
+            return False
         try:
-            return bool(eval(when_expr, safe_context, {}))
+            return bool(eval(code, safe_context, {}))
         except Exception:
             # 条件评估失败时视为False
             return False
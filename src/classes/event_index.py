@@ -0,0 +1,223 @@
+"""
+角色 / 角色对最近事件的内存索引。
+
+prompt 构建每月会多次查询某个角色（或某两个角色之间）最近的大事、小事。
+RecentEventIndex 为每个角色、每个角色对分别保存最近 capacity 条大事与小事，
+由 EventManager 在写入时更新、打开数据库时预热，命中时不访问数据库。
+
+- 窗口按 (month_stamp, 序号) 排序，与数据库的 (month_stamp, rowid) 顺序一致；
+  超出 capacity 时丢弃最旧的事件，窗口内总是该键最新的连续若干条事件。
+- complete 表示窗口包含该键的全部事件；否则只能回答 limit <= 窗口长度的查询，
+  更大的 limit 由调用方回退到数据库。
+- 键的总数不超过 max_keys，按最近使用淘汰（LRU）。索引中没有的键视为未知，
+  写入时跳过，查询时由调用方从数据库填充。
+- 打开已有数据库时只预热角色键；角色对数量大且多数从不被查询，首次查询时再填充。
+"""
+from __future__ import annotations
+
+import bisect
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Callable, Iterable, List, Optional, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.classes.event import Event
+
+# 角色 id，或按字典序排列的两个角色 id。
+EventKey = Union[str, Tuple[str, str]]
+
+
+def pair_key(avatar_id1: str, avatar_id2: str) -> Optional[Tuple[str, str]]:
+    """角色对的索引键；同一个角色不构成角色对，返回 None。"""
+    a, b = str(avatar_id1), str(avatar_id2)
+    if a == b:
+        return None
+    return (a, b) if a < b else (b, a)
+
+
+def event_keys(event: "Event") -> List[EventKey]:
+    """事件涉及的所有键：每个相关角色，以及相关角色两两组成的角色对。"""
+    if not event.related_avatars:
+        return []
+    ids = sorted({str(a) for a in event.related_avatars})
+    return [*ids, *combinations(ids, 2)]
+
+
+@dataclass
+class _Window:
+    """单个键某一类事件（大事或小事）的最近事件窗口。"""
+    items: list = field(default_factory=list)  # [(month_stamp, 序号, Event)]，时间正序
+    complete: bool = True  # 是否包含该键这一类的全部事件
+
+    def insert(self, item: tuple, capacity: int) -> None:
+        items = self.items
+        if items and item[:2] < items[-1][:2]:
+            # 乱序写入（较早月份的事件）：早于不完整窗口的起点时，窗口外可能还有更新的事件，不能收录。
+            if not self.complete and item[:2] < items[0][:2]:
+                return
+            bisect.insort(items, item, key=lambda it: (it[0], it[1]))
+        else:
+            items.append(item)
+        if len(items) > capacity:
+            del items[0]
+            self.complete = False
+
+    def latest(self, limit: int) -> Optional[List["Event"]]:
+        if limit <= 0:
+            return []
+        if limit > len(self.items) and not self.complete:
+            return None
+        return [it[2] for it in self.items[-limit:]]
+
+
+@dataclass
+class _Entry:
+    major: _Window = field(default_factory=_Window)
+    minor: _Window = field(default_factory=_Window)
+
+    def window_for(self, event: "Event") -> _Window:
+        # 分类与 EventManager 的大事 / 小事查询一致：故事事件归入小事。
+        return self.major if event.is_major and not event.is_story else self.minor
+
+
+class RecentEventIndex:
+    """
+    每个角色 / 角色对最近 capacity 条大事与小事的内存索引（最多 max_keys 个键）。
+
+    写入（add）只更新已知的键。角色键（或角色对键）“全部已知”时（新建的空库，或预热覆盖了全部角色），
+    不在索引中的键一定没有事件，会直接新建。一旦发生淘汰，两者都失效。
+    """
+
+    def __init__(self, capacity: int = 32, max_keys: int = 50000):
+        self.capacity = max(1, int(capacity))
+        self.max_keys = max(1, int(max_keys))
+        self._entries: "OrderedDict[EventKey, _Entry]" = OrderedDict()
+        self._avatars_known = True
+        self._pairs_known = True
+        # 新写入事件的序号，始终大于已见过的数据库 rowid，保证窗口内顺序与数据库一致。
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: EventKey) -> bool:
+        return key in self._entries
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    def _put(self, key: EventKey, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+            self._avatars_known = False
+            self._pairs_known = False
+
+    def _is_known(self, key: EventKey) -> bool:
+        return self._pairs_known if isinstance(key, tuple) else self._avatars_known
+
+    def _build_entries(
+        self,
+        rows: Iterable[Tuple[EventKey, int, "Event"]],
+        pending: Iterable["Event"],
+        want: Callable[[EventKey], bool],
+    ) -> "OrderedDict[EventKey, _Entry]":
+        """由数据库行 (key, rowid, event)（按 month_stamp、rowid 正序）与尚未落盘的事件构建窗口。"""
+        entries: "OrderedDict[EventKey, _Entry]" = OrderedDict()
+        seen_ids = set()
+        for key, rowid, event in rows:
+            entry = entries.get(key)
+            if entry is None:
+                entry = entries[key] = _Entry()
+            entry.window_for(event).insert((int(event.month_stamp), rowid, event), self.capacity)
+            seen_ids.add(event.id)
+            if rowid > self._seq:
+                self._seq = rowid
+        for event in pending:
+            if event.id in seen_ids:
+                continue
+            item = None
+            for key in event_keys(event):
+                if not want(key):
+                    continue
+                entry = entries.get(key)
+                if entry is None:
+                    entry = entries[key] = _Entry()
+                if item is None:
+                    item = (int(event.month_stamp), self._next_seq(), event)
+                entry.window_for(event).insert(item, self.capacity)
+        return entries
+
+    def load(
+        self,
+        rows: Iterable[Tuple[EventKey, int, "Event"]],
+        pending: Iterable["Event"] = (),
+        with_pairs: bool = False,
+    ) -> None:
+        """
+        预热：用全库每个角色（with_pairs 时还有每个角色对）最新的 capacity + 1 条大事、小事
+        （多取一条用于判断窗口是否完整）重建索引。
+        """
+        self._entries.clear()
+        self._avatars_known = True
+        self._pairs_known = with_pairs
+        want = (lambda key: True) if with_pairs else (lambda key: not isinstance(key, tuple))
+        for key, entry in self._build_entries(rows, pending, want).items():
+            self._put(key, entry)
+
+    def reset(self) -> None:
+        """清空索引，并视所有键为已知的空键（对应新建的空库）。"""
+        self.load((), with_pairs=True)
+
+    def fill(
+        self,
+        key: EventKey,
+        rows: Iterable[Tuple[EventKey, int, "Event"]],
+        pending: Iterable["Event"] = (),
+    ) -> None:
+        """查询未命中时，用该键最新的 capacity + 1 条大事、小事填充。"""
+        entry = self._build_entries(rows, pending, lambda k: k == key).get(key) or _Entry()
+        self._put(key, entry)
+
+    def add(self, event: "Event") -> None:
+        """收录一条新写入的事件。"""
+        item = None
+        for key in event_keys(event):
+            entry = self._entries.get(key)
+            if entry is None:
+                if not self._is_known(key):
+                    continue
+                entry = _Entry()
+                self._put(key, entry)
+            if item is None:
+                item = (int(event.month_stamp), self._next_seq(), event)
+            entry.window_for(event).insert(item, self.capacity)
+
+    def query(self, key: EventKey, kind: str, limit: int) -> Optional[List["Event"]]:
+        """
+        返回该键最新 limit 条事件（时间正序）；kind 为 "major" / "minor" / "all"。
+        索引无法保证结果与数据库一致时返回 None。
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            if not self._is_known(key):
+                return None
+            return []
+        self._entries.move_to_end(key)
+        if kind == "major":
+            return entry.major.latest(limit)
+        if kind == "minor":
+            return entry.minor.latest(limit)
+        # 全部事件：最新 limit 条一定落在两类各自最新的 limit 条之内。
+        major = entry.major.latest(limit)
+        minor = entry.minor.latest(limit)
+        if major is None or minor is None:
+            return None
+        if limit <= 0:
+            return []
+        merged = entry.major.items[-limit:] + entry.minor.items[-limit:]
+        merged.sort(key=lambda it: (it[0], it[1]))
+        return [it[2] for it in merged[-limit:]]
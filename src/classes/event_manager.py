@@ -5,20 +5,62 @@
 """
 from __future__ import annotations
 
+import asyncio
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, TYPE_CHECKING
+from typing import Callable, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+from src.classes.event_index import EventKey, RecentEventIndex, pair_key
+from src.run.log import get_logger
 
 if TYPE_CHECKING:
     from src.classes.event import Event
+    from src.classes.event_sink import EventWriteBehind
     from src.classes.event_storage import EventStorage
 
 
+def _latest(events: List["Event"], pred: Callable[["Event"], bool], limit: int) -> List["Event"]:
+    """从时间正序的事件列表中取满足条件的最新 limit 条（时间正序）。"""
+    result = []
+    for e in reversed(events):
+        if pred(e):
+            result.append(e)
+            if len(result) >= limit:
+                break
+    return list(reversed(result))
+
+
+def _involves(*avatar_ids: str) -> Callable[["Event"], bool]:
+    return lambda e: bool(e.related_avatars) and all(a in e.related_avatars for a in avatar_ids)
+
+
+def _is_major(e: "Event") -> bool:
+    return e.is_major and not e.is_story
+
+
+def _is_minor(e: "Event") -> bool:
+    return not e.is_major or e.is_story
+
+
+@dataclass
+class AvatarEventCounts:
+    """某个角色相关事件的累计数量（分类与 _is_major / _is_minor 一致）。"""
+    major: int = 0  # 大事（is_major 且非故事）
+    minor: int = 0  # 小事（非 major，或故事）
+    story: int = 0  # 故事
+
+
+_NO_EVENTS = AvatarEventCounts()
+
+
 class EventManager:
     """
     事件管理器：使用 SQLite 持久化存储。
 
     保持与旧版兼容的接口：
     - add_event: 添加事件
+    - add_events: 批量添加事件（单事务）
     - get_recent_events: 获取最近事件
     - get_events_by_avatar: 按角色查询
     - get_events_between: 按角色对查询
@@ -26,33 +68,79 @@ class EventManager:
     - get_minor_events_by_avatar: 获取角色小事
     - get_major_events_between: 获取角色对大事
     - get_minor_events_between: 获取角色对小事
+    - get_avatar_event_counts: 角色大事/小事/故事的数量（内存计数，不查库）
+
+    按角色 / 角色对的查询优先由内存索引（RecentEventIndex）回答，未命中或 limit 超出索引容量时查库。
     """
 
-    def __init__(self, storage: Optional["EventStorage"] = None):
+    def __init__(
+        self,
+        storage: Optional["EventStorage"] = None,
+        sink: Optional["EventWriteBehind"] = None,
+        recent_index: Optional[RecentEventIndex] = None,
+        flush_timeout: float = 30.0,
+    ):
         """
         初始化事件管理器。
 
         Args:
             storage: SQLite 存储层。如果为 None，则使用内存模式（仅用于测试）。
+            sink: 异步写入队列。提供时写入交给后台线程，storage 只负责读取。
+            recent_index: 最近事件的内存索引（仅在有 storage 时使用），打开时从数据库预热。
+            flush_timeout: 等待后台写入队列（flush / wait_for_write_capacity）的最长秒数。
         """
         self._storage = storage
+        self._sink = sink
+        self._flush_timeout = flush_timeout
+        self._recent = recent_index if storage is not None else None
         # 内存后备（仅当 storage 为 None 时使用，用于测试或迁移期间）。
         self._memory_events: List["Event"] = []
+        # 每个角色的事件计数：写入时累加；数据库随存档保存，打开时据此重建。
+        self._avatar_counts: Dict[str, AvatarEventCounts] = {}
+        # 写入（计数、索引、入队）与重建取快照、换入结果互斥；重建查库期间不持锁，
+        # 这段时间新增的事件记入 _rebuild_logs，换入时补上。
+        self._write_lock = threading.RLock()
+        self._rebuild_logs: List[List["Event"]] = []
+        self.rebuild_avatar_event_counts()
+        self.rebuild_recent_index()
 
     @classmethod
-    def create_with_db(cls, db_path: Path) -> "EventManager":
+    def create_with_db(cls, db_path: Path, write_behind: Optional[bool] = None) -> "EventManager":
         """
         工厂方法：创建使用 SQLite 的事件管理器。
 
         Args:
             db_path: 数据库文件路径。
+            write_behind: 是否启用后台异步写入，为 None 时读取配置 event_storage.write_behind。
 
         Returns:
             配置好的 EventManager 实例。
         """
         from src.classes.event_storage import EventStorage
+        from src.utils.config import CONFIG
+
+        conf = CONFIG.get("event_storage", {})
+        if write_behind is None:
+            write_behind = bool(conf.get("write_behind", False))
+
         storage = EventStorage(db_path)
-        return cls(storage)
+        sink = None
+        if write_behind:
+            from src.classes.event_sink import EventWriteBehind
+            # 写入线程使用独立连接。
+            sink = EventWriteBehind(
+                EventStorage(db_path),
+                max_pending=conf.get("max_pending", 10000),
+                batch_size=conf.get("batch_size", 1000),
+            )
+        recent_index = None
+        index_size = int(conf.get("recent_index_size", 32))
+        if index_size > 0:
+            recent_index = RecentEventIndex(
+                capacity=index_size,
+                max_keys=conf.get("recent_index_max_keys", 50000),
+            )
+        return cls(storage, sink, recent_index, flush_timeout=float(conf.get("flush_timeout", 30.0)))
 
     @classmethod
     def create_in_memory(cls) -> "EventManager":
@@ -76,105 +164,326 @@ class EventManager:
         if is_null_event(event):
             return
 
+        with self._write_lock:
+            self._count_events((event,))
+            for log in self._rebuild_logs:
+                log.append(event)
+            if self._recent is not None:
+                self._recent.add(event)
+            if self._sink:
+                # 调用方多在事件循环线程上，不在此阻塞；背压见 wait_for_write_capacity
+                self._sink.submit([event], block=False)
+            elif self._storage:
+                self._storage.add_event(event)
+            else:
+                # 内存后备模式。
+                self._memory_events.append(event)
+
+    def add_events(self, events: List["Event"]) -> None:
+        """
+        批量添加事件。
+
+        如果有 SQLite 存储，整批在一个事务内写入（启用异步写入时交给后台线程）。
+        否则逐条存入内存后备列表。
+        """
+        from src.classes.event import is_null_event
+        events = [e for e in events if not is_null_event(e)]
+        if not events:
+            return
+
         if self._storage:
-            self._storage.add_event(event)
+            with self._write_lock:
+                self._count_events(events)
+                for log in self._rebuild_logs:
+                    log.extend(events)
+                if self._recent is not None:
+                    for event in events:
+                        self._recent.add(event)
+                if self._sink:
+                    self._sink.submit(events, block=False)
+                else:
+                    self._storage.add_events(events)
         else:
-            # 内存后备模式。
-            self._memory_events.append(event)
+            for event in events:
+                self.add_event(event)
+
+    # --- 角色事件计数 ---
+
+    def _count_events(self, events: Iterable["Event"], counts: Optional[Dict[str, AvatarEventCounts]] = None) -> None:
+        if counts is None:
+            counts = self._avatar_counts
+        for event in events:
+            if not event.related_avatars:
+                continue
+            is_major = _is_major(event)
+            for avatar_id in set(event.related_avatars):
+                entry = counts.get(avatar_id)
+                if entry is None:
+                    entry = counts[avatar_id] = AvatarEventCounts()
+                if is_major:
+                    entry.major += 1
+                else:
+                    entry.minor += 1
+                if event.is_story:
+                    entry.story += 1
+
+    def get_avatar_event_counts(self, avatar_id: str) -> AvatarEventCounts:
+        """角色相关事件的数量（O(1)，无数据库查询）。返回值只读。"""
+        return self._avatar_counts.get(str(avatar_id), _NO_EVENTS)
+
+    def rebuild_avatar_event_counts(self) -> None:
+        """
+        从数据库（或内存后备）重新统计所有角色的事件数量。
+
+        查库不持写入锁：只统计快照时已提交的行（rowid 不超过快照时的最大值，且不在待写快照中），
+        待写快照与此后新增的事件另行累加，统计期间写入线程提交的事件不会漏计或重计。
+        """
+        if not self._storage:
+            with self._write_lock:
+                self._avatar_counts = {}
+                self._count_events(self._memory_events)
+            return
+        pending, added, last_rowid = self._begin_rebuild()
+        try:
+            committed = self._storage.count_events_by_avatar(
+                exclude_ids=[e.id for e in pending], max_rowid=last_rowid,
+            )
+        except BaseException:
+            self._end_rebuild(added)
+            raise
+        counts = {
+            avatar_id: AvatarEventCounts(major, minor, story)
+            for avatar_id, (major, minor, story) in committed.items()
+        }
+        with self._write_lock:
+            self._end_rebuild(added)
+            self._count_events(pending, counts)
+            self._count_events(added, counts)
+            self._avatar_counts = counts
+
+    def _begin_rebuild(self) -> tuple:
+        """
+        持写入锁取重建快照：(待写事件, 此后新增事件的记录列表, 已提交行的最大 rowid)。
+
+        记录列表在 _end_rebuild 前持续收录新增事件；调用方查库时不持锁。
+        """
+        with self._write_lock:
+            pending = list(self._sink.pending_events()) if self._sink else []
+            added: List["Event"] = []
+            self._rebuild_logs.append(added)
+            return pending, added, self._storage.max_rowid()
+
+    def _end_rebuild(self, added: List["Event"]) -> None:
+        with self._write_lock:
+            self._rebuild_logs.remove(added)
+
+    # --- 最近事件内存索引 ---
+
+    def _recent_rows(self, key: EventKey, limit: int) -> list:
+        if isinstance(key, tuple):
+            return self._storage.get_recent_events_per_pair(limit, pair=key)
+        return self._storage.get_recent_events_per_avatar(limit, avatar_id=key)
+
+    def rebuild_recent_index(self) -> None:
+        """
+        从数据库预热最近事件索引（打开数据库、清理后调用）。
+
+        只预热角色键；角色对在首次查询时按需填充。
+        """
+        if self._recent is None:
+            return
+        # 先取待写快照再查库，与 _with_pending 相同；查库不持写入锁，期间新增的事件换入时补上
+        # （与库中行按 id 去重）。
+        pending, added, _ = self._begin_rebuild()
+        try:
+            empty = self._storage.count() == 0
+            rows = [] if empty else self._storage.get_recent_events_per_avatar(self._recent.capacity + 1)
+        except BaseException:
+            self._end_rebuild(added)
+            raise
+        with self._write_lock:
+            self._end_rebuild(added)
+            if empty and not pending and not added:
+                self._recent.reset()
+            else:
+                self._recent.load(rows, pending + added)
+
+    def _recent_query(self, key: Optional[EventKey], kind: str, limit: int) -> Optional[List["Event"]]:
+        """由内存索引回答查询；无法保证与数据库一致时返回 None（调用方查库）。"""
+        if self._recent is None or key is None:
+            return None
+        result = self._recent.query(key, kind, limit)
+        if result is None and key not in self._recent and limit <= self._recent.capacity:
+            pending = self._sink.pending_events() if self._sink else []
+            self._recent.fill(key, self._recent_rows(key, self._recent.capacity + 1), pending)
+            result = self._recent.query(key, kind, limit)
+        return result
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待后台写入队列全部提交（存档、关闭前调用）。
+
+        Returns:
+            是否全部写完；超时（默认 flush_timeout）或写入线程已退出时返回 False。
+        """
+        if not self._sink:
+            return True
+        ok = self._sink.flush(self._flush_timeout if timeout is None else timeout)
+        if not ok:
+            state = "alive" if self._sink.is_alive() else "stopped"
+            get_logger().logger.error(
+                f"EventManager.flush timed out with {self._sink.pending_count()} pending events (writer {state})"
+            )
+        return ok
+
+    async def wait_for_write_capacity(self) -> bool:
+        """
+        后台写入队列已满时，在线程池中等待写入线程腾出空间，不阻塞事件循环（背压）。
+
+        Returns:
+            是否有空间；超时或写入线程已退出时返回 False（事件仍可入队，只是不再限流）。
+        """
+        if not self._sink or not self._sink.is_full():
+            return True
+        ok = await asyncio.to_thread(self._sink.wait_for_room, self._flush_timeout)
+        if not ok:
+            get_logger().logger.warning(
+                f"Event write-behind queue still full after {self._flush_timeout}s "
+                f"({self._sink.pending_count()} pending)"
+            )
+        return ok
+
+    def checkpoint(self) -> None:
+        """将所有事件完整落盘到数据库主文件（复制数据库文件前调用）。"""
+        self.flush()
+        if self._storage:
+            self._storage.checkpoint()
+
+    def backup_to(self, dest_path: Path) -> None:
+        """把事件数据库备份到 dest_path（另存为时使用，见 EventStorage.backup_to）。"""
+        self.flush()
+        if self._storage:
+            self._storage.backup_to(dest_path)
+
+    def _with_pending(
+        self,
+        query: Callable[[], List["Event"]],
+        pred: Callable[["Event"], bool],
+        limit: int,
+    ) -> List["Event"]:
+        """
+        执行数据库查询，并合并后台队列中尚未落盘的事件（read-your-writes）。
+
+        必须先取队列快照再查库：快照之后才提交的事件仍在快照中，
+        快照之前已提交的事件则一定能被查询看到。两边都出现的按 id 去重。
+        """
+        pending = self._sink.pending_events() if self._sink else []
+        events = query()
+        if not pending:
+            return events
+        seen = {e.id for e in events}
+        tail = [e for e in pending if e.id not in seen and pred(e)]
+        if not tail:
+            return events
+        merged = events + tail
+        # 待写事件按写入顺序排在数据库结果之后，稳定排序保持同月内的先后。
+        merged.sort(key=lambda e: int(e.month_stamp))
+        return merged[-limit:]
 
     def get_recent_events(self, limit: int = 100) -> List["Event"]:
         """获取最近的事件（时间正序）。"""
         if self._storage:
-            return self._storage.get_recent_events(limit=limit)
+            return self._with_pending(
+                lambda: self._storage.get_recent_events(limit=limit),
+                lambda e: True,
+                limit,
+            )
         else:
             return self._memory_events[-limit:]
 
     def get_events_by_avatar(self, avatar_id: str, *, limit: int = 50) -> List["Event"]:
         """获取角色相关的事件（时间正序）。"""
+        pred = _involves(avatar_id)
+        cached = self._recent_query(str(avatar_id), "all", limit)
+        if cached is not None:
+            return cached
         if self._storage:
-            return self._storage.get_events_by_avatar(avatar_id, limit=limit)
+            return self._with_pending(
+                lambda: self._storage.get_events_by_avatar(avatar_id, limit=limit), pred, limit
+            )
         else:
             # 内存后备模式：简单过滤。
-            result = []
-            for e in reversed(self._memory_events):
-                if e.related_avatars and avatar_id in e.related_avatars:
-                    result.append(e)
-                    if len(result) >= limit:
-                        break
-            return list(reversed(result))
+            return _latest(self._memory_events, pred, limit)
 
     def get_events_between(self, avatar_id1: str, avatar_id2: str, *, limit: int = 50) -> List["Event"]:
         """获取两个角色之间的事件（时间正序）。"""
+        pred = _involves(avatar_id1, avatar_id2)
+        cached = self._recent_query(pair_key(avatar_id1, avatar_id2), "all", limit)
+        if cached is not None:
+            return cached
         if self._storage:
-            return self._storage.get_events_between(avatar_id1, avatar_id2, limit=limit)
+            return self._with_pending(
+                lambda: self._storage.get_events_between(avatar_id1, avatar_id2, limit=limit), pred, limit
+            )
         else:
             # 内存后备模式：简单过滤。
-            result = []
-            for e in reversed(self._memory_events):
-                if e.related_avatars:
-                    if avatar_id1 in e.related_avatars and avatar_id2 in e.related_avatars:
-                        result.append(e)
-                        if len(result) >= limit:
-                            break
-            return list(reversed(result))
+            return _latest(self._memory_events, pred, limit)
 
     def get_major_events_by_avatar(self, avatar_id: str, *, limit: int = 10) -> List["Event"]:
         """获取角色的大事（长期记忆，时间正序）。"""
+        involves = _involves(avatar_id)
+        pred = lambda e: _is_major(e) and involves(e)
+        cached = self._recent_query(str(avatar_id), "major", limit)
+        if cached is not None:
+            return cached
         if self._storage:
-            return self._storage.get_major_events_by_avatar(avatar_id, limit=limit)
+            return self._with_pending(
+                lambda: self._storage.get_major_events_by_avatar(avatar_id, limit=limit), pred, limit
+            )
         else:
-            result = []
-            for e in reversed(self._memory_events):
-                if e.is_major and not e.is_story:
-                    if e.related_avatars and avatar_id in e.related_avatars:
-                        result.append(e)
-                        if len(result) >= limit:
-                            break
-            return list(reversed(result))
+            return _latest(self._memory_events, pred, limit)
 
     def get_minor_events_by_avatar(self, avatar_id: str, *, limit: int = 10) -> List["Event"]:
         """获取角色的小事（短期记忆，时间正序）。"""
+        involves = _involves(avatar_id)
+        pred = lambda e: _is_minor(e) and involves(e)
+        cached = self._recent_query(str(avatar_id), "minor", limit)
+        if cached is not None:
+            return cached
         if self._storage:
-            return self._storage.get_minor_events_by_avatar(avatar_id, limit=limit)
+            return self._with_pending(
+                lambda: self._storage.get_minor_events_by_avatar(avatar_id, limit=limit), pred, limit
+            )
         else:
-            result = []
-            for e in reversed(self._memory_events):
-                if not e.is_major or e.is_story:
-                    if e.related_avatars and avatar_id in e.related_avatars:
-                        result.append(e)
-                        if len(result) >= limit:
-                            break
-            return list(reversed(result))
+            return _latest(self._memory_events, pred, limit)
 
     def get_major_events_between(self, avatar_id1: str, avatar_id2: str, *, limit: int = 10) -> List["Event"]:
         """获取两个角色之间的大事（长期记忆，时间正序）。"""
+        involves = _involves(avatar_id1, avatar_id2)
+        pred = lambda e: _is_major(e) and involves(e)
+        cached = self._recent_query(pair_key(avatar_id1, avatar_id2), "major", limit)
+        if cached is not None:
+            return cached
         if self._storage:
-            return self._storage.get_major_events_between(avatar_id1, avatar_id2, limit=limit)
+            return self._with_pending(
+                lambda: self._storage.get_major_events_between(avatar_id1, avatar_id2, limit=limit), pred, limit
+            )
         else:
-            result = []
-            for e in reversed(self._memory_events):
-                if e.is_major and not e.is_story:
-                    if e.related_avatars:
-                        if avatar_id1 in e.related_avatars and avatar_id2 in e.related_avatars:
-                            result.append(e)
-                            if len(result) >= limit:
-                                break
-            return list(reversed(result))
+            return _latest(self._memory_events, pred, limit)
 
     def get_minor_events_between(self, avatar_id1: str, avatar_id2: str, *, limit: int = 10) -> List["Event"]:
         """获取两个角色之间的小事（短期记忆，时间正序）。"""
+        involves = _involves(avatar_id1, avatar_id2)
+        pred = lambda e: _is_minor(e) and involves(e)
+        cached = self._recent_query(pair_key(avatar_id1, avatar_id2), "minor", limit)
+        if cached is not None:
+            return cached
         if self._storage:
-            return self._storage.get_minor_events_between(avatar_id1, avatar_id2, limit=limit)
+            return self._with_pending(
+                lambda: self._storage.get_minor_events_between(avatar_id1, avatar_id2, limit=limit), pred, limit
+            )
         else:
-            result = []
-            for e in reversed(self._memory_events):
-                if not e.is_major or e.is_story:
-                    if e.related_avatars:
-                        if avatar_id1 in e.related_avatars and avatar_id2 in e.related_avatars:
-                            result.append(e)
-                            if len(result) >= limit:
-                                break
-            return list(reversed(result))
+            return _latest(self._memory_events, pred, limit)
 
     # --- 分页查询接口（新增）---
 
@@ -201,6 +510,8 @@ class EventManager:
             - has_more: 是否有更多数据。
         """
         if self._storage:
+            # cursor 基于数据库 rowid，先让队列落盘，保证翻页连续。
+            self.flush()
             events, next_cursor = self._storage.get_events(
                 avatar_id=avatar_id,
                 avatar_id_pair=avatar_id_pair,
@@ -227,21 +538,30 @@ class EventManager:
             删除的事件数量。
         """
         if self._storage:
-            return self._storage.cleanup(keep_major=keep_major, before_month_stamp=before_month_stamp)
+            self.flush()
+            deleted = self._storage.cleanup(keep_major=keep_major, before_month_stamp=before_month_stamp)
         else:
             # 内存模式：简单清空。
-            count = len(self._memory_events)
+            deleted = len(self._memory_events)
             self._memory_events.clear()
-            return count
+        # 计数与内存索引与库中现存事件保持一致
+        if deleted:
+            self.rebuild_avatar_event_counts()
+            self.rebuild_recent_index()
+        return deleted
 
     def count(self) -> int:
         """获取事件总数。"""
         if self._storage:
+            self.flush()
             return self._storage.count()
         else:
             return len(self._memory_events)
 
     def close(self) -> None:
-        """关闭资源。"""
+        """关闭资源（先写完后台队列）。"""
+        if self._sink:
+            self._sink.close()
+            self._sink = None
         if self._storage:
             self._storage.close()
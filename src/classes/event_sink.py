@@ -0,0 +1,169 @@
+"""
+事件异步写入（write-behind）。
+
+模拟每月结束时把事件交给 EventManager。同步写 SQLite 会在 asyncio 事件循环线程上
+等待磁盘，期间 websocket 推送与 HTTP 请求都被阻塞。这里把写入挪到专用线程：
+- 生产者（模拟线程）只把事件追加到待写队列，立即返回；
+- 写入线程按批次（单事务）写入数据库，提交成功后才从队列中移除；
+- 队列有上限（背压）：线程中的生产者在 submit 时阻塞等待；事件循环上的生产者用 submit(block=False)
+  立即入队，并在每月写入前通过 EventManager.wait_for_write_capacity 把等待挪到线程池；
+- flush() 等待队列清空，供存档、关闭时调用；所有等待都会检查写入线程是否存活，
+  写入线程意外退出时立即返回失败，而不是永久挂起；
+- pending_events() 返回尚未落盘的事件，EventManager 据此把内存尾部与数据库结果合并，
+  保证同一个月内写入的事件立即可查（read-your-writes）。
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+from src.run.log import get_logger
+
+if TYPE_CHECKING:
+    from src.classes.event import Event
+    from src.classes.event_storage import EventStorage
+
+# 等待时检查写入线程存活的间隔（秒）
+_WAIT_SLICE = 0.5
+
+
+class EventWriteBehind:
+    """
+    后台批量写入事件的队列。
+
+    写入线程使用独立的 EventStorage 连接：WAL 模式下读写连接互不阻塞，
+    且读连接只会看到已提交的数据。
+    """
+
+    def __init__(
+        self,
+        storage: "EventStorage",
+        max_pending: int = 10000,
+        batch_size: int = 1000,
+    ):
+        """
+        Args:
+            storage: 写入线程专用的存储连接（由本对象负责关闭）。
+            max_pending: 待写事件上限，达到后 submit 阻塞（背压）。
+            batch_size: 单个事务写入的最大事件数。
+        """
+        self._storage = storage
+        self._max_pending = max(1, int(max_pending))
+        self._batch_size = max(1, int(batch_size))
+        self._logger = get_logger().logger
+
+        # 待写事件（含正在写入的那一批，位于头部，提交成功后才移除）
+        self._pending: list["Event"] = []
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="EventWriteBehind", daemon=True)
+        self._thread.start()
+
+    def _wait(self, predicate: Callable[[], bool], timeout: Optional[float]) -> bool:
+        """
+        持有锁时等待 predicate 成立。
+
+        Returns:
+            是否成立；超时或写入线程已退出（条件不会再变化）时返回 False。
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not predicate():
+            if not self._thread.is_alive():
+                return predicate()
+            remaining = _WAIT_SLICE if deadline is None else min(_WAIT_SLICE, deadline - time.monotonic())
+            if remaining <= 0:
+                return False
+            self._cond.wait(remaining)
+        return True
+
+    def _has_room(self) -> bool:
+        return len(self._pending) < self._max_pending or self._closed
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def is_full(self) -> bool:
+        with self._cond:
+            return not self._has_room()
+
+    def submit(self, events: Iterable["Event"], block: bool = True) -> None:
+        """
+        将事件加入待写队列。
+
+        Args:
+            block: 队列已满时是否阻塞等待写入线程腾出空间。事件循环线程上应传 False：
+                立即入队（可暂时超过上限），背压由 wait_for_room 在线程池中等待。
+
+        Raises:
+            RuntimeError: 队列已关闭，或写入线程已退出。
+        """
+        events = list(events)
+        if not events:
+            return
+        with self._cond:
+            if block:
+                self._wait(self._has_room, None)
+            if self._closed:
+                raise RuntimeError("EventWriteBehind is closed")
+            if not self._thread.is_alive():
+                raise RuntimeError("EventWriteBehind writer thread has stopped")
+            self._pending.extend(events)
+            self._cond.notify_all()
+
+    def wait_for_room(self, timeout: Optional[float] = None) -> bool:
+        """等待队列低于上限（阻塞调用，事件循环上请放到线程池执行）。返回是否等到。"""
+        with self._cond:
+            return self._wait(self._has_room, timeout)
+
+    def pending_events(self) -> list["Event"]:
+        """返回尚未提交到数据库的事件快照（写入顺序）。"""
+        with self._cond:
+            return list(self._pending)
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待队列中的事件全部提交。
+
+        Returns:
+            是否在超时前全部写完（写入线程已退出时立即返回 False）。
+        """
+        with self._cond:
+            return self._wait(lambda: not self._pending, timeout)
+
+    def close(self) -> None:
+        """写完剩余事件后停止写入线程并关闭连接。"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._storage.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return  # 已关闭且队列为空
+                batch = self._pending[:self._batch_size]
+
+            try:
+                written = self._storage.add_events(batch)
+            except Exception as e:
+                self._logger.error(f"EventWriteBehind write failed: {e}")
+                written = 0
+            if written != len(batch):
+                # add_events 已记录错误；丢弃该批，避免无限重试卡住队列
+                self._logger.error(f"EventWriteBehind dropped {len(batch)} events after write failure")
+
+            with self._cond:
+                del self._pending[:len(batch)]
+                self._cond.notify_all()
@@ -5,9 +5,11 @@ SQLite 事件存储层。
 """
 from __future__ import annotations
 
+import json
+import os
 import sqlite3
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Iterable, List, Optional
 from contextlib import contextmanager
 from datetime import datetime, timezone
 
@@ -25,14 +27,18 @@ def _parse_time(ts_str: str) -> float:
     if not ts_str:
         return 0.0
     try:
-        # 尝试带微秒的格式
-        dt = datetime.strptime(ts_str, '%Y-%m-%d %H:%M:%S.%f')
-    except ValueError:
+        # fromisoformat 同时接受带 / 不带微秒的格式，比 strptime 快一个数量级（批量读取事件时是热点）
+        dt = datetime.fromisoformat(ts_str)
+    except (TypeError, ValueError):
         try:
-            # 尝试不带微秒的格式
-            dt = datetime.strptime(ts_str, '%Y-%m-%d %H:%M:%S')
+            # 尝试带微秒的格式
+            dt = datetime.strptime(ts_str, '%Y-%m-%d %H:%M:%S.%f')
         except ValueError:
-            return 0.0
+            try:
+                # 尝试不带微秒的格式
+                dt = datetime.strptime(ts_str, '%Y-%m-%d %H:%M:%S')
+            except ValueError:
+                return 0.0
     # 假设数据库存的是 UTC (naive time string from sqlite usually treated as such)
     return dt.replace(tzinfo=timezone.utc).timestamp()
 
@@ -41,24 +47,40 @@ class EventStorage:
     SQLite 事件存储层。
 
     提供：
-    - 实时写入事件
+    - 实时写入事件（单条或按月批量）
     - 分页查询（cursor-based）
     - 按角色/角色对查询
     - 历史清理
     """
 
-    def __init__(self, db_path: Path):
+    # PRAGMA synchronous 允许的取值
+    SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+    def __init__(self, db_path: Path, synchronous: Optional[str] = None):
         """
         初始化数据库连接，创建表（如不存在）。
 
         Args:
             db_path: 数据库文件路径。
+            synchronous: PRAGMA synchronous 级别（OFF/NORMAL/FULL/EXTRA），
+                为 None 时读取配置 event_storage.synchronous。
         """
         self._db_path = db_path
         self._conn: Optional[sqlite3.Connection] = None
         self._logger = get_logger().logger
+        self._synchronous = self._resolve_synchronous(synchronous)
         self._init_db()
 
+    @classmethod
+    def _resolve_synchronous(cls, synchronous: Optional[str]) -> str:
+        if synchronous is None:
+            from src.utils.config import CONFIG
+            synchronous = CONFIG.get("event_storage", {}).get("synchronous", "NORMAL")
+        level = str(synchronous).upper()
+        if level not in cls.SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Invalid synchronous level: {synchronous}")
+        return level
+
     def _init_db(self) -> None:
         """初始化数据库连接和表结构。"""
         try:
@@ -70,6 +92,10 @@ class EventStorage:
 
             # 启用外键约束。
             self._conn.execute("PRAGMA foreign_keys = ON")
+            # WAL 模式：写入只追加日志，读写互不阻塞；
+            # 配合 synchronous=NORMAL 时提交不再每次 fsync。
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute(f"PRAGMA synchronous = {self._synchronous}")
 
             # 创建表。
             self._conn.executescript("""
@@ -89,12 +115,19 @@ class EventStorage:
                     FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
                 );
 
-                CREATE INDEX IF NOT EXISTS idx_events_month_stamp
-                    ON events(month_stamp DESC);
+                -- 升序索引隐含 rowid 作为末尾键，等价于 (month_stamp, rowid)；
+                -- 反向扫描即可直接满足 ORDER BY month_stamp DESC, rowid DESC，无需临时排序。
+                -- 旧版的 DESC 索引做不到这一点，一并删除。
+                DROP INDEX IF EXISTS idx_events_month_stamp;
+                CREATE INDEX IF NOT EXISTS idx_events_month_rowid
+                    ON events(month_stamp);
                 CREATE INDEX IF NOT EXISTS idx_events_is_major
                     ON events(is_major);
-                CREATE INDEX IF NOT EXISTS idx_event_avatars_avatar_id
-                    ON event_avatars(avatar_id);
+                -- (avatar_id, event_id) 覆盖按角色筛选的 JOIN，无需回表。
+                -- 旧版单列索引被其完全覆盖，一并删除。
+                DROP INDEX IF EXISTS idx_event_avatars_avatar_id;
+                CREATE INDEX IF NOT EXISTS idx_event_avatars_avatar_event
+                    ON event_avatars(avatar_id, event_id);
                 CREATE INDEX IF NOT EXISTS idx_event_avatars_event_id
                     ON event_avatars(event_id);
             """)
@@ -131,37 +164,156 @@ class EventStorage:
             return False
 
         try:
-            with self._transaction():
-                # 插入事件主表。
-                self._conn.execute(
+            self._write_events([event])
+            return True
+        except Exception as e:
+            self._logger.error(f"Failed to write event {getattr(event, 'id', None)}: {e}")
+            return False
+
+    def add_events(self, events: Iterable["Event"]) -> int:
+        """
+        在单个事务中批量写入事件（通常为一整个月的事件）。
+
+        整批失败时回滚，再逐条重试，只丢弃写不进去的事件（记录日志），不抛异常。
+
+        Args:
+            events: 要写入的事件。
+
+        Returns:
+            成功提交的事件数量。
+        """
+        if self._conn is None:
+            self._logger.error("EventStorage not initialized")
+            return 0
+
+        events = list(events)
+        if not events:
+            return 0
+
+        try:
+            self._write_events(events)
+            return len(events)
+        except Exception as e:
+            if len(events) == 1:
+                self._logger.error(f"Failed to write event {getattr(events[0], 'id', None)}: {e}")
+                return 0
+            self._logger.warning(f"Failed to write {len(events)} events in one batch, retrying one by one: {e}")
+        return sum(1 for event in events if self.add_event(event))
+
+    def _write_events(self, events: List["Event"]) -> None:
+        """在一个事务内写入事件；任何错误（含行转换）回滚并抛出。"""
+        with self._transaction():
+            event_rows = [
+                (
+                    event.id,
+                    int(event.month_stamp),
+                    event.content,
+                    event.is_major,
+                    event.is_story,
+                    _format_time(event.created_at),
+                )
+                for event in events
+            ]
+            avatar_rows = [
+                (event.id, str(avatar_id))
+                for event in events
+                if event.related_avatars
+                for avatar_id in event.related_avatars
+            ]
+
+            # 插入事件主表。
+            self._conn.executemany(
+                """
+                INSERT OR IGNORE INTO events (id, month_stamp, content, is_major, is_story, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                event_rows,
+            )
+
+            # 插入关联表。
+            if avatar_rows:
+                self._conn.executemany(
                     """
-                    INSERT OR IGNORE INTO events (id, month_stamp, content, is_major, is_story, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                    INSERT OR IGNORE INTO event_avatars (event_id, avatar_id)
+                    VALUES (?, ?)
                     """,
-                    (
-                        event.id,
-                        int(event.month_stamp),
-                        event.content,
-                        event.is_major,
-                        event.is_story,
-                        _format_time(event.created_at),
-                    )
+                    avatar_rows,
                 )
 
-                # 插入关联表。
-                if event.related_avatars:
-                    for avatar_id in event.related_avatars:
-                        self._conn.execute(
-                            """
-                            INSERT OR IGNORE INTO event_avatars (event_id, avatar_id)
-                            VALUES (?, ?)
-                            """,
-                            (event.id, str(avatar_id))
-                        )
-            return True
+    def checkpoint(self) -> None:
+        """
+        将 WAL 日志合并回主数据库文件。
+        复制数据库文件（如存档）前必须调用，否则最近的提交可能只存在于 -wal 文件中。
+        """
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
         except Exception as e:
-            self._logger.error(f"Failed to write event {event.id}: {e}")
-            return False
+            self._logger.error(f"Failed to checkpoint EventStorage: {e}")
+
+    def backup_to(self, dest_path: Path) -> None:
+        """
+        通过 SQLite 在线备份 API 把数据库复制到 dest_path。
+
+        备份读取的是一致的快照（包括仍在 WAL 中的提交），无需先 checkpoint；
+        先写临时文件再替换，目标路径上残留的 -wal/-shm 会被删除，避免被回放到新文件上。
+        """
+        if self._conn is None:
+            raise RuntimeError("EventStorage is closed")
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = dest_path.with_name(dest_path.name + ".tmp")
+        if tmp_path.exists():
+            tmp_path.unlink()
+        dest = sqlite3.connect(str(tmp_path))
+        try:
+            self._conn.backup(dest)
+        finally:
+            dest.close()
+        for suffix in ("-wal", "-shm"):
+            stale = dest_path.with_name(dest_path.name + suffix)
+            if stale.exists():
+                stale.unlink()
+        os.replace(tmp_path, dest_path)
+
+    # 单条 SQL 允许的绑定参数上限（旧版 SQLite 为 999），批量 IN 查询按此分块。
+    _IN_CHUNK_SIZE = 500
+
+    def _load_related_avatars(self, event_ids: list[str]) -> dict[str, list[str]]:
+        """批量查询一组事件的关联角色，返回 event_id -> [avatar_id]（按写入顺序）。"""
+        related: dict[str, list[str]] = {}
+        for start in range(0, len(event_ids), self._IN_CHUNK_SIZE):
+            chunk = event_ids[start:start + self._IN_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT event_id, avatar_id FROM event_avatars "
+                f"WHERE event_id IN ({placeholders}) ORDER BY rowid",
+                chunk,
+            ).fetchall()
+            for r in rows:
+                related.setdefault(r["event_id"], []).append(r["avatar_id"])
+        return related
+
+    def _rows_to_events(self, rows: list[sqlite3.Row]) -> list["Event"]:
+        """将 events 表的查询结果转换为 Event 对象（关联角色一次性批量补齐）。"""
+        from src.classes.event import Event
+        from src.classes.calendar import MonthStamp
+
+        if not rows:
+            return []
+        related = self._load_related_avatars([row["id"] for row in rows])
+        return [
+            Event(
+                month_stamp=MonthStamp(row["month_stamp"]),
+                content=row["content"],
+                related_avatars=related.get(row["id"]),
+                is_major=bool(row["is_major"]),
+                is_story=bool(row["is_story"]),
+                id=row["id"],
+                created_at=_parse_time(row["created_at"]),
+            )
+            for row in rows
+        ]
 
     def _parse_cursor(self, cursor: str) -> tuple[int, int]:
         """
@@ -200,9 +352,6 @@ class EventStorage:
         Returns:
             (events, next_cursor)，next_cursor 为 None 表示没有更多。
         """
-        from src.classes.event import Event
-        from src.classes.calendar import MonthStamp
-
         if self._conn is None:
             return [], None
 
@@ -262,34 +411,13 @@ class EventStorage:
                 rows = rows[:limit]
 
             # 构建事件对象。
-            events = []
-            last_rowid = None
-            last_month_stamp = None
-            for row in rows:
-                # 获取关联的 avatar IDs。
-                avatar_rows = self._conn.execute(
-                    "SELECT avatar_id FROM event_avatars WHERE event_id = ?",
-                    (row["id"],)
-                ).fetchall()
-                related_avatars = [r["avatar_id"] for r in avatar_rows]
-
-                event = Event(
-                    month_stamp=MonthStamp(row["month_stamp"]),
-                    content=row["content"],
-                    related_avatars=related_avatars if related_avatars else None,
-                    is_major=bool(row["is_major"]),
-                    is_story=bool(row["is_story"]),
-                    id=row["id"],
-                    created_at=_parse_time(row["created_at"]),
-                )
-                events.append(event)
-                last_rowid = row["rowid"]
-                last_month_stamp = row["month_stamp"]
+            events = self._rows_to_events(rows)
 
             # 生成 next_cursor。
             next_cursor = None
-            if has_more and last_rowid is not None:
-                next_cursor = self._make_cursor(last_month_stamp, last_rowid)
+            if has_more and rows:
+                last = rows[-1]
+                next_cursor = self._make_cursor(last["month_stamp"], last["rowid"])
 
             return events, next_cursor
 
@@ -315,187 +443,79 @@ class EventStorage:
         events, _ = self.get_events(avatar_id_pair=(id1, id2), limit=limit)
         return list(reversed(events))  # 转为时间正序。
 
-    def get_major_events_by_avatar(self, avatar_id: str, limit: int = 10) -> list["Event"]:
-        """获取角色的大事（长期记忆）。"""
-        from src.classes.event import Event
-        from src.classes.calendar import MonthStamp
-
+    def _query_events(self, sql: str, params: tuple, what: str) -> list["Event"]:
+        """执行返回“最新 N 条”的查询，并转为时间正序。"""
         if self._conn is None:
             return []
 
         try:
-            rows = self._conn.execute(
-                """
-                SELECT DISTINCT e.id, e.month_stamp, e.content, e.is_major, e.is_story, e.created_at
-                FROM events e
-                JOIN event_avatars ea ON e.id = ea.event_id AND ea.avatar_id = ?
-                WHERE e.is_major = TRUE AND e.is_story = FALSE
-                ORDER BY e.month_stamp DESC
-                LIMIT ?
-                """,
-                (avatar_id, limit)
-            ).fetchall()
-
-            events = []
-            for row in rows:
-                avatar_rows = self._conn.execute(
-                    "SELECT avatar_id FROM event_avatars WHERE event_id = ?",
-                    (row["id"],)
-                ).fetchall()
-                related_avatars = [r["avatar_id"] for r in avatar_rows]
-
-                event = Event(
-                    month_stamp=MonthStamp(row["month_stamp"]),
-                    content=row["content"],
-                    related_avatars=related_avatars if related_avatars else None,
-                    is_major=bool(row["is_major"]),
-                    is_story=bool(row["is_story"]),
-                    id=row["id"],
-                    created_at=_parse_time(row["created_at"]),
-                )
-                events.append(event)
-
-            return list(reversed(events))  # 时间正序。
+            rows = self._conn.execute(sql, params).fetchall()
+            return list(reversed(self._rows_to_events(rows)))  # 时间正序。
         except Exception as e:
-            self._logger.error(f"Failed to query major events: {e}")
+            self._logger.error(f"Failed to query {what}: {e}")
             return []
 
+    def get_major_events_by_avatar(self, avatar_id: str, limit: int = 10) -> list["Event"]:
+        """获取角色的大事（长期记忆）。"""
+        return self._query_events(
+            """
+            SELECT DISTINCT e.rowid, e.id, e.month_stamp, e.content, e.is_major, e.is_story, e.created_at
+            FROM events e
+            JOIN event_avatars ea ON e.id = ea.event_id AND ea.avatar_id = ?
+            WHERE e.is_major = TRUE AND e.is_story = FALSE
+            ORDER BY e.month_stamp DESC, e.rowid DESC
+            LIMIT ?
+            """,
+            (avatar_id, limit),
+            "major events",
+        )
+
     def get_minor_events_by_avatar(self, avatar_id: str, limit: int = 10) -> list["Event"]:
         """获取角色的小事（短期记忆，包括故事）。"""
-        from src.classes.event import Event
-        from src.classes.calendar import MonthStamp
-
-        if self._conn is None:
-            return []
-
-        try:
-            rows = self._conn.execute(
-                """
-                SELECT DISTINCT e.id, e.month_stamp, e.content, e.is_major, e.is_story, e.created_at
-                FROM events e
-                JOIN event_avatars ea ON e.id = ea.event_id AND ea.avatar_id = ?
-                WHERE e.is_major = FALSE OR e.is_story = TRUE
-                ORDER BY e.month_stamp DESC
-                LIMIT ?
-                """,
-                (avatar_id, limit)
-            ).fetchall()
-
-            events = []
-            for row in rows:
-                avatar_rows = self._conn.execute(
-                    "SELECT avatar_id FROM event_avatars WHERE event_id = ?",
-                    (row["id"],)
-                ).fetchall()
-                related_avatars = [r["avatar_id"] for r in avatar_rows]
-
-                event = Event(
-                    month_stamp=MonthStamp(row["month_stamp"]),
-                    content=row["content"],
-                    related_avatars=related_avatars if related_avatars else None,
-                    is_major=bool(row["is_major"]),
-                    is_story=bool(row["is_story"]),
-                    id=row["id"],
-                    created_at=_parse_time(row["created_at"]),
-                )
-                events.append(event)
-
-            return list(reversed(events))  # 时间正序。
-        except Exception as e:
-            self._logger.error(f"Failed to query minor events: {e}")
-            return []
+        return self._query_events(
+            """
+            SELECT DISTINCT e.rowid, e.id, e.month_stamp, e.content, e.is_major, e.is_story, e.created_at
+            FROM events e
+            JOIN event_avatars ea ON e.id = ea.event_id AND ea.avatar_id = ?
+            WHERE e.is_major = FALSE OR e.is_story = TRUE
+            ORDER BY e.month_stamp DESC, e.rowid DESC
+            LIMIT ?
+            """,
+            (avatar_id, limit),
+            "minor events",
+        )
 
     def get_major_events_between(self, id1: str, id2: str, limit: int = 10) -> list["Event"]:
         """获取两个角色之间的大事（长期记忆）。"""
-        from src.classes.event import Event
-        from src.classes.calendar import MonthStamp
-
-        if self._conn is None:
-            return []
-
-        try:
-            rows = self._conn.execute(
-                """
-                SELECT DISTINCT e.id, e.month_stamp, e.content, e.is_major, e.is_story, e.created_at
-                FROM events e
-                JOIN event_avatars ea1 ON e.id = ea1.event_id AND ea1.avatar_id = ?
-                JOIN event_avatars ea2 ON e.id = ea2.event_id AND ea2.avatar_id = ?
-                WHERE e.is_major = TRUE AND e.is_story = FALSE
-                ORDER BY e.month_stamp DESC
-                LIMIT ?
-                """,
-                (id1, id2, limit)
-            ).fetchall()
-
-            events = []
-            for row in rows:
-                avatar_rows = self._conn.execute(
-                    "SELECT avatar_id FROM event_avatars WHERE event_id = ?",
-                    (row["id"],)
-                ).fetchall()
-                related_avatars = [r["avatar_id"] for r in avatar_rows]
-
-                event = Event(
-                    month_stamp=MonthStamp(row["month_stamp"]),
-                    content=row["content"],
-                    related_avatars=related_avatars if related_avatars else None,
-                    is_major=bool(row["is_major"]),
-                    is_story=bool(row["is_story"]),
-                    id=row["id"],
-                    created_at=_parse_time(row["created_at"]),
-                )
-                events.append(event)
-
-            return list(reversed(events))  # 时间正序。
-        except Exception as e:
-            self._logger.error(f"Failed to query major events between: {e}")
-            return []
+        return self._query_events(
+            """
+            SELECT DISTINCT e.rowid, e.id, e.month_stamp, e.content, e.is_major, e.is_story, e.created_at
+            FROM events e
+            JOIN event_avatars ea1 ON e.id = ea1.event_id AND ea1.avatar_id = ?
+            JOIN event_avatars ea2 ON e.id = ea2.event_id AND ea2.avatar_id = ?
+            WHERE e.is_major = TRUE AND e.is_story = FALSE
+            ORDER BY e.month_stamp DESC, e.rowid DESC
+            LIMIT ?
+            """,
+            (id1, id2, limit),
+            "major events between",
+        )
 
     def get_minor_events_between(self, id1: str, id2: str, limit: int = 10) -> list["Event"]:
         """获取两个角色之间的小事（短期记忆）。"""
-        from src.classes.event import Event
-        from src.classes.calendar import MonthStamp
-
-        if self._conn is None:
-            return []
-
-        try:
-            rows = self._conn.execute(
-                """
-                SELECT DISTINCT e.id, e.month_stamp, e.content, e.is_major, e.is_story, e.created_at
-                FROM events e
-                JOIN event_avatars ea1 ON e.id = ea1.event_id AND ea1.avatar_id = ?
-                JOIN event_avatars ea2 ON e.id = ea2.event_id AND ea2.avatar_id = ?
-                WHERE e.is_major = FALSE OR e.is_story = TRUE
-                ORDER BY e.month_stamp DESC
-                LIMIT ?
-                """,
-                (id1, id2, limit)
-            ).fetchall()
-
-            events = []
-            for row in rows:
-                avatar_rows = self._conn.execute(
-                    "SELECT avatar_id FROM event_avatars WHERE event_id = ?",
-                    (row["id"],)
-                ).fetchall()
-                related_avatars = [r["avatar_id"] for r in avatar_rows]
-
-                event = Event(
-                    month_stamp=MonthStamp(row["month_stamp"]),
-                    content=row["content"],
-                    related_avatars=related_avatars if related_avatars else None,
-                    is_major=bool(row["is_major"]),
-                    is_story=bool(row["is_story"]),
-                    id=row["id"],
-                    created_at=_parse_time(row["created_at"]),
-                )
-                events.append(event)
-
-            return list(reversed(events))  # 时间正序。
-        except Exception as e:
-            self._logger.error(f"Failed to query minor events between: {e}")
-            return []
+        return self._query_events(
+            """
+            SELECT DISTINCT e.rowid, e.id, e.month_stamp, e.content, e.is_major, e.is_story, e.created_at
+            FROM events e
+            JOIN event_avatars ea1 ON e.id = ea1.event_id AND ea1.avatar_id = ?
+            JOIN event_avatars ea2 ON e.id = ea2.event_id AND ea2.avatar_id = ?
+            WHERE e.is_major = FALSE OR e.is_story = TRUE
+            ORDER BY e.month_stamp DESC, e.rowid DESC
+            LIMIT ?
+            """,
+            (id1, id2, limit),
+            "minor events between",
+        )
 
     def get_recent_events(self, limit: int = 100) -> list["Event"]:
         """获取最近的事件（供初始状态 API 使用）。"""
@@ -547,6 +567,110 @@ class EventStorage:
             self._logger.error(f"Failed to cleanup events: {e}")
             return 0
 
+    # 每个键（角色 / 角色对）的大事、小事分别按时间倒序编号，取最新的若干条。
+    _RECENT_PER_KEY_SQL = """
+        SELECT {keys}, rowid, id, month_stamp, content, is_major, is_story, created_at
+        FROM (
+            SELECT {select_keys}, e.rowid AS rowid, e.id, e.month_stamp, e.content,
+                   e.is_major, e.is_story, e.created_at,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY {partition_keys}, (e.is_major = TRUE AND e.is_story = FALSE)
+                       ORDER BY e.month_stamp DESC, e.rowid DESC
+                   ) AS rn
+            FROM {source}
+            JOIN events e ON e.id = ea1.event_id
+            {where}
+        )
+        WHERE rn <= ?
+        ORDER BY month_stamp, rowid
+    """
+
+    def get_recent_events_per_avatar(
+        self, limit: int, avatar_id: Optional[str] = None
+    ) -> list[tuple[str, int, "Event"]]:
+        """
+        每个角色最新的 limit 条大事与 limit 条小事（供内存索引预热 / 填充）。
+
+        Returns:
+            [(avatar_id, rowid, event)]，按 month_stamp、rowid 正序；同一事件只构造一个对象。
+        """
+        sql = self._RECENT_PER_KEY_SQL.format(
+            keys="a1",
+            select_keys="ea1.avatar_id AS a1",
+            partition_keys="ea1.avatar_id",
+            source="event_avatars ea1",
+            where="WHERE ea1.avatar_id = ?" if avatar_id is not None else "",
+        )
+        params = (str(avatar_id), limit) if avatar_id is not None else (limit,)
+        return [(row["a1"], rowid, event) for row, rowid, event in self._recent_rows(sql, params)]
+
+    def get_recent_events_per_pair(
+        self, limit: int, pair: Optional[tuple[str, str]] = None
+    ) -> list[tuple[tuple[str, str], int, "Event"]]:
+        """
+        每个角色对（按字典序排列）最新的 limit 条大事与 limit 条小事（供内存索引预热 / 填充）。
+
+        Returns:
+            [((avatar_id1, avatar_id2), rowid, event)]，按 month_stamp、rowid 正序。
+        """
+        sql = self._RECENT_PER_KEY_SQL.format(
+            keys="a1, a2",
+            select_keys="ea1.avatar_id AS a1, ea2.avatar_id AS a2",
+            partition_keys="ea1.avatar_id, ea2.avatar_id",
+            source="event_avatars ea1 JOIN event_avatars ea2 "
+                   "ON ea1.event_id = ea2.event_id AND ea1.avatar_id < ea2.avatar_id",
+            where="WHERE ea1.avatar_id = ? AND ea2.avatar_id = ?" if pair is not None else "",
+        )
+        params = (str(pair[0]), str(pair[1]), limit) if pair is not None else (limit,)
+        return [((row["a1"], row["a2"]), rowid, event) for row, rowid, event in self._recent_rows(sql, params)]
+
+    def _recent_rows(self, sql: str, params: tuple) -> list[tuple[sqlite3.Row, int, "Event"]]:
+        if self._conn is None:
+            return []
+        try:
+            rows = self._conn.execute(sql, params).fetchall()
+        except Exception as e:
+            self._logger.error(f"Failed to query recent events per key: {e}")
+            return []
+        # 同一事件会出现在多个键下，只转换一次。
+        unique: dict[str, sqlite3.Row] = {}
+        for row in rows:
+            unique.setdefault(row["id"], row)
+        events = {e.id: e for e in self._rows_to_events(list(unique.values()))}
+        return [(row, row["rowid"], events[row["id"]]) for row in rows]
+
+    def count_events_by_avatar(
+        self, exclude_ids: Iterable[str] = (), max_rowid: Optional[int] = None,
+    ) -> dict[str, tuple[int, int, int]]:
+        """
+        按角色统计事件数量：avatar_id -> (大事, 小事, 故事)，分类与大事/小事查询一致。
+
+        Args:
+            exclude_ids: 不计入的事件 id（如仍在写入队列中、由调用方另行统计的事件）。
+                在同一条语句内排除，与统计读到的是同一个快照。
+            max_rowid: 只统计 rowid 不超过此值的事件（即取得该值之后写入的事件不计入）。
+        """
+        if self._conn is None:
+            return {}
+        try:
+            rows = self._conn.execute(
+                """
+                SELECT ea.avatar_id,
+                       SUM(CASE WHEN e.is_major = TRUE AND e.is_story = FALSE THEN 1 ELSE 0 END),
+                       SUM(CASE WHEN e.is_major = FALSE OR e.is_story = TRUE THEN 1 ELSE 0 END),
+                       SUM(CASE WHEN e.is_story = TRUE THEN 1 ELSE 0 END)
+                FROM event_avatars ea
+                JOIN events e ON e.id = ea.event_id
+                WHERE e.id NOT IN (SELECT value FROM json_each(?)) AND (? IS NULL OR e.rowid <= ?)
+                GROUP BY ea.avatar_id
+                """,
+                (json.dumps(list(exclude_ids)), max_rowid, max_rowid),
+            ).fetchall()
+            return {row[0]: (row[1], row[2], row[3]) for row in rows}
+        except Exception as e:
+            self._logger.error(f"Failed to count events by avatar: {e}")
+            return {}
+
     def count(self) -> int:
         """获取事件总数。"""
         if self._conn is None:
@@ -557,6 +681,16 @@ class EventStorage:
         except Exception:
             return 0
 
+    def max_rowid(self) -> int:
+        """已提交事件的最大 rowid（空库为 0）。"""
+        if self._conn is None:
+            return 0
+        try:
+            row = self._conn.execute("SELECT MAX(rowid) FROM events").fetchone()
+            return (row[0] or 0) if row else 0
+        except Exception:
+            return 0
+
     def close(self) -> None:
         """关闭数据库连接。"""
         if self._conn:
@@ -14,7 +14,7 @@ from src.classes.event import Event
 from src.utils.config import CONFIG
 from src.utils.llm import call_llm_with_task_name
 from src.run.log import get_logger
-from src.classes.actions import ACTION_INFOS_STR
+from src.classes.prompt_context import get_action_infos_prompt
 from src.i18n import t
 
 logger = get_logger().logger
@@ -67,7 +67,29 @@ def can_generate_long_term_objective(avatar: "Avatar") -> bool:
         return random.random() < probability
 
 
-async def generate_long_term_objective(avatar: "Avatar") -> Optional[LongTermObjective]:
+def build_long_term_objective_infos(avatar: "Avatar") -> Optional[dict]:
+    """
+    需要生成长期目标时构造模板参数，否则返回 None
+
+    判定会消耗全局随机数，构造只读取角色与世界的当前状态，均不涉及 LLM；
+    模拟器按角色顺序同步调用，再并发等待请求（见 Simulator._step_phases）。
+    """
+    if not can_generate_long_term_objective(avatar):
+        return None
+    return _long_term_objective_infos(avatar)
+
+
+def _long_term_objective_infos(avatar: "Avatar") -> dict:
+    return {
+        # 世界信息（仅获取已知区域 + 距离信息），与角色无关的部分按月缓存
+        "world_info": avatar.world.get_prompt_context().render_world_info(avatar.world, avatar=avatar, detailed=False),
+        # expanded_info（包含详细信息和事件历史）
+        "avatar_info": avatar.get_expanded_info(detailed=True),
+        "general_action_infos": get_action_infos_prompt(),
+    }
+
+
+async def generate_long_term_objective(avatar: "Avatar", infos: Optional[dict] = None) -> Optional[LongTermObjective]:
     """
     为角色生成长期目标
     
@@ -75,23 +97,14 @@ async def generate_long_term_objective(avatar: "Avatar") -> Optional[LongTermObj
     
     Args:
         avatar: 要生成长期目标的角色
+        infos: 预先构造的模板参数，None 时按当前状态构造
         
     Returns:
         生成的LongTermObjective对象，失败则返回None
     """
-    # 准备世界信息（仅获取已知区域 + 距离信息）
-    world_info = avatar.world.get_info(avatar=avatar)
-    
-    # 获取 expanded_info（包含详细信息和事件历史）
-    expanded_info = avatar.get_expanded_info(detailed=True)
-    
-    # 准备模板参数
+    if infos is None:
+        infos = _long_term_objective_infos(avatar)
     template_path = CONFIG.paths.templates / "long_term_objective.txt"
-    infos = {
-        "world_info": world_info,
-        "avatar_info": expanded_info,
-        "general_action_infos": ACTION_INFOS_STR,
-    }
     
     # 调用LLM并自动解析JSON（使用配置的模型模式）
     response_data = await call_llm_with_task_name("long_term_objective", template_path, infos)
@@ -112,30 +125,14 @@ async def generate_long_term_objective(avatar: "Avatar") -> Optional[LongTermObj
     logger.info(f"为角色 {avatar.name} 生成长期目标：{content}")
     
     return objective
-        
 
 
-async def process_avatar_long_term_objective(avatar: "Avatar") -> Optional[Event]:
-    """
-    处理单个角色的长期目标生成/更新
-    
-    检查角色是否需要生成目标，需要则生成并返回对应事件
-    
-    Args:
-        avatar: 要处理的角色
-        
-    Returns:
-        生成的事件，如果不需要生成或生成失败则返回None
-    """
-    if not can_generate_long_term_objective(avatar):
-        return None
-    
-    old_objective = avatar.long_term_objective
-    new_objective = await generate_long_term_objective(avatar)
-    
+def apply_long_term_objective(avatar: "Avatar", new_objective: Optional[LongTermObjective]) -> Optional[Event]:
+    """将新目标写入角色并返回对应事件；目标为空时返回 None"""
     if not new_objective:
         return None
     
+    old_objective = avatar.long_term_objective
     avatar.long_term_objective = new_objective
     
     # 生成事件
@@ -159,6 +156,26 @@ async def process_avatar_long_term_objective(avatar: "Avatar") -> Optional[Event
     return event
 
 
+async def process_avatar_long_term_objective(avatar: "Avatar") -> Optional[Event]:
+    """
+    处理单个角色的长期目标生成/更新
+    
+    检查角色是否需要生成目标，需要则生成并返回对应事件
+    
+    Args:
+        avatar: 要处理的角色
+        
+    Returns:
+        生成的事件，如果不需要生成或生成失败则返回None
+    """
+    infos = build_long_term_objective_infos(avatar)
+    if infos is None:
+        return None
+    
+    new_objective = await generate_long_term_objective(avatar, infos)
+    return apply_long_term_objective(avatar, new_objective)
+
+
 def set_user_long_term_objective(avatar: "Avatar", objective_content: str) -> None:
     """
     玩家设定角色的长期目标
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import TYPE_CHECKING, Optional
 
 from src.classes.tile import Tile, TileType
@@ -29,6 +30,12 @@ class Map():
         self.cultivate_regions = {}
         self.city_regions = {}
 
+        # 感知覆盖缓存：key=(x, y, radius)，value=该菱形范围内出现的区域（按发现顺序）
+        # tile.region 被重新划分后需调用 invalidate_region_coverage()
+        self._region_coverage: dict[tuple[int, int, int], tuple['Region', ...]] = {}
+        # 区域 id -> 在 self.regions 中的位置（见 get_region_order）
+        self._region_order: dict[int, int] = {}
+
     def update_sect_regions(self) -> None:
         """根据当前 self.regions 动态刷新宗门总部区域字典。"""
         self.sect_regions = {rid: r for rid, r in self.regions.items() if isinstance(r, SectRegion)}
@@ -76,6 +83,36 @@ class Map():
         """
         return self.tiles[(x, y)].region
 
+    def get_regions_in_radius(self, x: int, y: int, radius: int) -> tuple['Region', ...]:
+        """
+        返回以 (x, y) 为中心、曼哈顿距离 radius 内的所有区域（去重）。
+        结果按坐标记忆化，同一位置与半径只扫描一次。
+        """
+        key = (x, y, radius)
+        cached = self._region_coverage.get(key)
+        if cached is not None:
+            return cached
+
+        tiles = self.tiles
+        regions = set()
+        for dx, dy in _diamond_offsets(radius):
+            tile = tiles.get((x + dx, y + dy))
+            if tile is not None and tile.region:
+                regions.add(tile.region)
+        cached = tuple(regions)
+        self._region_coverage[key] = cached
+        return cached
+
+    def invalidate_region_coverage(self) -> None:
+        """清空感知覆盖缓存（tile 与 region 的归属发生变化时调用）。"""
+        self._region_coverage.clear()
+
+    def get_region_order(self) -> dict[int, int]:
+        """区域 id -> 在 self.regions 中的位置（区域增减后重建）。"""
+        if len(self._region_order) != len(self.regions):
+            self._region_order = {rid: i for i, rid in enumerate(self.regions)}
+        return self._region_order
+
     def get_info(self, detailed: bool = False, avatar: object = None) -> dict:
         """
         返回地图信息（dict）。
@@ -86,30 +123,38 @@ class Map():
         if TYPE_CHECKING:
              from src.classes.avatar import Avatar
 
-        from src.classes.region import NormalRegion, CultivateRegion, CityRegion
-        
-        known_region_ids = avatar.known_regions if avatar else None
-        current_loc = (avatar.pos_x, avatar.pos_y) if avatar else None
-        
-        def filter_regions(cls):
-            return {
-                rid: r for rid, r in self.regions.items() 
-                if isinstance(r, cls) and (known_region_ids is None or rid in known_region_ids)
-            }
-
+        from src.classes.region_catalog import REGION_CATEGORIES
         from src.i18n import t
 
-        def build_regions_info(regions_dict) -> list[str]:
-            infos = []
-            step_len = avatar.move_step_length if avatar else 1
-            for r in regions_dict.values():
-                base_info = r.get_detailed_info(current_loc, step_len) if detailed else r.get_info(current_loc, step_len)
-                infos.append(base_info)
-            return infos
-
-        return {
-            t("Cultivate Region (can cultivate to increase cultivation)"): build_regions_info(filter_regions(CultivateRegion)),
-            t("Normal Region (can hunt, gather, mine)"): build_regions_info(filter_regions(NormalRegion)),
-            t("City Region (can trade)"): build_regions_info(filter_regions(CityRegion)),
-            t("Sect Headquarters (sect disciples heal faster here)"): build_regions_info(filter_regions(SectRegion)),
-        }
+        if avatar is not None:
+            # 已知区域取自角色的已知区域目录（按分组排好序），无需逐个过滤 self.regions
+            groups = avatar.region_catalog.view(avatar)
+        else:
+            groups = tuple([r for r in self.regions.values() if isinstance(r, cls)] for cls in REGION_CATEGORIES)
+        current_loc = (avatar.pos_x, avatar.pos_y) if avatar else None
+        step_len = avatar.move_step_length if avatar else 1
+
+        def build_regions_info(regions) -> list[str]:
+            return [
+                r.get_detailed_info(current_loc, step_len) if detailed else r.get_info(current_loc, step_len)
+                for r in regions
+            ]
+
+        labels = (
+            t("Cultivate Region (can cultivate to increase cultivation)"),
+            t("Normal Region (can hunt, gather, mine)"),
+            t("City Region (can trade)"),
+            t("Sect Headquarters (sect disciples heal faster here)"),
+        )
+        return {label: build_regions_info(regions) for label, regions in zip(labels, groups)}
+
+
+@lru_cache(maxsize=None)
+def _diamond_offsets(radius: int) -> tuple[tuple[int, int], ...]:
+    """曼哈顿半径 radius 内的所有偏移量，按 x 优先、y 次之的顺序排列。"""
+    return tuple(
+        (dx, dy)
+        for dx in range(-radius, radius + 1)
+        for dy in range(-radius, radius + 1)
+        if abs(dx) + abs(dy) <= radius
+    )
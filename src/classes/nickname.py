@@ -37,22 +37,36 @@ def can_get_nickname(avatar: "Avatar") -> bool:
     if avatar.nickname is not None:
         return False
     
-    # 检查事件数量
-    em = avatar.world.event_manager
+    # 检查事件数量（EventManager 维护的内存计数，不查库）
+    counts = avatar.world.event_manager.get_avatar_event_counts(avatar.id)
     major_threshold = CONFIG.nickname.major_event_threshold
     minor_threshold = CONFIG.nickname.minor_event_threshold
     
-    major_events = em.get_major_events_by_avatar(avatar.id, limit=major_threshold)
-    minor_events = em.get_minor_events_by_avatar(avatar.id, limit=minor_threshold)
-    
-    major_count = len(major_events)
-    minor_count = len(minor_events)
-    
     # AND逻辑：两个条件都要满足
-    return major_count >= major_threshold and minor_count >= minor_threshold
+    return counts.major >= major_threshold and counts.minor >= minor_threshold
+
+
+def _nickname_infos(avatar: "Avatar") -> dict:
+    return {
+        "world_info": avatar.world.static_info,
+        # expanded_info 包含详细信息和事件历史
+        "avatar_info": avatar.get_expanded_info(detailed=True),
+    }
+
+
+def build_nickname_infos(avatar: "Avatar") -> Optional[dict]:
+    """
+    满足条件时构造绰号生成的模板参数，否则返回 None
+
+    只读取角色当前状态，不发起请求；模拟器据此在月初同步构造提示词，
+    再与其他阶段并发等待 LLM（见 Simulator._step_phases）。
+    """
+    if not can_get_nickname(avatar):
+        return None
+    return _nickname_infos(avatar)
 
 
-async def generate_nickname(avatar: "Avatar") -> Optional[dict]:
+async def generate_nickname(avatar: "Avatar", infos: Optional[dict] = None) -> Optional[dict]:
     """
     为角色生成绰号
     
@@ -60,20 +74,15 @@ async def generate_nickname(avatar: "Avatar") -> Optional[dict]:
     
     Args:
         avatar: 要生成绰号的角色
+        infos: 预先构造的模板参数，None 时按角色当前状态构造
         
     Returns:
         包含 nickname 和 reason 的字典，失败则返回None
     """
     try:
-        # 获取 expanded_info（包含详细信息和事件历史）
-        expanded_info = avatar.get_expanded_info(detailed=True)
-        
-        # 准备模板参数
+        if infos is None:
+            infos = _nickname_infos(avatar)
         template_path = CONFIG.paths.templates / "nickname.txt"
-        infos = {
-            "world_info": avatar.world.static_info,
-            "avatar_info": expanded_info,
-        }
         
         # 调用LLM并自动解析JSON
         response_data = await call_llm_with_task_name("nickname", template_path, infos)
@@ -99,25 +108,11 @@ async def generate_nickname(avatar: "Avatar") -> Optional[dict]:
         return None
 
 
-async def process_avatar_nickname(avatar: "Avatar") -> Optional[Event]:
-    """
-    处理单个角色的绰号生成
-    
-    检查角色是否满足条件，满足则生成绰号并返回对应事件
-    
-    Args:
-        avatar: 要处理的角色
-        
-    Returns:
-        生成的事件，如果不满足条件或生成失败则返回None
-    """
-    if not can_get_nickname(avatar):
+def apply_nickname(avatar: "Avatar", result: Optional[dict]) -> Optional[Event]:
+    """将生成结果写入角色并返回对应事件；结果为空或角色已有绰号时返回 None"""
+    if not result or avatar.nickname is not None:
         return None
-    
-    result = await generate_nickname(avatar)
-    if not result:
-        return None
-    
+
     nickname_str = result["nickname"]
     reason = result["reason"]
     
@@ -132,3 +127,22 @@ async def process_avatar_nickname(avatar: "Avatar") -> Optional[Event]:
     )
     return event
 
+
+async def process_avatar_nickname(avatar: "Avatar") -> Optional[Event]:
+    """
+    处理单个角色的绰号生成
+    
+    检查角色是否满足条件，满足则生成绰号并返回对应事件
+    
+    Args:
+        avatar: 要处理的角色
+        
+    Returns:
+        生成的事件，如果不满足条件或生成失败则返回None
+    """
+    infos = build_nickname_infos(avatar)
+    if infos is None:
+        return None
+    
+    result = await generate_nickname(avatar, infos)
+    return apply_nickname(avatar, result)
@@ -45,7 +45,7 @@ def is_within_observation(initiator: "Avatar", other: "Avatar") -> bool:
 def get_observable_avatars(initiator: "Avatar", avatars: Iterable["Avatar"]) -> List["Avatar"]:
     """
     从给定集合中过滤出处于 initiator 交互范围内的角色（不包含 initiator 本人）。
-    算法：线性扫描 O(N)，与现有管理器遍历复杂度一致。
+    算法：线性扫描 O(N)。AvatarManager 内部改用空间索引，这里保留给任意角色集合使用。
     """
     result: list["Avatar"] = []
     for v in avatars:
@@ -0,0 +1,161 @@
+"""
+按月缓存的提示词上下文。
+
+同一个月里，每个角色决策时的世界信息几乎相同：区域描述、世界背景、动作说明都与角色无关，
+只有“已知区域”的筛选和到各区域的距离因人而异。PromptContext 按 (月份, 语言) 缓存：
+- 每个区域的描述（不含距离后缀），以 JSON 编码后的形式保存；
+- 按月数缓存的距离后缀；
+- 世界共享信息（get_shared_info）的 JSON 片段，内容变化时重新渲染。
+
+render_world_info 直接拼出与 to_json_str_with_intent(world.get_info(...)) 逐字相同的文本，
+省去每次构建 dict 与带缩进的 json.dumps（带 indent 时 json 使用纯 Python 编码器）。
+结果是 PromptJSON，intentify_prompt_infos 会原样填入模板。
+
+区域名称 / 描述被历史修改时，World.record_modification 会丢弃当前上下文。
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from src.i18n import t
+from src.utils.strings import PromptJSON, to_json_str_with_intent
+
+if TYPE_CHECKING:
+    from src.classes.avatar import Avatar
+    from src.classes.region import Region
+    from src.classes.world import World
+
+
+# 语言 -> 模板可直接使用的动作说明
+_ACTION_INFOS_PROMPT: dict[str, PromptJSON] = {}
+
+
+def get_action_infos_prompt() -> PromptJSON:
+    """general_action_infos 字段的渲染结果（每种语言只渲染一次）。"""
+    from src.classes.actions import get_action_infos_str
+    from src.classes.language import language_manager
+
+    lang = str(language_manager)
+    cached = _ACTION_INFOS_PROMPT.get(lang)
+    if cached is None:
+        cached = _ACTION_INFOS_PROMPT[lang] = PromptJSON(to_json_str_with_intent(get_action_infos_str()))
+    return cached
+
+
+@dataclass
+class PromptStats:
+    """本月上下文的复用统计（UTF-8 字节数，供基准与调试查看）。"""
+    renders: int = 0  # render_world_info / render_shared_info 调用次数
+    rendered_bytes: int = 0  # 渲染出的文本总量
+    encoded_bytes: int = 0  # 其中实际经过 json 编码的量（各片段首次渲染），其余取自缓存
+
+
+class PromptContext:
+    """某个月份、某种语言下的提示词上下文缓存。通过 World.get_prompt_context() 获取。"""
+
+    def __init__(self, world: "World", key: tuple):
+        from src.classes.region_catalog import REGION_CATEGORIES
+
+        self.key = key
+        self.stats = PromptStats()
+        # 与 Map.get_info 相同的分组与顺序
+        labels = (
+            t("Cultivate Region (can cultivate to increase cultivation)"),
+            t("Normal Region (can hunt, gather, mine)"),
+            t("City Region (can trade)"),
+            t("Sect Headquarters (sect disciples heal faster here)"),
+        )
+        regions = list(world.map.regions.values())
+        # (分组名, 分组名的 JSON 编码, 该组全部区域)
+        self._groups: list[tuple[str, str, list["Region"]]] = [
+            (label, json.dumps(label, ensure_ascii=False), [r for r in regions if isinstance(r, cls)])
+            for label, cls in zip(labels, REGION_CATEGORIES)
+        ]
+        # (region_id, detailed) -> (描述, 去掉结尾引号的 JSON 编码)
+        self._region_text: dict[tuple[int, bool], tuple[str, str]] = {}
+        # 月数 -> (距离后缀, 去掉首尾引号的 JSON 编码)
+        self._distance_text: dict[int, tuple[str, str]] = {}
+        self._shared_info: Optional[dict] = None
+        self._shared_fragments: list[str] = []
+
+    @staticmethod
+    def key_for(world: "World") -> tuple:
+        from src.classes.language import language_manager
+        return int(world.month_stamp), str(language_manager)
+
+    def _encode(self, value) -> str:
+        text = json.dumps(value, ensure_ascii=False)
+        self.stats.encoded_bytes += len(text.encode("utf-8"))
+        return text
+
+    def _region(self, region: "Region", detailed: bool) -> tuple[str, str]:
+        key = (region.id, detailed)
+        cached = self._region_text.get(key)
+        if cached is None:
+            base = region.get_detailed_info() if detailed else region.get_info()
+            cached = self._region_text[key] = (base, self._encode(base)[:-1])
+        return cached
+
+    def _distance(self, months: int) -> tuple[str, str]:
+        cached = self._distance_text.get(months)
+        if cached is None:
+            from src.classes.region import format_distance_desc
+            desc = format_distance_desc(months)
+            cached = self._distance_text[months] = (desc, self._encode(desc)[1:-1])
+        return cached
+
+    def _shared(self, world: "World") -> list[str]:
+        info = world.get_shared_info()
+        if info != self._shared_info:
+            self._shared_info = info
+            fragments = [json.dumps({k: v}, ensure_ascii=False, indent=2)[2:-2] for k, v in info.items()]
+            self.stats.encoded_bytes += sum(len(f.encode("utf-8")) for f in fragments)
+            self._shared_fragments = fragments
+        return self._shared_fragments
+
+    def _region_groups(self, avatar: Optional["Avatar"], detailed: bool, index: int) -> list[list[str]]:
+        """
+        各分组区域的描述（index 0）或其 JSON 编码（index 1）。
+        指定 avatar 时取其已知区域目录，并附上距离后缀。
+        """
+        if avatar is None:
+            tail = '"' if index else ""
+            return [[self._region(r, detailed)[index] + tail for r in regions] for _, _, regions in self._groups]
+        catalog = avatar.region_catalog
+        groups = catalog.view(avatar)
+        months = catalog.travel_months(avatar)
+        tail = '"' if index else ""
+        return [
+            [self._region(r, detailed)[index] + self._distance(months[r.id])[index] + tail for r in regions]
+            for regions in groups
+        ]
+
+    def region_info(self, avatar: Optional["Avatar"] = None, detailed: bool = True) -> dict:
+        """与 Map.get_info(detailed, avatar) 相同的 dict，区域描述取自缓存。"""
+        return {
+            label: items
+            for (label, _, _), items in zip(self._groups, self._region_groups(avatar, detailed, 0))
+        }
+
+    def _finish(self, fragments: list[str]) -> PromptJSON:
+        text = ("{\n" + ",\n".join(fragments) + "\n}" if fragments else "{}").replace("\\n", "\n")
+        self.stats.renders += 1
+        self.stats.rendered_bytes += len(text.encode("utf-8"))
+        return PromptJSON(text)
+
+    def render_world_info(
+        self, world: "World", avatar: Optional["Avatar"] = None, detailed: bool = True
+    ) -> PromptJSON:
+        """渲染结果与 to_json_str_with_intent(world.get_info(detailed, avatar)) 逐字相同。"""
+        fragments = []
+        for (_, encoded_label, _), items in zip(self._groups, self._region_groups(avatar, detailed, 1)):
+            body = "[\n" + ",\n".join("    " + item for item in items) + "\n  ]" if items else "[]"
+            fragments.append(f"  {encoded_label}: {body}")
+        fragments.extend(self._shared(world))
+        return self._finish(fragments)
+
+    def render_shared_info(self, world: "World") -> PromptJSON:
+        """与 to_json_str_with_intent(world.get_shared_info()) 逐字相同。"""
+        return self._finish(list(self._shared(world)))
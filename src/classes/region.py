@@ -18,6 +18,10 @@ if TYPE_CHECKING:
     from src.classes.avatar import Avatar
 
 
+def format_distance_desc(months: int) -> str:
+    """区域描述后的距离后缀，如“（距离：3个月）”。"""
+    return t(" (Distance: {months} months)", months=months)
+
 
 @dataclass
 class Region(ABC):
@@ -75,15 +79,15 @@ class Region(ABC):
         """
         pass
 
+    def get_travel_months(self, current_loc: tuple[int, int], step_len: int = 1) -> int:
+        """从 current_loc 到区域中心的估算月数：距离 / 步长（向上取整，至少 1 个月）。"""
+        dist = chebyshev_distance(current_loc, self.center_loc)
+        return max(1, (dist + step_len - 1) // step_len)
+
     def _get_distance_desc(self, current_loc: tuple[int, int] = None, step_len: int = 1) -> str:
         if current_loc is None:
             return ""
-        dist = chebyshev_distance(current_loc, self.center_loc)
-        # 估算到达时间：距离 / 步长 (向上取整)
-        months = (dist + step_len - 1) // step_len
-        # 避免显示 0 个月
-        months = max(1, months)
-        return t(" (Distance: {months} months)", months=months)
+        return format_distance_desc(self.get_travel_months(current_loc, step_len))
 
     def get_info(self, current_loc: tuple[int, int] = None, step_len: int = 1) -> str:
         return f"{self.name}{self._get_distance_desc(current_loc, step_len)}"
@@ -0,0 +1,105 @@
+"""
+角色已知区域目录。
+
+拼提示词时需要按四个分组（修炼 / 普通 / 城市 / 宗门驻地）列出角色已知的区域，
+并附上到各区域的旅行月数。逐次遍历 map.regions、用 known_regions 过滤并计算距离，
+在角色多、区域多时开销可观。KnownRegionCatalog 为每个角色维护：
+- 各分组的已知区域列表，顺序与 map.regions 一致；known_regions 增长时只插入新区域；
+- 到各已知区域中心的旅行月数，只在角色位置或移动步长变化后重新计算。
+
+known_regions 只增不减。感知阶段通过 Avatar.learn_region 直接登记新区域；
+其他途径（初始化、读档替换整个集合）由 view() 根据集合对象与大小的变化补齐。
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Optional
+
+from src.classes.region import CityRegion, CultivateRegion, NormalRegion
+from src.classes.sect_region import SectRegion
+
+if TYPE_CHECKING:
+    from src.classes.avatar import Avatar
+    from src.classes.map import Map
+    from src.classes.region import Region
+
+# 与 Map.get_info 的分组顺序一致
+REGION_CATEGORIES: tuple[type, ...] = (CultivateRegion, NormalRegion, CityRegion, SectRegion)
+
+
+class KnownRegionCatalog:
+    """某个角色已知区域的分类有序视图与旅行月数缓存。"""
+
+    __slots__ = ("_map", "_source", "_size", "_ids", "_count", "_orders", "_groups", "_months_key", "_months")
+
+    def __init__(self):
+        self._map: Optional["Map"] = None
+        self._source: Optional[set[int]] = None  # 对应的 known_regions 集合对象
+        self._size = 0  # 上次同步时 known_regions 的大小
+        self._ids: set[int] = set()  # 已处理的区域 id（含地图上不存在的 id）
+        self._count = 0  # 目录中的区域数
+        self._orders: tuple[list[int], ...] = ()  # 各分组内区域在 map.regions 中的位置
+        self._groups: tuple[list["Region"], ...] = ()
+        self._months_key: Optional[tuple[int, int, int]] = None  # (x, y, 步长)
+        self._months: dict[int, int] = {}
+
+    def _insert(self, region_id: int) -> None:
+        self._ids.add(region_id)
+        region = self._map.regions.get(region_id)
+        if region is None:
+            return
+        self._count += 1
+        position = self._map.get_region_order()[region_id]
+        for orders, group, cls in zip(self._orders, self._groups, REGION_CATEGORIES):
+            if isinstance(region, cls):
+                i = bisect_left(orders, position)
+                orders.insert(i, position)
+                group.insert(i, region)
+
+    def _rebuild(self, game_map: "Map", known: set[int]) -> None:
+        self._map = game_map
+        self._source = known
+        self._ids = set()
+        self._count = 0
+        self._orders = tuple([] for _ in REGION_CATEGORIES)
+        self._groups = tuple([] for _ in REGION_CATEGORIES)
+        self._months_key = None
+        for region_id in known:
+            self._insert(region_id)
+        self._size = len(known)
+
+    def add(self, region: "Region") -> None:
+        """登记一个刚加入 known_regions 的区域；与上次同步之间还有其他变化时留给 view() 补齐。"""
+        if self._source is None or region.id in self._ids or len(self._source) != self._size + 1:
+            return
+        self._insert(region.id)
+        self._size += 1
+
+    def view(self, avatar: "Avatar") -> tuple[list["Region"], ...]:
+        """按 REGION_CATEGORIES 分组的已知区域（顺序与 map.regions 一致）。返回值只读。"""
+        game_map = avatar.world.map
+        known = avatar.known_regions
+        if game_map is not self._map or known is not self._source:
+            self._rebuild(game_map, known)
+        elif len(known) != self._size:
+            for region_id in known:
+                if region_id not in self._ids:
+                    self._insert(region_id)
+            self._size = len(known)
+        return self._groups
+
+    def travel_months(self, avatar: "Avatar") -> dict[int, int]:
+        """已知区域 id -> 从当前位置出发的旅行月数；位置或步长变化后重新计算。返回值只读。"""
+        groups = self.view(avatar)
+        key = (avatar.pos_x, avatar.pos_y, avatar.move_step_length)
+        months = self._months
+        if key != self._months_key:
+            self._months_key = key
+            months = self._months = {}
+        if len(months) != self._count:
+            loc, step_len = key[:2], key[2]
+            for group in groups:
+                for region in group:
+                    if region.id not in months:
+                        months[region.id] = region.get_travel_months(loc, step_len)
+        return months
@@ -0,0 +1,253 @@
+"""
+角色空间索引
+
+将存活角色按网格桶 (cell) 与所属区域 (region id) 分组，
+使“感知范围内的角色”“同区域角色”查询不再需要线性扫描所有角色。
+
+- 网格桶：坐标按 cell_size 切分，半径查询只遍历与曼哈顿菱形外接矩形相交的桶。
+- 区域桶：按 tile.region.id 分组。
+- 增量维护：AvatarManager.avatars 的增删由 IndexedAvatarDict 同步；
+  角色 pos_x / pos_y / tile 变化时由 Avatar.__setattr__ 回调 update()。
+- 结果顺序：按角色加入 avatars 字典的先后排序，与原先线性扫描的顺序一致，保证随机过程可复现。
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.classes.avatar import Avatar
+
+
+# 默认网格边长：与常见感知半径（2~5）同量级，半径查询通常只触及 2x2~3x3 个桶
+DEFAULT_CELL_SIZE = 4
+
+# 触发索引更新的角色属性
+SPATIAL_FIELDS = frozenset({"pos_x", "pos_y", "tile"})
+
+# 角色对象上记录所属索引的属性名（非 dataclass 字段，不参与存档）
+_INDEX_ATTR = "_spatial_index"
+
+
+class _Entry:
+    __slots__ = ("avatar", "seq", "cell", "region_id")
+
+    def __init__(self, avatar: "Avatar", seq: int):
+        self.avatar = avatar
+        self.seq = seq
+        self.cell: Optional[Tuple[int, int]] = None
+        self.region_id: Optional[int] = None
+
+
+class AvatarSpatialIndex:
+    """
+    网格 + 区域双重分桶的角色索引。
+    """
+
+    def __init__(self, cell_size: int = DEFAULT_CELL_SIZE):
+        self.cell_size = max(1, int(cell_size))
+        self._entries: Dict[str, _Entry] = {}
+        self._cells: Dict[Tuple[int, int], Set[str]] = {}
+        self._regions: Dict[int, Set[str]] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, avatar_id: object) -> bool:
+        return str(avatar_id) in self._entries
+
+    # ========== 维护 ==========
+
+    def add(self, avatar: "Avatar", avatar_id: Optional[str] = None) -> None:
+        """加入（或替换）一个角色。同 id 重复加入时保留原有排序位置。"""
+        aid = str(avatar.id if avatar_id is None else avatar_id)
+        entry = self._entries.get(aid)
+        if entry is None:
+            self._seq += 1
+            entry = _Entry(avatar, self._seq)
+            self._entries[aid] = entry
+        elif entry.avatar is not avatar:
+            self._unbind(entry.avatar)
+            entry.avatar = avatar
+        avatar.__dict__[_INDEX_ATTR] = self
+        self._place(aid, entry)
+
+    def remove(self, avatar_id: str) -> None:
+        """移除一个角色（不存在时静默忽略）。"""
+        aid = str(avatar_id)
+        entry = self._entries.pop(aid, None)
+        if entry is None:
+            return
+        self._discard_cell(aid, entry.cell)
+        self._discard_region(aid, entry.region_id)
+        self._unbind(entry.avatar)
+
+    def update(self, avatar: "Avatar") -> None:
+        """角色位置或所在 tile 变化后调用，重新分桶。"""
+        aid = str(avatar.id)
+        entry = self._entries.get(aid)
+        if entry is None or entry.avatar is not avatar:
+            return
+        self._place(aid, entry)
+
+    def clear(self) -> None:
+        for entry in self._entries.values():
+            self._unbind(entry.avatar)
+        self._entries.clear()
+        self._cells.clear()
+        self._regions.clear()
+
+    def rebuild(self, avatars: Dict[str, "Avatar"]) -> None:
+        """按给定字典（保持其顺序）整体重建索引，用于地图区域被重新划分等批量变化。"""
+        self.clear()
+        for aid, avatar in avatars.items():
+            self.add(avatar, aid)
+
+    # ========== 查询 ==========
+
+    def query_radius(self, x: int, y: int, radius: int, exclude: "Avatar | None" = None) -> List["Avatar"]:
+        """返回与 (x, y) 曼哈顿距离 <= radius 的角色（不含 exclude）。"""
+        if radius < 0:
+            return []
+        size = self.cell_size
+        cx0, cx1 = (x - radius) // size, (x + radius) // size
+        cy0, cy1 = (y - radius) // size, (y + radius) // size
+        cells = self._cells
+        entries = self._entries
+
+        hits: list[_Entry] = []
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if not bucket:
+                    continue
+                for aid in bucket:
+                    entry = entries[aid]
+                    other = entry.avatar
+                    if other is exclude:
+                        continue
+                    if abs(other.pos_x - x) + abs(other.pos_y - y) <= radius:
+                        hits.append(entry)
+        return self._ordered(hits)
+
+    def query_region(self, region_id: int, exclude: "Avatar | None" = None) -> List["Avatar"]:
+        """返回当前所在 tile 属于 region_id 的角色（不含 exclude）。"""
+        bucket = self._regions.get(region_id)
+        if not bucket:
+            return []
+        entries = self._entries
+        hits = [entries[aid] for aid in bucket if entries[aid].avatar is not exclude]
+        return self._ordered(hits)
+
+    # ========== 内部 ==========
+
+    @staticmethod
+    def _ordered(hits: Iterable[_Entry]) -> List["Avatar"]:
+        return [e.avatar for e in sorted(hits, key=lambda e: e.seq)]
+
+    def _place(self, aid: str, entry: _Entry) -> None:
+        avatar = entry.avatar
+        size = self.cell_size
+        cell = (avatar.pos_x // size, avatar.pos_y // size)
+        # 不在任何 tile / 区域上的角色不参与区域查询
+        tile = getattr(avatar, "tile", None)
+        region = tile.region if tile is not None else None
+        region_id = region.id if region is not None else None
+
+        if cell != entry.cell:
+            self._discard_cell(aid, entry.cell)
+            self._cells.setdefault(cell, set()).add(aid)
+            entry.cell = cell
+
+        if region_id != entry.region_id:
+            self._discard_region(aid, entry.region_id)
+            if region_id is not None:
+                self._regions.setdefault(region_id, set()).add(aid)
+            entry.region_id = region_id
+
+    def _discard_cell(self, aid: str, cell: Optional[Tuple[int, int]]) -> None:
+        if cell is None:
+            return
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.discard(aid)
+            if not bucket:
+                del self._cells[cell]
+
+    def _discard_region(self, aid: str, region_id: Optional[int]) -> None:
+        if region_id is None:
+            return
+        bucket = self._regions.get(region_id)
+        if bucket is not None:
+            bucket.discard(aid)
+            if not bucket:
+                del self._regions[region_id]
+
+    def _unbind(self, avatar: "Avatar") -> None:
+        if avatar.__dict__.get(_INDEX_ATTR) is self:
+            del avatar.__dict__[_INDEX_ATTR]
+
+
+def notify_spatial_change(avatar: "Avatar") -> None:
+    """由 Avatar.__setattr__ 调用：若角色已被索引，则刷新其分桶。"""
+    index = avatar.__dict__.get(_INDEX_ATTR)
+    if index is not None:
+        index.update(avatar)
+
+
+class IndexedAvatarDict(dict):
+    """
+    与 AvatarSpatialIndex 同步的 id -> Avatar 字典。
+
+    AvatarManager.avatars 在代码与测试中被大量直接读写（赋值、update、pop），
+    因此在字典层面拦截写操作，保证任何路径下索引都与存活角色集合一致。
+    """
+
+    def __init__(self, index: AvatarSpatialIndex, *args, **kwargs):
+        super().__init__()
+        self.index = index
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, key, avatar) -> None:
+        super().__setitem__(key, avatar)
+        self.index.add(avatar, key)
+
+    def __delitem__(self, key) -> None:
+        super().__delitem__(key)
+        self.index.remove(key)
+
+    _MISSING = object()
+
+    def pop(self, key, default=_MISSING):
+        if key in self:
+            value = super().pop(key)
+            self.index.remove(key)
+            return value
+        if default is self._MISSING:
+            raise KeyError(key)
+        return default
+
+    def popitem(self):
+        key, value = super().popitem()
+        self.index.remove(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self) -> None:
+        super().clear()
+        self.index.clear()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def copy(self) -> dict:
+        return dict(self)
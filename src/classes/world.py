@@ -16,6 +16,8 @@ from src.i18n import t
 if TYPE_CHECKING:
     from src.classes.avatar import Avatar
     from src.classes.celestial_phenomenon import CelestialPhenomenon
+    from src.classes.prompt_context import PromptContext
+    from src.sim.save.save_journal import SaveTracker
 
 
 @dataclass
@@ -35,15 +37,37 @@ class World():
     gathering_manager: GatheringManager = field(default_factory=GatheringManager)
     # 世界历史
     history: "History" = field(default_factory=lambda: History())
+    # 增量存档的差分基准（不参与序列化，见 src/sim/save/save_journal.py）
+    save_tracker: Optional["SaveTracker"] = field(default=None, repr=False, compare=False)
+    # 本月的提示词上下文缓存（见 src/classes/prompt_context.py）
+    _prompt_context: Optional["PromptContext"] = field(default=None, init=False, repr=False, compare=False)
 
     def get_info(self, detailed: bool = False, avatar: Optional["Avatar"] = None) -> dict:
         """
         返回世界信息（dict），其中包含地图信息（dict）。
         如果指定了 avatar，将传给 map.get_info 用于过滤区域和计算距离。
         """
-        static_info = self.static_info
         map_info = self.map.get_info(detailed=detailed, avatar=avatar)
-        world_info = {**map_info, **static_info}
+        return {**map_info, **self.get_shared_info()}
+
+    def get_prompt_context(self) -> "PromptContext":
+        """
+        本月、当前语言下的提示词上下文（区域描述、共享信息的渲染结果按月缓存）。
+        拼提示词时用它代替 get_info + JSON 序列化。
+        """
+        from src.classes.prompt_context import PromptContext
+        key = PromptContext.key_for(self)
+        context = self._prompt_context
+        if context is None or context.key != key:
+            context = self._prompt_context = PromptContext(self, key)
+        return context
+
+    def get_shared_info(self) -> dict:
+        """
+        返回与具体角色无关的世界信息（世界背景、历史、天地灵机），不含地图区域。
+        多个角色共用同一段提示词时使用。
+        """
+        world_info = dict(self.static_info)
 
         if self.current_phenomenon:
             # 使用翻译 Key
@@ -84,6 +108,8 @@ class World():
             
         # 累加修改（后来的覆盖前面的）
         self.history.modifications[category][id_str].update(changes)
+        # 名称 / 描述变了，本月缓存的区域描述作废
+        self._prompt_context = None
 
     @property
     def static_info(self) -> dict:
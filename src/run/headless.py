@@ -0,0 +1,298 @@
+"""
+无头批量模拟：不启动服务器，直接构建世界并推进 N 个月，输出吞吐报告。
+
+事件与服务器一样写入 SQLite 事件库（默认放在临时目录，运行结束后删除；--events-db 指定路径
+则保留），--memory-events 改用内存事件管理器（不计事件库开销）。
+
+LLM 由离线后端（src/utils/llm/offline.py）替代，同一种子下运行结果可复现，
+作为容量规划与模拟性能回归测试的标准工具。
+
+指定 --llm-cache 时改用真实 LLM 配合响应缓存（src/utils/llm/cache.py）：
+record 录制一次真实运行，replay 用同一种子离线全速回放（缓存未命中时报错）。
+
+使用方法:
+    python -m src.run.headless --months 120 --avatars 200 --seed 42
+    python -m src.run.headless --months 1200 --avatars 1000 --llm-latency 0.05 --json report.json
+    python -m src.run.headless --months 24 --avatars 20 --llm-cache logs/run.sqlite --llm-cache-mode record
+    python -m src.run.headless --months 24 --avatars 20 --llm-cache logs/run.sqlite --llm-cache-mode replay
+
+注意：字符串哈希（set 遍历顺序等）受 PYTHONHASHSEED 影响；未设置时本程序会以
+PYTHONHASHSEED=<seed> 重新启动自身，保证可复现。
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass
+class HeadlessReport:
+    """一次无头运行的结果。"""
+    seed: int
+    months: int
+    avatars_initial: int
+    avatars_alive: int
+    events: int
+    setup_seconds: float
+    sim_seconds: float
+    months_per_second: float
+    events_per_second: float
+    peak_rss_mb: Optional[float]
+    # 各阶段累计耗时（秒）
+    phase_seconds: dict[str, float] = field(default_factory=dict)
+    # 各阶段累计 CPU 时间（秒），与 phase_seconds 之差近似为等待 LLM 的时间
+    phase_cpu_seconds: dict[str, float] = field(default_factory=dict)
+    llm_calls: dict[str, int] = field(default_factory=dict)
+    # 事件内容摘要：同一种子、同一代码下应保持不变
+    digest: str = ""
+
+    def format(self) -> str:
+        lines = [
+            f"seed={self.seed} months={self.months} avatars={self.avatars_initial} -> {self.avatars_alive} alive",
+            f"setup:        {self.setup_seconds:8.2f} s",
+            f"simulation:   {self.sim_seconds:8.2f} s",
+            f"months/sec:   {self.months_per_second:8.2f}",
+            f"events:       {self.events:8d}  ({self.events_per_second:.1f}/s)",
+            f"peak RSS:     {self.peak_rss_mb:8.1f} MB" if self.peak_rss_mb is not None else "peak RSS:     n/a",
+            f"digest:       {self.digest}",
+            "phases:",
+        ]
+        total = sum(self.phase_seconds.values()) or 1.0
+        for name, seconds in sorted(self.phase_seconds.items(), key=lambda kv: -kv[1]):
+            cpu = self.phase_cpu_seconds.get(name, 0.0)
+            lines.append(
+                f"  {name:<40s} {seconds * 1000:10.1f} ms  {seconds / total * 100:5.1f}%"
+                f"  cpu {cpu * 1000:10.1f} ms"
+            )
+        if self.llm_calls:
+            lines.append("llm calls: " + ", ".join(f"{k}={v}" for k, v in sorted(self.llm_calls.items())))
+        return "\n".join(lines)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _setup_language(lang: Optional[str]) -> None:
+    """与服务器启动时一致：设置语言并按语言重载静态数据。"""
+    from src.classes.language import language_manager
+    from src.run.data_loader import reload_all_static_data
+    from src.utils.config import CONFIG, update_paths_for_language
+    from src.utils.df import reload_game_configs
+
+    language_manager.set_language(str(lang or getattr(CONFIG.system, "language", "zh-CN")))
+    update_paths_for_language()
+    reload_game_configs()
+    reload_all_static_data()
+
+
+def build_world(avatar_count: int, sect_count: int, seed: int, events_db_path: Optional[Path] = None):
+    """
+    构建世界：地图、宗门与随机角色（与服务器开局流程一致，不含历史背景与主角）。
+
+    指定 events_db_path 时事件写入该 SQLite 库（与服务器相同），否则使用内存事件管理器。
+    """
+    from src.classes.calendar import Month, Year, create_month_stamp
+    from src.classes.sect import sects_by_id
+    from src.classes.world import World
+    from src.run.load_map import load_cultivation_world_map
+    from src.sim.new_avatar import make_avatars
+
+    random.seed(seed)
+    game_map = load_cultivation_world_map()
+    month_stamp = create_month_stamp(Year(100), Month.JANUARY)
+    if events_db_path is not None:
+        world = World.create_with_db(map=game_map, month_stamp=month_stamp, events_db_path=events_db_path)
+    else:
+        world = World(map=game_map, month_stamp=month_stamp)
+    pool = sorted(sects_by_id.values(), key=lambda s: s.id)
+    random.shuffle(pool)
+    existed_sects = pool[:sect_count]
+    avatars = make_avatars(
+        world,
+        count=avatar_count,
+        current_month_stamp=world.month_stamp,
+        existed_sects=existed_sects,
+    )
+    world.avatar_manager.avatars.update(avatars)
+    return world
+
+
+async def run_headless(
+    months: int,
+    avatars: int,
+    seed: int = 42,
+    sects: int = 6,
+    llm_latency: float = 0.0,
+    lang: Optional[str] = None,
+    llm_cache: Optional[str] = None,
+    llm_cache_mode: str = "replay",
+    events_db: Optional[str] = None,
+    memory_events: bool = False,
+) -> HeadlessReport:
+    """
+    构建世界并推进 months 个月，返回吞吐报告。指定 llm_cache 时使用真实 LLM + 响应缓存。
+
+    事件默认写入临时目录中的 SQLite 库（events_db 指定时写入该路径并保留）；
+    memory_events 为 True 时使用内存事件管理器。
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if memory_events:
+            events_db_path = None
+        else:
+            events_db_path = Path(events_db) if events_db else Path(tmpdir) / "headless_events.db"
+        return await _run(months, avatars, seed, sects, llm_latency, lang, llm_cache, llm_cache_mode, events_db_path)
+
+
+async def _run(
+    months: int,
+    avatars: int,
+    seed: int,
+    sects: int,
+    llm_latency: float,
+    lang: Optional[str],
+    llm_cache: Optional[str],
+    llm_cache_mode: str,
+    events_db_path: Optional[Path],
+) -> HeadlessReport:
+    from src.sim.instrumentation import PhaseStats
+    from src.sim.scheduler import SimScheduler
+    from src.sim.simulator import Simulator
+    from src.utils.llm import SQLiteResponseCache, set_offline_backend, set_response_cache
+    from src.utils.llm.offline import StubLLMBackend
+    from src.utils.llm.stats import get_llm_stats, reset_llm_stats
+
+    t_setup = time.perf_counter()
+    _setup_language(lang)
+    world = build_world(avatars, sects, seed, events_db_path)
+    sim = Simulator(world)
+    # 只统计本次运行（不使用服务器共用的默认观测器）
+    sim.instruments = []
+    phase_stats = PhaseStats()
+    sim.add_instrument(phase_stats)
+    setup_seconds = time.perf_counter() - t_setup
+
+    backend = None
+    cache = None
+    if llm_cache:
+        cache = SQLiteResponseCache(llm_cache, mode=llm_cache_mode)
+        set_response_cache(cache)
+        reset_llm_stats()
+    else:
+        backend = StubLLMBackend(seed=seed, latency=llm_latency)
+        set_offline_backend(backend)
+    digest = hashlib.sha1()
+    event_count = 0
+
+    async def step():
+        return await sim.step()
+
+    def publish(events):
+        nonlocal event_count
+        event_count += len(events)
+        for event in events:
+            digest.update(str(event.month_stamp).encode())
+            digest.update(event.content.encode("utf-8"))
+
+    # 模拟推进期间固定随机序列（构建世界之后重新播种，不受语言数据加载影响）
+    random.seed(seed)
+    t_sim = time.perf_counter()
+    try:
+        await SimScheduler(mode="fast").run(step, publish, max_steps=months)
+        sim_seconds = time.perf_counter() - t_sim
+    finally:
+        set_offline_backend(None)
+        if cache is not None:
+            set_response_cache(None)
+            cache.close()
+        # 写完后台队列并关闭事件库（临时目录随后删除）
+        world.event_manager.close()
+    if backend is not None:
+        llm_calls = dict(backend.calls)
+    else:
+        # 缓存命中也算作模拟发起的调用
+        llm_calls = {task: s["calls"] + s["cache_hits"] for task, s in get_llm_stats().items()}
+
+    return HeadlessReport(
+        seed=seed,
+        months=months,
+        avatars_initial=avatars,
+        avatars_alive=len(world.avatar_manager.avatars),
+        events=event_count,
+        setup_seconds=round(setup_seconds, 3),
+        sim_seconds=round(sim_seconds, 3),
+        months_per_second=round(months / sim_seconds, 3) if sim_seconds > 0 else 0.0,
+        events_per_second=round(event_count / sim_seconds, 3) if sim_seconds > 0 else 0.0,
+        peak_rss_mb=_peak_rss_mb(),
+        phase_seconds={k: round(t[0], 4) for k, t in phase_stats.totals.items()},
+        phase_cpu_seconds={k: round(t[1], 4) for k, t in phase_stats.totals.items()},
+        llm_calls=llm_calls,
+        digest=digest.hexdigest()[:16],
+    )
+
+
+def _ensure_hash_seed(seed: int) -> None:
+    """PYTHONHASHSEED 只能在解释器启动前设置；未设置时带上它重新运行自身。"""
+    if os.environ.get("PYTHONHASHSEED") is not None:
+        return
+    env = dict(os.environ, PYTHONHASHSEED=str(seed))
+    result = subprocess.run([sys.executable, "-m", "src.run.headless", *sys.argv[1:]], env=env)
+    sys.exit(result.returncode)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Headless batch simulation runner.")
+    parser.add_argument("--months", type=int, default=120)
+    parser.add_argument("--avatars", type=int, default=100)
+    parser.add_argument("--sects", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="离线 LLM 每次调用的模拟延迟（秒）")
+    parser.add_argument("--lang", default=None, help="语言（默认取 system.language）")
+    parser.add_argument("--llm-cache", default=None, help="使用真实 LLM 与该路径的响应缓存，代替离线后端")
+    parser.add_argument("--llm-cache-mode", default="replay", choices=("record", "replay", "cache"),
+                        help="响应缓存模式（需配合 --llm-cache）")
+    parser.add_argument("--events-db", default=None, help="事件库路径（默认写入临时目录，运行结束后删除）")
+    parser.add_argument("--memory-events", action="store_true", help="使用内存事件管理器，不写事件库")
+    parser.add_argument("--json", default=None, help="把报告另存为 JSON 文件")
+    args = parser.parse_args(argv)
+
+    if argv is None:
+        _ensure_hash_seed(args.seed)
+
+    report = asyncio.run(run_headless(
+        months=args.months,
+        avatars=args.avatars,
+        seed=args.seed,
+        sects=args.sects,
+        llm_latency=args.llm_latency,
+        lang=args.lang,
+        llm_cache=args.llm_cache,
+        llm_cache_mode=args.llm_cache_mode,
+        events_db=args.events_db,
+        memory_events=args.memory_events,
+    ))
+    print(report.format())
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(asdict(report), f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
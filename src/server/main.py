@@ -1,6 +1,7 @@
 import sys
 import os
 import asyncio
+import json
 import webbrowser
 import subprocess
 import time
@@ -21,6 +22,8 @@ from pydantic import BaseModel
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from src.sim.simulator import Simulator
+from src.sim.scheduler import SimScheduler
+from src.sim import instrumentation
 from src.classes.world import World
 from src.classes.history import HistoryManager
 from src.classes.calendar import Month, Year, create_month_stamp
@@ -39,12 +42,16 @@ from src.classes.event import Event
 from src.classes.celestial_phenomenon import celestial_phenomena_by_id
 from src.classes.long_term_objective import set_user_long_term_objective, clear_user_long_term_objective
 from src.sim.save.save_game import save_game, list_saves
+from src.sim.save.save_format import get_save_suffix
 from src.sim.load.load_game import load_game
 from src.utils import protagonist as prot_utils
 from src.utils.llm.client import test_connectivity
+from src.utils.llm import get_llm_stats
 from src.utils.llm.config import LLMConfig, LLMMode
 from src.run.data_loader import reload_all_static_data
 from src.classes.language import language_manager, LanguageType
+from src.server.tick_encoder import TickEncoder, ENCODINGS as TICK_ENCODINGS
+from src.server.ws_channel import ClientChannel, KIND_TICK
 
 # 全局游戏实例
 game_instance = {
@@ -135,10 +142,15 @@ IS_DEV_MODE = "--dev" in sys.argv
 class ConnectionManager:
     def __init__(self):
         self.active_connections: list[WebSocket] = []
+        # 每个连接独立的有界发送队列，慢客户端不阻塞广播
+        self.channels: dict[WebSocket, ClientChannel] = {}
+        # tick 增量编码：按客户端记录已同步的版本
+        self.tick_encoder = TickEncoder()
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, encoding: Optional[str] = None):
         await websocket.accept()
         self.active_connections.append(websocket)
+        self.tick_encoder.register(websocket, encoding)
         
         # 不再自动恢复游戏，让用户明确选择"新游戏"或"加载存档"。
         # 这样可以避免在用户加载存档前就生成初始化事件。
@@ -148,6 +160,10 @@ class ConnectionManager:
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        self.tick_encoder.unregister(websocket)
+        channel = self.channels.pop(websocket, None)
+        if channel is not None:
+            channel.close()
             
         # 当最后一个客户端断开时，自动暂停游戏
         if len(self.active_connections) == 0:
@@ -159,18 +175,120 @@ class ConnectionManager:
             game_instance["is_paused"] = should_pause
             print(f"[Auto-Control] {log_msg}")
 
+    def _channel(self, websocket: WebSocket) -> ClientChannel:
+        channel = self.channels.get(websocket)
+        if channel is None:
+            ws_conf = CONFIG.websocket
+            channel = ClientChannel(
+                websocket,
+                max_queue=ws_conf.max_queue,
+                max_lag=ws_conf.max_lag,
+                on_close=lambda ch: self.disconnect(ch.websocket),
+            )
+            self.channels[websocket] = channel
+        return channel
+
+    async def _fan_out(self, payloads: list) -> None:
+        """
+        把已编码的负载 (连接, 负载, kind, 事件) 放入各连接的发送队列；
+        让出一次事件循环，使各发送任务并发开始。
+        """
+        for connection, payload, kind, events in payloads:
+            if connection in self.active_connections:
+                self._channel(connection).send(payload, kind, events)
+        await asyncio.sleep(0)
+
+    def send_to(self, websocket: WebSocket, message: str) -> None:
+        """给单个连接发消息：经其发送队列，由发送任务统一写入 websocket。"""
+        if websocket in self.active_connections:
+            self._channel(websocket).send(message)
+
+    def get_connection_metrics(self) -> list[dict]:
+        """各连接的发送队列深度、滞留时间与计数。"""
+        metrics = []
+        for i, connection in enumerate(self.active_connections):
+            channel = self.channels.get(connection)
+            item = {"connection": i}
+            item.update(channel.metrics() if channel else {
+                "queue_depth": 0, "lag_seconds": 0.0, "sent": 0, "dropped": 0, "closed": False,
+            })
+            metrics.append(item)
+        return metrics
+
     async def broadcast(self, message: dict):
         import json
         try:
-            # 简单序列化，实际生产可能需要更复杂的 Encoder
+            # 只序列化一次，所有连接共享同一份文本
             txt = json.dumps(message, default=str)
-            for connection in self.active_connections:
-                await connection.send_text(txt)
+            await self._fan_out([(connection, txt, None, ()) for connection in list(self.active_connections)])
         except Exception as e:
             print(f"Broadcast error: {e}")
 
+    async def broadcast_tick(self, world: World, header: dict):
+        """按各客户端已同步的版本推送增量（或全量）tick。"""
+        await self.deliver_tick(self.prepare_tick(world, header))
+
+    def prepare_tick(self, world: World, header: dict) -> list:
+        """
+        同步采集角色状态并编码 tick，返回 [(连接, 负载, 事件)]。
+
+        发送队列已满的连接先合并排队中的 tick：本次改发全量快照，并把被丢弃 tick 的事件并入。
+        """
+        events = list(header.get("events") or [])
+        headers = {}
+        for connection in self.active_connections:
+            channel = self.channels.get(connection)
+            if channel is None:
+                continue
+            resync, carried = channel.begin_tick()
+            if resync:
+                self.tick_encoder.request_resync(connection)
+            if carried:
+                headers[connection] = {**header, "events": carried + events}
+
+        living = {str(a.id): a for a in world.avatar_manager.get_living_avatars()}
+        states = {
+            aid: (
+                int(getattr(a, "pos_x", 0)),
+                int(getattr(a, "pos_y", 0)),
+                a.current_action_name,
+                resolve_avatar_action_emoji(a),
+            )
+            for aid, a in living.items()
+        }
+
+        def describe(aid: str) -> dict:
+            a = living[aid]
+            x, y, action, emoji = states[aid]
+            return {
+                "id": aid,
+                "name": a.name,
+                "x": x,
+                "y": y,
+                "gender": a.gender.value,
+                "pic_id": resolve_avatar_pic_id(a),
+                "action": action,
+                "action_emoji": emoji,
+                "is_dead": False,
+            }
+
+        return [
+            (connection, payload, headers[connection]["events"] if connection in headers else events)
+            for connection, payload in self.tick_encoder.encode_tick(
+                header, states, describe, world_token=world, headers=headers
+            )
+        ]
+
+    async def deliver_tick(self, payloads: list):
+        await self._fan_out([
+            (connection, payload, KIND_TICK, events) for connection, payload, events in payloads
+        ])
+
 manager = ConnectionManager()
 
+# 模拟推进节奏（见 CONFIG.scheduler）
+sim_scheduler = SimScheduler.from_config()
+
 
 def serialize_events_for_client(events: List[Event]) -> List[dict]:
     """将事件转换为前端可用的结构。"""
@@ -336,7 +454,7 @@ async def init_game_async():
         save_name = f"save_{timestamp}"
         saves_dir = CONFIG.paths.saves
         saves_dir.mkdir(parents=True, exist_ok=True)
-        save_path = saves_dir / f"{save_name}.json"
+        save_path = saves_dir / f"{save_name}{get_save_suffix()}"
         events_db_path = get_events_db_path(save_path)
         
         game_instance["current_save_path"] = save_path
@@ -467,97 +585,38 @@ async def game_loop():
         return
     
     print("[game_loop] 初始化完成，开始游戏循环。")
-    
-    while True:
-        # 控制游戏速度，例如每秒 1 次更新
-        await asyncio.sleep(1.0)
-        
-        try:
-            # 检查暂停状态
-            if game_instance.get("is_paused", False):
-                continue
-            
-            # 再次检查初始化状态（可能被重新初始化）
-            if game_instance.get("init_status") != "ready":
-                continue
 
-            sim = game_instance.get("sim")
-            world = game_instance.get("world")
-            
-            if sim and world:
-                # 执行一步
-                events = await sim.step()
-                
-                # 获取状态变更 (Source of Truth: AvatarManager)
-                newly_born_ids = world.avatar_manager.pop_newly_born()
-                newly_dead_ids = world.avatar_manager.pop_newly_dead()
+    def should_run() -> bool:
+        # 暂停或被重新初始化时不推进
+        if game_instance.get("is_paused", False):
+            return False
+        if game_instance.get("init_status") != "ready":
+            return False
+        return bool(game_instance.get("sim") and game_instance.get("world"))
 
-                avatar_updates = []
-                
-                # 为了避免重复发送大量数据，我们区分处理：
-                # - 新角色/刚死角色：发送完整数据（或关键状态更新）
-                # - 旧角色：只发送位置 (x, y)（限制数量）
-                
-                # 1. 发送新角色的完整信息
-                for aid in newly_born_ids:
-                    a = world.avatar_manager.avatars.get(aid)
-                    if a:
-                        avatar_updates.append({
-                            "id": str(a.id),
-                            "name": a.name,
-                            "x": int(getattr(a, "pos_x", 0)),
-                            "y": int(getattr(a, "pos_y", 0)),
-                            "gender": a.gender.value,
-                            "pic_id": resolve_avatar_pic_id(a),
-                            "action": a.current_action_name,
-                            "action_emoji": resolve_avatar_action_emoji(a),
-                            "is_dead": False
-                        })
-
-                # 2. 发送刚死角色的状态更新
-                for aid in newly_dead_ids:
-                    # 使用 get_avatar 以兼容死者查询
-                    a = world.avatar_manager.get_avatar(aid)
-                    if a:
-                        avatar_updates.append({
-                            "id": str(a.id),
-                            "name": a.name, # 名字也带上，防止前端没数据
-                            "is_dead": True,
-                            "action": "已故"
-                        })
-
-                # 3. 常规位置更新（暂时只发前 50 个旧角色，减少数据量）
-                limit = 50
-                count = 0
-                # 只遍历活人更新位置
-                for a in world.avatar_manager.get_living_avatars():
-                    # 如果是新角色，已经在上面处理过了，跳过
-                    if a.id in newly_born_ids:
-                        continue
-                        
-                    if count < limit:
-                        avatar_updates.append({
-                            "id": str(a.id), 
-                            "x": int(getattr(a, "pos_x", 0)), 
-                            "y": int(getattr(a, "pos_y", 0)),
-                            "action_emoji": resolve_avatar_action_emoji(a)
-                        })
-                        count += 1
-
-                # 构造广播数据包
-                state = {
-                    "type": "tick",
-                    "year": int(world.month_stamp.get_year()),
-                    "month": world.month_stamp.get_month().value,
-                    "events": serialize_events_for_client(events),
-                    "avatars": avatar_updates,
-                    "phenomenon": serialize_phenomenon(world.current_phenomenon)
-                }
-                await manager.broadcast(state)
-        except Exception as e:
-            from src.run.log import get_logger
-            print(f"Game loop error: {e}")
-            get_logger().logger.error(f"Game loop error: {e}", exc_info=True)
+    async def step():
+        world = game_instance.get("world")
+        events = await game_instance["sim"].step()
+        return world, events
+
+    def publish(result):
+        world, events = result
+        # 清空出生/死亡缓冲：增量编码器通过快照对比得到这些变化
+        world.avatar_manager.pop_newly_born()
+        world.avatar_manager.pop_newly_dead()
+
+        # 构造广播数据包（角色部分由 tick 编码器按客户端生成）
+        header = {
+            "type": "tick",
+            "year": int(world.month_stamp.get_year()),
+            "month": world.month_stamp.get_month().value,
+            "events": serialize_events_for_client(events),
+            "phenomenon": serialize_phenomenon(world.current_phenomenon)
+        }
+        # 状态在此同步采集并编码完毕；投递只把负载放入各连接的发送队列
+        return manager.deliver_tick(manager.prepare_tick(world, header))
+
+    await sim_scheduler.run(step, publish, should_run)
 
 
 def ensure_npm_dependencies(web_dir: str) -> bool:
@@ -657,6 +716,11 @@ async def lifespan(app: FastAPI):
     yield
     
     # 关闭时清理
+    # 写完后台队列中的事件并释放 SQLite 连接。
+    world = game_instance.get("world")
+    if world and hasattr(world, "event_manager"):
+        world.event_manager.close()
+
     if npm_process:
         print("正在关闭前端开发服务...")
         try:
@@ -713,15 +777,19 @@ print(f"Web dist path: {WEB_DIST_PATH}")
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+    # tick 编码：/ws?encoding=binary 使用二进制帧，默认 json
+    encoding = websocket.query_params.get("encoding")
+    if encoding not in TICK_ENCODINGS:
+        encoding = None
+    await manager.connect(websocket, encoding)
     
     # ===== 检查 LLM 状态并通知前端 =====
     if game_instance.get("llm_check_failed", False):
         error_msg = game_instance.get("llm_error_message", "LLM 连接失败")
-        await websocket.send_json({
+        manager.send_to(websocket, json.dumps({
             "type": "llm_config_required",
             "error": error_msg
-        })
+        }))
         print(f"已向客户端发送 LLM 配置要求: {error_msg}")
     # ===== 检测结束 =====
     
@@ -731,13 +799,51 @@ async def websocket_endpoint(websocket: WebSocket):
             data = await websocket.receive_text()
             # echo test
             if data == "ping":
-                await websocket.send_text('{"type":"pong"}')
+                manager.send_to(websocket, '{"type":"pong"}')
+            # 客户端状态丢失（如重新加载世界）时请求全量同步
+            elif data == "resync":
+                manager.tick_encoder.request_resync(websocket)
     except WebSocketDisconnect:
         manager.disconnect(websocket)
     except Exception as e:
         print(f"WS Error: {e}")
         manager.disconnect(websocket)
 
+@app.get("/api/ws/metrics")
+def get_ws_metrics():
+    """各 websocket 连接的发送队列深度与滞留时间（调试用）"""
+    return {"connections": manager.get_connection_metrics()}
+
+@app.get("/api/scheduler")
+def get_scheduler_stats():
+    """模拟调度模式与步进耗时统计"""
+    return {"mode": sim_scheduler.mode, **sim_scheduler.stats.to_dict()}
+
+@app.get("/api/debug/sim-stats")
+def get_sim_stats():
+    """Simulator.step 各阶段耗时 / 事件数，以及按任务统计的 LLM 调用"""
+    last_profile = instrumentation.last_profile_path
+    return {
+        "phases": instrumentation.get_phase_stats().summary(),
+        "llm": get_llm_stats(),
+        "last_profile": str(last_profile) if last_profile else None,
+    }
+
+class ProfileStepRequest(BaseModel):
+    profiler: str = "cprofile"
+
+@app.post("/api/debug/profile-step")
+def profile_next_step(req: ProfileStepRequest):
+    """在剖析器下执行下一个月的模拟，结果写入 instrumentation.profile_dir"""
+    sim = game_instance.get("sim")
+    if not sim:
+        raise HTTPException(status_code=503, detail="World not initialized")
+    try:
+        sim.request_profile(req.profiler)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "ok", "profiler": req.profiler}
+
 @app.get("/api/meta/avatars")
 def get_avatar_meta():
     return AVATAR_ASSETS
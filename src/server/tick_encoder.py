@@ -0,0 +1,222 @@
+"""
+websocket tick 增量编码。
+
+每秒一次的 tick 推送原先只附带前 50 个角色的位置，其余角色的移动前端永远收不到；
+若改为每次推送全部角色，负载又随世界规模线性增长。这里改为增量协议：
+- 服务端保存上一次推送的角色快照（按版本号递增），每个客户端记录自己已收到的版本；
+- 已同步到上一版本的客户端只收到变化的字段（新角色发完整信息，消失的角色标记死亡）；
+- 新连接、发送失败或客户端主动请求（"resync"）时，下一次推送发送全量快照；
+- 所有处于同一版本、同一编码的客户端共享同一份编码结果，每个 tick 只序列化一次。
+
+websocket 基于 TCP 有序可靠传输，发送成功即视为客户端已收到该版本。
+
+支持两种编码：
+- json（默认）：与旧协议兼容的 {"type": "tick", ...} 文本帧；
+- binary：位置变化打包为定长数组（struct），其余字段仍以 JSON 附在帧内。
+  帧格式（小端）：
+    magic "CWT1" | uint32 json 长度 | uint32 位置条目数 | json | 条目 * (uint32 索引, uint16 x, uint16 y)
+  角色 id 映射为整数索引，首次出现时在 json 的 "index" 字段中下发 [id, 索引] 对。
+"""
+from __future__ import annotations
+
+import json
+import struct
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional, Union
+
+ENCODING_JSON = "json"
+ENCODING_BINARY = "binary"
+ENCODINGS = (ENCODING_JSON, ENCODING_BINARY)
+
+# 快照中跟踪的字段（顺序即 AvatarState 元组顺序）
+TRACKED_FIELDS = ("x", "y", "action", "action_emoji")
+AvatarState = tuple
+
+# 角色从存活快照中消失时下发的状态
+DEAD_ACTION = "已故"
+
+BINARY_MAGIC = b"CWT1"
+_FRAME_HEADER = struct.Struct("<4sII")
+_POSITION = struct.Struct("<IHH")
+
+Payload = Union[str, bytes]
+
+
+@dataclass
+class ClientTickState:
+    """单个客户端的同步状态。"""
+    encoding: str = ENCODING_JSON
+    # 客户端已收到的快照版本；None 表示下一次需要全量同步
+    version: Optional[int] = None
+
+
+class TickEncoder:
+    """
+    为所有连接的客户端生成 tick 负载。
+
+    用法：
+        encoder.register(ws, "binary")
+        for ws, payload in encoder.encode_tick(header, states, describe):
+            发送 payload；失败时调用 encoder.request_resync(ws)
+    """
+
+    def __init__(self):
+        self._clients: dict[Hashable, ClientTickState] = {}
+        self._version = 0
+        self._states: dict[str, AvatarState] = {}
+        self._world_token: Any = None
+        # 角色 id -> 二进制协议中的整数索引（进程内稳定、不复用）
+        self._index: dict[str, int] = {}
+
+    def register(self, client: Hashable, encoding: Optional[str] = None) -> ClientTickState:
+        """登记新客户端，其第一次收到的 tick 为全量快照。"""
+        encoding = encoding or ENCODING_JSON
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unsupported tick encoding: {encoding}")
+        state = ClientTickState(encoding=encoding)
+        self._clients[client] = state
+        return state
+
+    def unregister(self, client: Hashable) -> None:
+        self._clients.pop(client, None)
+
+    def request_resync(self, client: Hashable) -> None:
+        """下一次推送时向该客户端发送全量快照。"""
+        state = self._clients.get(client)
+        if state is not None:
+            state.version = None
+
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def encode_tick(
+        self,
+        header: dict,
+        states: dict[str, AvatarState],
+        describe: Callable[[str], dict],
+        world_token: Any = None,
+        headers: Optional[dict[Hashable, dict]] = None,
+    ) -> list[tuple[Hashable, Payload]]:
+        """
+        记录新的角色快照，并为每个客户端生成负载。
+
+        Args:
+            header: tick 的公共字段（type/year/month/events/phenomenon）。
+            states: 存活角色 id -> 按 TRACKED_FIELDS 排列的状态元组。
+            describe: 返回角色完整信息的函数（新角色与全量同步时调用）。
+            world_token: 世界标识；变化时（读档、重新开局）所有客户端全量同步。
+            headers: 个别客户端使用的公共字段（如并入了被合并丢弃的事件），其负载单独编码。
+
+        Returns:
+            [(客户端, 负载)]，负载为 str（json）或 bytes（binary）。
+            调用后客户端即视为已同步到新版本。
+        """
+        if world_token is not self._world_token:
+            self._world_token = world_token
+            self._states = {}
+            for state in self._clients.values():
+                state.version = None
+
+        prev = self._states
+        prev_version = self._version
+        self._states = dict(states)
+        self._version += 1
+        for aid in states:
+            if aid not in self._index:
+                self._index[aid] = len(self._index)
+
+        records: dict[bool, list[dict]] = {}
+        payloads: dict[tuple[bool, str], Payload] = {}
+        result: list[tuple[Hashable, Payload]] = []
+        for client, client_state in self._clients.items():
+            full = client_state.version != prev_version
+            client_header = headers.get(client) if headers else None
+            key = (full, client_state.encoding, client if client_header is not None else None)
+            if key not in payloads:
+                if full not in records:
+                    records[full] = (
+                        [describe(aid) for aid in states] if full
+                        else self._diff(prev, states, describe)
+                    )
+                known = set() if full else prev.keys()
+                payloads[key] = self._encode(
+                    client_state.encoding, client_header or header, records[full], full, known
+                )
+            client_state.version = self._version
+            result.append((client, payloads[key]))
+        return result
+
+    @staticmethod
+    def _diff(prev: dict[str, AvatarState], states: dict[str, AvatarState], describe: Callable[[str], dict]) -> list[dict]:
+        records: list[dict] = []
+        for aid, state in states.items():
+            old = prev.get(aid)
+            if old is None:
+                records.append(describe(aid))
+            elif old != state:
+                record: dict = {"id": aid}
+                for name, new_value, old_value in zip(TRACKED_FIELDS, state, old):
+                    if new_value != old_value:
+                        record[name] = new_value
+                records.append(record)
+        for aid in prev:
+            if aid not in states:
+                records.append({"id": aid, "is_dead": True, "action": DEAD_ACTION})
+        return records
+
+    def _encode(self, encoding: str, header: dict, records: list[dict], full: bool, known) -> Payload:
+        if encoding == ENCODING_JSON:
+            return json.dumps({**header, "avatars": records, "full": full}, default=str)
+
+        avatars: list[dict] = []
+        positions: list[bytes] = []
+        new_index: list[list] = []
+        for record in records:
+            aid = record["id"]
+            if ("x" in record or "y" in record) and aid in self._states:
+                # 增量记录可能只含 x 或 y，位置条目统一取当前快照中的坐标
+                idx = self._index[aid]
+                x, y = self._states[aid][:2]
+                record = {k: v for k, v in record.items() if k not in ("x", "y")}
+                positions.append(_POSITION.pack(idx, x, y))
+                if aid not in known:
+                    new_index.append([aid, idx])
+            if len(record) > 1:
+                avatars.append(record)
+
+        body = json.dumps(
+            {**header, "avatars": avatars, "index": new_index, "full": full},
+            default=str,
+        ).encode("utf-8")
+        return b"".join([_FRAME_HEADER.pack(BINARY_MAGIC, len(body), len(positions)), body, *positions])
+
+
+def decode_binary_tick(frame: bytes, index: dict[int, str]) -> dict:
+    """
+    解码二进制 tick 帧（前端解码逻辑的 Python 版本，供测试与调试工具使用）。
+
+    Args:
+        frame: 二进制帧。
+        index: 客户端维护的 索引 -> 角色 id 映射，会被原地更新。
+
+    Returns:
+        与 json 编码等价的 tick 字典（位置条目追加在 avatars 末尾）。
+    """
+    magic, json_len, count = _FRAME_HEADER.unpack_from(frame, 0)
+    if magic != BINARY_MAGIC:
+        raise ValueError("Not a tick frame")
+    offset = _FRAME_HEADER.size
+    data = json.loads(frame[offset:offset + json_len].decode("utf-8"))
+    offset += json_len
+
+    if data.get("full"):
+        index.clear()
+    for aid, idx in data.pop("index", []):
+        index[idx] = aid
+    avatars = data.setdefault("avatars", [])
+    for _ in range(count):
+        idx, x, y = _POSITION.unpack_from(frame, offset)
+        offset += _POSITION.size
+        if idx in index:
+            avatars.append({"id": index[idx], "x": x, "y": y})
+    return data
@@ -0,0 +1,204 @@
+"""
+websocket 客户端发送通道。
+
+广播原先逐个 await 每个连接的 send，一个网络慢的客户端会拖住整个 tick。
+这里为每个连接维护一个有界的待发送队列，由独立的发送任务排空：
+- 广播只负责把已编码好的负载（所有客户端共享同一个 str/bytes 对象）放入各队列，不等待发送完成；
+- 队列满时合并 tick：编码新 tick 之前由上层调用 begin_tick()，丢弃队列中尚未发送的旧 tick，
+  本次即改发全量快照，并把被丢弃 tick 携带的事件并入其中（事件不会从实时推送中丢失）；
+- 控制消息（toast 等）不会为 tick 让位：tick 总是入队（合并后队列中至多一个 tick 超出上限）；
+  控制消息遇到队列满时丢弃最旧的控制消息，没有控制消息时才合并排队中的 tick；
+- 最旧的未送达消息滞留超过 max_lag 秒，视为慢客户端，主动断开；
+- metrics() 提供队列深度、滞留时间与收发计数。
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Sequence, Union
+
+Payload = Union[str, bytes]
+
+# 可合并的消息类型：丢弃旧 tick 后补发一次全量快照（附带被丢弃的事件）即可恢复
+KIND_TICK = "tick"
+
+
+@dataclass
+class _Outgoing:
+    payload: Payload
+    kind: Optional[str]
+    enqueued_at: float
+    # tick 携带的事件（已序列化），被合并丢弃时转入下一个 tick
+    events: Sequence[dict] = ()
+
+
+class ClientChannel:
+    """
+    单个 websocket 连接的发送队列。
+
+    发送任务按需启动：队列为空时任务退出，下一次入队时重新创建。
+    """
+
+    def __init__(
+        self,
+        websocket: Any,
+        max_queue: int = 32,
+        max_lag: float = 15.0,
+        on_drop: Optional[Callable[["ClientChannel", Optional[str]], None]] = None,
+        on_close: Optional[Callable[["ClientChannel"], None]] = None,
+    ):
+        """
+        Args:
+            websocket: 目标连接（需提供 send_text / send_bytes / close）。
+            max_queue: 待发送消息上限（不含正在发送的一条）。
+            max_lag: 最旧未送达消息允许滞留的秒数，超过后断开连接。
+            on_drop: 丢弃消息时回调 (channel, 被丢弃消息的 kind)。
+            on_close: 通道因发送失败或滞留过久而关闭时回调。
+        """
+        self.websocket = websocket
+        self._max_queue = max(1, int(max_queue))
+        self._max_lag = float(max_lag)
+        self._on_drop = on_drop
+        self._on_close = on_close
+
+        self._queue: deque[_Outgoing] = deque()
+        self._in_flight: Optional[_Outgoing] = None
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+        # 是否有 tick 被丢弃（下一个 tick 须为全量快照），以及被丢弃 tick 的事件
+        self._resync = False
+        self._carried_events: list[dict] = []
+
+        self.sent = 0
+        self.dropped = 0
+
+    def begin_tick(self) -> tuple[bool, list[dict]]:
+        """
+        编码新 tick 之前调用：队列已满时先合并排队中的 tick。
+
+        Returns:
+            (是否须发送全量快照, 被丢弃 tick 的事件)。事件按时间顺序，应放在本次 tick 的事件之前。
+        """
+        if len(self._queue) >= self._max_queue:
+            self._coalesce_ticks()
+        resync, events = self._resync, self._carried_events
+        self._resync = False
+        self._carried_events = []
+        return resync, events
+
+    def send(self, payload: Payload, kind: Optional[str] = None, events: Sequence[dict] = ()) -> bool:
+        """
+        将消息放入队列，立即返回。tick 须先经 begin_tick() 合并，events 为其携带的事件。
+
+        Returns:
+            是否已入队（通道已关闭或因滞留过久被断开时返回 False）。
+        """
+        if self.closed:
+            return False
+        if self.lag() > self._max_lag:
+            self._shutdown(f"lagging {self.lag():.1f}s behind")
+            return False
+
+        if kind != KIND_TICK and len(self._queue) >= self._max_queue:
+            self._make_room()
+        self._queue.append(_Outgoing(payload, kind, time.monotonic(), events))
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._drain())
+        return True
+
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def lag(self) -> float:
+        """最旧的未送达消息（含正在发送的一条）已等待的秒数。"""
+        oldest = self._in_flight or (self._queue[0] if self._queue else None)
+        if oldest is None:
+            return 0.0
+        return time.monotonic() - oldest.enqueued_at
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth(),
+            "lag_seconds": round(self.lag(), 3),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "closed": self.closed,
+        }
+
+    def close(self) -> None:
+        """停止发送（连接已由上层断开），丢弃未发送的消息。"""
+        self.closed = True
+        self._queue.clear()
+        task = self._task
+        if task is not None and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+
+    def _coalesce_ticks(self) -> int:
+        """丢弃排队中的 tick，保留其事件，并要求下一个 tick 为全量快照。返回丢弃数量。"""
+        kept: deque[_Outgoing] = deque()
+        removed = 0
+        for item in self._queue:
+            if item.kind == KIND_TICK:
+                self._carried_events.extend(item.events)
+                removed += 1
+            else:
+                kept.append(item)
+        if removed:
+            self._queue = kept
+            self._resync = True
+            self._dropped(removed, KIND_TICK)
+        return removed
+
+    def _make_room(self) -> None:
+        """为控制消息腾出位置：丢弃最旧的控制消息；队列中只有 tick 时合并 tick。"""
+        for i, item in enumerate(self._queue):
+            if item.kind != KIND_TICK:
+                del self._queue[i]
+                self._dropped(1, item.kind)
+                return
+        self._coalesce_ticks()
+
+    def _dropped(self, count: int, kind: Optional[str]) -> None:
+        self.dropped += count
+        if self._on_drop is not None:
+            self._on_drop(self, kind)
+
+    async def _drain(self) -> None:
+        while self._queue and not self.closed:
+            item = self._queue.popleft()
+            self._in_flight = item
+            try:
+                if isinstance(item.payload, bytes):
+                    await self.websocket.send_bytes(item.payload)
+                else:
+                    await self.websocket.send_text(item.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._in_flight = None
+                self._shutdown(f"send failed: {e}")
+                return
+            self._in_flight = None
+            self.sent += 1
+
+    def _shutdown(self, reason: str) -> None:
+        if self.closed:
+            return
+        print(f"[WS] 断开客户端（{reason}）")
+        self.close()
+        try:
+            asyncio.get_running_loop().create_task(self._close_socket())
+        except RuntimeError:
+            pass
+        if self._on_close is not None:
+            self._on_close(self)
+
+    async def _close_socket(self) -> None:
+        try:
+            # 1013: Try Again Later
+            await self.websocket.close(code=1013)
+        except Exception:
+            pass
@@ -0,0 +1,294 @@
+"""
+Simulator.step 的分阶段观测。
+
+每个月的各个阶段分别记录：
+- wall：墙钟耗时；
+- cpu：当前线程的 CPU 时间（time.thread_time）；
+- await：wall - cpu，近似为等待 LLM / IO 的时间（等待期间事件循环上其他协程消耗的 CPU 也会计入 cpu）；
+- events：阶段返回的事件数。
+阶段并发执行时（见 src/sim/phase_scheduler.py），cpu 也包含同时运行的其他阶段的消耗。
+另附本月各任务的 LLM 调用次数与 token 用量（src/utils/llm/stats.py 的增量）。
+
+扩展方式：实现 on_step(record) 的对象（StepInstrument）通过 Simulator.add_instrument 挂载。
+内置：
+- PhaseStats：滑动窗口 + 累计统计，供 /api/debug/sim-stats 查询；
+- JsonlStepSink / CsvStepSink：按月追加写文件，超过大小上限时滚动（path.1, path.2 ...）。
+
+单步剖析：Simulator.request_profile("cprofile" | "pyinstrument") 后，下一次 step 在剖析器下执行，
+结果写入 instrumentation.profile_dir。
+"""
+from __future__ import annotations
+
+import csv
+import inspect
+import io
+import json
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional, Protocol
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+@dataclass
+class PhaseRecord:
+    name: str
+    wall: float
+    cpu: float
+    events: int
+
+    @property
+    def await_time(self) -> float:
+        return max(0.0, self.wall - self.cpu)
+
+
+@dataclass
+class StepRecord:
+    month_stamp: int
+    wall: float = 0.0
+    cpu: float = 0.0
+    events: int = 0
+    phases: list[PhaseRecord] = field(default_factory=list)
+    # {任务名: {"calls", "prompt_tokens", "completion_tokens"}}，仅本月增量
+    llm: dict[str, dict] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        for phase, raw in zip(self.phases, data["phases"]):
+            raw["await"] = phase.await_time
+        return data
+
+
+class StepInstrument(Protocol):
+    def on_step(self, record: StepRecord) -> None: ...
+
+
+class StepRecorder:
+    """记录单个 step 内的各阶段数据。"""
+
+    def __init__(self, month_stamp: int):
+        from src.utils.llm.stats import get_llm_stats
+        self.record = StepRecord(month_stamp=int(month_stamp))
+        self._llm_before = get_llm_stats()
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.thread_time()
+
+    async def run(self, name: str, fn: Callable, *args) -> Any:
+        wall0 = time.perf_counter()
+        cpu0 = time.thread_time()
+        result = fn(*args)
+        if inspect.isawaitable(result):
+            result = await result
+        self.record.phases.append(PhaseRecord(
+            name=name,
+            wall=time.perf_counter() - wall0,
+            cpu=time.thread_time() - cpu0,
+            events=len(result) if isinstance(result, list) else 0,
+        ))
+        return result
+
+    def finish(self, events: int) -> StepRecord:
+        from src.utils.llm.stats import get_llm_stats
+        record = self.record
+        record.wall = time.perf_counter() - self._wall0
+        record.cpu = time.thread_time() - self._cpu0
+        record.events = events
+        for task, after in get_llm_stats().items():
+            before = self._llm_before.get(task, {})
+            delta = {
+                key: after[key] - before.get(key, 0)
+                for key in ("calls", "prompt_tokens", "completion_tokens")
+            }
+            if any(delta.values()):
+                record.llm[task] = delta
+        return record
+
+
+class PhaseStats:
+    """
+    最近 window 个月的滑动窗口统计，外加启动以来的累计值。
+    """
+
+    def __init__(self, window: int = 120):
+        self._window: deque[StepRecord] = deque(maxlen=max(1, int(window)))
+        self.steps = 0
+        # {阶段名: [wall, cpu, events]} 累计
+        self.totals: dict[str, list[float]] = {}
+
+    def on_step(self, record: StepRecord) -> None:
+        self._window.append(record)
+        self.steps += 1
+        for phase in record.phases:
+            total = self.totals.setdefault(phase.name, [0.0, 0.0, 0])
+            total[0] += phase.wall
+            total[1] += phase.cpu
+            total[2] += phase.events
+
+    def summary(self) -> dict:
+        """窗口内各阶段的平均值（毫秒）与累计值。"""
+        n = len(self._window)
+        phases: dict[str, dict] = {}
+        for record in self._window:
+            for phase in record.phases:
+                item = phases.setdefault(phase.name, {"wall_ms": 0.0, "cpu_ms": 0.0, "await_ms": 0.0, "events": 0.0})
+                item["wall_ms"] += phase.wall * 1000
+                item["cpu_ms"] += phase.cpu * 1000
+                item["await_ms"] += phase.await_time * 1000
+                item["events"] += phase.events
+        for item in phases.values():
+            for key in item:
+                item[key] = round(item[key] / n, 3)
+
+        return {
+            "steps": self.steps,
+            "window": n,
+            "avg_step_ms": round(sum(r.wall for r in self._window) / n * 1000, 3) if n else 0.0,
+            "phases": phases,
+            "totals": {
+                name: {"wall_s": round(t[0], 4), "cpu_s": round(t[1], 4), "events": int(t[2])}
+                for name, t in self.totals.items()
+            },
+            "last_step": self._window[-1].to_dict() if n else None,
+        }
+
+
+class _RollingFile:
+    """按大小滚动的追加写文件。"""
+
+    def __init__(self, path: Path | str, max_bytes: int, backups: int = 3):
+        self.path = Path(path)
+        self.max_bytes = max(1, int(max_bytes))
+        self.backups = max(0, int(backups))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _rollover(self) -> None:
+        for i in range(self.backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+    def append(self, text: str, header: str = "") -> None:
+        if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+            self._rollover()
+        is_new = not self.path.exists()
+        with open(self.path, "a", encoding="utf-8", newline="") as f:
+            if is_new and header:
+                f.write(header)
+            f.write(text)
+
+
+class JsonlStepSink:
+    """每月一行 JSON（StepRecord.to_dict）。"""
+
+    def __init__(self, path: Path | str, max_bytes: int = 10 * 1024 * 1024, backups: int = 3):
+        self._file = _RollingFile(path, max_bytes, backups)
+
+    def on_step(self, record: StepRecord) -> None:
+        self._file.append(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+
+
+class CsvStepSink:
+    """每个阶段一行：month_stamp, phase, wall, cpu, await, events。"""
+
+    COLUMNS = ("month_stamp", "phase", "wall", "cpu", "await", "events")
+
+    def __init__(self, path: Path | str, max_bytes: int = 10 * 1024 * 1024, backups: int = 3):
+        self._file = _RollingFile(path, max_bytes, backups)
+
+    def on_step(self, record: StepRecord) -> None:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for phase in record.phases:
+            writer.writerow([
+                record.month_stamp, phase.name,
+                f"{phase.wall:.6f}", f"{phase.cpu:.6f}", f"{phase.await_time:.6f}", phase.events,
+            ])
+        header = ",".join(self.COLUMNS) + "\r\n"
+        self._file.append(buf.getvalue(), header=header)
+
+
+class StepProfiler:
+    """在剖析器下执行单个 step，结果写入 out_dir。"""
+
+    def __init__(self, kind: str, out_dir: Path | str):
+        if kind not in PROFILERS:
+            raise ValueError(f"Unknown profiler: {kind}")
+        if kind == "pyinstrument":
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError:
+                raise ValueError("pyinstrument is not installed")
+        self.kind = kind
+        self.out_dir = Path(out_dir)
+        self._profiler = None
+
+    def start(self) -> None:
+        if self.kind == "cprofile":
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            from pyinstrument import Profiler
+            self._profiler = Profiler(async_mode="enabled")
+            self._profiler.start()
+
+    def stop(self, month_stamp: int) -> Path:
+        """停止剖析并写出结果，返回文件路径。"""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        if self.kind == "cprofile":
+            import pstats
+            self._profiler.disable()
+            path = self.out_dir / f"step_{month_stamp}_{stamp}.prof"
+            self._profiler.dump_stats(str(path))
+            # 附一份按累计耗时排序的文本摘要
+            with open(path.with_suffix(".txt"), "w", encoding="utf-8") as f:
+                pstats.Stats(self._profiler, stream=f).sort_stats("cumulative").print_stats(60)
+        else:
+            self._profiler.stop()
+            path = self.out_dir / f"step_{month_stamp}_{stamp}.html"
+            path.write_text(self._profiler.output_html(), encoding="utf-8")
+        return path
+
+
+# --- 默认观测（由配置决定，服务器与 Simulator 共用） ---
+
+_default_stats: Optional[PhaseStats] = None
+_default_instruments: Optional[list] = None
+# 最近一次单步剖析的结果文件
+last_profile_path: Optional[Path] = None
+
+
+def get_phase_stats() -> PhaseStats:
+    """全局 PhaseStats（服务器在读档/新开局时会重建 Simulator，统计需跨实例保留）。"""
+    global _default_stats
+    if _default_stats is None:
+        from src.utils.config import CONFIG
+        _default_stats = PhaseStats(window=CONFIG.instrumentation.window)
+    return _default_stats
+
+
+def get_default_instruments() -> list:
+    """按 CONFIG.instrumentation 构造默认挂载的观测器（只构造一次）。"""
+    global _default_instruments
+    if _default_instruments is None:
+        from src.utils.config import CONFIG
+        conf = CONFIG.instrumentation
+        instruments: list = []
+        if conf.enabled:
+            instruments.append(get_phase_stats())
+            sink = str(getattr(conf, "sink", "") or "").lower()
+            max_bytes = int(float(conf.sink_max_mb) * 1024 * 1024)
+            if sink == "jsonl":
+                instruments.append(JsonlStepSink(Path(conf.sink_dir) / "sim_steps.jsonl", max_bytes))
+            elif sink == "csv":
+                instruments.append(CsvStepSink(Path(conf.sink_dir) / "sim_steps.csv", max_bytes))
+        _default_instruments = instruments
+    return list(_default_instruments)
@@ -66,6 +66,12 @@ class AvatarLoadMixin:
         # 重建age
         age = Age.from_dict(data["age"], realm)
         
+        # personas / alignment / technique 直接传入构造函数，避免 __post_init__ 随机生成后再被覆盖
+        # （随机生成性格是读档中最慢的一步，且会消耗全局随机数）
+        persona_ids = data.get("persona_ids", [])
+        alignment_name = data.get("alignment")
+        technique_id = data.get("technique_id")
+
         # 创建Avatar（不完整，需要后续填充）
         avatar = cls(
             world=world,
@@ -77,13 +83,15 @@ class AvatarLoadMixin:
             cultivation_progress=cultivation_progress,
             pos_x=data["pos_x"],
             pos_y=data["pos_y"],
+            personas=[personas_by_id[pid] for pid in persona_ids if pid in personas_by_id],
+            alignment=Alignment[alignment_name] if alignment_name is not None else None,
+            technique=techniques_by_id.get(technique_id) if technique_id is not None else None,
         )
         
         # 设置灵根
         avatar.root = Root[data["root"]]
         
         # 设置功法
-        technique_id = data.get("technique_id")
         if technique_id is not None:
             avatar.technique = techniques_by_id.get(technique_id)
         
@@ -142,14 +150,6 @@ class AvatarLoadMixin:
         if sect_rank_value is not None:
             avatar.sect_rank = SectRank(sect_rank_value)
         
-        alignment_name = data.get("alignment")
-        if alignment_name is not None:
-            avatar.alignment = Alignment[alignment_name]
-        
-        # 重建personas
-        persona_ids = data.get("persona_ids", [])
-        avatar.personas = [personas_by_id[pid] for pid in persona_ids if pid in personas_by_id]
-        
         # 设置外貌（通过level获取完整的Appearance对象）
         avatar.appearance = get_appearance_by_level(data.get("appearance", 5))
 
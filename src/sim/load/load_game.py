@@ -3,15 +3,20 @@
 
 主要功能：
 - load_game: 从JSON文件加载游戏完整状态
+- read_save_data: 读取基础快照并回放增量差分
+- stream_save_data: 流式读取存档并回放增量差分（角色逐个回调，load_game 使用）
 - get_events_db_path: 根据存档路径计算事件数据库路径
 - check_save_compatibility: 检查存档版本兼容性（当前未实现严格检查）
 
 加载流程（两阶段）：
-1. 第一阶段：加载所有Avatar对象（relations留空）
+1. 第一阶段：流式读取角色数组，加载所有存活Avatar对象（relations留空）
    - 通过AvatarLoadMixin.from_save_dict反序列化
    - 配表对象（Technique, Material等）通过id从全局字典获取
+   - 已故角色不反序列化，以压缩的原始数据放入 DeadAvatarStore 休眠，
+     首次通过 AvatarManager.get_avatar 访问时才物化（CONFIG.save.lazy_dead_avatars）
 2. 第二阶段：重建Avatar之间的relations网络
    - 必须在所有Avatar加载完成后才能建立引用关系
+   - 被存活角色关系引用的死者立即物化，其余死者的关系在物化时补建
    
 错误容错：
 - 缺失的配表对象引用会被跳过（如删除的Item）
@@ -28,7 +33,7 @@
 """
 import json
 from pathlib import Path
-from typing import Tuple, List, Optional, TYPE_CHECKING
+from typing import Callable, Tuple, List, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from src.classes.world import World
@@ -147,6 +152,74 @@ def get_events_db_path(save_path: Path) -> Path:
     return save_path.with_suffix("").with_name(save_path.stem + "_events.db")
 
 
+def read_save_data(save_path: Path) -> dict:
+    """
+    读取存档数据：基础快照（JSON 或紧凑格式，见 save_format.py）+ 属于该快照的差分日志
+    （增量存档，见 save_journal.py）。不做 schema 迁移。
+    """
+    from src.sim.save.save_format import read_save_file
+    from src.sim.save.save_journal import apply_deltas, get_journal_path, read_deltas
+
+    save_data = read_save_file(save_path)
+    snapshot_id = save_data.get("meta", {}).get("snapshot_id")
+    deltas = read_deltas(get_journal_path(save_path), snapshot_id)
+    if deltas:
+        print(f"正在回放 {len(deltas)} 条增量存档记录...")
+    return apply_deltas(save_data, deltas)
+
+
+def stream_save_data(save_path: Path, on_avatar: Callable[[dict, Optional[str]], None]) -> dict:
+    """
+    流式读取存档并回放增量差分：每个角色（差分后的最终状态）交给 on_avatar(data, raw_json)，
+    返回除 avatars 外的顶层数据。raw_json 为 JSON 基础快照中的原始文本，
+    角色被差分覆盖或存档为紧凑格式时为 None。
+    旧 schema 版本的存档先完整读入并迁移（见 save_format.py），再逐个回调。
+    """
+    from src.sim.load.save_stream import stream_save
+    from src.sim.save.save_format import (
+        is_compact_save,
+        migrate_save_data,
+        needs_migration,
+        read_save_meta,
+        stream_compact,
+    )
+    from src.sim.save.save_journal import fold_deltas, get_journal_path, read_deltas
+
+    if needs_migration(read_save_meta(save_path)):
+        save_data = migrate_save_data(read_save_data(save_path))
+        for data in save_data.pop("avatars", []):
+            on_avatar(data, None)
+        return save_data
+
+    replay = {}
+
+    def before_avatars(top_level: dict) -> None:
+        snapshot_id = top_level.get("meta", {}).get("snapshot_id")
+        deltas = read_deltas(get_journal_path(save_path), snapshot_id)
+        if deltas:
+            print(f"正在回放 {len(deltas)} 条增量存档记录...")
+        replay["top_level"], replay["avatars"], replay["removed"] = fold_deltas(deltas)
+
+    def handle(data: dict, raw: str) -> None:
+        aid = str(data["id"])
+        if aid in replay["removed"]:
+            return
+        if aid in replay["avatars"]:
+            on_avatar(replay["avatars"].pop(aid), None)
+            return
+        on_avatar(data, raw)
+
+    reader = stream_compact if is_compact_save(save_path) else stream_save
+    save_data = reader(save_path, handle, before_avatars)
+    if not replay:
+        before_avatars(save_data)
+    # 差分中新增的角色
+    for data in replay["avatars"].values():
+        on_avatar(data, None)
+    save_data.update(replay["top_level"])
+    return save_data
+
+
 def load_game(save_path: Optional[Path] = None) -> Tuple["World", "Simulator", List["Sect"]]:
     """
     从文件加载游戏状态
@@ -179,9 +252,21 @@ def load_game(save_path: Optional[Path] = None) -> Tuple["World", "Simulator", L
         from src.sim.simulator import Simulator
         from src.run.load_map import load_cultivation_world_map
         
-        # 读取存档文件
-        with open(save_path, "r", encoding="utf-8") as f:
-            save_data = json.load(f)
+        from src.classes.dead_avatar_store import DeadAvatarStore
+
+        # 流式读取存档文件（含增量差分）：存活角色保留数据待反序列化，死者直接压缩休眠
+        living_data = []
+        dormant_records = {}
+
+        def collect_avatar(avatar_data: dict, raw: Optional[str]) -> None:
+            if avatar_data.get("is_dead"):
+                if raw is None:
+                    raw = json.dumps(avatar_data, ensure_ascii=False)
+                dormant_records[str(avatar_data["id"])] = DeadAvatarStore.pack(raw)
+            else:
+                living_data.append(avatar_data)
+
+        save_data = stream_save_data(save_path, collect_avatar)
         
         # 读取元信息
         meta = save_data.get("meta", {})
@@ -229,27 +314,26 @@ def load_game(save_path: Optional[Path] = None) -> Tuple["World", "Simulator", L
         existed_sect_ids = world_data.get("existed_sect_ids", [])
         existed_sects = [sects_by_id[sid] for sid in existed_sect_ids if sid in sects_by_id]
         
-        # 第一阶段：重建所有Avatar（不含relations）
-        avatars_data = save_data.get("avatars", [])
-        all_avatars = {}
-        for avatar_data in avatars_data:
-            avatar = Avatar.from_save_dict(avatar_data, world)
-            all_avatars[avatar.id] = avatar
-        
-        # 第二阶段：重建relations（需要所有avatar都已加载）
-        for avatar_data in avatars_data:
-            avatar_id = avatar_data["id"]
-            avatar = all_avatars[avatar_id]
-            relations_dict = avatar_data.get("relations", {})
-            
-            for other_id, relation_value in relations_dict.items():
-                if other_id in all_avatars:
-                    other_avatar = all_avatars[other_id]
-                    relation = Relation(relation_value)
-                    avatar.relations[other_avatar] = relation
-        
-        # 将所有avatar添加到world
-        world.avatar_manager.avatars = all_avatars
+        # 第一阶段：重建所有存活Avatar（不含relations），死者放入休眠存储
+        manager = world.avatar_manager
+        manager.avatars = {
+            avatar.id: avatar
+            for avatar in (Avatar.from_save_dict(avatar_data, world) for avatar_data in living_data)
+        }
+        dead_store = manager.dead_avatars
+        dead_store.load_dormant(world, dormant_records)
+
+        # 第二阶段：重建relations
+        # 被存活角色引用的死者立即物化（主循环会直接访问），其余死者按需物化
+        for avatar_data in living_data:
+            for other_id in avatar_data.get("relations", {}):
+                if dead_store.is_dormant(other_id):
+                    dead_store.materialize(other_id)
+        for avatar_data in living_data:
+            avatar = manager.avatars[avatar_data["id"]]
+            dead_store.link_relations(avatar, avatar_data.get("relations", {}))
+        if not CONFIG.save.lazy_dead_avatars:
+            dead_store.materialize_all()
         
         # 恢复洞府主人关系
         cultivate_regions_hosts = world_data.get("cultivate_regions_hosts", {})
@@ -258,14 +342,15 @@ def load_game(save_path: Optional[Path] = None) -> Tuple["World", "Simulator", L
             rid = int(rid_str)
             if rid in game_map.regions:
                 region = game_map.regions[rid]
-                if isinstance(region, CultivateRegion) and avatar_id in all_avatars:
-                    region.host_avatar = all_avatars[avatar_id]
+                host = manager.get_avatar(avatar_id) if avatar_id is not None else None
+                if isinstance(region, CultivateRegion) and host is not None:
+                    region.host_avatar = host
         
         # 重建宗门成员关系与功法列表
         from src.classes.technique import techniques_by_name
         
-        # 1. 重建成员
-        for avatar in all_avatars.values():
+        # 1. 重建成员（死者在死亡时已离开宗门，不再加入）
+        for avatar in manager.avatars.values():
             if avatar.sect:
                 # 存档中 avatar.sect 已经被 Avatar.from_save_dict 恢复为 Sect 对象引用
                 # 但 Sect.members 是空的（因为 Sect 是重新加载配置生成的）
@@ -299,7 +384,8 @@ def load_game(save_path: Optional[Path] = None) -> Tuple["World", "Simulator", L
         # 兼容旧存档 "birth_rate"
         simulator.awakening_rate = simulator_data.get("awakening_rate", simulator_data.get("birth_rate", CONFIG.game.npc_awakening_rate_per_month))
         
-        print(f"存档加载成功！共加载 {len(all_avatars)} 个角色")
+        print(f"存档加载成功！共加载 {len(manager.avatars) + len(dead_store)} 个角色"
+              f"（存活 {len(manager.avatars)}，已故 {len(dead_store)}）")
         return world, simulator, existed_sects
         
     except Exception as e:
@@ -320,10 +406,9 @@ def check_save_compatibility(save_path: Path) -> Tuple[bool, str]:
         (是否兼容, 错误信息)
     """
     try:
-        with open(save_path, "r", encoding="utf-8") as f:
-            save_data = json.load(f)
-        
-        meta = save_data.get("meta", {})
+        from src.sim.save.save_format import read_save_meta
+
+        meta = read_save_meta(save_path)
         save_version = meta.get("version", "unknown")
         current_version = CONFIG.meta.version
         
@@ -0,0 +1,157 @@
+"""
+流式读取存档 JSON
+
+完整读档用 json.load 一次性把整个存档（主要是角色数组）解析成字典树，几万个角色时内存
+峰值与耗时都集中在这里。这里按块读取文件，顶层除 avatars 外的字段照常解析，avatars
+数组则逐个元素解析并交给回调，同时附带该元素在文件中的原始 JSON 文本，便于调用方
+不做反序列化就直接保存（如已故角色的休眠数据）。
+
+只依赖标准库 json 的 raw_decode（C 实现的扫描器）。
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Optional, TextIO
+
+_CHUNK_SIZE = 1 << 20
+_WHITESPACE = " \t\n\r"
+_DECODER = json.JSONDecoder()
+
+AvatarCallback = Callable[[dict, str], None]
+
+
+class _JsonStream:
+    """在按块读取的文本缓冲区上逐个解码 JSON 值。"""
+
+    def __init__(self, f: TextIO, chunk_size: int = _CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, min_size: int = 0) -> bool:
+        if self.eof:
+            return False
+        # 丢弃已消费的部分，避免缓冲区无限增长
+        if self.pos >= self.chunk_size:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.f.read(max(self.chunk_size, min_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """跳过空白，返回下一个字符（文件结束返回空串）。"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"存档格式错误：期望 {char!r}，实际 {found!r}")
+        self.pos += 1
+
+    def separator(self, closing: str) -> bool:
+        """读取 ',' 或结束符；遇到结束符返回 True。"""
+        found = self.peek()
+        self.pos += 1
+        if found == closing:
+            return True
+        if found != ",":
+            raise ValueError(f"存档格式错误：期望 ',' 或 {closing!r}，实际 {found!r}")
+        return False
+
+    def value(self) -> tuple[Any, str]:
+        """解码下一个 JSON 值，返回 (值, 原始文本)。"""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # 值被块边界截断：读入更多（至少翻倍，保证大值的总解析代价仍是线性的）
+                if not self._fill(len(self.buf) - self.pos):
+                    raise
+                continue
+            # 顶层数字等标量恰好在缓冲区末尾结束时可能被截断
+            if end == len(self.buf) and self._fill():
+                continue
+            raw = self.buf[self.pos:end]
+            self.pos = end
+            return obj, raw
+
+
+def stream_save(
+    save_path: Path,
+    on_avatar: AvatarCallback,
+    before_avatars: Optional[Callable[[dict], None]] = None,
+    chunk_size: int = _CHUNK_SIZE,
+) -> dict:
+    """
+    流式读取存档。
+
+    Args:
+        save_path: 存档路径
+        on_avatar: 对 avatars 数组的每个元素调用 on_avatar(data, raw_json)
+        before_avatars: 开始读取 avatars 前调用，参数为此前已读到的顶层字段
+            （save_game 写出的存档中 meta / world 总在 avatars 之前）
+        chunk_size: 每次读取的字符数
+
+    Returns:
+        除 avatars 外的顶层字段
+    """
+    top_level: dict = {}
+    with open(save_path, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f, chunk_size)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return top_level
+        while True:
+            key, _ = stream.value()
+            stream.expect(":")
+            if key == "avatars":
+                if before_avatars is not None:
+                    before_avatars(top_level)
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.pos += 1
+                else:
+                    while True:
+                        data, raw = stream.value()
+                        on_avatar(data, raw)
+                        if stream.separator("]"):
+                            break
+            else:
+                top_level[key], _ = stream.value()
+            if stream.separator("}"):
+                break
+    return top_level
+
+
+def read_top_level(save_path: Path, key: str, chunk_size: int = 1 << 16) -> Any:
+    """
+    只读取顶层字段 key 的值（读到即停），不存在时返回 None。
+    用于存档列表只读 meta：save_game 写出的存档中 meta 是第一个字段。
+    """
+    with open(save_path, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f, chunk_size)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return None
+        while True:
+            name, _ = stream.value()
+            stream.expect(":")
+            value, _ = stream.value()
+            if name == key:
+                return value
+            if stream.separator("}"):
+                return None
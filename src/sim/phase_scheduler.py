@@ -0,0 +1,125 @@
+"""
+按读写依赖调度 Simulator.step 的各阶段。
+
+每个阶段声明读取（reads）与写入（writes）的状态；两个阶段冲突当且仅当一方写入的状态
+被另一方读取或写入。调度规则：
+- 阶段按声明顺序（规范顺序）排列；
+- 每个阶段等待所有在它之前、且与它冲突的阶段完成后开始；
+- 不冲突的阶段（典型情况：各自等待 LLM 返回的请求阶段）并发执行。
+
+因此任何冲突阶段的相对先后与顺序执行时完全一致；共享的全局随机数序列也作为状态（RNG）
+声明，消耗随机数的阶段之间保持原顺序，结果可复现。各阶段返回的事件按规范顺序合并，
+与完成的先后无关。
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+# --- 状态名 ---
+AVATARS = "avatars"            # 角色的一般状态：位置、动作与计划、境界、物品、HP 等
+ROSTER = "roster"              # 存活角色集合（死亡、新生）
+RELATIONS = "relations"        # 角色之间的关系
+INTERACTIONS = "interactions"  # 交互计数（relation_interaction_states）
+OBJECTIVES = "objectives"      # 长期目标
+NICKNAMES = "nicknames"        # 绰号
+WORLD = "world"                # 世界级状态：天象、聚集事件等
+RNG = "rng"                    # 全局 random 序列
+EVENTS = "events"              # 本月已产生的事件
+
+# 整体读写世界的阶段（动作执行、被动结算等）
+WORLD_STATE = frozenset({AVATARS, ROSTER, RELATIONS, INTERACTIONS, OBJECTIVES, NICKNAMES, WORLD, RNG})
+
+
+@dataclass(frozen=True)
+class Phase:
+    name: str
+    fn: Callable[[], Any]
+    reads: frozenset[str] = frozenset()
+    writes: frozenset[str] = frozenset()
+
+    def conflicts_with(self, other: "Phase") -> bool:
+        return bool(
+            self.writes & (other.reads | other.writes)
+            or other.writes & self.reads
+        )
+
+
+def phase(name: str, fn: Callable[[], Any], reads: Iterable[str] = (), writes: Iterable[str] = ()) -> Phase:
+    return Phase(name, fn, frozenset(reads), frozenset(writes))
+
+
+def build_dependencies(phases: list[Phase]) -> list[list[int]]:
+    """每个阶段需要等待的前序阶段下标。"""
+    return [
+        [i for i in range(j) if phases[i].conflicts_with(phases[j])]
+        for j in range(len(phases))
+    ]
+
+
+Runner = Callable[..., Awaitable[Any]]
+
+
+class PhaseScheduler:
+    """
+    执行一组阶段。
+
+    Args:
+        phases: 按规范顺序排列的阶段。
+        concurrent: False 时严格按顺序逐个执行（用于对照与排查）。
+    """
+
+    def __init__(self, phases: list[Phase], concurrent: bool = True):
+        self.phases = phases
+        self.concurrent = concurrent
+        self.dependencies = build_dependencies(phases)
+        self.results: list[Any] = [None] * len(phases)
+
+    def result_of(self, name: str) -> Any:
+        """名为 name 的（第一个）阶段的结果。"""
+        for index, item in enumerate(self.phases):
+            if item.name == name:
+                return self.results[index]
+        raise KeyError(name)
+
+    def events_before(self, index: int) -> list:
+        """规范顺序上位于 index 之前的阶段产生的事件。"""
+        events: list = []
+        for result in self.results[:index]:
+            if isinstance(result, list):
+                events.extend(result)
+        return events
+
+    def events(self) -> list:
+        return self.events_before(len(self.phases))
+
+    async def run(self, runner: Runner) -> list[Any]:
+        """
+        runner(name, fn) 负责调用阶段函数（并可记录耗时），返回阶段结果。
+        任一阶段出错时取消其余阶段并抛出该异常。
+        """
+        if not self.concurrent:
+            for index, item in enumerate(self.phases):
+                self.results[index] = await runner(item.name, item.fn)
+            return self.results
+
+        tasks: list[asyncio.Task] = []
+
+        async def run_node(index: int) -> None:
+            deps = self.dependencies[index]
+            if deps:
+                await asyncio.gather(*(tasks[i] for i in deps))
+            item = self.phases[index]
+            self.results[index] = await runner(item.name, item.fn)
+
+        for index in range(len(self.phases)):
+            tasks.append(asyncio.create_task(run_node(index)))
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return self.results
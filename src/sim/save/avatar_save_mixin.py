@@ -25,10 +25,12 @@ class AvatarSaveMixin:
             包含Avatar完整状态的字典，可直接JSON序列化
         """
         # 序列化relations: dict[Avatar, Relation] -> dict[str, str]
-        relations_dict = {
+        # 指向休眠（未物化）死者的关系一并写出
+        relations_dict = dict(self.unresolved_relations)
+        relations_dict.update({
             other.id: relation.value
             for other, relation in self.relations.items()
-        }
+        })
         
         # 序列化materials: dict[Material, int] -> dict[int, int]
         materials_dict = {
@@ -0,0 +1,250 @@
+"""
+存档文件格式与 schema 版本
+
+同一份存档数据（schema）有两种文件格式，按存档文件后缀区分：
+- JSON（.json）：带缩进的明文 JSON，便于调试，也用作导出格式（export_save_json，导出为 {存档名}_export.json）；
+- 紧凑格式（.sav）：文件头 + 明文 meta + zlib 压缩的正文。正文中角色以列式表保存
+  （列名只写一次，每个角色一行），省去每个角色几十个重复的字段名。
+
+紧凑格式文件头：MAGIC(6 字节) + 容器版本(1 字节) + meta 长度(4 字节，大端) + meta(UTF-8 JSON)。
+读取存档列表时只需读文件头，不必解压正文。
+
+schema 版本（meta.schema_version）描述存档数据的结构，与文件格式无关。数据结构变化时提升
+SAVE_SCHEMA_VERSION，并用 register_migration 注册把上一版本数据升级一级的函数；读档时按版本
+依次执行。没有 schema_version 的旧存档视为版本 1。
+"""
+from __future__ import annotations
+
+import json
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from src.utils.config import CONFIG
+
+SAVE_SCHEMA_VERSION = 1
+
+COMPACT_MAGIC = b"CWSAVE"
+COMPACT_CONTAINER_VERSION = 1
+_HEADER = struct.Struct(">BI")
+
+FORMAT_SUFFIXES = {
+    "json": ".json",
+    "compact": ".sav",
+}
+
+Migration = Callable[[dict], dict]
+_MIGRATIONS: dict[int, Migration] = {}
+
+
+# --- 格式选择 ---
+
+def get_save_suffix(fmt: Optional[str] = None) -> str:
+    """新存档使用的文件后缀（默认取配置 save.format）。"""
+    fmt = fmt or str(getattr(CONFIG.save, "format", "json"))
+    if fmt not in FORMAT_SUFFIXES:
+        raise ValueError(f"未知的存档格式: {fmt}")
+    return FORMAT_SUFFIXES[fmt]
+
+
+def is_compact_path(save_path: Path) -> bool:
+    return save_path.suffix == FORMAT_SUFFIXES["compact"]
+
+
+def is_compact_save(save_path: Path) -> bool:
+    """按文件内容判断（不依赖后缀）。"""
+    with open(save_path, "rb") as f:
+        return f.read(len(COMPACT_MAGIC)) == COMPACT_MAGIC
+
+
+# --- schema 版本与迁移 ---
+
+def register_migration(from_version: int) -> Callable[[Migration], Migration]:
+    """
+    注册把 schema 版本 from_version 的存档数据升级到 from_version + 1 的函数。
+
+    函数接收完整的存档数据字典（含 avatars 列表，差分已回放），返回升级后的数据。
+    """
+    def decorator(fn: Migration) -> Migration:
+        _MIGRATIONS[from_version] = fn
+        return fn
+    return decorator
+
+
+def get_schema_version(meta: dict) -> int:
+    return int(meta.get("schema_version", 1))
+
+
+def needs_migration(meta: dict) -> bool:
+    return get_schema_version(meta) < SAVE_SCHEMA_VERSION
+
+
+def migrate_save_data(save_data: dict) -> dict:
+    """把存档数据逐级升级到当前 schema 版本。"""
+    meta = save_data.setdefault("meta", {})
+    version = get_schema_version(meta)
+    if version > SAVE_SCHEMA_VERSION:
+        print(f"存档 schema 版本 ({version}) 高于当前版本 ({SAVE_SCHEMA_VERSION})，尝试直接读取")
+        return save_data
+    while version < SAVE_SCHEMA_VERSION:
+        migration = _MIGRATIONS.get(version)
+        if migration is None:
+            raise ValueError(f"缺少存档 schema {version} -> {version + 1} 的迁移")
+        print(f"正在迁移存档 schema: {version} -> {version + 1}")
+        save_data = migration(save_data)
+        version += 1
+        save_data.setdefault("meta", {})["schema_version"] = version
+    return save_data
+
+
+# --- 列式角色表 ---
+
+def encode_avatar_table(avatars: list[dict]) -> dict:
+    """
+    角色列表 -> 列式表。列为所有角色字段的并集（按首次出现顺序）；
+    个别角色缺少的字段记录在 absent 中（[行, 列]），以区分缺失与 None。
+    """
+    columns: dict[str, int] = {}
+    for data in avatars:
+        for key in data:
+            if key not in columns:
+                columns[key] = len(columns)
+    names = list(columns)
+    rows = []
+    absent = []
+    for row_index, data in enumerate(avatars):
+        if len(data) == len(names):
+            rows.append([data[name] for name in names])
+            continue
+        row = []
+        for col_index, name in enumerate(names):
+            if name in data:
+                row.append(data[name])
+            else:
+                row.append(None)
+                absent.append([row_index, col_index])
+        rows.append(row)
+    return {"columns": names, "rows": rows, "absent": absent}
+
+
+def decode_avatar_table(table: dict) -> Iterator[dict]:
+    names = table.get("columns", [])
+    absent: dict[int, set[int]] = {}
+    for row_index, col_index in table.get("absent", []):
+        absent.setdefault(row_index, set()).add(col_index)
+    for row_index, row in enumerate(table.get("rows", [])):
+        data = dict(zip(names, row))
+        for col_index in absent.get(row_index, ()):
+            del data[names[col_index]]
+        yield data
+
+
+# --- 紧凑格式读写 ---
+
+def _write_compact(f, save_data: dict) -> None:
+    meta = json.dumps(save_data.get("meta", {}), ensure_ascii=False).encode("utf-8")
+    body = {key: value for key, value in save_data.items() if key not in ("meta", "avatars")}
+    body["avatar_table"] = encode_avatar_table(save_data.get("avatars", []))
+    raw = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    f.write(COMPACT_MAGIC)
+    f.write(_HEADER.pack(COMPACT_CONTAINER_VERSION, len(meta)))
+    f.write(meta)
+    f.write(zlib.compress(raw, int(getattr(CONFIG.save, "compress_level", 6))))
+
+
+def _read_compact_header(f) -> dict:
+    if f.read(len(COMPACT_MAGIC)) != COMPACT_MAGIC:
+        raise ValueError("不是紧凑格式存档")
+    container_version, meta_len = _HEADER.unpack(f.read(_HEADER.size))
+    if container_version > COMPACT_CONTAINER_VERSION:
+        raise ValueError(f"不支持的紧凑存档容器版本: {container_version}")
+    return json.loads(f.read(meta_len).decode("utf-8"))
+
+
+def stream_compact(
+    save_path: Path,
+    on_avatar: Callable[[dict, Optional[str]], None],
+    before_avatars: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    读取紧凑存档，接口与 save_stream.stream_save 相同：
+    角色逐个交给 on_avatar(data, None)（没有原始 JSON 文本），返回其余顶层数据。
+    """
+    with open(save_path, "rb") as f:
+        meta = _read_compact_header(f)
+        body = json.loads(zlib.decompress(f.read()))
+    table = body.pop("avatar_table", {})
+    top_level = {"meta": meta, **body}
+    if before_avatars is not None:
+        before_avatars(top_level)
+    for data in decode_avatar_table(table):
+        on_avatar(data, None)
+    return top_level
+
+
+# --- 与格式无关的入口 ---
+
+def write_save_file(save_path: Path, save_data: dict) -> None:
+    """按后缀选择格式写入；先写临时文件再替换，中途失败不会损坏原存档。"""
+    tmp_path = save_path.with_name(save_path.name + ".tmp")
+    if is_compact_path(save_path):
+        with open(tmp_path, "wb") as f:
+            _write_compact(f, save_data)
+    else:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(save_data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, save_path)
+
+
+def read_save_file(save_path: Path) -> dict:
+    """读取完整的基础快照（不含差分）。"""
+    if is_compact_save(save_path):
+        avatars: list[dict] = []
+        save_data = stream_compact(save_path, lambda data, raw: avatars.append(data))
+        save_data["avatars"] = avatars
+        return save_data
+    with open(save_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_save_meta(save_path: Path) -> dict:
+    """只读取基础快照的 meta（紧凑格式读文件头；JSON 流式读到 meta 为止）。"""
+    if is_compact_save(save_path):
+        with open(save_path, "rb") as f:
+            return _read_compact_header(f)
+    from src.sim.load.save_stream import read_top_level
+
+    return read_top_level(save_path, "meta") or {}
+
+
+def export_save_json(save_path: Path, out_path: Optional[Path] = None) -> Path:
+    """
+    把任意格式的存档（差分已回放）导出为带缩进的 JSON，默认为 {原存档名}_export.json。
+    导出的文件本身就是一份可读档的 JSON 存档，并带有自己的事件数据库副本：
+    差分日志与事件数据库都按文件名（stem）定位，导出文件不与原存档共用。
+    """
+    from src.classes.event_storage import EventStorage
+    from src.sim.load.load_game import get_events_db_path, read_save_data
+
+    save_path = Path(save_path)
+    out_path = Path(out_path) if out_path is not None else save_path.with_name(save_path.stem + "_export.json")
+    if out_path.with_suffix("") == save_path.with_suffix(""):
+        raise ValueError(f"导出文件不能与原存档同名: {out_path}")
+    save_data = read_save_data(save_path)
+    meta = save_data.setdefault("meta", {})
+    # 导出的是完整状态，不再对应任何差分日志
+    meta.pop("snapshot_id", None)
+
+    events_db = get_events_db_path(save_path)
+    export_db = get_events_db_path(out_path)
+    if events_db.exists():
+        storage = EventStorage(events_db)
+        try:
+            storage.backup_to(export_db)
+        finally:
+            storage.close()
+    meta["events_db"] = export_db.name
+    write_save_file(out_path, save_data)
+    return out_path
@@ -2,7 +2,7 @@
 存档功能模块
 
 主要功能：
-- save_game: 保存游戏完整状态到JSON文件
+- save_game: 保存游戏完整状态到存档文件
 - get_save_info: 读取存档的元信息（不加载完整数据）
 - list_saves: 列出所有存档文件
 
@@ -14,17 +14,19 @@
 - simulator: 模拟器配置（如出生率）
 
 存档格式：
-- JSON（明文，易于调试）+ SQLite事件数据库
+- JSON（.json，明文，易于调试）或紧凑格式（.sav，列式 + zlib 压缩，见 save_format.py）+ SQLite事件数据库
+- meta.schema_version 记录数据结构版本，读档时按需迁移
 - 存档位置：assets/saves/ (配置在config.yml中)
 - 事件数据库：{save_name}_events.db（与JSON文件同目录）
+- 增量存档：JSON 作为基础快照，之后的存档只向 {save_name}_journal.jsonl 追加差分，
+  定期压缩为新的基础快照（见 save_journal.py）
 
 注意事项：
-- 不支持跨版本兼容（版本号仅记录，不做检查）
+- 游戏版本号仅记录，不做检查；数据结构的兼容由 schema_version + 迁移函数处理
 - 地图本身不保存（因为地图是固定的，只保存宗门总部位置）
 - relations在Avatar中已转换为id映射，避免循环引用
 - 事件实时写入SQLite，JSON中的events字段仅用于旧存档迁移
 """
-import json
 from pathlib import Path
 from datetime import datetime
 from typing import List, Optional, TYPE_CHECKING
@@ -37,13 +39,28 @@ if TYPE_CHECKING:
 from src.utils.config import CONFIG
 from src.classes.language import language_manager
 from src.sim.load.load_game import get_events_db_path
+from src.sim.save.save_journal import (
+    SaveTracker,
+    append_delta,
+    get_journal_path,
+    new_snapshot_id,
+    read_latest_meta,
+)
+from src.sim.save.save_format import (
+    FORMAT_SUFFIXES,
+    SAVE_SCHEMA_VERSION,
+    get_save_suffix,
+    read_save_meta,
+    write_save_file,
+)
 
 
 def save_game(
     world: "World",
     simulator: "Simulator",
     existed_sects: List["Sect"],
-    save_path: Optional[Path] = None
+    save_path: Optional[Path] = None,
+    incremental: Optional[bool] = None,
 ) -> tuple[bool, Optional[str]]:
     """
     保存游戏状态到文件
@@ -52,7 +69,10 @@ def save_game(
         world: 世界对象
         simulator: 模拟器对象
         existed_sects: 本局启用的宗门列表
-        save_path: 保存路径，默认为saves/时间戳_游戏时间.json
+        save_path: 保存路径，默认为saves/时间戳_游戏时间.json（后缀由 save.format 决定）；
+            后缀为 .sav 时写紧凑格式，否则写 JSON（见 save_format.py）
+        incremental: 是否允许写差分（见 save_journal.py），为 None 时读取配置 save.incremental。
+            同一 World 上次存到同一路径且未达到压缩条件时追加差分，否则写完整的基础快照。
         
     Returns:
         (保存是否成功, 保存的文件名)
@@ -70,7 +90,7 @@ def save_game(
             month = world.month_stamp.get_month().value
             game_time_str = f"Y{year}M{month}"
             
-            filename = f"{time_str}_{game_time_str}.json"
+            filename = f"{time_str}_{game_time_str}{get_save_suffix()}"
             save_path = saves_dir / filename
         else:
             save_path = Path(save_path)
@@ -79,88 +99,26 @@ def save_game(
         # 计算事件数据库路径。
         events_db_path = get_events_db_path(save_path)
 
-        # 确保当前的 SQLite 数据库被复制到新存档的位置。
-        # 如果当前使用的是其他数据库文件，需要将其复制过来。
-        if hasattr(world.event_manager, "_storage") and world.event_manager._storage:
-             current_db_path = world.event_manager._storage._db_path
+        # 等待后台写入队列落盘，存档中的事件数据库才完整。
+        if not world.event_manager.flush():
+            raise RuntimeError("事件写入队列未能在超时前落盘，存档中的事件数据库不完整")
+
+        # 当前使用的是其他数据库文件时（另存为），通过 SQLite 在线备份 API 复制过来：
+        # 无需先 checkpoint，也不会复制到写了一半的页。
+        storage = getattr(world.event_manager, "_storage", None)
+        if storage:
+             current_db_path = storage._db_path
              if current_db_path != events_db_path:
-                 import shutil
-                 # 确保源文件存在
-                 if current_db_path.exists():
-                    # 确保目标目录存在
-                    events_db_path.parent.mkdir(parents=True, exist_ok=True)
-                    # 复制数据库文件
-                    shutil.copy2(current_db_path, events_db_path)
-                    print(f"已复制事件数据库: {current_db_path} -> {events_db_path}")
-                 else:
-                     print(f"警告: 当前事件数据库不存在: {current_db_path}")
-
-        # 构建元信息
-        meta = {
-            "version": CONFIG.meta.version,
-            "save_time": datetime.now().isoformat(),
-            "game_time": f"{world.month_stamp.get_year()}年{world.month_stamp.get_month().value}月",
-            "language": str(language_manager),
-            # SQLite 事件数据库信息。
-            "events_db": str(events_db_path.name),
-            "event_count": world.event_manager.count(),
-        }
-        
-        # 构建世界数据
-        # 收集有主洞府信息
-        from src.classes.region import CultivateRegion
-        cultivate_regions_hosts = {}
-        if hasattr(world.map, 'regions'):
-             for rid, region in world.map.regions.items():
-                 if isinstance(region, CultivateRegion) and region.host_avatar:
-                     cultivate_regions_hosts[str(rid)] = region.host_avatar.id
-
-        world_data = {
-            "month_stamp": int(world.month_stamp),
-            "existed_sect_ids": [sect.id for sect in existed_sects],
-            # 天地灵机
-            "current_phenomenon_id": world.current_phenomenon.id if world.current_phenomenon else None,
-            "phenomenon_start_year": world.phenomenon_start_year if hasattr(world, 'phenomenon_start_year') else 0,
-            "cultivate_regions_hosts": cultivate_regions_hosts,
-            # 出世物品流转
-            "circulation": world.circulation.to_save_dict(),
-            # 世界历史
-            "history": {
-                "text": world.history.text,
-                "modifications": world.history.modifications
-            },
-        }
-        
-        # 保存所有Avatar（第一阶段：不含relations）
-        # 需要保存活人和死者
-        avatars_data = []
-        for avatar in world.avatar_manager._iter_all_avatars():
-            avatars_data.append(avatar.to_save_dict())
-        
-        # 保存事件历史（限制数量）
-        max_events = CONFIG.save.max_events_to_save
-        events_data = []
-        recent_events = world.event_manager.get_recent_events(limit=max_events)
-        for event in recent_events:
-            events_data.append(event.to_dict())
-        
-        # 保存模拟器数据
-        simulator_data = {
-            "awakening_rate": simulator.awakening_rate
-        }
-        
-        # 组装完整的存档数据
-        save_data = {
-            "meta": meta,
-            "world": world_data,
-            "avatars": avatars_data,
-            "events": events_data,
-            "simulator": simulator_data
-        }
-        
-        # 写入文件
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(save_data, f, ensure_ascii=False, indent=2)
+                 world.event_manager.backup_to(events_db_path)
+                 print(f"已备份事件数据库: {current_db_path} -> {events_db_path}")
+
+        if incremental is None:
+            incremental = bool(CONFIG.save.incremental)
+        tracker = getattr(world, "save_tracker", None)
+        if incremental and _can_append_delta(tracker, save_path):
+            _append_delta(world, simulator, existed_sects, save_path, events_db_path, tracker)
+        else:
+            _write_base_snapshot(world, simulator, existed_sects, save_path, events_db_path)
         
         print(f"游戏已保存到: {save_path}")
         return True, save_path.name
@@ -172,6 +130,138 @@ def save_game(
         return False, None
 
 
+def _build_meta(world: "World", events_db_path: Path, snapshot_id: str) -> dict:
+    """构建元信息"""
+    return {
+        "version": CONFIG.meta.version,
+        "schema_version": SAVE_SCHEMA_VERSION,
+        "save_time": datetime.now().isoformat(),
+        "game_time": f"{world.month_stamp.get_year()}年{world.month_stamp.get_month().value}月",
+        "language": str(language_manager),
+        # SQLite 事件数据库信息。
+        "events_db": str(events_db_path.name),
+        "event_count": world.event_manager.count(),
+        # 基础快照标识，差分日志据此匹配
+        "snapshot_id": snapshot_id,
+    }
+
+
+def _build_world_data(world: "World", existed_sects: List["Sect"]) -> dict:
+    """构建世界数据"""
+    # 收集有主洞府信息
+    from src.classes.region import CultivateRegion
+    cultivate_regions_hosts = {}
+    if hasattr(world.map, 'regions'):
+         for rid, region in world.map.regions.items():
+             if isinstance(region, CultivateRegion) and region.host_avatar:
+                 cultivate_regions_hosts[str(rid)] = region.host_avatar.id
+
+    return {
+        "month_stamp": int(world.month_stamp),
+        "existed_sect_ids": [sect.id for sect in existed_sects],
+        # 天地灵机
+        "current_phenomenon_id": world.current_phenomenon.id if world.current_phenomenon else None,
+        "phenomenon_start_year": world.phenomenon_start_year if hasattr(world, 'phenomenon_start_year') else 0,
+        "cultivate_regions_hosts": cultivate_regions_hosts,
+        # 出世物品流转
+        "circulation": world.circulation.to_save_dict(),
+        # 世界历史
+        "history": {
+            "text": world.history.text,
+            "modifications": world.history.modifications
+        },
+    }
+
+
+def _build_simulator_data(simulator: "Simulator") -> dict:
+    return {
+        "awakening_rate": simulator.awakening_rate
+    }
+
+
+def _can_append_delta(tracker: Optional[SaveTracker], save_path: Path) -> bool:
+    """是否可以在已有基础快照上追加差分（否则需要写新的基础快照，即压缩）"""
+    if tracker is None or tracker.save_path != save_path or not save_path.exists():
+        return False
+    if tracker.deltas >= int(CONFIG.save.compact_every):
+        return False
+    # 差分日志相对基础快照过大时，读档回放的代价超过重写快照
+    ratio = float(CONFIG.save.compact_ratio)
+    return tracker.journal_bytes <= tracker.base_bytes * ratio
+
+
+def _write_base_snapshot(
+    world: "World",
+    simulator: "Simulator",
+    existed_sects: List["Sect"],
+    save_path: Path,
+    events_db_path: Path,
+) -> None:
+    """写完整的基础快照，并清空差分日志"""
+    snapshot_id = new_snapshot_id()
+
+    # 保存所有Avatar（第一阶段：不含relations）
+    # 需要保存活人和死者；读档后未访问过的休眠死者直接写回原数据，不物化
+    all_avatars = list(world.avatar_manager._iter_all_avatars())
+    avatars_data = [avatar.to_save_dict() for avatar in all_avatars]
+    dead_store = world.avatar_manager.dead_avatars
+    dormant_data = [dead_store.dormant_data(aid) for aid in dead_store.dormant_ids()]
+    
+    # 保存事件历史（限制数量）
+    max_events = CONFIG.save.max_events_to_save
+    events_data = []
+    recent_events = world.event_manager.get_recent_events(limit=max_events)
+    for event in recent_events:
+        events_data.append(event.to_dict())
+    
+    # 组装完整的存档数据
+    save_data = {
+        "meta": _build_meta(world, events_db_path, snapshot_id),
+        "world": _build_world_data(world, existed_sects),
+        "avatars": avatars_data + dormant_data,
+        "events": events_data,
+        "simulator": _build_simulator_data(simulator)
+    }
+    
+    write_save_file(save_path, save_data)
+
+    # 旧差分属于旧快照，读档时本就会被忽略，这里直接删除
+    journal_path = get_journal_path(save_path)
+    if journal_path.exists():
+        journal_path.unlink()
+
+    world.save_tracker = SaveTracker.from_full_save(
+        save_path, snapshot_id, all_avatars, avatars_data, base_bytes=save_path.stat().st_size,
+        dormant_data=dormant_data,
+    )
+
+
+def _append_delta(
+    world: "World",
+    simulator: "Simulator",
+    existed_sects: List["Sect"],
+    save_path: Path,
+    events_db_path: Path,
+    tracker: SaveTracker,
+) -> None:
+    """追加一行差分：变化的角色、被删除的角色，以及全量的 meta / world / simulator"""
+    manager = world.avatar_manager
+    changed, removed, digests, dead = tracker.collect_changes(
+        manager._iter_all_avatars(), manager.dead_avatars.dormant_ids()
+    )
+    delta = {
+        "snapshot_id": tracker.snapshot_id,
+        "seq": tracker.deltas + 1,
+        "meta": _build_meta(world, events_db_path, tracker.snapshot_id),
+        "world": _build_world_data(world, existed_sects),
+        "simulator": _build_simulator_data(simulator),
+        "avatars": changed,
+        "removed": removed,
+    }
+    written = append_delta(get_journal_path(save_path), delta)
+    tracker.commit(digests, dead, written)
+
+
 def get_save_info(save_path: Path) -> Optional[dict]:
     """
     读取存档文件的元信息（不加载完整数据）
@@ -183,9 +273,7 @@ def get_save_info(save_path: Path) -> Optional[dict]:
         存档元信息字典，如果读取失败返回None
     """
     try:
-        with open(save_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data.get("meta", {})
+        return read_latest_meta(save_path, read_save_meta(save_path))
     except Exception:
         return None
 
@@ -207,7 +295,8 @@ def list_saves(saves_dir: Optional[Path] = None) -> List[tuple[Path, dict]]:
         return []
     
     saves = []
-    for save_file in saves_dir.glob("*.json"):
+    save_files = [f for suffix in FORMAT_SUFFIXES.values() for f in saves_dir.glob(f"*{suffix}")]
+    for save_file in save_files:
         info = get_save_info(save_file)
         if info is not None:
             saves.append((save_file, info))
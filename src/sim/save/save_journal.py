@@ -0,0 +1,231 @@
+"""
+增量存档：基础快照 + 只追加的差分日志
+
+存档由两部分组成：
+- 基础快照：{save_name}.json，格式与完整存档相同（旧版本也能直接读取，只是看不到之后的差分）；
+- 差分日志：{save_name}_journal.jsonl，每次存档追加一行，只包含自上次存档以来变化的角色、
+  被删除的角色 id，以及体积很小的 meta / world / simulator 全量数据。
+
+每份基础快照带有 snapshot_id，差分行记录自己所属的快照；读档时只应用匹配的行，
+因此压缩（重写基础快照、清空日志）中途中断也不会把旧差分叠加到新快照上。
+
+变化检测：
+- 存活角色：比较 to_save_dict 序列化结果的摘要；
+- 已故角色：死亡后状态基本冻结，只比较关系（relations）的指纹，不再重复序列化。
+  已故角色随时间累积，这正是完整存档越来越慢的原因。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.classes.avatar import Avatar
+
+
+def get_journal_path(save_path: Path) -> Path:
+    """
+    根据存档路径计算差分日志路径。
+
+    例如：save_20260105_1423.json -> save_20260105_1423_journal.jsonl
+    """
+    return save_path.with_name(save_path.stem + "_journal.jsonl")
+
+
+def new_snapshot_id() -> str:
+    return uuid.uuid4().hex
+
+
+def digest_avatar_dict(data: dict) -> str:
+    raw = json.dumps(data, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def relations_fingerprint(avatar: "Avatar") -> tuple:
+    relations = getattr(avatar, "relations", None) or {}
+    pairs = {str(other.id): str(relation.value) for other, relation in relations.items()}
+    for other_id, value in (getattr(avatar, "unresolved_relations", None) or {}).items():
+        pairs.setdefault(str(other_id), str(value))
+    return tuple(sorted(pairs.items()))
+
+
+def relations_fingerprint_of_data(data: dict) -> tuple:
+    """与 relations_fingerprint 相同，但直接基于存档数据（休眠的已故角色）。"""
+    return tuple(sorted((str(other_id), str(value)) for other_id, value in (data.get("relations") or {}).items()))
+
+
+@dataclass
+class SaveTracker:
+    """
+    记录某个存档路径上一次写入时各角色的状态摘要，用于计算下一次差分。
+
+    挂在 World 上（world.save_tracker），读档或换存档路径后重新开始（下次存档写基础快照）。
+    """
+    save_path: Path
+    snapshot_id: str
+    base_bytes: int = 0
+    deltas: int = 0
+    journal_bytes: int = 0
+    # 存活角色：avatar_id -> to_save_dict 摘要
+    digests: dict[str, str] = field(default_factory=dict)
+    # 已故角色：avatar_id -> 关系指纹
+    dead: dict[str, tuple] = field(default_factory=dict)
+
+    def collect_changes(
+        self, avatars: Iterable["Avatar"], dormant_ids: Iterable[str] = ()
+    ) -> tuple[list[dict], list[str], dict[str, str], dict[str, tuple]]:
+        """
+        计算差分：返回 (变化的角色数据, 被删除的角色 id, 新的摘要表, 新的已故表)。
+        dormant_ids 为仍在休眠的已故角色（见 DeadAvatarStore），读档后未被访问过，必然没有变化。
+        只有差分成功落盘后才应调用 commit 更新本对象。
+        """
+        changed: list[dict] = []
+        digests: dict[str, str] = {}
+        dead: dict[str, tuple] = {
+            aid: self.dead[aid] for aid in dormant_ids if aid in self.dead
+        }
+        for avatar in avatars:
+            aid = str(avatar.id)
+            if avatar.is_dead and aid in self.dead:
+                fingerprint = relations_fingerprint(avatar)
+                dead[aid] = fingerprint
+                if fingerprint == self.dead[aid]:
+                    continue
+                changed.append(avatar.to_save_dict())
+                continue
+            data = avatar.to_save_dict()
+            if avatar.is_dead:
+                dead[aid] = relations_fingerprint(avatar)
+            else:
+                digest = digest_avatar_dict(data)
+                digests[aid] = digest
+                if self.digests.get(aid) == digest:
+                    continue
+            changed.append(data)
+        known = set(self.digests) | set(self.dead)
+        removed = sorted(known - set(digests) - set(dead))
+        return changed, removed, digests, dead
+
+    def commit(self, digests: dict[str, str], dead: dict[str, tuple], written_bytes: int) -> None:
+        self.digests = digests
+        self.dead = dead
+        self.deltas += 1
+        self.journal_bytes += written_bytes
+
+    @classmethod
+    def from_full_save(cls, save_path: Path, snapshot_id: str, avatars: Iterable["Avatar"],
+                       avatars_data: list[dict], base_bytes: int,
+                       dormant_data: Iterable[dict] = ()) -> "SaveTracker":
+        tracker = cls(save_path=save_path, snapshot_id=snapshot_id, base_bytes=base_bytes)
+        for avatar, data in zip(avatars, avatars_data):
+            aid = str(avatar.id)
+            if avatar.is_dead:
+                tracker.dead[aid] = relations_fingerprint(avatar)
+            else:
+                tracker.digests[aid] = digest_avatar_dict(data)
+        for data in dormant_data:
+            tracker.dead[str(data["id"])] = relations_fingerprint_of_data(data)
+        return tracker
+
+
+def _last_line_end(f) -> int:
+    """文件中最后一个换行符之后的偏移（没有换行符时为 0）。"""
+    end = f.seek(0, os.SEEK_END)
+    pos = end
+    while pos > 0:
+        step = min(4096, pos)
+        pos -= step
+        f.seek(pos)
+        chunk = f.read(step)
+        i = chunk.rfind(b"\n")
+        if i >= 0:
+            return pos + i + 1
+    return 0
+
+
+def append_delta(journal_path: Path, delta: dict) -> int:
+    """
+    追加一行差分并落盘，返回写入的字节数。
+
+    上一次追加失败（如磁盘已满）可能在末尾留下写了一半的行；先截断到最后一个完整行，
+    避免新的差分接在残片后面而无法解析。
+    """
+    line = (json.dumps(delta, ensure_ascii=False) + "\n").encode("utf-8")
+    with open(journal_path, "a+b") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end:
+            f.seek(end - 1)
+            if f.read(1) != b"\n":
+                f.truncate(_last_line_end(f))
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    return len(line)
+
+
+def read_deltas(journal_path: Path, snapshot_id: Optional[str]) -> list[dict]:
+    """读取属于 snapshot_id 的差分行；无法解析的行（写了一半的残片）会被跳过。"""
+    if snapshot_id is None or not journal_path.exists():
+        return []
+    deltas = []
+    with open(journal_path, "rb") as f:
+        for raw in f:
+            try:
+                delta = json.loads(raw.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                continue
+            if isinstance(delta, dict) and delta.get("snapshot_id") == snapshot_id:
+                deltas.append(delta)
+    return deltas
+
+
+def fold_deltas(deltas: list[dict]) -> tuple[dict, dict[str, dict], set[str]]:
+    """
+    合并多条差分：返回 (最新的 meta / world / simulator, 最终的角色数据 id -> data, 最终被删除的 id)。
+    供流式读档使用，与 apply_deltas 的结果一致。
+    """
+    top_level: dict = {}
+    avatars: dict[str, dict] = {}
+    removed: set[str] = set()
+    for delta in deltas:
+        for key in ("meta", "world", "simulator"):
+            if key in delta:
+                top_level[key] = delta[key]
+        for data in delta.get("avatars", []):
+            aid = str(data["id"])
+            avatars[aid] = data
+            removed.discard(aid)
+        for aid in delta.get("removed", []):
+            avatars.pop(str(aid), None)
+            removed.add(str(aid))
+    return top_level, avatars, removed
+
+
+def apply_deltas(save_data: dict, deltas: list[dict]) -> dict:
+    """把差分按顺序应用到基础快照数据上（原地修改并返回）。"""
+    if not deltas:
+        return save_data
+    avatars = {str(data["id"]): data for data in save_data.get("avatars", [])}
+    for delta in deltas:
+        for key in ("meta", "world", "simulator"):
+            if key in delta:
+                save_data[key] = delta[key]
+        for data in delta.get("avatars", []):
+            avatars[str(data["id"])] = data
+        for aid in delta.get("removed", []):
+            avatars.pop(str(aid), None)
+    save_data["avatars"] = list(avatars.values())
+    return save_data
+
+
+def read_latest_meta(save_path: Path, base_meta: dict) -> dict:
+    """存档的最新 meta：有匹配的差分时取最后一行的 meta，否则取基础快照的。"""
+    deltas = read_deltas(get_journal_path(save_path), base_meta.get("snapshot_id"))
+    if deltas and "meta" in deltas[-1]:
+        return deltas[-1]["meta"]
+    return base_meta
@@ -0,0 +1,172 @@
+"""
+模拟调度器：控制 Simulator.step 的推进节奏。
+
+原先的 game_loop 固定先 sleep 1 秒再执行一步，耗时 5 秒的月份实际变成 6 秒，
+而很快的月份也无法超过 1 Hz。调度器按模式决定两步之间是否等待、等待多久：
+- target_rate：每月至少间隔 interval 秒，等待时间扣除本月已消耗的时间；
+- fast：尽快推进，不等待（无头批量模拟）；
+- budget：每个 interval 周期内最多花 budget 秒连续模拟（可跑多个月），剩余时间让出给服务端。
+
+推送：publish(result) 同步采集本月需要推送的状态，返回负责投递的 awaitable，
+调度器等它完成后再推进下个月。投递只是把已编码的负载放入各连接的发送队列
+（见 src/server/ws_channel.py），实际发送由各连接的发送任务在后台完成，不拖慢模拟。
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from src.run.log import get_logger
+
+MODE_TARGET_RATE = "target_rate"
+MODE_FAST = "fast"
+MODE_BUDGET = "budget"
+MODES = (MODE_TARGET_RATE, MODE_FAST, MODE_BUDGET)
+
+
+@dataclass
+class SchedulerStats:
+    """步进耗时统计。"""
+    steps: int = 0
+    last_step_seconds: float = 0.0
+    avg_step_seconds: float = 0.0  # 指数滑动平均
+    max_step_seconds: float = 0.0
+    total_step_seconds: float = 0.0
+    # 运行期间（不含暂停）的总墙钟时间
+    run_seconds: float = 0.0
+
+    def record(self, duration: float) -> None:
+        self.steps += 1
+        self.last_step_seconds = duration
+        self.max_step_seconds = max(self.max_step_seconds, duration)
+        self.total_step_seconds += duration
+        if self.steps == 1:
+            self.avg_step_seconds = duration
+        else:
+            self.avg_step_seconds = 0.8 * self.avg_step_seconds + 0.2 * duration
+
+    def to_dict(self) -> dict:
+        return {
+            "steps": self.steps,
+            "last_step_seconds": round(self.last_step_seconds, 4),
+            "avg_step_seconds": round(self.avg_step_seconds, 4),
+            "max_step_seconds": round(self.max_step_seconds, 4),
+            "months_per_second": round(self.steps / self.run_seconds, 3) if self.run_seconds > 0 else 0.0,
+        }
+
+
+class SimScheduler:
+    """
+    按模式循环执行模拟步。
+
+    Args:
+        mode: target_rate / fast / budget。
+        interval: target_rate 模式下每月的最小间隔；budget 模式下的周期长度（秒）。
+        budget: budget 模式下每个周期内可用于模拟的秒数。
+        idle_interval: should_run 返回 False（暂停/未就绪）时的轮询间隔。
+    """
+
+    def __init__(
+        self,
+        mode: str = MODE_TARGET_RATE,
+        interval: float = 1.0,
+        budget: float = 0.8,
+        idle_interval: float = 0.2,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown scheduler mode: {mode}")
+        self.mode = mode
+        self.interval = max(0.0, float(interval))
+        self.budget = max(0.0, float(budget))
+        self.idle_interval = idle_interval
+        self.stats = SchedulerStats()
+        self._slice_start: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, mode: Optional[str] = None) -> "SimScheduler":
+        """从 CONFIG.scheduler 构造；mode 参数可覆盖配置。"""
+        from src.utils.config import CONFIG
+        conf = CONFIG.scheduler
+        return cls(
+            mode=mode or conf.mode,
+            interval=conf.interval,
+            budget=conf.budget,
+        )
+
+    async def run(
+        self,
+        step: Callable[[], Awaitable[Any]],
+        publish: Optional[Callable[[Any], Optional[Awaitable]]] = None,
+        should_run: Optional[Callable[[], bool]] = None,
+        max_steps: Optional[int] = None,
+    ) -> SchedulerStats:
+        """
+        循环执行 step，直到达到 max_steps（None 表示一直运行）。
+
+        Args:
+            step: 执行一个月的模拟，返回值传给 publish。
+            publish: 同步采集推送所需的状态并返回投递用的 awaitable（可为 None），
+                调度器等待投递完成后才开始下个月。
+            should_run: 每步之前检查；返回 False 时暂停推进（不计入统计）。
+            max_steps: 最多执行的步数。
+        """
+        logger = get_logger().logger
+        executed = 0
+        while max_steps is None or executed < max_steps:
+            if should_run is not None and not should_run():
+                self._slice_start = None
+                await asyncio.sleep(self.idle_interval)
+                continue
+
+            t0 = time.monotonic()
+            if self._slice_start is None:
+                self._slice_start = t0
+            try:
+                result = await step()
+            except Exception as e:
+                # 单步失败不终止循环（与原 game_loop 行为一致）
+                print(f"Game loop error: {e}")
+                logger.error(f"Game loop error: {e}", exc_info=True)
+                await self._pace(t0)
+                continue
+            self.stats.record(time.monotonic() - t0)
+            executed += 1
+
+            if publish is not None:
+                try:
+                    delivery = publish(result)
+                except Exception as e:
+                    logger.error(f"Publish error: {e}", exc_info=True)
+                    delivery = None
+                if delivery is not None:
+                    try:
+                        await delivery
+                    except Exception as e:
+                        logger.error(f"Publish error: {e}", exc_info=True)
+
+            await self._pace(t0)
+        return self.stats
+
+    async def _pace(self, step_start: float) -> None:
+        now = time.monotonic()
+        self.stats.run_seconds += now - step_start
+        if self.mode == MODE_TARGET_RATE:
+            delay = self.interval - (now - step_start)
+        elif self.mode == MODE_BUDGET:
+            used = now - self._slice_start
+            if used < self.budget:
+                delay = 0.0
+            else:
+                delay = self.interval - used
+                self._slice_start = None
+        else:
+            delay = 0.0
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+            self.stats.run_seconds += time.monotonic() - now
+        else:
+            # 让出事件循环，使推送、HTTP 请求得以执行
+            await asyncio.sleep(0)
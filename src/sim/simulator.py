@@ -15,16 +15,53 @@ from src.run.log import get_logger
 from src.classes.fortune import try_trigger_fortune
 from src.classes.misfortune import try_trigger_misfortune
 from src.classes.celestial_phenomenon import get_random_celestial_phenomenon
-from src.classes.long_term_objective import process_avatar_long_term_objective
+from src.classes.long_term_objective import (
+    apply_long_term_objective,
+    build_long_term_objective_infos,
+    generate_long_term_objective,
+)
 from src.classes.death import handle_death
 from src.classes.death_reason import DeathReason
 from src.i18n import t
 from src.i18n import t
+from src.sim.instrumentation import StepProfiler, StepRecorder, get_default_instruments
+from src.sim.phase_scheduler import (
+    AVATARS, EVENTS, INTERACTIONS, NICKNAMES, OBJECTIVES, RELATIONS, RNG, ROSTER, WORLD, WORLD_STATE,
+    Phase, PhaseScheduler, phase,
+)
 
 class Simulator:
     def __init__(self, world: World):
         self.world = world
         self.awakening_rate = CONFIG.game.npc_awakening_rate_per_month  # 从配置文件读取NPC每月觉醒率（凡人晋升修士）
+        # 上次感知时各角色的 (x, y, 感知半径)，未变化的角色无需重新扫描
+        self._perception_keys: dict[str, tuple[int, int, int]] = {}
+        # 分阶段观测（见 src/sim/instrumentation.py）
+        self.instruments: list = get_default_instruments()
+        self._recorder: StepRecorder | None = None
+        self._pending_profile: StepProfiler | None = None
+        self.last_profile_path = None
+
+    def add_instrument(self, instrument) -> None:
+        """挂载观测器：每步结束后调用 instrument.on_step(StepRecord)"""
+        self.instruments.append(instrument)
+
+    def remove_instrument(self, instrument) -> None:
+        if instrument in self.instruments:
+            self.instruments.remove(instrument)
+
+    def request_profile(self, kind: str = "cprofile") -> None:
+        """在剖析器下执行下一次 step（cprofile / pyinstrument）"""
+        self._pending_profile = StepProfiler(kind, CONFIG.instrumentation.profile_dir)
+
+    async def _run_phase(self, name: str, fn, *args):
+        """执行一个阶段；有观测器时记录耗时与事件数"""
+        if self._recorder is not None:
+            return await self._recorder.run(name, fn, *args)
+        result = fn(*args)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
 
     def _phase_update_perception_and_knowledge(self):
         """
@@ -49,32 +86,27 @@ class Simulator:
                 avatars_with_home.add(r.host_avatar.id)
 
         # 2. 遍历所有存活角色
+        perception_keys: dict[str, tuple[int, int, int]] = {}
         for avatar in self.world.avatar_manager.get_living_avatars():
-            # ...
             # 计算感知半径（曼哈顿距离）
             radius = get_avatar_observation_radius(avatar)
-            
-            # ...
-            # 获取范围内的有效坐标
-            start_x = max(0, avatar.pos_x - radius)
-            end_x = min(self.world.map.width - 1, avatar.pos_x + radius)
-            start_y = max(0, avatar.pos_y - radius)
-            end_y = min(self.world.map.height - 1, avatar.pos_y + radius)
-
-            # 收集感知到的区域
-            observed_regions = set()
-            for x in range(start_x, end_x + 1):
-                for y in range(start_y, end_y + 1):
-                    # 距离判定：曼哈顿距离
-                    if abs(x - avatar.pos_x) + abs(y - avatar.pos_y) <= radius:
-                        tile = self.world.map.get_tile(x, y)
-                        if tile.region:
-                            observed_regions.add(tile.region)
+            key = (avatar.pos_x, avatar.pos_y, radius)
+            perception_keys[avatar.id] = key
+            moved = self._perception_keys.get(avatar.id) != key
+
+            # 位置与半径均未变化：范围内区域上月已记入 known_regions，
+            # 已有洞府者也无需检查占据，直接跳过
+            if not moved and avatar.id in avatars_with_home:
+                continue
+
+            # 收集感知到的区域（按坐标缓存）
+            observed_regions = self.world.map.get_regions_in_radius(*key)
 
             # 更新认知与自动占据
             for region in observed_regions:
-                # 更新 known_regions
-                avatar.known_regions.add(region.id)
+                # 更新 known_regions（同步角色的已知区域目录）
+                if moved:
+                    avatar.learn_region(region)
                 
                 # 自动占据逻辑
                 # 只有当：是修炼区域 + 无主 + 自己无洞府 时触发
@@ -92,6 +124,8 @@ class Simulator:
                                 related_avatars=[avatar.id]
                             )
                             events.append(event)
+
+        self._perception_keys = perception_keys
         return events
 
     async def _phase_decide_actions(self):
@@ -235,31 +269,74 @@ class Simulator:
                 
         return events
     
-    async def _phase_nickname_generation(self):
+    def _phase_prepare_nicknames(self) -> dict:
         """
-        绰号生成阶段
+        绰号生成（准备）：判定条件并构造提示词，返回 {avatar_id: (avatar, infos)}
         """
-        from src.classes.nickname import process_avatar_nickname
-        
-        # 并发执行
-        living_avatars = self.world.avatar_manager.get_living_avatars()
-        tasks = [process_avatar_nickname(avatar) for avatar in living_avatars]
-        results = await asyncio.gather(*tasks)
-        
-        events = [e for e in results if e]
+        from src.classes.nickname import build_nickname_infos
+
+        prepared = {}
+        for avatar in self.world.avatar_manager.get_living_avatars():
+            infos = build_nickname_infos(avatar)
+            if infos is not None:
+                prepared[avatar.id] = (avatar, infos)
+        return prepared
+
+    async def _phase_request_nicknames(self, prepared: dict) -> dict:
+        """
+        绰号生成（请求）：并发等待 LLM，返回 {avatar_id: (avatar, result)}
+        """
+        from src.classes.nickname import generate_nickname
+
+        items = list(prepared.values())
+        results = await asyncio.gather(*(generate_nickname(avatar, infos) for avatar, infos in items))
+        return {avatar.id: (avatar, result) for (avatar, _), result in zip(items, results)}
+
+    def _phase_nickname_generation(self, results: dict) -> list[Event]:
+        """
+        绰号生成（提交）：按角色顺序写入结果并生成事件，期间死亡的角色跳过
+        """
+        from src.classes.nickname import apply_nickname
+
+        events = []
+        for avatar, result in results.values():
+            if avatar.is_dead:
+                continue
+            event = apply_nickname(avatar, result)
+            if event:
+                events.append(event)
         return events
-    
-    async def _phase_long_term_objective_thinking(self):
+
+    def _phase_prepare_long_term_objectives(self) -> dict:
         """
-        长期目标思考阶段
-        检查角色是否需要生成/更新长期目标
+        长期目标思考（准备）：按角色顺序判定是否需要生成并构造提示词
         """
-        # 并发执行
-        living_avatars = self.world.avatar_manager.get_living_avatars()
-        tasks = [process_avatar_long_term_objective(avatar) for avatar in living_avatars]
-        results = await asyncio.gather(*tasks)
-        
-        events = [e for e in results if e]
+        prepared = {}
+        for avatar in self.world.avatar_manager.get_living_avatars():
+            infos = build_long_term_objective_infos(avatar)
+            if infos is not None:
+                prepared[avatar.id] = (avatar, infos)
+        return prepared
+
+    async def _phase_request_long_term_objectives(self, prepared: dict) -> dict:
+        """
+        长期目标思考（请求）：并发等待 LLM
+        """
+        items = list(prepared.values())
+        results = await asyncio.gather(*(generate_long_term_objective(avatar, infos) for avatar, infos in items))
+        return {avatar.id: (avatar, result) for (avatar, _), result in zip(items, results)}
+
+    def _phase_long_term_objective_thinking(self, results: dict) -> list[Event]:
+        """
+        长期目标思考（提交）：按角色顺序写入新目标并生成事件
+        """
+        events = []
+        for avatar, objective in results.values():
+            if avatar.is_dead:
+                continue
+            event = apply_long_term_objective(avatar, objective)
+            if event:
+                events.append(event)
         return events
     
     async def _phase_process_gatherings(self):
@@ -413,7 +490,7 @@ class Simulator:
         """
         前进一个时间步（一个月）：
         1.  感知与认知更新（及自动占据洞府）
-        2.  长期目标思考
+        2.  长期目标思考（准备，请求与绰号请求并发）
         3.  Gathering 多人聚集结算
         4.  决策阶段 (AI 选择动作)
         5.  提交阶段 (开始执行动作)
@@ -423,58 +500,121 @@ class Simulator:
         9.  结算死亡
         10. 年龄与新生
         11. 被动结算 (丹药、时间效果、奇遇)
-        12. 绰号生成
+        12. 绰号生成（提示词在月初构造，请求与上述阶段并发）
         13. 天地灵机更新
         14. 处理剩余交互计数 (如奇遇产生的交互)
         15. 归档与时间推进
-        """
-        events: list[Event] = []
-        processed_event_ids: set[str] = set()
-
-        # 1. 感知与认知更新
-        events.extend(self._phase_update_perception_and_knowledge())
-
-        # 2. 长期目标思考
-        events.extend(await self._phase_long_term_objective_thinking())
-
-        # 3. Gathering 结算
-        events.extend(await self._phase_process_gatherings())
 
-        # 4. 决策阶段
-        await self._phase_decide_actions()
-
-        # 5. 提交阶段
-        events.extend(self._phase_commit_next_plans())
-
-        # 6. 执行阶段
-        events.extend(await self._phase_execute_actions())
-
-        # 7. 处理初步交互计数
-        self._phase_handle_interactions(events, processed_event_ids)
-
-        # 8. 关系演化
-        events.extend(await self._phase_evolve_relations())
-
-        # 9. 结算死亡
-        events.extend(self._phase_resolve_death())
-
-        # 10. 年龄与新生
-        events.extend(self._phase_update_age_and_birth())
-
-        # 11. 被动结算
-        events.extend(await self._phase_passive_effects())
-
-        # 12. 绰号生成
-        events.extend(await self._phase_nickname_generation())
+        各阶段按声明的读写依赖调度，见 _step_plan。
+        """
+        profiler, self._pending_profile = self._pending_profile, None
+        month_stamp = int(self.world.month_stamp)
+        if self.instruments:
+            self._recorder = StepRecorder(month_stamp)
+        if profiler is not None:
+            profiler.start()
+        try:
+            final_events = await self._step_phases()
+        finally:
+            recorder, self._recorder = self._recorder, None
+            if profiler is not None:
+                self.last_profile_path = profiler.stop(month_stamp)
+                from src.sim import instrumentation
+                instrumentation.last_profile_path = self.last_profile_path
+
+        if recorder is not None:
+            record = recorder.finish(len(final_events))
+            for instrument in self.instruments:
+                try:
+                    instrument.on_step(record)
+                except Exception as e:
+                    get_logger().logger.error(f"Instrument {type(instrument).__name__} failed: {e}")
+        return final_events
 
-        # 13. 更新天地灵机
-        events.extend(self._phase_update_celestial_phenomenon())
+    def _step_plan(self, processed_event_ids: set[str]) -> PhaseScheduler:
+        """
+        本月各阶段及其读写的状态（见 src/sim/phase_scheduler.py）。
+
+        长期目标与绰号拆为 准备 / 请求 / 提交 三段：准备阶段在月初按角色顺序同步判定并构造提示词，
+        请求阶段只等待 LLM、不读写世界状态，因此两者的请求彼此并发，且与后续阶段重叠
+        （绰号请求贯穿整个月）；提交阶段仍位于原来的位置，事件顺序不变。
+        """
+        # 动作、聚集、奇遇等整体读写世界的阶段彼此串行
+        exclusive = dict(reads=WORLD_STATE, writes=WORLD_STATE | {EVENTS})
+        profile = {AVATARS, ROSTER, RELATIONS, OBJECTIVES, NICKNAMES, WORLD}
+
+        def result_of(name: str):
+            return scheduler.result_of(name)
+
+        def handle_interactions(index: int) -> Phase:
+            return phase(
+                "handle_interactions",
+                lambda: self._phase_handle_interactions(scheduler.events_before(index), processed_event_ids),
+                reads={EVENTS, ROSTER}, writes={INTERACTIONS},
+            )
+
+        phases: list[Phase] = [
+            # 感知与认知更新
+            phase("update_perception_and_knowledge", self._phase_update_perception_and_knowledge, **exclusive),
+            # 长期目标思考：判定（消耗随机数）与构造提示词
+            phase("prepare_long_term_objectives", self._phase_prepare_long_term_objectives,
+                  reads=profile, writes={RNG, "pending_objectives"}),
+            # 绰号生成：判定与构造提示词
+            phase("prepare_nicknames", self._phase_prepare_nicknames,
+                  reads=profile, writes={"pending_nicknames"}),
+            # 并发请求 LLM
+            phase("request_long_term_objectives",
+                  lambda: self._phase_request_long_term_objectives(result_of("prepare_long_term_objectives")),
+                  reads={"pending_objectives"}, writes={"objective_results"}),
+            phase("request_nicknames",
+                  lambda: self._phase_request_nicknames(result_of("prepare_nicknames")),
+                  reads={"pending_nicknames"}, writes={"nickname_results"}),
+            # 长期目标写入
+            phase("long_term_objective_thinking",
+                  lambda: self._phase_long_term_objective_thinking(result_of("request_long_term_objectives")),
+                  reads={"objective_results", ROSTER}, writes={OBJECTIVES, EVENTS}),
+            # Gathering 结算
+            phase("process_gatherings", self._phase_process_gatherings, **exclusive),
+            # 决策阶段
+            phase("decide_actions", self._phase_decide_actions, **exclusive),
+            # 提交阶段
+            phase("commit_next_plans", self._phase_commit_next_plans, **exclusive),
+            # 执行阶段
+            phase("execute_actions", self._phase_execute_actions, **exclusive),
+        ]
+        # 处理初步交互计数
+        phases.append(handle_interactions(len(phases)))
+        phases += [
+            # 关系演化
+            phase("evolve_relations", self._phase_evolve_relations, **exclusive),
+            # 结算死亡
+            phase("resolve_death", self._phase_resolve_death, **exclusive),
+            # 年龄与新生
+            phase("update_age_and_birth", self._phase_update_age_and_birth, **exclusive),
+            # 被动结算
+            phase("passive_effects", self._phase_passive_effects, **exclusive),
+            # 绰号写入
+            phase("nickname_generation",
+                  lambda: self._phase_nickname_generation(result_of("request_nicknames")),
+                  reads={"nickname_results", ROSTER}, writes={NICKNAMES, EVENTS}),
+            # 更新天地灵机
+            phase("update_celestial_phenomenon", self._phase_update_celestial_phenomenon,
+                  reads={WORLD}, writes={WORLD, RNG, EVENTS}),
+        ]
+        # 处理剩余阶段的交互计数
+        phases.append(handle_interactions(len(phases)))
 
-        # 14. 处理剩余阶段的交互计数
-        self._phase_handle_interactions(events, processed_event_ids)
+        scheduler = PhaseScheduler(phases, concurrent=CONFIG.scheduler.phase_pipeline)
+        return scheduler
 
-        # 15. 归档与时间推进
-        return self._finalize_step(events)
+    async def _step_phases(self) -> list[Event]:
+        scheduler = self._step_plan(set())
+        await scheduler.run(self._run_phase)
+        # 写入队列已满时先等写入线程追上（在线程池中等待，不阻塞事件循环）
+        if self.world.event_manager:
+            await self.world.event_manager.wait_for_write_capacity()
+        # 归档与时间推进
+        return await self._run_phase("finalize", self._finalize_step, scheduler.events())
 
     def _finalize_step(self, events: list[Event]) -> list[Event]:
         """
@@ -492,10 +632,9 @@ class Simulator:
                 unique_events[e.id] = e
         final_events = list(unique_events.values())
 
-        # 2. 统一写入事件管理器
+        # 2. 统一写入事件管理器（整月事件单事务批量入库）
         if self.world.event_manager:
-            for e in final_events:
-                self.world.event_manager.add_event(e)
+            self.world.event_manager.add_events(final_events)
         
         # 3. 记录日志
         self._phase_log_events(final_events)
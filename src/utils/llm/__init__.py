@@ -12,9 +12,15 @@ from .client import (
     call_llm_json, 
     call_llm_with_template, 
     call_llm_with_task_name,
+    get_response_cache,
+    set_offline_backend,
+    set_response_cache,
     test_connectivity
 )
+from .cache import SQLiteResponseCache
 from .config import LLMMode, get_task_mode
+from .prompt import get_prefix_stats
+from .stats import get_llm_stats
 from .exceptions import LLMError, ParseError, ConfigError
 
 __all__ = [
@@ -22,9 +28,15 @@ __all__ = [
     "call_llm_json", 
     "call_llm_with_template",
     "call_llm_with_task_name",
+    "set_offline_backend",
+    "set_response_cache",
+    "get_response_cache",
     "test_connectivity",
+    "SQLiteResponseCache",
     "LLMMode",
     "get_task_mode",
+    "get_prefix_stats",
+    "get_llm_stats",
     "LLMError",
     "ParseError",
     "ConfigError",
@@ -0,0 +1,155 @@
+"""
+LLM 响应缓存：按 (模型, 规范化提示词) 的哈希保存原始响应文本。
+
+只缓存能成功解析为 JSON 的响应，解析失败后的重试仍会请求网络。
+工作模式（ai.response_cache.mode）：
+- off:    不使用缓存（默认）
+- cache:  命中直接返回；未命中请求网络并写入。过期（ttl_hours）的条目视为未命中
+- record: 总是请求网络，并写入（覆盖）缓存，用于录制一次完整模拟
+- replay: 只读缓存，不访问网络，忽略过期时间；未命中抛出 LLMError。
+          配合同一种子的无头模拟（src/run/headless.py --llm-cache），可离线全速回放
+
+条目总数超过 max_entries 时按最近使用时间淘汰（LRU）。
+实现 get / put / close 的任意对象都可以通过 set_response_cache 替换默认的 SQLite 后端。
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+CACHE_MODES = ("off", "cache", "record", "replay")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used);
+"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """统一换行符并去掉行尾与首尾空白，避免无意义的差异导致未命中。"""
+    lines = prompt.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def cache_key(model: str, prompt: str) -> str:
+    """缓存键：模型名与规范化提示词的 SHA-256。"""
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_prompt(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SQLiteResponseCache:
+    """
+    SQLite 响应缓存。
+
+    Args:
+        path: 数据库文件路径（":memory:" 为内存库）。
+        mode: 工作模式，见 CACHE_MODES。
+        ttl_seconds: 条目有效期（秒），0 表示不过期；replay 模式忽略。
+        max_entries: 最多保留的条目数，0 表示不限制。
+    """
+
+    def __init__(self, path: Path | str, mode: str = "cache", ttl_seconds: float = 0, max_entries: int = 0):
+        if mode not in CACHE_MODES or mode == "off":
+            raise ValueError(f"Unsupported response cache mode: {mode}")
+        self.mode = mode
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.max_entries = max(0, int(max_entries))
+        # 统计：命中 / 未命中 / 写入 / 淘汰次数
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        if str(path) != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, key: str) -> Optional[str]:
+        """返回缓存的响应文本；未命中或已过期时返回 None。"""
+        with self._lock:
+            row = self._conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created = row
+            if self.mode == "replay":
+                # 回放只读，不更新使用时间，避免逐次提交
+                self.hits += 1
+                return response
+            now = time.time()
+            if self.ttl_seconds and now - created > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._count -= 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return response
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """写入（覆盖）一条响应；replay 模式下忽略。"""
+        if self.mode == "replay":
+            return
+        with self._lock:
+            now = time.time()
+            existed = self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            if not existed:
+                self._count += 1
+            self.writes += 1
+            excess = self._count - self.max_entries if self.max_entries else 0
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+                self._count -= excess
+                self.evictions += excess
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_response_cache(conf) -> Optional[SQLiteResponseCache]:
+    """按 ai.response_cache 配置创建缓存；未配置或 mode 为 off 时返回 None。"""
+    if conf is None:
+        return None
+    mode = str(getattr(conf, "mode", "off") or "off").lower()
+    if mode == "off":
+        return None
+    return SQLiteResponseCache(
+        path=getattr(conf, "path", "logs/llm_cache.sqlite"),
+        mode=mode,
+        ttl_seconds=float(getattr(conf, "ttl_hours", 0) or 0) * 3600,
+        max_entries=int(getattr(conf, "max_entries", 0) or 0),
+    )
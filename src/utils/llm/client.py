@@ -4,19 +4,54 @@ import json
 import urllib.request
 import urllib.error
 import asyncio
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional
 
 from src.run.log import log_llm_call
 from src.utils.config import CONFIG
 from .config import LLMMode, LLMConfig, get_task_mode
 from .parser import parse_json
-from .prompt import build_prompt, load_template
+from .prompt import build_prompt_parts, load_template, record_prompt_prefix
 from .exceptions import LLMError, ParseError
+from .transport import AsyncHTTPTransport
+from .stats import record_cache_hit, record_call, record_usage, task_scope
+from .cache import cache_key, create_response_cache
 
 # 模块级信号量，懒加载
 _SEMAPHORE: Optional[asyncio.Semaphore] = None
 
+# 离线后端（无头批量模拟 / 压测）：设置后仍完整渲染提示词，但不发起网络请求，
+# 由 backend(task_name, infos, prompt) 直接返回解析后的结果
+OfflineBackend = Callable[[Optional[str], dict, str], Awaitable[Any]]
+_OFFLINE_BACKEND: Optional[OfflineBackend] = None
+
+
+def set_offline_backend(backend: Optional[OfflineBackend]) -> None:
+    """设置（或传入 None 清除）离线 LLM 后端"""
+    global _OFFLINE_BACKEND
+    _OFFLINE_BACKEND = backend
+
+
+# 响应缓存（见 cache.py），懒加载：首次调用时按 ai.response_cache 创建
+_RESPONSE_CACHE: Any = None
+_RESPONSE_CACHE_LOADED = False
+
+
+def set_response_cache(cache: Any) -> None:
+    """设置（或传入 None 关闭）LLM 响应缓存，覆盖 ai.response_cache 配置。需要 mode / get / put"""
+    global _RESPONSE_CACHE, _RESPONSE_CACHE_LOADED
+    _RESPONSE_CACHE = cache
+    _RESPONSE_CACHE_LOADED = True
+
+
+def get_response_cache() -> Any:
+    global _RESPONSE_CACHE, _RESPONSE_CACHE_LOADED
+    if not _RESPONSE_CACHE_LOADED:
+        _RESPONSE_CACHE = create_response_cache(getattr(CONFIG.ai, "response_cache", None))
+        _RESPONSE_CACHE_LOADED = True
+    return _RESPONSE_CACHE
+
 
 def _get_semaphore() -> asyncio.Semaphore:
     global _SEMAPHORE
@@ -26,8 +61,8 @@ def _get_semaphore() -> asyncio.Semaphore:
     return _SEMAPHORE
 
 
-def _call_with_requests(config: LLMConfig, prompt: str) -> str:
-    """使用原生 urllib 调用 (OpenAI 兼容接口)"""
+def _build_request(config: LLMConfig, prompt: str) -> tuple[str, dict, bytes]:
+    """构造 OpenAI 兼容接口的请求：(url, headers, body)"""
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {config.api_key}"
@@ -47,17 +82,29 @@ def _call_with_requests(config: LLMConfig, prompt: str) -> str:
         url = url.rstrip("/")
         url = f"{url}/chat/completions"
 
+    return url, headers, json.dumps(data).encode('utf-8')
+
+
+def _get_request_timeout() -> float:
+    return float(getattr(CONFIG.ai, "request_timeout", 120))
+
+
+def _call_with_requests(config: LLMConfig, prompt: str) -> str:
+    """使用原生 urllib 调用 (OpenAI 兼容接口)"""
+    url, headers, body = _build_request(config, prompt)
+
     req = urllib.request.Request(
         url, 
-        data=json.dumps(data).encode('utf-8'), 
+        data=body, 
         headers=headers,
         method="POST"
     )
     
     try:
-        # 设置超时时间为 120 秒，避免无限等待
-        with urllib.request.urlopen(req, timeout=120) as response:
+        # 设置超时时间（默认 120 秒），避免无限等待
+        with urllib.request.urlopen(req, timeout=_get_request_timeout()) as response:
             result = json.loads(response.read().decode('utf-8'))
+            record_usage(result.get('usage'))
             return result['choices'][0]['message']['content']
     except urllib.error.HTTPError as e:
         error_body = e.read().decode('utf-8')
@@ -66,16 +113,62 @@ def _call_with_requests(config: LLMConfig, prompt: str) -> str:
         raise Exception(f"LLM Request failed: {str(e)}")
 
 
+# 模块级连接池，绑定创建它的事件循环，懒加载
+_TRANSPORT: Optional[AsyncHTTPTransport] = None
+
+
+def _get_transport() -> AsyncHTTPTransport:
+    global _TRANSPORT
+    loop = asyncio.get_running_loop()
+    if _TRANSPORT is None or _TRANSPORT.loop is not loop:
+        # 连接属于特定事件循环，换循环（如测试、重启）后重新建池
+        limit = getattr(CONFIG.ai, "max_concurrent_requests", 10)
+        _TRANSPORT = AsyncHTTPTransport(max_idle_per_host=limit)
+    return _TRANSPORT
+
+
+async def _call_with_transport(config: LLMConfig, prompt: str) -> str:
+    """使用 asyncio 连接池调用 (OpenAI 兼容接口)，不占用线程"""
+    url, headers, body = _build_request(config, prompt)
+
+    try:
+        status, raw = await _get_transport().post(url, body, headers, timeout=_get_request_timeout())
+    except asyncio.TimeoutError:
+        raise Exception("LLM Request failed: timeout")
+    except Exception as e:
+        raise Exception(f"LLM Request failed: {str(e)}")
+
+    if status >= 400:
+        raise Exception(f"LLM Request failed {status}: {raw.decode('utf-8', errors='replace')}")
+    try:
+        result = json.loads(raw.decode('utf-8'))
+        record_usage(result.get('usage'))
+        return result['choices'][0]['message']['content']
+    except Exception as e:
+        raise Exception(f"LLM Request failed: {str(e)}")
+
+
 async def call_llm(prompt: str, mode: LLMMode = LLMMode.NORMAL) -> str:
     """
     基础 LLM 调用，自动控制并发
-    使用 urllib 直接调用 OpenAI 兼容接口
+    直接调用 OpenAI 兼容接口，传输方式由 ai.http_transport 选择：
+    - urllib: 在线程池中阻塞调用（默认）
+    - asyncio: 事件循环上的 keep-alive 连接池
     """
     config = LLMConfig.from_mode(mode)
     semaphore = _get_semaphore()
     
     async with semaphore:
-        result = await asyncio.to_thread(_call_with_requests, config, prompt)
+        start = time.perf_counter()
+        ok = False
+        try:
+            if getattr(CONFIG.ai, "http_transport", "urllib") == "asyncio":
+                result = await _call_with_transport(config, prompt)
+            else:
+                result = await asyncio.to_thread(_call_with_requests, config, prompt)
+            ok = True
+        finally:
+            record_call(len(prompt), time.perf_counter() - start, ok)
     
     log_llm_call(config.model_name, prompt, result)
     return result
@@ -86,20 +179,42 @@ async def call_llm_json(
     mode: LLMMode = LLMMode.NORMAL,
     max_retries: int | None = None
 ) -> dict:
-    """调用 LLM 并解析为 JSON，带重试"""
+    """调用 LLM 并解析为 JSON，带重试。启用响应缓存时先查缓存，只缓存解析成功的响应"""
     if max_retries is None:
         max_retries = int(getattr(CONFIG.ai, "max_parse_retries", 0))
+
+    cache = get_response_cache()
+    key = None
+    if cache is not None:
+        model_name = LLMConfig.from_mode(mode).model_name
+        key = cache_key(model_name, prompt)
+        if cache.mode != "record":
+            cached = cache.get(key)
+            if cached is not None:
+                try:
+                    result = parse_json(cached)
+                except ParseError:
+                    # 解析规则变化后旧条目可能失效，按未命中处理
+                    result = None
+                if result is not None:
+                    record_cache_hit(len(prompt))
+                    return result
+            if cache.mode == "replay":
+                raise LLMError("回放模式下响应缓存未命中", model=model_name, key=key)
     
     last_error: ParseError | None = None
     for attempt in range(max_retries + 1):
         response = await call_llm(prompt, mode)
         try:
-            return parse_json(response)
+            result = parse_json(response)
         except ParseError as e:
             last_error = e
             if attempt < max_retries:
                 continue
             raise LLMError(f"解析失败（重试 {max_retries} 次后）", cause=last_error) from last_error
+        if key is not None:
+            cache.put(key, model_name, response)
+        return result
     
     # This should never be reached, but satisfies type checker.
     raise LLMError("未知错误")
@@ -109,12 +224,21 @@ async def call_llm_with_template(
     template_path: Path | str,
     infos: dict,
     mode: LLMMode = LLMMode.NORMAL,
-    max_retries: int | None = None
+    max_retries: int | None = None,
+    task_name: str | None = None,
 ) -> dict:
-    """使用模板调用 LLM"""
+    """使用模板调用 LLM。提供 task_name 时记录稳定前缀，用于统计前缀缓存潜力"""
     template = load_template(template_path)
-    prompt = build_prompt(template, infos)
-    return await call_llm_json(prompt, mode, max_retries)
+    prefix, suffix = build_prompt_parts(template, infos)
+    if task_name and prefix:
+        record_prompt_prefix(task_name, prefix)
+    with task_scope(task_name):
+        if _OFFLINE_BACKEND is not None:
+            start = time.perf_counter()
+            result = await _OFFLINE_BACKEND(task_name, infos, prefix + suffix)
+            record_call(len(prefix) + len(suffix), time.perf_counter() - start)
+            return result
+        return await call_llm_json(prefix + suffix, mode, max_retries)
 
 
 async def call_llm_with_task_name(
@@ -143,7 +267,7 @@ async def call_llm_with_task_name(
     if global_mode in ["normal", "fast"]:
         mode = LLMMode(global_mode)
             
-    return await call_llm_with_template(template_path, infos, mode, max_retries)
+    return await call_llm_with_template(template_path, infos, mode, max_retries, task_name=task_name)
 
 
 def test_connectivity(mode: LLMMode = LLMMode.NORMAL, config: Optional[LLMConfig] = None) -> tuple[bool, str]:
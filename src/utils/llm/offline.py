@@ -0,0 +1,84 @@
+"""
+离线 LLM 后端：不访问网络，按任务返回结构合法的确定性结果。
+
+用于无头批量模拟与性能回归（见 src/run/headless.py）。提示词仍会完整渲染，
+因此提示词构造的开销计入测量；只有网络请求被替换。
+
+随机选择由 (seed, 任务, 角色名, 该角色第几次调用) 决定，与并发调用的完成顺序无关，
+同一种子下多次运行得到相同的决策序列。
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+from collections import Counter
+from typing import Any, Optional
+
+# 无参数即可执行的动作（能否执行由动作自身的条件判断，不满足时计划被跳过）
+_SIMPLE_ACTIONS = (
+    "Cultivate", "Breakthrough", "Hunt", "Harvest", "Mine", "SelfHeal",
+    "Traveling", "Reading", "HelpMortals", "Catch", "Retreat",
+)
+_DIRECTIONS = ("North", "South", "East", "West")
+
+
+class StubLLMBackend:
+    """
+    可直接传给 set_offline_backend 的离线后端。
+
+    Args:
+        seed: 随机种子。
+        latency: 每次调用模拟的网络延迟（秒），0 表示立即返回。
+    """
+
+    def __init__(self, seed: int = 0, latency: float = 0.0):
+        self.seed = seed
+        self.latency = latency
+        # 统计：各任务调用次数
+        self.calls: Counter[str] = Counter()
+        self._per_key: Counter[str] = Counter()
+
+    async def __call__(self, task_name: Optional[str], infos: dict, prompt: str) -> Any:
+        task = task_name or "untagged"
+        self.calls[task] += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+        if task == "action_decision":
+            names = [infos["avatar_name"]] if "avatar_name" in infos else \
+                [n for n in str(infos.get("avatar_names", "")).split(", ") if n]
+            return {name: self._decision(name) for name in names}
+        if task == "interaction_feedback":
+            target = infos.get("avatar_name_2", "")
+            options = list(infos.get("feedback_actions") or [])
+            rng = self._rng(task, target)
+            return {target: {"thinking": "", "feedback": rng.choice(options) if options else ""}}
+        if task == "long_term_objective":
+            # 必须非空，否则角色每月都会重新请求长期目标
+            return {"long_term_objective": "stub objective"}
+        if task == "nickname":
+            return {"nickname": "", "thinking": "", "reason": ""}
+        if task == "relation_resolver":
+            return {"changed": False}
+        # story_teller / single_choice 等：返回空结果，调用方走各自的兜底逻辑
+        return {}
+
+    def _rng(self, task: str, name: str) -> random.Random:
+        key = f"{task}:{name}"
+        self._per_key[key] += 1
+        return random.Random(f"{self.seed}:{key}:{self._per_key[key]}")
+
+    def _decision(self, name: str) -> dict:
+        rng = self._rng("action_decision", name)
+        pairs: list[list] = []
+        for _ in range(rng.randint(2, 5)):
+            if rng.random() < 0.3:
+                pairs.append(["MoveToDirection", {"direction": rng.choice(_DIRECTIONS)}])
+            else:
+                pairs.append([rng.choice(_SIMPLE_ACTIONS), {}])
+        return {
+            "avatar_thinking": "",
+            "current_emotion": "emotion_calm",
+            "short_term_objective": "",
+            "action_name_params_pairs": pairs,
+        }
@@ -1,8 +1,40 @@
-"""提示词处理"""
+"""提示词处理
 
+模板可以用单独一行 DYNAMIC_MARKER 分成两段：
+- 之前为稳定前缀：角色设定、动作列表、规则、输出格式等，只引用不随调用变化的信息；
+- 之后为动态后缀：角色信息、已知区域、近期事件等每次调用都不同的内容。
+稳定前缀在同一任务的多次调用间逐字相同，可以命中服务端的前缀缓存（prompt caching / KV 复用）。
+"""
+
+import hashlib
 from pathlib import Path
 from src.utils.strings import intentify_prompt_infos
 
+# 模板中分隔稳定前缀与动态后缀的标记行
+DYNAMIC_MARKER = "<<<DYNAMIC>>>"
+
+# 任务名 -> {前缀哈希: 调用次数}
+_PREFIX_STATS: dict[str, dict[str, int]] = {}
+# 前缀哈希 -> 前缀长度（字符数）
+_PREFIX_SIZES: dict[str, int] = {}
+
+
+def build_prompt_parts(template: str, infos: dict) -> tuple[str, str]:
+    """
+    根据模板构建提示词，返回 (稳定前缀, 动态后缀)。
+    模板中没有 DYNAMIC_MARKER 时，前缀为空串。
+    """
+    processed = intentify_prompt_infos(infos)
+    head, sep, tail = template.partition(DYNAMIC_MARKER)
+    if not sep:
+        return "", template.format(**processed)
+    # 去掉标记行自身的换行，拼接后与不带标记的模板排版一致
+    if tail.startswith("\r\n"):
+        tail = tail[2:]
+    elif tail.startswith("\n"):
+        tail = tail[1:]
+    return head.format(**processed), tail.format(**processed)
+
 
 def build_prompt(template: str, infos: dict) -> str:
     """
@@ -15,8 +47,50 @@ def build_prompt(template: str, infos: dict) -> str:
     Returns:
         str: 构建好的提示词
     """
-    processed = intentify_prompt_infos(infos)
-    return template.format(**processed)
+    prefix, suffix = build_prompt_parts(template, infos)
+    return prefix + suffix
+
+
+def record_prompt_prefix(task_name: str, prefix: str) -> str:
+    """记录一次调用的稳定前缀，返回前缀哈希。"""
+    digest = hashlib.sha1(prefix.encode("utf-8")).hexdigest()[:16]
+    counts = _PREFIX_STATS.setdefault(task_name, {})
+    counts[digest] = counts.get(digest, 0) + 1
+    _PREFIX_SIZES[digest] = len(prefix)
+    return digest
+
+
+def get_prefix_stats() -> dict[str, dict]:
+    """
+    各任务的前缀缓存潜力统计。
+
+    Returns:
+        {task_name: {
+            "calls": 调用次数,
+            "distinct_prefixes": 不同前缀的数量,
+            "reusable_calls": 前缀此前已出现过的调用次数（理论可命中缓存）,
+            "hit_ratio": reusable_calls / calls,
+            "avg_prefix_chars": 平均前缀长度,
+        }}
+    """
+    stats = {}
+    for task_name, counts in _PREFIX_STATS.items():
+        calls = sum(counts.values())
+        prefix_chars = sum(_PREFIX_SIZES[h] * n for h, n in counts.items())
+        reusable = calls - len(counts)
+        stats[task_name] = {
+            "calls": calls,
+            "distinct_prefixes": len(counts),
+            "reusable_calls": reusable,
+            "hit_ratio": reusable / calls if calls else 0.0,
+            "avg_prefix_chars": prefix_chars / calls if calls else 0.0,
+        }
+    return stats
+
+
+def reset_prefix_stats() -> None:
+    _PREFIX_STATS.clear()
+    _PREFIX_SIZES.clear()
 
 
 def load_template(path: Path | str) -> str:
@@ -0,0 +1,82 @@
+"""
+按任务统计 LLM 调用：次数、失败次数、提示词字符数、token 用量与耗时。
+
+任务名由 call_llm_with_template 写入上下文变量，底层调用（包括 asyncio.to_thread
+中的 urllib 调用，上下文会被复制过去）据此归类；未经模板调用的记为 "untagged"。
+token 用量取自 OpenAI 兼容接口返回的 usage 字段，离线后端没有 usage，只计次数。
+命中响应缓存的调用不计入 calls，只计入 cache_hits。
+"""
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Iterator, Optional
+
+UNTAGGED = "untagged"
+
+_current_task: ContextVar[str] = ContextVar("llm_task", default=UNTAGGED)
+
+
+@dataclass
+class TaskLLMStats:
+    calls: int = 0
+    errors: int = 0
+    prompt_chars: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    seconds: float = 0.0
+    cache_hits: int = 0
+
+
+_STATS: dict[str, TaskLLMStats] = {}
+_LOCK = threading.Lock()
+
+
+@contextmanager
+def task_scope(task_name: Optional[str]) -> Iterator[None]:
+    """在此范围内发起的 LLM 调用归入 task_name。"""
+    token = _current_task.set(task_name or UNTAGGED)
+    try:
+        yield
+    finally:
+        _current_task.reset(token)
+
+
+def record_call(prompt_chars: int, seconds: float, ok: bool = True) -> None:
+    with _LOCK:
+        stats = _STATS.setdefault(_current_task.get(), TaskLLMStats())
+        stats.calls += 1
+        stats.prompt_chars += prompt_chars
+        stats.seconds += seconds
+        if not ok:
+            stats.errors += 1
+
+
+def record_cache_hit(prompt_chars: int) -> None:
+    with _LOCK:
+        stats = _STATS.setdefault(_current_task.get(), TaskLLMStats())
+        stats.cache_hits += 1
+        stats.prompt_chars += prompt_chars
+
+
+def record_usage(usage: Optional[dict]) -> None:
+    """记录接口返回的 usage（prompt_tokens / completion_tokens）。"""
+    if not isinstance(usage, dict):
+        return
+    with _LOCK:
+        stats = _STATS.setdefault(_current_task.get(), TaskLLMStats())
+        stats.prompt_tokens += int(usage.get("prompt_tokens") or 0)
+        stats.completion_tokens += int(usage.get("completion_tokens") or 0)
+
+
+def get_llm_stats() -> dict[str, dict]:
+    """返回 {任务名: 统计} 的快照。"""
+    with _LOCK:
+        return {task: asdict(stats) for task, stats in _STATS.items()}
+
+
+def reset_llm_stats() -> None:
+    with _LOCK:
+        _STATS.clear()
@@ -0,0 +1,212 @@
+"""LLM HTTP 传输层：基于 asyncio 的连接池（HTTP/1.1 keep-alive）
+
+urllib 方案每次请求都新建 TCP/TLS 连接，并在线程池里阻塞整个请求周期。
+这里直接在事件循环上收发，连接按 (scheme, host, port) 复用，不占用线程。
+仅实现 LLM 调用所需的最小子集：POST + Content-Length / chunked 响应。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ssl
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlsplit
+
+# 响应体按块读取的大小
+_READ_CHUNK = 64 * 1024
+
+
+@dataclass
+class _Connection:
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    last_used: float = field(default_factory=time.monotonic)
+
+    def is_usable(self, keepalive_expiry: float) -> bool:
+        if self.writer.is_closing() or self.reader.at_eof():
+            return False
+        return time.monotonic() - self.last_used < keepalive_expiry
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class AsyncHTTPTransport:
+    """
+    绑定在单个事件循环上的 HTTP/1.1 连接池。
+
+    Args:
+        max_idle_per_host: 每个主机最多保留的空闲连接数。
+        keepalive_expiry: 空闲连接的最长保留秒数，超过后丢弃（服务端通常会先断开）。
+    """
+
+    def __init__(self, max_idle_per_host: int = 10, keepalive_expiry: float = 30.0):
+        self._max_idle = max(0, int(max_idle_per_host))
+        self._keepalive_expiry = keepalive_expiry
+        self._idle: dict[tuple[str, str, int], list[_Connection]] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        self.loop = asyncio.get_running_loop()
+        # 统计：新建连接数（调试/测试用）
+        self.connections_opened = 0
+
+    async def post(self, url: str, body: bytes, headers: dict[str, str], timeout: float) -> tuple[int, bytes]:
+        """
+        发送 POST 请求并读取完整响应。
+
+        Returns:
+            (status, body)
+
+        Raises:
+            asyncio.TimeoutError: 整个请求（含建连与读取）超过 timeout 秒。
+            ConnectionError / OSError: 网络错误。
+        """
+        return await asyncio.wait_for(self._post(url, body, headers), timeout=timeout)
+
+    async def aclose(self) -> None:
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+        self._idle.clear()
+
+    async def _post(self, url: str, body: bytes, headers: dict[str, str]) -> tuple[int, bytes]:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        host = parts.hostname or ""
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        host_header = host if parts.port is None else f"{host}:{port}"
+
+        lines = [f"POST {target} HTTP/1.1", f"Host: {host_header}"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        lines += [f"Content-Length: {len(body)}", "Connection: keep-alive", "", ""]
+        request = "\r\n".join(lines).encode("latin-1") + body
+
+        conn = self._take_idle(key)
+        if conn is not None:
+            try:
+                return await self._roundtrip(key, conn, request)
+            except ConnectionError:
+                # 空闲连接可能已被服务端关闭（尚未收到任何响应），换新连接重试一次
+                pass
+        conn = await self._open(key)
+        return await self._roundtrip(key, conn, request)
+
+    def _take_idle(self, key: tuple[str, str, int]) -> Optional[_Connection]:
+        conns = self._idle.get(key)
+        while conns:
+            conn = conns.pop()
+            if conn.is_usable(self._keepalive_expiry):
+                return conn
+            conn.close()
+        return None
+
+    async def _open(self, key: tuple[str, str, int]) -> _Connection:
+        scheme, host, port = key
+        ssl_ctx = None
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            ssl_ctx = self._ssl_context
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=ssl_ctx, server_hostname=host if ssl_ctx else None
+        )
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def _roundtrip(self, key: tuple[str, str, int], conn: _Connection, request: bytes) -> tuple[int, bytes]:
+        reusable = False
+        try:
+            conn.writer.write(request)
+            await conn.writer.drain()
+
+            status_line = await conn.reader.readline()
+            if not status_line:
+                raise ConnectionError("Connection closed by server")
+            version, status, _ = _parse_status_line(status_line)
+            resp_headers = await _read_headers(conn.reader)
+
+            body, complete = await _read_body(conn.reader, resp_headers)
+            reusable = (
+                complete
+                and version == "HTTP/1.1"
+                and resp_headers.get("connection", "").lower() != "close"
+            )
+            return status, body
+        finally:
+            if reusable:
+                self._release(key, conn)
+            else:
+                # 出错、取消（超时）或服务端要求关闭：连接状态未知，不再复用
+                conn.close()
+
+    def _release(self, key: tuple[str, str, int], conn: _Connection) -> None:
+        conns = self._idle.setdefault(key, [])
+        if len(conns) >= self._max_idle:
+            conn.close()
+            return
+        conn.last_used = time.monotonic()
+        conns.append(conn)
+
+
+def _parse_status_line(line: bytes) -> tuple[str, int, str]:
+    parts = line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise ConnectionError(f"Malformed status line: {line!r}")
+    return parts[0], int(parts[1]), parts[2] if len(parts) > 2 else ""
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise asyncio.IncompleteReadError(b"", None)
+        if line in (b"\r\n", b"\n"):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: dict[str, str]) -> tuple[bytes, bool]:
+    """读取响应体。返回 (body, 是否按协议完整读取)；读到 EOF 结束的响应不可复用连接。"""
+    buf = bytearray()
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        while True:
+            size_line = await reader.readline()
+            if not size_line:
+                raise asyncio.IncompleteReadError(bytes(buf), None)
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                # 跳过 trailer
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return bytes(buf), True
+            buf += await reader.readexactly(size)
+            await reader.readline()  # 块尾 CRLF
+
+    length = headers.get("content-length")
+    if length is not None:
+        remaining = int(length)
+        while remaining > 0:
+            chunk = await reader.read(min(remaining, _READ_CHUNK))
+            if not chunk:
+                raise asyncio.IncompleteReadError(bytes(buf), remaining)
+            buf += chunk
+            remaining -= len(chunk)
+        return bytes(buf), True
+
+    while True:
+        chunk = await reader.read(_READ_CHUNK)
+        if not chunk:
+            return bytes(buf), False
+        buf += chunk
@@ -1,32 +1,51 @@
 from __future__ import annotations
 
 from inspect import signature, Parameter
-from typing import Callable, Mapping, Any
+from typing import Callable, Mapping, Any, Optional
 
 
-def filter_kwargs_for_callable(func: Callable[..., Any], kwargs: Mapping[str, Any]) -> dict[str, Any]:
+def get_allowed_kwarg_names(func: Callable[..., Any], skip_first: bool = False) -> Optional[frozenset[str]]:
     """
-    依据可调用对象的签名过滤 kwargs，只保留目标函数可接收的关键字参数。
+    依据可调用对象的签名，返回其可接收的关键字参数名；返回 None 表示不需要过滤。
 
-    - 若目标函数含有 **kwargs（VAR_KEYWORD），直接原样返回（无需过滤）。
+    - 若目标函数含有 **kwargs（VAR_KEYWORD），或签名不可获取（如内建或 C 扩展），返回 None。
     - 仅保留 POSITIONAL_OR_KEYWORD 与 KEYWORD_ONLY 两类参数名。
-    - 自动忽略 "self"。
-    - 在签名不可获取时（如内建或 C 扩展），原样返回。
+    - 自动忽略 "self"；skip_first=True 时忽略第一个参数（对类上取到的未绑定方法使用）。
     """
     try:
         sig = signature(func)
     except (ValueError, TypeError):
-        return dict(kwargs)
+        return None
 
-    params = sig.parameters
-    if any(p.kind == Parameter.VAR_KEYWORD for p in params.values()):
-        return dict(kwargs)
+    params = list(sig.parameters.values())
+    if skip_first and params:
+        params = params[1:]
+    if any(p.kind == Parameter.VAR_KEYWORD for p in params):
+        return None
+
+    return frozenset(
+        p.name
+        for p in params
+        if p.name != "self" and p.kind in (Parameter.POSITIONAL_OR_KEYWORD, Parameter.KEYWORD_ONLY)
+    )
 
-    allowed_names = {
-        name
-        for name, p in params.items()
-        if name != "self" and p.kind in (Parameter.POSITIONAL_OR_KEYWORD, Parameter.KEYWORD_ONLY)
-    }
+
+def filter_kwargs(kwargs: Mapping[str, Any], allowed_names: Optional[frozenset[str]]) -> dict[str, Any]:
+    """按 get_allowed_kwarg_names 的结果过滤 kwargs（None 时原样返回）。"""
+    if allowed_names is None:
+        return dict(kwargs)
     return {k: v for k, v in kwargs.items() if k in allowed_names}
 
 
+def filter_kwargs_for_callable(func: Callable[..., Any], kwargs: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    依据可调用对象的签名过滤 kwargs，只保留目标函数可接收的关键字参数。
+
+    - 若目标函数含有 **kwargs（VAR_KEYWORD），直接原样返回（无需过滤）。
+    - 仅保留 POSITIONAL_OR_KEYWORD 与 KEYWORD_ONLY 两类参数名。
+    - 自动忽略 "self"。
+    - 在签名不可获取时（如内建或 C 扩展），原样返回。
+
+    每次调用都会解析签名；热路径上的动作调用请使用 ActionRegistry 的调度表（ActionDispatch）。
+    """
+    return filter_kwargs(kwargs, get_allowed_kwarg_names(func))
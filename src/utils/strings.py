@@ -19,15 +19,31 @@ def to_json_str_with_intent(data, unescape_newlines: bool = True) -> str:
     return s
 
 
+class PromptJSON(str):
+    """
+    已经由 to_json_str_with_intent 渲染好的文本。
+
+    intentify_prompt_infos 遇到它时原样填入模板，不再二次编码；
+    用于按月 / 按语言缓存的提示词片段（见 src/classes/prompt_context.py）。
+    """
+    __slots__ = ()
+
+
+def _intent(value) -> str:
+    if isinstance(value, PromptJSON):
+        return value
+    return to_json_str_with_intent(value)
+
+
 def intentify_prompt_infos(infos: dict) -> dict:
     processed: dict = dict(infos or {})
     if "avatar_infos" in processed:
-        processed["avatar_infos"] = to_json_str_with_intent(processed["avatar_infos"])
+        processed["avatar_infos"] = _intent(processed["avatar_infos"])
     if "world_info" in processed:
-        processed["world_info"] = to_json_str_with_intent(processed["world_info"])
+        processed["world_info"] = _intent(processed["world_info"])
     if "general_action_infos" in processed:
-        processed["general_action_infos"] = to_json_str_with_intent(processed["general_action_infos"])
+        processed["general_action_infos"] = _intent(processed["general_action_infos"])
     if "expanded_info" in processed:
-        processed["expanded_info"] = to_json_str_with_intent(processed["expanded_info"])
+        processed["expanded_info"] = _intent(processed["expanded_info"])
     return processed
 
@@ -0,0 +1,66 @@
+"""
+Tests for the per-action-class dispatch table (precomputed kwarg names).
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.classes.action import MoveToDirection, TimedAction
+from src.classes.action.registry import ActionDispatch, ActionRegistry
+from src.classes.action_runtime import ActionPlan
+from src.utils.params import filter_kwargs_for_callable
+
+
+class _Probe:
+    def can_start(self, direction: str, *, speed: int = 1):
+        return True, ""
+
+    @staticmethod
+    def start(target):
+        return None
+
+    def step(self, **params):
+        return None
+
+    def finish(self, self_named_param=None):
+        return []
+
+
+def test_dispatch_matches_filter_kwargs_for_callable():
+    dispatch = ActionDispatch.build(_Probe)
+    probe = _Probe()
+    params = {"direction": "North", "speed": 2, "target": "x", "other": 1, "self_named_param": 3}
+    for method in ("can_start", "start", "step", "finish"):
+        assert dispatch.kwargs_for(method, params) == filter_kwargs_for_callable(getattr(probe, method), params)
+    assert dispatch.allowed["can_start"] == {"direction", "speed"}
+    assert dispatch.allowed["start"] == {"target"}
+    assert dispatch.allowed["step"] is None
+
+
+def test_registered_actions_have_prebuilt_dispatch():
+    dispatch = ActionRegistry.get_dispatch("MoveToDirection")
+    assert dispatch.action_cls is MoveToDirection
+    assert dispatch.allowed["step"] == {"direction"}
+    with pytest.raises(KeyError):
+        ActionRegistry.get_dispatch("NoSuchAction")
+
+
+def test_unregistered_subclass_is_cached():
+    class Custom(TimedAction):
+        def _execute(self, amount: int = 0):
+            pass
+
+    first = ActionRegistry.dispatch_for(Custom)
+    assert ActionRegistry.dispatch_for(Custom) is first
+    assert first.kwargs_for("_execute", {"amount": 1, "junk": 2}) == {"amount": 1}
+
+
+@pytest.mark.asyncio
+async def test_commit_and_tick_do_not_inspect_signatures(dummy_avatar):
+    dummy_avatar.planned_actions = [ActionPlan("MoveToDirection", {"direction": "East", "extra": 1})]
+    with patch("src.utils.params.signature", side_effect=AssertionError("signature called")):
+        event = dummy_avatar.commit_next_plan()
+        await dummy_avatar.tick_action()
+    assert event is not None
+    assert dummy_avatar.current_action.params == {"direction": "East", "extra": 1}
@@ -606,3 +606,117 @@ class TestLLMAIModuleLevelInstance:
     def test_llm_ai_is_ai_subclass(self):
         """Test that LLMAI is a subclass of AI."""
         assert issubclass(LLMAI, AI)
+
+
+class _FakeAvatar:
+    """批量决策只用到名字、位置分组信息与 get_expanded_info。"""
+
+    def __init__(self, name, region_id=1, sect_id=None):
+        from types import SimpleNamespace
+        self.name = name
+        self.tile = SimpleNamespace(region=SimpleNamespace(id=region_id))
+        self.sect = SimpleNamespace(id=sect_id) if sect_id is not None else None
+        self.emotion = EmotionType.CALM
+
+    def get_expanded_info(self, co_region_avatars=None):
+        return f"{self.name} info"
+
+
+def _decision(action):
+    return {
+        "action_name_params_pairs": [[action, {}]],
+        "avatar_thinking": "...",
+        "short_term_objective": "goal",
+        "current_emotion": "emotion_happy",
+    }
+
+
+class TestBatchedDecision:
+    """Tests for ai.decision_batch (several avatars per prompt)."""
+
+    @pytest.fixture
+    def mock_world(self, base_world):
+        base_world.get_observable_avatars = MagicMock(return_value=[])
+        context = base_world.get_prompt_context()
+        context.region_info = MagicMock(return_value={"regions": []})
+        context.render_world_info = MagicMock(return_value="world info")
+        return base_world
+
+    @pytest.fixture
+    def batch_of_3(self):
+        from src.utils.config import CONFIG
+        with patch.object(CONFIG.ai.decision_batch, "size", 3), \
+             patch.object(CONFIG.ai.decision_batch, "group_by", "region"):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_co_located_avatars_share_one_prompt(self, mock_world, batch_of_3):
+        avatars = [_FakeAvatar("A"), _FakeAvatar("B"), _FakeAvatar("C", region_id=2)]
+
+        async def fake_llm(task_name, template_path, info):
+            if str(template_path).endswith("ai_batch.txt"):
+                assert set(info["avatar_infos"]) == {"A", "B"}
+                return {"A": _decision("cultivate"), "B": _decision("move")}
+            return {info["avatar_name"]: _decision("rest")}
+
+        with patch("src.classes.ai.call_llm_with_task_name", new_callable=AsyncMock) as mock_llm:
+            mock_llm.side_effect = fake_llm
+            results = await LLMAI()._decide(mock_world, avatars)
+
+        # 一次批量（A、B）+ 一次单独（C 独占一个区域）
+        assert mock_llm.await_count == 2
+        assert list(results) == avatars
+        assert results[avatars[0]][0] == [("cultivate", {})]
+        assert results[avatars[1]][0] == [("move", {})]
+        assert results[avatars[2]][0] == [("rest", {})]
+        assert avatars[0].emotion == EmotionType.HAPPY
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_response_falls_back_per_avatar(self, mock_world, batch_of_3):
+        avatars = [_FakeAvatar("A"), _FakeAvatar("B"), _FakeAvatar("C")]
+        retried = []
+
+        async def fake_llm(task_name, template_path, info):
+            if str(template_path).endswith("ai_batch.txt"):
+                # B 缺失，C 没有合法动作
+                return {"A": _decision("cultivate"), "C": {"action_name_params_pairs": []}}
+            retried.append(info["avatar_name"])
+            return {info["avatar_name"]: _decision("rest")}
+
+        with patch("src.classes.ai.call_llm_with_task_name", new_callable=AsyncMock) as mock_llm:
+            mock_llm.side_effect = fake_llm
+            results = await LLMAI()._decide(mock_world, avatars)
+
+        assert sorted(retried) == ["B", "C"]
+        assert results[avatars[0]][0] == [("cultivate", {})]
+        assert results[avatars[1]][0] == [("rest", {})]
+        assert results[avatars[2]][0] == [("rest", {})]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_request_falls_back_per_avatar(self, mock_world, batch_of_3):
+        avatars = [_FakeAvatar("A"), _FakeAvatar("B")]
+
+        async def fake_llm(task_name, template_path, info):
+            if str(template_path).endswith("ai_batch.txt"):
+                raise RuntimeError("LLM Request failed: timeout")
+            return {info["avatar_name"]: _decision("rest")}
+
+        with patch("src.classes.ai.call_llm_with_task_name", new_callable=AsyncMock) as mock_llm:
+            mock_llm.side_effect = fake_llm
+            results = await LLMAI()._decide(mock_world, avatars)
+
+        assert mock_llm.await_count == 3
+        assert set(results) == set(avatars)
+
+    def test_grouping_by_sect_and_size(self):
+        from src.classes.ai import _group_avatars
+
+        avatars = [_FakeAvatar(f"S{i}", region_id=i, sect_id=7) for i in range(5)]
+        avatars += [_FakeAvatar("R1"), _FakeAvatar("R1"), _FakeAvatar("Lone", sect_id=8)]
+
+        batches, singles = _group_avatars(avatars, 2, "sect")
+
+        names = [[a.name for a in b] for b in batches]
+        assert names == [["S0", "S1"], ["S2", "S3"]]
+        # 余下的一个、同名角色与独占分组的角色单独决策
+        assert sorted(a.name for a in singles) == ["Lone", "R1", "R1", "S4"]
@@ -0,0 +1,65 @@
+"""
+测试 EffectsMixin.effects 的缓存与失效。
+"""
+from unittest.mock import patch
+
+from src.classes.effect.mixin import set_effects_cache_check
+
+
+def test_effects_cached_between_reads(dummy_avatar):
+    first = dummy_avatar.effects
+    with patch.object(type(dummy_avatar), "_compute_effects", side_effect=AssertionError("recomputed")):
+        assert dummy_avatar.effects is first
+
+
+def test_reassigning_source_invalidates(dummy_avatar):
+    before = dummy_avatar.effects
+    dummy_avatar.temporary_effects = [{
+        "source": "test",
+        "effects": {"extra_battle_strength_points": 7},
+        "start_month": int(dummy_avatar.world.month_stamp),
+        "duration": 1,
+    }]
+    after = dummy_avatar.effects
+    assert after is not before
+    assert after.get("extra_battle_strength_points", 0) == before.get("extra_battle_strength_points", 0) + 7
+
+
+def test_recalc_and_month_change_invalidate(dummy_avatar):
+    dummy_avatar.add_breakthrough_rate(0.3, duration=1)
+    assert dummy_avatar.effects["extra_breakthrough_success_rate"] >= 0.3
+
+    # 临时效果到期：无需显式失效，跨月即重算
+    dummy_avatar.world.month_stamp = dummy_avatar.world.month_stamp + 1
+    assert dummy_avatar.effects.get("extra_breakthrough_success_rate", 0) < 0.3
+
+
+def test_phenomenon_change_invalidates(dummy_avatar):
+    class _Phenomenon:
+        effects = {"extra_max_hp": 50}
+
+    base = dummy_avatar.effects.get("extra_max_hp", 0)
+    dummy_avatar.world.current_phenomenon = _Phenomenon()
+    assert dummy_avatar.effects.get("extra_max_hp", 0) == base + 50
+
+
+def test_check_mode_repairs_stale_cache(dummy_avatar):
+    dummy_avatar.temporary_effects = [{
+        "source": "test",
+        "effects": {"extra_cultivate_exp": 1},
+        "start_month": int(dummy_avatar.world.month_stamp),
+        "duration": 12,
+    }]
+    assert dummy_avatar.effects["extra_cultivate_exp"] == 1
+
+    # 原地修改且未调用 invalidate_effects：普通模式下读到旧值
+    dummy_avatar.temporary_effects[0]["effects"]["extra_cultivate_exp"] = 5
+    assert dummy_avatar.effects["extra_cultivate_exp"] == 1
+
+    set_effects_cache_check(True)
+    try:
+        with patch("src.run.log.get_logger") as mock_logger:
+            assert dummy_avatar.effects["extra_cultivate_exp"] == 5
+            mock_logger.return_value.logger.error.assert_called_once()
+    finally:
+        set_effects_cache_check(False)
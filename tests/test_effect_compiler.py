@@ -0,0 +1,61 @@
+"""
+测试效果表达式的解析与预编译。
+"""
+from types import SimpleNamespace
+
+from src.classes.effect import load_effect_from_str, _evaluate_conditional_effect
+from src.classes.effect.compiler import _CODE_REGISTRY, compile_expression
+
+
+def test_relaxed_effect_is_parsed_and_precompiled():
+    raw = "[{when: 'avatar.weapon is None', extra_battle_strength_points: 5}, {extra_max_hp: '10 + avatar.weapon_proficiency'}]"
+    effect = load_effect_from_str(raw)
+
+    assert effect == [
+        {"when": "avatar.weapon is None", "extra_battle_strength_points": 5},
+        {"extra_max_hp": "10 + avatar.weapon_proficiency"},
+    ]
+    assert _CODE_REGISTRY["avatar.weapon is None"] is not None
+    assert _CODE_REGISTRY["10 + avatar.weapon_proficiency"] is not None
+
+    # 重复解析返回独立对象，避免配表之间共享可变状态
+    again = load_effect_from_str(raw)
+    assert again == effect and again is not effect
+
+
+def test_compile_expression_is_shared_and_tolerates_syntax_errors():
+    assert compile_expression("avatar.hp > 0") is compile_expression("avatar.hp > 0")
+    assert compile_expression("avatar.(") is None
+
+
+def test_conditions_use_compiled_code():
+    avatar = SimpleNamespace(weapon=None, personas=[SimpleNamespace(key="A")])
+    effect = [
+        {"when": "avatar.weapon is None", "extra_battle_strength_points": 5},
+        # 推导式需要在 globals 中访问 avatar
+        {"when": "any(p.key == 'A' for p in avatar.personas)", "extra_max_hp": 3},
+        {"when": "avatar.(", "extra_max_lifespan": 10},
+        {"when": "avatar.missing.attr", "extra_move_step": 1},
+    ]
+    assert _evaluate_conditional_effect(effect, avatar) == {
+        "extra_battle_strength_points": 5,
+        "extra_max_hp": 3,
+    }
+
+
+def test_dynamic_values_are_evaluated(dummy_avatar):
+    dummy_avatar.weapon_proficiency = 50.0
+    dummy_avatar.temporary_effects = [{
+        "source": "test",
+        "effects": {
+            "extra_battle_strength_points": "eval(1 + avatar.weapon_proficiency * 0.02)",
+            "extra_max_hp": "avatar.(",
+        },
+        "start_month": int(dummy_avatar.world.month_stamp),
+        "duration": 1,
+    }]
+    # 临时效果最后收集
+    _, evaluated = dummy_avatar.get_effect_breakdown()[-1]
+    assert evaluated["extra_battle_strength_points"] == 2.0
+    # 语法错误的表达式保留原值
+    assert evaluated["extra_max_hp"] == "avatar.("
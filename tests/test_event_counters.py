@@ -0,0 +1,173 @@
+"""
+Tests for the per-avatar event counters maintained by EventManager.
+"""
+
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from src.classes.calendar import Month, Year, create_month_stamp
+from src.classes.event import Event
+from src.classes.event_index import RecentEventIndex
+from src.classes.event_manager import EventManager
+from src.classes.event_sink import EventWriteBehind
+from src.classes.event_storage import EventStorage
+from src.classes.nickname import can_get_nickname
+
+
+MONTH = create_month_stamp(Year(100), Month.JANUARY)
+
+
+def make_events():
+    return [
+        Event(MONTH, "大事", related_avatars=["a", "b"], is_major=True),
+        Event(MONTH, "大事故事", related_avatars=["a"], is_major=True, is_story=True),
+        Event(MONTH, "小事", related_avatars=["a", "a"]),
+        Event(MONTH, "无关"),
+    ]
+
+
+@pytest.fixture
+def temp_db_path():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir) / "events.db"
+
+
+def assert_counts(manager):
+    a = manager.get_avatar_event_counts("a")
+    assert (a.major, a.minor, a.story) == (1, 2, 1)
+    b = manager.get_avatar_event_counts("b")
+    assert (b.major, b.minor, b.story) == (1, 0, 0)
+    assert manager.get_avatar_event_counts("nobody").major == 0
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_counts_match_queries_and_survive_reopen(temp_db_path, write_behind):
+    manager = EventManager.create_with_db(temp_db_path, write_behind=write_behind)
+    manager.add_event(make_events()[0])
+    manager.add_events(make_events()[1:])
+    assert_counts(manager)
+    assert len(manager.get_major_events_by_avatar("a")) == 1
+    assert len(manager.get_minor_events_by_avatar("a")) == 2
+    manager.close()
+
+    reopened = EventManager.create_with_db(temp_db_path)
+    assert_counts(reopened)
+    reopened.close()
+
+
+def test_memory_mode_and_cleanup_resync():
+    manager = EventManager.create_in_memory()
+    for event in make_events():
+        manager.add_event(event)
+    assert_counts(manager)
+    manager.cleanup()
+    assert manager.get_avatar_event_counts("a").minor == 0
+
+
+class GatedStorage(EventStorage):
+    """写入前等待 gate，让事件停留在写入队列中。"""
+
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self.gate = threading.Event()
+
+    def add_events(self, events):
+        self.gate.wait(timeout=5)
+        return super().add_events(events)
+
+
+def test_rebuild_counts_pending_events_once(temp_db_path):
+    writer = GatedStorage(temp_db_path)
+    sink = EventWriteBehind(writer)
+    manager = EventManager(EventStorage(temp_db_path), sink)
+    manager.add_events(make_events())
+
+    # 事件仍在队列中：重建不等待写入线程，直接把它们计入
+    manager.rebuild_avatar_event_counts()
+    assert_counts(manager)
+    assert len(sink.pending_events()) == len(make_events())
+
+    # 统计期间写入线程提交了快照中的事件：不能重计
+    storage = manager._storage
+    count_committed = storage.count_events_by_avatar
+
+    def commit_then_count(*args, **kwargs):
+        writer.gate.set()
+        assert sink.flush(timeout=5)
+        return count_committed(*args, **kwargs)
+
+    with patch.object(storage, "count_events_by_avatar", side_effect=commit_then_count):
+        manager.rebuild_avatar_event_counts()
+    assert_counts(manager)
+    manager.rebuild_avatar_event_counts()
+    assert_counts(manager)
+    manager.close()
+
+
+def test_rebuild_does_not_block_writers_while_querying(temp_db_path):
+    writer = GatedStorage(temp_db_path)
+    sink = EventWriteBehind(writer)
+    manager = EventManager(EventStorage(temp_db_path), sink)
+    manager.add_events(make_events()[:1])
+    storage = manager._storage
+    count_committed = storage.count_events_by_avatar
+    late = Event(MONTH, "统计期间的小事", related_avatars=["b"])
+
+    def add_and_commit_then_count(*args, **kwargs):
+        # 另一线程（事件循环）在查库期间写入，不应被锁住；新事件随后落盘
+        adder = threading.Thread(target=manager.add_event, args=(late,))
+        adder.start()
+        adder.join(timeout=2)
+        assert not adder.is_alive()
+        writer.gate.set()
+        assert sink.flush(timeout=5)
+        return count_committed(*args, **kwargs)
+
+    with patch.object(storage, "count_events_by_avatar", side_effect=add_and_commit_then_count):
+        manager.rebuild_avatar_event_counts()
+    b = manager.get_avatar_event_counts("b")
+    assert (b.major, b.minor) == (1, 1)
+    manager.rebuild_avatar_event_counts()
+    assert manager.get_avatar_event_counts("b").minor == 1
+    manager.close()
+
+
+def test_rebuild_recent_index_does_not_flush(temp_db_path):
+    writer = GatedStorage(temp_db_path)
+    sink = EventWriteBehind(writer)
+    manager = EventManager(EventStorage(temp_db_path), sink, RecentEventIndex(capacity=8))
+    manager.add_events(make_events())
+    manager.rebuild_recent_index()
+    assert len(sink.pending_events()) == len(make_events())
+    assert len(manager.get_minor_events_by_avatar("a")) == 2
+    writer.gate.set()
+    manager.close()
+
+
+def test_cleanup_keeps_counts_in_sync_with_db(temp_db_path):
+    manager = EventManager.create_with_db(temp_db_path)
+    manager.add_events(make_events())
+    manager.cleanup(keep_major=True)
+    a = manager.get_avatar_event_counts("a")
+    assert (a.major, a.minor) == (len(manager.get_major_events_by_avatar("a")),
+                                   len(manager.get_minor_events_by_avatar("a")))
+    assert a.major == 1
+    manager.close()
+
+
+def test_can_get_nickname_does_not_query_events(temp_db_path):
+    manager = EventManager.create_with_db(temp_db_path)
+    events = [Event(MONTH, f"大事{i}", related_avatars=["a"], is_major=True) for i in range(20)]
+    events += [Event(MONTH, f"小事{i}", related_avatars=["a"]) for i in range(50)]
+    manager.add_events(events)
+    avatar = SimpleNamespace(id="a", nickname=None, world=SimpleNamespace(event_manager=manager))
+    with patch.object(manager._storage, "get_events", side_effect=AssertionError("queried")):
+        assert can_get_nickname(avatar)
+        avatar.id = "b"
+        assert not can_get_nickname(avatar)
+    manager.close()
@@ -0,0 +1,121 @@
+"""
+Tests for the in-memory recent-event index (per avatar / per avatar pair).
+"""
+
+import random
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.classes.calendar import MonthStamp
+from src.classes.event import Event
+from src.classes.event_index import RecentEventIndex
+from src.classes.event_manager import EventManager
+from src.classes.event_storage import EventStorage
+
+
+AVATARS = ["a", "b", "c", "d", "e"]
+QUERIES = [
+    ("get_events_by_avatar", "get_events_by_avatar", 1),
+    ("get_major_events_by_avatar", "get_major_events_by_avatar", 1),
+    ("get_minor_events_by_avatar", "get_minor_events_by_avatar", 1),
+    ("get_events_between", "get_events_between", 2),
+    ("get_major_events_between", "get_major_events_between", 2),
+    ("get_minor_events_between", "get_minor_events_between", 2),
+]
+
+
+@pytest.fixture
+def temp_db_path():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir) / "events.db"
+
+
+def random_events(rng, count, month_start=0):
+    events = []
+    for i in range(count):
+        # 偶尔写入较早月份的事件，覆盖乱序插入。
+        month = month_start + i // 3 - (rng.random() < 0.1) * rng.randint(1, 5)
+        events.append(Event(
+            MonthStamp(max(0, month)),
+            f"事件{month_start}-{i}",
+            related_avatars=rng.sample(AVATARS, rng.choice([1, 1, 2, 2, 3])),
+            is_major=rng.random() < 0.3,
+            is_story=rng.random() < 0.15,
+        ))
+    return events
+
+
+def make_manager(db_path, capacity=4, max_keys=6, write_behind=False):
+    manager = EventManager.create_with_db(db_path, write_behind=write_behind)
+    manager._recent = RecentEventIndex(capacity=capacity, max_keys=max_keys)
+    manager.rebuild_recent_index()
+    return manager
+
+
+def assert_matches_db(manager, db_path, rng):
+    manager.flush()
+    storage = EventStorage(db_path)
+    try:
+        for _ in range(60):
+            name, storage_name, arity = rng.choice(QUERIES)
+            ids = rng.sample(AVATARS, arity)
+            limit = rng.randint(0, 7)
+            got = getattr(manager, name)(*ids, limit=limit)
+            expected = getattr(storage, storage_name)(*ids, limit=limit)
+            assert [e.id for e in got] == [e.id for e in expected], (name, ids, limit)
+    finally:
+        storage.close()
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_index_matches_database(temp_db_path, write_behind):
+    rng = random.Random(7)
+    manager = make_manager(temp_db_path, write_behind=write_behind)
+    for batch in range(6):
+        events = random_events(rng, 25, month_start=batch * 10)
+        manager.add_events(events[:20])
+        for event in events[20:]:
+            manager.add_event(event)
+        assert_matches_db(manager, temp_db_path, rng)
+    assert len(manager._recent) <= 6
+    manager.close()
+
+    reopened = make_manager(temp_db_path, capacity=4, max_keys=100)
+    assert_matches_db(reopened, temp_db_path, rng)
+    reopened.add_events(random_events(rng, 30, month_start=100))
+    assert_matches_db(reopened, temp_db_path, rng)
+    reopened.close()
+
+
+def test_cleanup_keeps_index_consistent(temp_db_path):
+    rng = random.Random(11)
+    manager = make_manager(temp_db_path, max_keys=100)
+    manager.add_events(random_events(rng, 60))
+    manager.get_minor_events_by_avatar("a", limit=3)
+    manager.cleanup(keep_major=True)
+    assert manager.get_minor_events_by_avatar("a", limit=3) == []
+    assert_matches_db(manager, temp_db_path, rng)
+    manager.close()
+
+
+def test_hits_do_not_touch_database(temp_db_path):
+    manager = make_manager(temp_db_path, capacity=8, max_keys=100)
+    manager.add_events(random_events(random.Random(3), 40))
+    expected = {name: getattr(manager, name)(*AVATARS[:arity], limit=8) for name, _, arity in QUERIES}
+    failing = {
+        storage_name: patch.object(manager._storage, storage_name, side_effect=AssertionError("queried"))
+        for _, storage_name, _ in QUERIES
+    }
+    for p in failing.values():
+        p.start()
+    try:
+        for name, _, arity in QUERIES:
+            assert getattr(manager, name)(*AVATARS[:arity], limit=8) == expected[name]
+        assert manager.get_events_between("b", "a", limit=5) == expected["get_events_between"][-5:]
+    finally:
+        for p in failing.values():
+            p.stop()
+    manager.close()
@@ -0,0 +1,188 @@
+"""
+Tests for the write-behind event sink and EventManager read-your-writes.
+"""
+
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.classes.calendar import Month, Year, create_month_stamp
+from src.classes.event import Event
+from src.classes.event_manager import EventManager
+from src.classes.event_sink import EventWriteBehind
+from src.classes.event_storage import EventStorage
+
+
+@pytest.fixture
+def temp_db_path():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir) / "events.db"
+
+
+def make_event(month: int, content: str, avatar_ids=None, is_major=False) -> Event:
+    return Event(
+        month_stamp=create_month_stamp(Year(100), Month(month)),
+        content=content,
+        related_avatars=avatar_ids,
+        is_major=is_major,
+    )
+
+
+class GatedStorage(EventStorage):
+    """写入前等待 gate，用于模拟写入线程落后于模拟。"""
+
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self.gate = threading.Event()
+
+    def add_events(self, events):
+        self.gate.wait(timeout=5)
+        return super().add_events(events)
+
+
+@pytest.fixture
+def gated_manager(temp_db_path):
+    writer = GatedStorage(temp_db_path)
+    manager = EventManager(EventStorage(temp_db_path), EventWriteBehind(writer))
+    yield manager, writer
+    writer.gate.set()
+    manager.close()
+
+
+def test_events_are_written_in_background(temp_db_path):
+    manager = EventManager.create_with_db(temp_db_path, write_behind=True)
+    manager.add_events([make_event(1, f"E{i}", ["a1"]) for i in range(50)])
+    manager.add_event(make_event(2, "last", ["a1"]))
+
+    manager.flush()
+    assert manager._storage.count() == 51
+    manager.close()
+
+    reopened = EventStorage(temp_db_path)
+    assert reopened.count() == 51
+    reopened.close()
+
+
+def test_reads_include_pending_events(gated_manager):
+    manager, writer = gated_manager
+    manager.add_events([
+        make_event(1, "old major", ["a1", "a2"], is_major=True),
+        make_event(1, "old minor", ["a1"]),
+    ])
+    writer.gate.set()
+    manager.flush()
+    writer.gate.clear()
+
+    manager.add_events([
+        make_event(2, "new major", ["a1", "a2"], is_major=True),
+        make_event(2, "new minor", ["a2"]),
+    ])
+    assert manager._sink.pending_count() == 2
+    assert manager._storage.count() == 2
+
+    assert [e.content for e in manager.get_recent_events(limit=3)] == ["old minor", "new major", "new minor"]
+    assert [e.content for e in manager.get_events_by_avatar("a1")] == ["old major", "old minor", "new major"]
+    assert [e.content for e in manager.get_major_events_between("a1", "a2")] == ["old major", "new major"]
+    assert [e.content for e in manager.get_minor_events_by_avatar("a2")] == ["new minor"]
+    assert [e.content for e in manager.get_events_between("a1", "a2", limit=1)] == ["new major"]
+
+
+def test_count_and_pagination_flush_first(gated_manager):
+    manager, writer = gated_manager
+    manager.add_events([make_event(1, f"E{i}") for i in range(3)])
+    threading.Timer(0.05, writer.gate.set).start()
+
+    assert manager.count() == 3
+    events, _, has_more = manager.get_events_paginated(limit=10)
+    assert [e.content for e in events] == ["E2", "E1", "E0"]
+    assert has_more is False
+
+
+def test_backpressure_blocks_producer(temp_db_path):
+    writer = GatedStorage(temp_db_path)
+    sink = EventWriteBehind(writer, max_pending=2, batch_size=2)
+    sink.submit([make_event(1, "a"), make_event(1, "b")])
+
+    done = threading.Event()
+
+    def produce():
+        sink.submit([make_event(1, "c")])
+        done.set()
+
+    threading.Thread(target=produce, daemon=True).start()
+    assert not done.wait(timeout=0.1)
+
+    writer.gate.set()
+    assert done.wait(timeout=5)
+    assert sink.flush(timeout=5)
+    sink.close()
+
+
+def test_close_drains_queue_and_rejects_new_events(temp_db_path):
+    sink = EventWriteBehind(EventStorage(temp_db_path))
+    sink.submit([make_event(1, f"E{i}") for i in range(10)])
+    sink.close()
+
+    with pytest.raises(RuntimeError):
+        sink.submit([make_event(1, "late")])
+
+    reopened = EventStorage(temp_db_path)
+    assert reopened.count() == 10
+    reopened.close()
+
+
+async def test_full_queue_does_not_block_the_event_loop(temp_db_path):
+    import asyncio
+
+    writer = GatedStorage(temp_db_path)
+    manager = EventManager(EventStorage(temp_db_path), EventWriteBehind(writer, max_pending=2, batch_size=2))
+    try:
+        manager.add_events([make_event(1, "a"), make_event(1, "b")])
+        # 队列已满：事件循环上的写入立即返回（暂时超过上限），不等待磁盘
+        manager.add_events([make_event(1, "c")])
+        assert manager._sink.pending_count() == 3
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        threading.Timer(0.1, writer.gate.set).start()
+        assert await manager.wait_for_write_capacity()
+        task.cancel()
+        # 等待期间事件循环仍在运行
+        assert ticks >= 3
+        assert manager.flush()
+        assert manager._storage.count() == 3
+    finally:
+        writer.gate.set()
+        manager.close()
+
+
+class _WriterCrash(BaseException):
+    pass
+
+
+class CrashingStorage(EventStorage):
+    def add_events(self, events):
+        raise _WriterCrash()
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_flush_fails_fast_when_writer_thread_died(temp_db_path):
+    sink = EventWriteBehind(CrashingStorage(temp_db_path))
+    sink.submit([make_event(1, "a")])
+    sink._thread.join(timeout=5)
+    assert not sink.is_alive()
+
+    manager = EventManager(EventStorage(temp_db_path), sink)
+    assert manager.flush(timeout=30) is False
+    with pytest.raises(RuntimeError):
+        sink.submit([make_event(1, "b")])
+    manager._storage.close()
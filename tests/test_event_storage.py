@@ -406,6 +406,122 @@ class TestEventStorageCursorParsing:
         assert cursor == "1200_42"
 
 
+class TestEventStorageBatch:
+    """Batched (single-transaction) writes and journal settings."""
+
+    def test_add_events_writes_batch(self, event_storage):
+        events = [
+            make_event(100, 1, "E1", ["a1", "a2"]),
+            make_event(100, 1, "E2", ["a1"]),
+            make_event(100, 1, "World event", None),
+        ]
+
+        assert event_storage.add_events(events) == 3
+        assert event_storage.count() == 3
+        assert [e.content for e in event_storage.get_events_by_avatar("a1")] == ["E1", "E2"]
+        assert [e.content for e in event_storage.get_events_between("a1", "a2")] == ["E1"]
+
+    def test_add_events_empty(self, event_storage):
+        assert event_storage.add_events([]) == 0
+        assert event_storage.count() == 0
+
+    def test_add_events_drops_only_the_failing_event(self, event_storage):
+        good = make_event(100, 1, "Good", ["a1"])
+        bad = make_event(100, 1, "Bad", ["a1"])
+        bad.content = None  # 违反 NOT NULL 约束
+
+        assert event_storage.add_events([good, bad]) == 1
+        assert [e.content for e in event_storage.get_events_by_avatar("a1")] == ["Good"]
+
+    def test_add_events_logs_row_conversion_errors(self, event_storage):
+        good = make_event(100, 1, "Good", ["a1"])
+        bad = make_event(100, 1, "Bad", ["a1"])
+        bad.month_stamp = "not a month"
+
+        assert event_storage.add_events([bad, good]) == 1
+        assert event_storage.add_event(bad) is False
+        assert event_storage.count() == 1
+
+    def test_wal_and_synchronous(self, temp_db_path):
+        storage = EventStorage(temp_db_path, synchronous="full")
+        try:
+            assert storage._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            # FULL == 2
+            assert storage._conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+        finally:
+            storage.close()
+
+    def test_invalid_synchronous_rejected(self, temp_db_path):
+        with pytest.raises(ValueError):
+            EventStorage(temp_db_path, synchronous="sometimes")
+
+    def test_checkpoint_makes_copy_complete(self, event_storage, temp_db_path):
+        """checkpoint 之后单独复制主库文件即可得到全部事件。"""
+        import shutil
+
+        event_storage.add_events([make_event(100, 1, f"E{i}", ["a1"]) for i in range(5)])
+        event_storage.checkpoint()
+
+        copy_path = temp_db_path.with_name("copy.db")
+        shutil.copy2(temp_db_path, copy_path)
+        copied = EventStorage(copy_path)
+        try:
+            assert copied.count() == 5
+        finally:
+            copied.close()
+
+
+class TestEventStorageReadPath:
+    """Related avatars are loaded in bulk, not per row."""
+
+    @staticmethod
+    def _count_statements(storage):
+        statements = []
+        storage._conn.set_trace_callback(statements.append)
+        return statements
+
+    def test_related_avatars_loaded_in_one_query(self, event_storage):
+        event_storage.add_events([
+            make_event(100, i % 12 + 1, f"E{i}", ["a1", f"b{i}"], is_major=bool(i % 2))
+            for i in range(30)
+        ])
+
+        queries = [
+            lambda: event_storage.get_events(avatar_id="a1", limit=20),
+            lambda: event_storage.get_major_events_by_avatar("a1", limit=20),
+            lambda: event_storage.get_minor_events_between("a1", "b2", limit=20),
+        ]
+        for query in queries:
+            statements = self._count_statements(event_storage)
+            query()
+            event_storage._conn.set_trace_callback(None)
+            assert len(statements) == 2
+
+        events, _ = event_storage.get_events(avatar_id="a1", limit=20)
+        assert all(e.related_avatars[0] == "a1" and len(e.related_avatars) == 2 for e in events)
+
+    def test_related_avatars_keep_insertion_order(self, event_storage):
+        event_storage.add_event(make_event(100, 1, "Ordered", ["z", "a", "m"]))
+
+        (event,) = event_storage.get_minor_events_by_avatar("a")
+        assert event.related_avatars == ["z", "a", "m"]
+
+    def test_same_month_ordered_by_insertion(self, event_storage):
+        event_storage.add_events([make_event(100, 3, f"E{i}", ["a1"], is_major=True) for i in range(5)])
+
+        contents = [e.content for e in event_storage.get_major_events_by_avatar("a1", limit=3)]
+        assert contents == ["E2", "E3", "E4"]
+
+    def test_pagination_uses_ordering_index(self, event_storage):
+        plan = event_storage._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT rowid FROM events e "
+            "ORDER BY e.month_stamp DESC, e.rowid DESC LIMIT 10"
+        ).fetchall()
+        details = " ".join(row[3] for row in plan)
+        assert "idx_events_month_rowid" in details
+        assert "TEMP B-TREE" not in details
+
+
 # --- EventManager Tests ---
 
 class TestEventManagerWithStorage:
@@ -419,6 +535,12 @@ class TestEventManagerWithStorage:
 
         assert event_manager.count() == 1
 
+    def test_add_events_filters_null(self, event_manager):
+        """Test batched add skips NULL_EVENT."""
+        event_manager.add_events([make_event(100, 5, "A", ["a1"]), NULL_EVENT, make_event(100, 5, "B", ["a1"])])
+
+        assert event_manager.count() == 2
+
     def test_add_null_event_ignored(self, event_manager):
         """Test that NULL_EVENT is ignored."""
         event_manager.add_event(NULL_EVENT)
@@ -0,0 +1,61 @@
+"""
+Tests for the headless batch runner and the offline LLM backend.
+"""
+
+from src.run.headless import run_headless
+from src.utils.llm import call_llm_with_task_name, set_offline_backend
+from src.utils.llm.offline import StubLLMBackend
+from src.utils.config import CONFIG
+
+
+async def test_offline_backend_replaces_network_calls():
+    backend = StubLLMBackend(seed=1)
+    set_offline_backend(backend)
+    try:
+        res = await call_llm_with_task_name(
+            "action_decision",
+            CONFIG.paths.templates / "ai_batch.txt",
+            {"avatar_names": "甲, 乙", "avatar_infos": {}, "world_info": "", "general_action_infos": ""},
+        )
+    finally:
+        set_offline_backend(None)
+
+    assert set(res) == {"甲", "乙"}
+    assert res["甲"]["action_name_params_pairs"]
+    assert backend.calls["action_decision"] == 1
+
+
+def test_stub_decisions_are_seeded_per_avatar():
+    a, b = StubLLMBackend(seed=7), StubLLMBackend(seed=7)
+    # 调用顺序不同，同一角色的决策序列相同
+    first = [a._decision("甲"), a._decision("乙"), a._decision("甲")]
+    second = [b._decision("乙"), b._decision("甲"), b._decision("甲")]
+    assert first[0] == second[1] and first[2] == second[2] and first[1] == second[0]
+    assert StubLLMBackend(seed=8)._decision("甲") != first[0]
+
+
+async def test_headless_run_is_reproducible():
+    first = await run_headless(months=3, avatars=12, seed=5, sects=2)
+    second = await run_headless(months=3, avatars=12, seed=5, sects=2)
+
+    assert first.months == 3
+    assert first.events > 0
+    assert first.digest == second.digest
+    assert first.llm_calls["action_decision"] > 0
+    assert "decide_actions" in first.phase_seconds
+    assert first.months_per_second > 0
+
+
+async def test_headless_writes_events_to_sqlite(tmp_path):
+    from src.classes.event_storage import EventStorage
+
+    db_path = tmp_path / "events.db"
+    report = await run_headless(months=3, avatars=12, seed=5, sects=2, events_db=str(db_path))
+    in_memory = await run_headless(months=3, avatars=12, seed=5, sects=2, memory_events=True)
+
+    storage = EventStorage(db_path)
+    try:
+        assert storage.count() == report.events
+    finally:
+        storage.close()
+    assert report.digest == in_memory.digest
@@ -0,0 +1,182 @@
+"""
+Tests for per-phase step instrumentation, LLM task stats and step profiling.
+"""
+
+import asyncio
+import csv
+import json
+
+import pytest
+from unittest.mock import patch
+
+from src.sim.instrumentation import (
+    CsvStepSink,
+    JsonlStepSink,
+    PhaseRecord,
+    PhaseStats,
+    StepProfiler,
+    StepRecord,
+    StepRecorder,
+)
+from src.sim.simulator import Simulator
+from src.utils.llm.stats import get_llm_stats, record_call, record_usage, reset_llm_stats, task_scope
+
+
+def make_record(month_stamp=0, wall=0.01):
+    return StepRecord(
+        month_stamp=month_stamp,
+        wall=wall,
+        phases=[PhaseRecord("decide_actions", wall=wall, cpu=wall / 4, events=0),
+                PhaseRecord("execute_actions", wall=wall / 2, cpu=wall / 2, events=3)],
+    )
+
+
+async def test_recorder_separates_await_from_cpu():
+    recorder = StepRecorder(month_stamp=7)
+
+    async def waiting():
+        await asyncio.sleep(0.05)
+        return ["a", "b"]
+
+    def busy():
+        return [1]
+
+    assert await recorder.run("waiting", waiting) == ["a", "b"]
+    assert await recorder.run("busy", busy) == [1]
+    record = recorder.finish(events=3)
+
+    waiting_rec, busy_rec = record.phases
+    assert waiting_rec.events == 2 and busy_rec.events == 1
+    assert waiting_rec.wall >= 0.05
+    assert waiting_rec.await_time >= 0.04
+    assert record.month_stamp == 7 and record.events == 3
+
+
+async def test_recorder_reports_llm_delta_per_task():
+    reset_llm_stats()
+    with task_scope("action_decision"):
+        record_call(100, 0.1)
+    recorder = StepRecorder(month_stamp=0)
+    with task_scope("action_decision"):
+        record_call(100, 0.1)
+        record_usage({"prompt_tokens": 40, "completion_tokens": 5})
+    with task_scope("nickname"):
+        record_call(10, 0.1, ok=False)
+    record = recorder.finish(events=0)
+
+    assert record.llm == {
+        "action_decision": {"calls": 1, "prompt_tokens": 40, "completion_tokens": 5},
+        "nickname": {"calls": 1, "prompt_tokens": 0, "completion_tokens": 0},
+    }
+    stats = get_llm_stats()
+    assert stats["action_decision"]["calls"] == 2
+    assert stats["nickname"]["errors"] == 1
+    reset_llm_stats()
+
+
+def test_phase_stats_window_and_totals():
+    stats = PhaseStats(window=2)
+    for i in range(3):
+        stats.on_step(make_record(i))
+
+    summary = stats.summary()
+    assert summary["steps"] == 3
+    assert summary["window"] == 2
+    assert summary["phases"]["decide_actions"]["wall_ms"] == pytest.approx(10.0)
+    assert summary["phases"]["decide_actions"]["await_ms"] == pytest.approx(7.5)
+    assert summary["totals"]["execute_actions"]["events"] == 9
+    assert summary["last_step"]["month_stamp"] == 2
+
+
+def test_jsonl_sink_rotates(tmp_path):
+    path = tmp_path / "steps.jsonl"
+    sink = JsonlStepSink(path, max_bytes=200, backups=2)
+    for i in range(10):
+        sink.on_step(make_record(i))
+
+    assert path.exists()
+    assert (tmp_path / "steps.jsonl.1").exists()
+    assert (tmp_path / "steps.jsonl.2").exists()
+    assert not (tmp_path / "steps.jsonl.3").exists()
+    first = json.loads(path.read_text(encoding="utf-8").splitlines()[0])
+    assert first["phases"][0]["name"] == "decide_actions"
+    assert "await" in first["phases"][0]
+
+
+def test_csv_sink_writes_header_per_file(tmp_path):
+    path = tmp_path / "steps.csv"
+    sink = CsvStepSink(path)
+    sink.on_step(make_record(0))
+    sink.on_step(make_record(1))
+
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(CsvStepSink.COLUMNS)
+    assert len(rows) == 1 + 4
+    assert rows[-1][:2] == ["1", "execute_actions"]
+
+
+def test_profiler_rejects_unknown_kind(tmp_path):
+    with pytest.raises(ValueError):
+        StepProfiler("perf", tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_simulator_records_all_phases(base_world, dummy_avatar, mock_llm_managers):
+    base_world.avatar_manager.avatars[dummy_avatar.id] = dummy_avatar
+    sim = Simulator(base_world)
+    sim.instruments = []
+    stats = PhaseStats()
+    sim.add_instrument(stats)
+
+    await sim.step()
+
+    record = stats.summary()["last_step"]
+    names = [phase["name"] for phase in record["phases"]]
+    assert names[0] == "update_perception_and_knowledge"
+    assert names[-1] == "finalize"
+    assert names.count("handle_interactions") == 2
+    assert {"decide_actions", "request_nicknames", "long_term_objective_thinking"} <= set(names)
+    assert record["wall"] >= sum(phase["wall"] for phase in record["phases"]) * 0.99
+
+
+@pytest.mark.asyncio
+async def test_simulator_profiles_single_step(base_world, dummy_avatar, mock_llm_managers, tmp_path):
+    base_world.avatar_manager.avatars[dummy_avatar.id] = dummy_avatar
+    sim = Simulator(base_world)
+
+    with patch("src.sim.simulator.CONFIG.instrumentation.profile_dir", str(tmp_path)):
+        sim.request_profile("cprofile")
+    await sim.step()
+
+    assert sim.last_profile_path is not None
+    assert sim.last_profile_path.exists()
+    assert sim.last_profile_path.with_suffix(".txt").exists()
+
+    # 只剖析一次
+    sim.last_profile_path = None
+    await sim.step()
+    assert sim.last_profile_path is None
+
+
+def test_debug_endpoints():
+    from fastapi.testclient import TestClient
+    from src.server.main import app, game_instance
+
+    client = TestClient(app)
+    data = client.get("/api/debug/sim-stats").json()
+    assert "phases" in data and "llm" in data
+
+    class FakeSim:
+        def request_profile(self, kind):
+            if kind != "cprofile":
+                raise ValueError("bad profiler")
+            self.kind = kind
+
+    fake = FakeSim()
+    with patch.dict(game_instance, {"sim": fake}):
+        assert client.post("/api/debug/profile-step", json={"profiler": "cprofile"}).status_code == 200
+        assert fake.kind == "cprofile"
+        assert client.post("/api/debug/profile-step", json={"profiler": "nope"}).status_code == 400
+    with patch.dict(game_instance, {"sim": None}):
+        assert client.post("/api/debug/profile-step", json={}).status_code == 503
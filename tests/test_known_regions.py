@@ -207,5 +207,74 @@ class TestInitKnownRegions:
         )
 
 
+class TestPerceptionPhase:
+    """测试 Simulator._phase_update_perception_and_knowledge 的覆盖缓存"""
+
+    def _make_avatar(self, world, x, y):
+        avatar = Avatar(
+            world=world,
+            name="感知测试",
+            id=get_avatar_id(),
+            birth_month_stamp=create_month_stamp(Year(2000), Month.JANUARY),
+            age=Age(20, Realm.Qi_Refinement),
+            gender=Gender.MALE,
+            pos_x=x,
+            pos_y=y,
+            root=Root.GOLD,
+            alignment=Alignment.RIGHTEOUS,
+            sect=None
+        )
+        world.avatar_manager.register_avatar(avatar)
+        return avatar
+
+    def test_regions_in_radius_matches_tile_walk(self, world_with_sect_region):
+        world, _, sect_region = world_with_sect_region
+        game_map = world.map
+
+        assert game_map.get_regions_in_radius(3, 3, 4) == (sect_region,)
+        assert game_map.get_regions_in_radius(3, 3, 3) == ()
+        # 越界坐标被忽略
+        assert game_map.get_regions_in_radius(9, 9, 8) == (sect_region,)
+
+    def test_moving_avatar_learns_regions(self, world_with_sect_region):
+        from src.sim.simulator import Simulator
+
+        world, _, sect_region = world_with_sect_region
+        avatar = self._make_avatar(world, 0, 0)
+        sim = Simulator(world)
+
+        sim._phase_update_perception_and_knowledge()
+        assert sect_region.id not in avatar.known_regions
+
+        avatar.pos_x, avatar.pos_y = 4, 4
+        sim._phase_update_perception_and_knowledge()
+        assert sect_region.id in avatar.known_regions
+
+    def test_unmoved_avatar_skips_scan(self, world_with_normal_region):
+        from src.sim.simulator import Simulator
+        from src.classes.region import CultivateRegion
+
+        world, normal_region = world_with_normal_region
+        cave = CultivateRegion(id=201, name="测试洞府", desc="", cors=[(1, 1)])
+        world.map.regions[cave.id] = cave
+        world.map.get_tile(1, 1).region = cave
+        avatar = self._make_avatar(world, 1, 1)
+        sim = Simulator(world)
+
+        events = sim._phase_update_perception_and_knowledge()
+        assert cave.host_avatar is avatar
+        assert len(events) == 1
+        assert {normal_region.id, cave.id} <= avatar.known_regions
+
+        # 位置未变且已有洞府：不再扫描
+        world.map.get_regions_in_radius = MagicMock(side_effect=AssertionError("should not rescan"))
+        assert sim._phase_update_perception_and_knowledge() == []
+
+        # 一旦移动，重新扫描
+        world.map.get_regions_in_radius = MagicMock(return_value=())
+        avatar.pos_x = 2
+        sim._phase_update_perception_and_knowledge()
+        world.map.get_regions_in_radius.assert_called_once()
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,165 @@
+"""
+Tests for streaming save loading and lazy (dormant) dead avatars.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from src.classes.age import Age
+from src.classes.avatar import Avatar, Gender
+from src.classes.calendar import Month, Year, create_month_stamp
+from src.classes.cultivation import Realm
+from src.classes.map import Map
+from src.classes.relation import Relation
+from src.classes.tile import TileType
+from src.classes.world import World
+from src.sim.load.load_game import load_game
+from src.sim.load.save_stream import stream_save
+from src.sim.save.save_game import save_game
+from src.sim.save.save_journal import get_journal_path
+from src.sim.simulator import Simulator
+from src.utils.config import CONFIG
+from src.utils.id_generator import get_avatar_id
+
+
+def create_test_map():
+    m = Map(width=10, height=10)
+    for x in range(10):
+        for y in range(10):
+            m.create_tile(x, y, TileType.PLAIN)
+    return m
+
+
+def add_avatar(world, name, dead=False):
+    avatar = Avatar(
+        world=world,
+        name=name,
+        id=get_avatar_id(),
+        birth_month_stamp=create_month_stamp(Year(80), Month.JANUARY),
+        age=Age(20, Realm.Qi_Refinement),
+        gender=Gender.MALE,
+    )
+    world.avatar_manager.avatars[avatar.id] = avatar
+    if dead:
+        avatar.is_dead = True
+        world.avatar_manager.handle_death(avatar.id)
+    return avatar
+
+
+def relate(a, b, relation=Relation.FRIEND):
+    a.relations[b] = relation
+    b.relations[a] = relation
+
+
+def load(save_path):
+    with patch("src.run.load_map.load_cultivation_world_map", return_value=create_test_map()):
+        return load_game(save_path)
+
+
+@pytest.fixture
+def world():
+    w = World(map=create_test_map(), month_stamp=create_month_stamp(Year(100), Month.JANUARY))
+    yield w
+    w.event_manager.close()
+
+
+def test_stream_save_matches_json_load(tmp_path):
+    data = {
+        "meta": {"version": "1", "n": 12},
+        "avatars": [{"id": str(i), "name": "名字" * i, "x": [1.5, None, True]} for i in range(50)],
+        "events": [],
+        "simulator": {"rate": 0.01},
+    }
+    path = tmp_path / "save.json"
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    seen = []
+    before = []
+    # 很小的块，迫使每个值都跨越块边界
+    top_level = stream_save(
+        path, lambda item, raw: seen.append((item, raw)), lambda top: before.append(list(top)), chunk_size=7
+    )
+
+    assert [item for item, _ in seen] == data["avatars"]
+    assert all(json.loads(raw) == item for item, raw in seen)
+    assert before == [["meta"]]
+    assert top_level == {k: v for k, v in data.items() if k != "avatars"}
+
+
+def test_dead_avatars_stay_dormant_until_accessed(world, tmp_path):
+    alive = add_avatar(world, "Alive")
+    parent = add_avatar(world, "Parent", dead=True)
+    grandparent = add_avatar(world, "Grandparent", dead=True)
+    stranger = add_avatar(world, "Stranger", dead=True)
+    relate(alive, parent, Relation.FRIEND)
+    relate(parent, grandparent, Relation.SIBLING)
+    save_path = tmp_path / "game.json"
+    save_game(world, Simulator(world), [], save_path)
+
+    loaded_world, _, _ = load(save_path)
+    manager = loaded_world.avatar_manager
+    store = manager.dead_avatars
+    # 被存活角色引用的死者立即物化，其余休眠
+    assert not store.is_dormant(parent.id)
+    assert store.is_dormant(grandparent.id)
+    assert store.is_dormant(stranger.id)
+    assert len(store) == 3 and stranger.id in store
+
+    l_alive = manager.get_avatar(alive.id)
+    l_parent = manager.get_avatar(parent.id)
+    assert l_alive.relations[l_parent] == Relation.FRIEND
+    assert l_parent.unresolved_relations == {grandparent.id: Relation.SIBLING.value}
+
+    l_grandparent = manager.get_avatar(grandparent.id)
+    assert l_grandparent.is_dead and l_grandparent.name == "Grandparent"
+    assert l_parent.relations[l_grandparent] == Relation.SIBLING
+    assert l_grandparent.relations[l_parent] == Relation.SIBLING
+    assert l_parent.unresolved_relations == {}
+    assert store.is_dormant(stranger.id)
+    loaded_world.event_manager.close()
+
+
+def test_resave_keeps_dormant_avatars_and_relations(world, tmp_path):
+    alive = add_avatar(world, "Alive")
+    parent = add_avatar(world, "Parent", dead=True)
+    grandparent = add_avatar(world, "Grandparent", dead=True)
+    relate(alive, parent)
+    relate(parent, grandparent, Relation.SIBLING)
+    save_path = tmp_path / "game.json"
+    save_game(world, Simulator(world), [], save_path)
+
+    loaded_world, sim, sects = load(save_path)
+    resaved = tmp_path / "resaved.json"
+    with patch.object(type(alive), "from_save_dict", wraps=type(alive).from_save_dict) as spy:
+        save_game(loaded_world, sim, sects, resaved)
+        loaded_world.avatar_manager.get_avatar(alive.id).hp.cur = 7
+        save_game(loaded_world, sim, sects, resaved)
+    # 存档不物化休眠角色，差分里也没有它们
+    assert spy.call_count == 0
+    assert loaded_world.avatar_manager.dead_avatars.is_dormant(grandparent.id)
+    delta = json.loads(get_journal_path(resaved).read_text(encoding="utf-8"))
+    assert [a["id"] for a in delta["avatars"]] == [alive.id]
+    loaded_world.event_manager.close()
+
+    again, _, _ = load(resaved)
+    manager = again.avatar_manager
+    assert manager.get_avatar(alive.id).hp.cur == 7
+    l_parent = manager.get_avatar(parent.id)
+    l_grandparent = manager.get_avatar(grandparent.id)
+    assert l_parent.relations[l_grandparent] == Relation.SIBLING
+    again.event_manager.close()
+
+
+def test_eager_mode_materializes_all(world, tmp_path):
+    add_avatar(world, "Alive")
+    dead = add_avatar(world, "Dead", dead=True)
+    save_path = tmp_path / "game.json"
+    save_game(world, Simulator(world), [], save_path)
+
+    with patch.object(CONFIG.save, "lazy_dead_avatars", False):
+        loaded_world, _, _ = load(save_path)
+    assert not loaded_world.avatar_manager.dead_avatars.is_dormant(dead.id)
+    assert loaded_world.avatar_manager.dead_avatars.dormant_ids() == []
+    loaded_world.event_manager.close()
@@ -0,0 +1,113 @@
+"""
+Tests for the LLM response cache (content-addressed SQLite cache with record/replay modes).
+"""
+
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.run.headless import run_headless
+from src.utils.llm import LLMError, SQLiteResponseCache, set_response_cache
+from src.utils.llm.cache import cache_key, create_response_cache
+from src.utils.llm.client import call_llm_json
+from src.utils.llm.stats import get_llm_stats, reset_llm_stats, task_scope
+
+
+@pytest.fixture
+def use_cache():
+    caches = []
+
+    def install(mode, **kwargs):
+        cache = SQLiteResponseCache(":memory:", mode=mode, **kwargs)
+        caches.append(cache)
+        set_response_cache(cache)
+        return cache
+
+    yield install
+    set_response_cache(None)
+    for cache in caches:
+        cache.close()
+
+
+def test_cache_key_normalizes_prompt_and_includes_model():
+    assert cache_key("m", "a  \r\nb\n\n") == cache_key("m", "a\nb")
+    assert cache_key("m", "a\nb") != cache_key("m", "a\nc")
+    assert cache_key("m1", "a") != cache_key("m2", "a")
+
+
+def test_ttl_and_lru_eviction():
+    cache = SQLiteResponseCache(":memory:", mode="cache", ttl_seconds=60, max_entries=2)
+    cache.put("a", "m", "1")
+    cache.put("b", "m", "2")
+    time.sleep(0.01)
+    assert cache.get("a") == "1"  # a 成为最近使用
+    cache.put("c", "m", "3")
+    assert len(cache) == 2 and cache.evictions == 1
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+    cache.ttl_seconds = 1e-9
+    time.sleep(0.01)
+    assert cache.get("a") is None
+    assert len(cache) == 1
+    cache.close()
+
+    assert create_response_cache(None) is None
+    assert create_response_cache({"mode": "off"}) is None
+
+
+async def test_hits_skip_network_and_only_parsed_responses_are_cached(use_cache):
+    cache = use_cache("cache")
+    reset_llm_stats()
+    with patch("src.utils.llm.client.call_llm", new_callable=AsyncMock) as mock_call:
+        mock_call.side_effect = ["not json", '{"ok": 1}']
+        with task_scope("nickname"):
+            assert await call_llm_json("prompt", max_retries=1) == {"ok": 1}
+            assert await call_llm_json("prompt  \n", max_retries=1) == {"ok": 1}
+        assert mock_call.call_count == 2
+    assert cache.writes == 1 and cache.hits == 1
+    assert get_llm_stats()["nickname"]["cache_hits"] == 1
+    reset_llm_stats()
+
+
+async def test_record_overwrites_and_replay_never_calls_network(use_cache):
+    use_cache("record")
+    with patch("src.utils.llm.client.call_llm", new_callable=AsyncMock) as mock_call:
+        mock_call.side_effect = ['{"v": 1}', '{"v": 2}']
+        assert await call_llm_json("p") == {"v": 1}
+        assert await call_llm_json("p") == {"v": 2}
+
+    recorded = SQLiteResponseCache(":memory:", mode="record")
+    recorded.put(cache_key("", "p"), "", json.dumps({"v": 2}))
+    set_response_cache(recorded)
+    recorded.mode = "replay"
+    with patch("src.utils.llm.client.call_llm", new_callable=AsyncMock) as mock_call:
+        assert await call_llm_json("p") == {"v": 2}
+        with pytest.raises(LLMError):
+            await call_llm_json("other")
+        mock_call.assert_not_called()
+    set_response_cache(None)
+    recorded.close()
+
+
+async def test_headless_replay_matches_recording(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite")
+
+    async def fake_llm(prompt, mode=None):
+        return json.dumps({"prompt_chars": len(prompt)})
+
+    with patch("src.utils.llm.client.call_llm", side_effect=fake_llm) as mock_call:
+        recorded = await run_headless(months=3, avatars=8, seed=3, sects=2,
+                                      llm_cache=path, llm_cache_mode="record")
+        network_calls = mock_call.call_count
+    assert network_calls > 0
+    with patch("src.utils.llm.client.call_llm", new_callable=AsyncMock) as mock_call:
+        replayed = await run_headless(months=3, avatars=8, seed=3, sects=2,
+                                      llm_cache=path, llm_cache_mode="replay")
+        mock_call.assert_not_called()
+
+    assert replayed.digest == recorded.digest
+    # 录制时每次调用都访问网络，回放时全部由缓存命中
+    assert sum(replayed.llm_calls.values()) == network_calls
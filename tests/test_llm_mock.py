@@ -2,9 +2,11 @@ import pytest
 import json
 from unittest.mock import MagicMock, patch, AsyncMock
 from pathlib import Path
-from src.utils.llm.prompt import build_prompt
+from src.utils.llm.prompt import (
+    DYNAMIC_MARKER, build_prompt, build_prompt_parts, get_prefix_stats, load_template, reset_prefix_stats,
+)
 from src.utils.llm.parser import parse_json
-from src.utils.llm.client import call_llm_json, call_llm, LLMMode
+from src.utils.llm.client import call_llm_json, call_llm, call_llm_with_task_name, LLMMode
 from src.utils.llm.exceptions import ParseError, LLMError
 
 # ================= Prompt Tests =================
@@ -36,6 +38,42 @@ def test_intentify_prompt_infos_formatting():
     assert '{\n  "name": "Alice",' in result
     assert '"hp": 100\n}' in result
 
+def test_build_prompt_parts_splits_at_marker():
+    template = "Rules: {rules}\n<<<DYNAMIC>>>\nAvatar: {name}"
+    prefix, suffix = build_prompt_parts(template, {"rules": "be nice", "name": "Alice"})
+    assert prefix == "Rules: be nice\n"
+    assert suffix == "Avatar: Alice"
+    # 拼接结果与没有标记行的模板一致
+    assert build_prompt(template, {"rules": "be nice", "name": "Alice"}) == "Rules: be nice\nAvatar: Alice"
+    assert build_prompt_parts("Hi {name}", {"name": "Bob"}) == ("", "Hi Bob")
+
+def test_task_templates_have_stable_prefix():
+    """主要调用点的模板前缀不应引用随角色变化的信息。"""
+    from src.utils.config import CONFIG
+    for name in ["ai.txt", "ai_batch.txt", "relation_update.txt", "nickname.txt", "long_term_objective.txt"]:
+        template = load_template(CONFIG.paths.templates / name)
+        prefix = template.partition(DYNAMIC_MARKER)[0]
+        assert prefix != template, name
+        for volatile in ["{avatar_info", "{avatar_name", "{avatar_a", "{avatar_b", "{recent_events_text}"]:
+            assert volatile not in prefix, (name, volatile)
+
+@pytest.mark.asyncio
+async def test_call_llm_with_task_name_records_prefix_stats():
+    reset_prefix_stats()
+    template = "Actions: {general_action_infos}\n<<<DYNAMIC>>>\n{avatar_name}"
+    with patch("src.utils.llm.client.load_template", return_value=template), \
+         patch("src.utils.llm.client.call_llm_json", new_callable=AsyncMock) as mock_call:
+        mock_call.return_value = {}
+        for name in ["A", "B", "C"]:
+            await call_llm_with_task_name("action_decision", "ai.txt", {"general_action_infos": "x", "avatar_name": name})
+
+    assert mock_call.call_args[0][0] == 'Actions: "x"\nC'
+    stats = get_prefix_stats()["action_decision"]
+    assert stats["calls"] == 3
+    assert stats["distinct_prefixes"] == 1
+    assert stats["reusable_calls"] == 2
+    reset_prefix_stats()
+
 # ================= Parser Tests =================
 def test_parse_simple_json():
     text = '{"key": "value", "num": 1}'
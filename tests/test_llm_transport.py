@@ -0,0 +1,142 @@
+"""
+Tests for the asyncio keep-alive LLM transport against a local stub
+OpenAI-compatible server.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from src.utils.llm import client
+from src.utils.llm.client import call_llm, LLMMode
+from src.utils.llm.config import LLMConfig
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, self.headers.get("Authorization"), body))
+        prompt = body["messages"][0]["content"]
+
+        if prompt == "slow":
+            time.sleep(0.5)
+        if prompt == "unauthorized":
+            return self._send(401, b'{"error": {"message": "Invalid API key"}}')
+
+        payload = json.dumps({"choices": [{"message": {"content": f"echo:{prompt}"}}]}).encode()
+        if prompt == "chunked":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(payload), 7):
+                part = payload[i:i + 7]
+                self.wfile.write(f"{len(part):x}\r\n".encode() + part + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        if prompt == "close":
+            self.close_connection = True
+            self.send_response(200)
+            self.send_header("Connection", "close")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        if prompt == "drop":
+            self.close_connection = True
+        self._send(200, payload)
+
+    def _send(self, code, payload):
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def asyncio_transport(stub_server):
+    config = LLMConfig(
+        model_name="stub-model",
+        api_key="stub-key",
+        base_url=f"http://127.0.0.1:{stub_server.server_address[1]}/v1",
+    )
+    with patch("src.utils.llm.client.LLMConfig.from_mode", return_value=config), \
+         patch.object(client.CONFIG.ai, "http_transport", "asyncio"), \
+         patch.object(client, "_TRANSPORT", None):
+        yield stub_server
+
+
+async def test_call_llm_reuses_connection(asyncio_transport):
+    results = [await call_llm(f"p{i}", mode=LLMMode.NORMAL) for i in range(5)]
+
+    assert results == [f"echo:p{i}" for i in range(5)]
+    assert asyncio_transport.connections == 1
+    path, auth, body = asyncio_transport.requests[0]
+    assert path == "/v1/chat/completions"
+    assert auth == "Bearer stub-key"
+    assert body["model"] == "stub-model"
+
+
+async def test_chunked_response(asyncio_transport):
+    assert await call_llm("chunked") == "echo:chunked"
+    # chunked 响应读完后连接仍可复用
+    assert await call_llm("again") == "echo:again"
+    assert asyncio_transport.connections == 1
+
+
+async def test_server_closing_connection_is_not_reused(asyncio_transport):
+    assert await call_llm("close") == "echo:close"
+    assert await call_llm("after") == "echo:after"
+    assert asyncio_transport.connections == 2
+
+
+async def test_http_error_is_reported(asyncio_transport):
+    with pytest.raises(Exception) as exc_info:
+        await call_llm("unauthorized")
+    assert "401" in str(exc_info.value)
+    assert "Invalid API key" in str(exc_info.value)
+
+
+async def test_request_timeout(asyncio_transport):
+    with patch.object(client.CONFIG.ai, "request_timeout", 0.1):
+        with pytest.raises(Exception) as exc_info:
+            await call_llm("slow")
+    assert "timeout" in str(exc_info.value)
+    # 超时的连接被丢弃，后续请求新建连接
+    assert await call_llm("ok") == "echo:ok"
+
+
+async def test_stale_idle_connection_is_retried(asyncio_transport):
+    # 服务端回应后直接断开，但未声明 Connection: close，连接被放回池中
+    assert await call_llm("drop") == "echo:drop"
+    # 即使池没有察觉连接已断开，复用失败后也会换新连接重试
+    with patch("src.utils.llm.transport._Connection.is_usable", return_value=True):
+        assert await call_llm("after") == "echo:after"
+    assert asyncio_transport.connections == 2
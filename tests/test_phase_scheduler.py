@@ -0,0 +1,124 @@
+"""
+Tests for the dependency-aware phase scheduler used by Simulator.step.
+"""
+
+import asyncio
+import time
+
+import pytest
+from unittest.mock import patch
+
+from src.sim.phase_scheduler import PhaseScheduler, build_dependencies, phase
+from src.sim.simulator import Simulator
+
+
+async def run_plain(name, fn):
+    result = fn()
+    if asyncio.iscoroutine(result):
+        result = await result
+    return result
+
+
+def sleeper(log, name, delay, events=None):
+    async def fn():
+        log.append(f"{name}-start")
+        await asyncio.sleep(delay)
+        log.append(f"{name}-end")
+        return events
+    return fn
+
+
+def test_dependencies_follow_conflicts():
+    phases = [
+        phase("a", None, writes={"x"}),
+        phase("b", None, reads={"y"}),
+        phase("c", None, reads={"x"}, writes={"y"}),
+        phase("d", None, reads={"x"}),
+    ]
+    # b 与 a 无关；c 读 a 写的 x、写 b 读的 y；d 与 c 同为读者
+    assert build_dependencies(phases) == [[], [], [0, 1], [0]]
+
+
+async def test_independent_phases_overlap():
+    log = []
+    scheduler = PhaseScheduler([
+        phase("a", sleeper(log, "a", 0.05), writes={"x"}),
+        phase("b", sleeper(log, "b", 0.05), writes={"y"}),
+        phase("c", sleeper(log, "c", 0.0), reads={"x", "y"}),
+    ])
+    start = time.monotonic()
+    await scheduler.run(run_plain)
+
+    assert time.monotonic() - start < 0.09
+    assert log.index("b-start") < log.index("a-end")
+    assert log.index("c-start") > max(log.index("a-end"), log.index("b-end"))
+
+
+async def test_sequential_mode_runs_in_order():
+    log = []
+    scheduler = PhaseScheduler([
+        phase("a", sleeper(log, "a", 0.01), writes={"x"}),
+        phase("b", sleeper(log, "b", 0.0), writes={"y"}),
+    ], concurrent=False)
+    await scheduler.run(run_plain)
+    assert log == ["a-start", "a-end", "b-start", "b-end"]
+
+
+async def test_events_keep_declared_order():
+    log = []
+    scheduler = PhaseScheduler([
+        phase("slow", sleeper(log, "slow", 0.03, ["e1"]), writes={"x"}),
+        phase("fast", sleeper(log, "fast", 0.0, ["e2"]), writes={"y"}),
+        phase("meta", sleeper(log, "meta", 0.0, {"not": "events"}), writes={"z"}),
+        phase("after", lambda: scheduler.events_before(3), reads={"x", "y"}),
+    ])
+    await scheduler.run(run_plain)
+
+    assert log.index("fast-end") < log.index("slow-end")
+    assert scheduler.result_of("after") == ["e1", "e2"]
+    assert scheduler.events() == ["e1", "e2", "e1", "e2"]
+
+
+async def test_failure_cancels_other_phases():
+    log = []
+
+    async def boom():
+        raise RuntimeError("boom")
+
+    scheduler = PhaseScheduler([
+        phase("long", sleeper(log, "long", 1.0), writes={"x"}),
+        phase("boom", boom, writes={"y"}),
+        phase("after", sleeper(log, "after", 0.0), reads={"y"}),
+    ])
+    with pytest.raises(RuntimeError):
+        await scheduler.run(run_plain)
+    assert "long-end" not in log
+    assert "after-start" not in log
+
+
+@pytest.mark.asyncio
+async def test_simulator_overlaps_objective_and_nickname_requests(base_world, dummy_avatar, mock_llm_managers):
+    base_world.avatar_manager.avatars[dummy_avatar.id] = dummy_avatar
+    sim = Simulator(base_world)
+    log = []
+
+    async def objective(avatar, infos=None):
+        log.append("objective-start")
+        await asyncio.sleep(0.05)
+        log.append("objective-end")
+        return None
+
+    async def nickname(avatar, infos=None):
+        log.append("nickname-start")
+        await asyncio.sleep(0.05)
+        log.append("nickname-end")
+        return {"nickname": "测试", "reason": ""}
+
+    mock_llm_managers["lto"].side_effect = objective
+    mock_llm_managers["nick"].side_effect = nickname
+    with patch("src.classes.nickname.can_get_nickname", return_value=True):
+        events = await sim.step()
+
+    assert log.index("nickname-start") < log.index("objective-end")
+    assert dummy_avatar.nickname is not None
+    assert any("测试" in e.content for e in events)
@@ -0,0 +1,88 @@
+"""
+Tests for the per-month prompt context cache (world info / action infos rendering).
+"""
+
+import random
+
+import pytest
+
+from src.classes.actions import get_action_infos_str
+from src.classes.calendar import Month, Year, create_month_stamp
+from src.classes.language import language_manager
+from src.classes.prompt_context import get_action_infos_prompt
+from src.classes.world import World
+from src.run.load_map import load_cultivation_world_map
+from src.sim.new_avatar import make_avatars
+from src.utils.strings import PromptJSON, intentify_prompt_infos, to_json_str_with_intent
+
+
+@pytest.fixture(scope="module")
+def game_map():
+    return load_cultivation_world_map()
+
+
+@pytest.fixture
+def world(game_map):
+    random.seed(5)
+    w = World(map=game_map, month_stamp=create_month_stamp(Year(100), Month.JANUARY))
+    w.avatar_manager.avatars.update(make_avatars(w, count=12, current_month_stamp=w.month_stamp))
+    yield w
+    w.event_manager.close()
+
+
+def test_rendering_matches_world_get_info(world):
+    context = world.get_prompt_context()
+    for avatar in world.avatar_manager.avatars.values():
+        for detailed in (True, False):
+            expected = to_json_str_with_intent(world.get_info(detailed=detailed, avatar=avatar))
+            assert context.render_world_info(world, avatar=avatar, detailed=detailed) == expected
+            assert context.region_info(avatar=avatar, detailed=detailed) == world.map.get_info(detailed, avatar)
+    assert context.render_world_info(world, detailed=False) == to_json_str_with_intent(world.get_info())
+    assert context.render_shared_info(world) == to_json_str_with_intent(world.get_shared_info())
+    assert context.stats.encoded_bytes < context.stats.rendered_bytes
+
+
+def test_shared_info_changes_are_picked_up(world):
+    context = world.get_prompt_context()
+    avatar = next(iter(world.avatar_manager.avatars.values()))
+    context.render_world_info(world, avatar=avatar)
+    world.set_history("第一行\n第二行 \"引号\"")
+    assert context.render_world_info(world, avatar=avatar) == \
+        to_json_str_with_intent(world.get_info(detailed=True, avatar=avatar))
+
+
+def test_context_is_per_month_and_dropped_on_modification(world):
+    context = world.get_prompt_context()
+    assert world.get_prompt_context() is context
+    region = next(iter(world.map.regions.values()))
+    old_name = region.name
+    try:
+        region.name = "改名之地"
+        world.record_modification("regions", str(region.id), {"name": region.name})
+        renamed = world.get_prompt_context()
+        assert renamed is not context
+        assert "改名之地" in renamed.render_world_info(world)
+    finally:
+        region.name = old_name
+    world.month_stamp = world.month_stamp + 1
+    assert world.get_prompt_context() is not renamed
+
+
+def test_action_infos_are_cached_per_language():
+    original = str(language_manager)
+    try:
+        language_manager.set_language("zh-CN")
+        zh = get_action_infos_prompt()
+        assert zh is get_action_infos_prompt()
+        assert zh == to_json_str_with_intent(get_action_infos_str())
+        language_manager.set_language("en-US")
+        assert get_action_infos_prompt() != zh
+    finally:
+        language_manager.set_language(original)
+
+
+def test_intentify_keeps_rendered_json():
+    rendered = PromptJSON(to_json_str_with_intent({"a": ["x"]}))
+    processed = intentify_prompt_infos({"world_info": rendered, "expanded_info": {"a": 1}})
+    assert processed["world_info"] is rendered
+    assert processed["expanded_info"] == to_json_str_with_intent({"a": 1})
@@ -0,0 +1,101 @@
+"""
+Tests for the per-avatar known-region catalog (grouped, map-ordered view + travel months cache).
+"""
+
+import random
+
+import pytest
+
+from src.classes.calendar import Month, Year, create_month_stamp
+from src.classes.region_catalog import REGION_CATEGORIES
+from src.classes.world import World
+from src.run.load_map import load_cultivation_world_map
+from src.sim.new_avatar import make_avatars
+
+
+@pytest.fixture(scope="module")
+def game_map():
+    return load_cultivation_world_map()
+
+
+@pytest.fixture
+def world(game_map):
+    random.seed(11)
+    w = World(map=game_map, month_stamp=create_month_stamp(Year(100), Month.JANUARY))
+    w.avatar_manager.avatars.update(make_avatars(w, count=8, current_month_stamp=w.month_stamp))
+    yield w
+    w.event_manager.close()
+
+
+def _filtered(game_map, known):
+    return tuple(
+        [r for rid, r in game_map.regions.items() if isinstance(r, cls) and rid in known]
+        for cls in REGION_CATEGORIES
+    )
+
+
+def _any_avatar(world):
+    return next(iter(world.avatar_manager.avatars.values()))
+
+
+def test_view_matches_filtered_map_order(world):
+    for avatar in world.avatar_manager.avatars.values():
+        assert avatar.region_catalog.view(avatar) == _filtered(world.map, avatar.known_regions)
+
+
+def test_learn_region_and_direct_adds_are_tracked(world):
+    avatar = _any_avatar(world)
+    catalog = avatar.region_catalog
+    catalog.view(avatar)
+    unknown = [r for rid, r in world.map.regions.items() if rid not in avatar.known_regions]
+    random.Random(3).shuffle(unknown)
+
+    for region in unknown[:5]:
+        avatar.learn_region(region)
+        assert catalog.view(avatar) == _filtered(world.map, avatar.known_regions)
+
+    # 绕过 learn_region 直接修改集合，view 也能补齐
+    avatar.known_regions.update(r.id for r in unknown[5:9])
+    assert catalog.view(avatar) == _filtered(world.map, avatar.known_regions)
+
+    # 读档会整体替换集合
+    avatar.known_regions = {unknown[-1].id}
+    assert catalog.view(avatar) == _filtered(world.map, avatar.known_regions)
+
+
+def test_travel_months_follow_position_and_step(world):
+    avatar = _any_avatar(world)
+    for region in list(world.map.regions.values())[:6]:
+        avatar.learn_region(region)
+    catalog = avatar.region_catalog
+
+    def expected():
+        loc = (avatar.pos_x, avatar.pos_y)
+        return {
+            rid: world.map.regions[rid].get_travel_months(loc, avatar.move_step_length)
+            for rid in avatar.known_regions
+            if rid in world.map.regions
+        }
+
+    months = catalog.travel_months(avatar)
+    assert months == expected()
+    assert catalog.travel_months(avatar) is months
+
+    avatar.pos_x = (avatar.pos_x + 7) % world.map.width
+    assert catalog.travel_months(avatar) == expected()
+
+    region = next(r for rid, r in world.map.regions.items() if rid not in avatar.known_regions)
+    avatar.learn_region(region)
+    assert catalog.travel_months(avatar) == expected()
+
+
+def test_map_get_info_uses_catalog(world):
+    avatar = _any_avatar(world)
+    for region in list(world.map.regions.values())[::3]:
+        avatar.learn_region(region)
+    loc = (avatar.pos_x, avatar.pos_y)
+    info = world.map.get_info(detailed=True, avatar=avatar)
+    groups = _filtered(world.map, avatar.known_regions)
+    assert [len(items) for items in info.values()] == [len(g) for g in groups]
+    for items, group in zip(info.values(), groups):
+        assert items == [r.get_detailed_info(loc, avatar.move_step_length) for r in group]
@@ -0,0 +1,176 @@
+"""
+Tests for the compact save format, schema versioning and JSON export.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from src.classes.age import Age
+from src.classes.avatar import Avatar, Gender
+from src.classes.calendar import Month, Year, create_month_stamp
+from src.classes.cultivation import Realm
+from src.classes.map import Map
+from src.classes.relation import Relation
+from src.classes.tile import TileType
+from src.classes.world import World
+from src.sim.load.load_game import load_game, read_save_data
+from src.sim.save import save_format
+from src.sim.save.save_format import (
+    decode_avatar_table,
+    encode_avatar_table,
+    export_save_json,
+    is_compact_save,
+)
+from src.sim.save.save_game import get_save_info, list_saves, save_game
+from src.sim.save.save_journal import get_journal_path
+from src.sim.simulator import Simulator
+from src.utils.id_generator import get_avatar_id
+
+
+def create_test_map():
+    m = Map(width=10, height=10)
+    for x in range(10):
+        for y in range(10):
+            m.create_tile(x, y, TileType.PLAIN)
+    return m
+
+
+def add_avatar(world, name, dead=False):
+    avatar = Avatar(
+        world=world,
+        name=name,
+        id=get_avatar_id(),
+        birth_month_stamp=create_month_stamp(Year(80), Month.JANUARY),
+        age=Age(20, Realm.Qi_Refinement),
+        gender=Gender.FEMALE,
+    )
+    world.avatar_manager.avatars[avatar.id] = avatar
+    if dead:
+        avatar.is_dead = True
+        world.avatar_manager.handle_death(avatar.id)
+    return avatar
+
+
+def load(save_path):
+    with patch("src.run.load_map.load_cultivation_world_map", return_value=create_test_map()):
+        return load_game(save_path)
+
+
+@pytest.fixture
+def world():
+    w = World(map=create_test_map(), month_stamp=create_month_stamp(Year(100), Month.JANUARY))
+    yield w
+    w.event_manager.close()
+
+
+def test_avatar_table_round_trip_keeps_missing_keys():
+    avatars = [
+        {"id": "1", "name": "a", "nickname": None},
+        {"id": "2", "name": "b"},
+        {"id": "3", "extra": [1, 2], "name": "c", "nickname": {"value": "x"}},
+    ]
+    table = encode_avatar_table(avatars)
+    assert table["columns"] == ["id", "name", "nickname", "extra"]
+    assert list(decode_avatar_table(table)) == avatars
+
+
+def test_compact_save_round_trip(world, tmp_path):
+    alive = add_avatar(world, "Alive")
+    dead = add_avatar(world, "Dead", dead=True)
+    alive.relations[dead] = Relation.FRIEND
+    dead.relations[alive] = Relation.FRIEND
+    sim = Simulator(world)
+    json_path = tmp_path / "plain.json"
+    sav_path = tmp_path / "game.sav"
+
+    save_game(world, sim, [], json_path)
+    save_game(world, sim, [], sav_path)
+
+    assert is_compact_save(sav_path) and not is_compact_save(json_path)
+    assert sav_path.stat().st_size < json_path.stat().st_size
+    info = get_save_info(sav_path)
+    assert info["schema_version"] == save_format.SAVE_SCHEMA_VERSION
+    assert {p.name for p, _ in list_saves(tmp_path)} == {"plain.json", "game.sav"}
+
+    plain, compact = read_save_data(json_path), read_save_data(sav_path)
+    assert compact["avatars"] == plain["avatars"]
+    assert compact["world"] == plain["world"]
+
+    loaded_world, _, _ = load(sav_path)
+    manager = loaded_world.avatar_manager
+    l_alive = manager.get_avatar(alive.id)
+    l_dead = manager.get_avatar(dead.id)
+    assert l_alive.name == "Alive" and l_dead.is_dead
+    assert l_alive.relations[l_dead] == Relation.FRIEND
+    assert l_alive.personas == alive.personas
+    loaded_world.event_manager.close()
+
+
+def test_compact_save_with_journal(world, tmp_path):
+    avatar = add_avatar(world, "Alive")
+    sim = Simulator(world)
+    save_path = tmp_path / "game.sav"
+    save_game(world, sim, [], save_path)
+    avatar.hp.cur = 12
+    save_game(world, sim, [], save_path)
+    assert get_journal_path(save_path).exists()
+
+    loaded_world, _, _ = load(save_path)
+    assert loaded_world.avatar_manager.avatars[avatar.id].hp.cur == 12
+    loaded_world.event_manager.close()
+
+
+def test_saving_never_deletes_other_save_files(world, tmp_path):
+    add_avatar(world, "Alive")
+    sim = Simulator(world)
+    save_game(world, sim, [], tmp_path / "game.sav")
+    exported = export_save_json(tmp_path / "game.sav")
+    save_game(world, sim, [], tmp_path / "game.json")
+    save_game(world, sim, [], tmp_path / "game.sav", incremental=False)
+    assert (tmp_path / "game.json").exists()
+    assert exported.exists()
+
+
+def test_export_save_json(world, tmp_path):
+    avatar = add_avatar(world, "Alive")
+    sim = Simulator(world)
+    save_path = tmp_path / "game.sav"
+    save_game(world, sim, [], save_path)
+    avatar.hp.cur = 5
+    save_game(world, sim, [], save_path)
+
+    out = export_save_json(save_path)
+    assert out == tmp_path / "game_export.json"
+    data = json.loads(out.read_text(encoding="utf-8"))
+    # 导出文件使用自己的事件数据库，与原存档互不影响
+    assert data["meta"]["events_db"] == "game_export_events.db"
+    assert data["avatars"][0]["hp"]["cur"] == 5
+    assert "snapshot_id" not in data["meta"]
+
+    loaded_world, _, _ = load(out)
+    assert loaded_world.avatar_manager.avatars[avatar.id].hp.cur == 5
+    loaded_world.event_manager.close()
+
+
+def test_old_schema_is_migrated_on_load(world, tmp_path):
+    avatar = add_avatar(world, "Alive")
+    save_path = tmp_path / "game.sav"
+    save_game(world, Simulator(world), [], save_path)
+
+    def rename(data):
+        for avatar_data in data["avatars"]:
+            avatar_data["name"] = avatar_data["name"] + "·迁移"
+        return data
+
+    version = save_format.SAVE_SCHEMA_VERSION
+    with patch.object(save_format, "SAVE_SCHEMA_VERSION", version + 1), \
+            patch.dict(save_format._MIGRATIONS, {version: rename}):
+        loaded_world, _, _ = load(save_path)
+    assert loaded_world.avatar_manager.avatars[avatar.id].name == "Alive·迁移"
+    loaded_world.event_manager.close()
+
+    with patch.object(save_format, "SAVE_SCHEMA_VERSION", version + 1):
+        with pytest.raises(ValueError):
+            load(save_path)
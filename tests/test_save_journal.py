@@ -0,0 +1,232 @@
+"""
+Tests for incremental saves (base snapshot + journal) and event DB backups.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from src.classes.age import Age
+from src.classes.avatar import Avatar, Gender
+from src.classes.calendar import Month, Year, create_month_stamp
+from src.classes.cultivation import Realm
+from src.classes.event import Event
+from src.classes.map import Map
+from src.classes.tile import TileType
+from src.classes.world import World
+from src.sim.load.load_game import get_events_db_path, load_game
+from src.sim.save.save_game import get_save_info, save_game
+from src.sim.save.save_journal import get_journal_path
+from src.sim.simulator import Simulator
+from src.utils.config import CONFIG
+from src.utils.id_generator import get_avatar_id
+
+
+def create_test_map():
+    m = Map(width=10, height=10)
+    for x in range(10):
+        for y in range(10):
+            m.create_tile(x, y, TileType.PLAIN)
+    return m
+
+
+def add_avatar(world, name):
+    avatar = Avatar(
+        world=world,
+        name=name,
+        id=get_avatar_id(),
+        birth_month_stamp=create_month_stamp(Year(80), Month.JANUARY),
+        age=Age(20, Realm.Qi_Refinement),
+        gender=Gender.MALE,
+    )
+    world.avatar_manager.avatars[avatar.id] = avatar
+    return avatar
+
+
+def kill(world, avatar):
+    avatar.is_dead = True
+    world.avatar_manager.handle_death(avatar.id)
+
+
+def load(save_path):
+    with patch("src.run.load_map.load_cultivation_world_map", return_value=create_test_map()):
+        return load_game(save_path)
+
+
+@pytest.fixture
+def world():
+    w = World(map=create_test_map(), month_stamp=create_month_stamp(Year(100), Month.JANUARY))
+    yield w
+    w.event_manager.close()
+
+
+def test_second_save_appends_delta_and_loads_merged(world, tmp_path):
+    alive = add_avatar(world, "Alive")
+    doomed = add_avatar(world, "Doomed")
+    removed = add_avatar(world, "Removed")
+    sim = Simulator(world)
+    save_path = tmp_path / "game.json"
+
+    assert save_game(world, sim, [], save_path)[0]
+    base_text = save_path.read_text(encoding="utf-8")
+    assert not get_journal_path(save_path).exists()
+
+    alive.hp.cur = 42
+    kill(world, doomed)
+    world.avatar_manager.remove_avatar(removed.id)
+    world.month_stamp = create_month_stamp(Year(100), Month.MARCH)
+    assert save_game(world, sim, [], save_path)[0]
+
+    # 基础快照不变，差分只包含变化的角色
+    assert save_path.read_text(encoding="utf-8") == base_text
+    lines = get_journal_path(save_path).read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1
+    delta = json.loads(lines[0])
+    assert {a["id"] for a in delta["avatars"]} == {alive.id, doomed.id}
+    assert delta["removed"] == [removed.id]
+    assert get_save_info(save_path)["game_time"] == delta["meta"]["game_time"]
+
+    loaded_world, _, _ = load(save_path)
+    manager = loaded_world.avatar_manager
+    assert manager.avatars[alive.id].hp.cur == 42
+    assert int(loaded_world.month_stamp) == int(world.month_stamp)
+    assert manager.get_avatar(doomed.id).is_dead
+    assert manager.get_avatar(removed.id) is None
+    loaded_world.event_manager.close()
+
+
+def test_unchanged_dead_avatars_are_not_reserialized(world, tmp_path):
+    add_avatar(world, "Alive")
+    dead = add_avatar(world, "Dead")
+    kill(world, dead)
+    sim = Simulator(world)
+    save_path = tmp_path / "game.json"
+    save_game(world, sim, [], save_path)
+
+    with patch.object(type(dead), "to_save_dict", autospec=True, side_effect=type(dead).to_save_dict) as spy:
+        save_game(world, sim, [], save_path)
+    assert dead not in [call.args[0] for call in spy.call_args_list]
+
+    delta = json.loads(get_journal_path(save_path).read_text(encoding="utf-8"))
+    assert delta["avatars"] == []
+
+
+def test_compaction_rewrites_base_and_drops_journal(world, tmp_path):
+    avatar = add_avatar(world, "Alive")
+    sim = Simulator(world)
+    save_path = tmp_path / "game.json"
+
+    # 单角色存档很小，关闭按体积压缩，只测按条数压缩
+    with patch.object(CONFIG.save, "compact_every", 2), patch.object(CONFIG.save, "compact_ratio", 100):
+        for hp in (90, 80, 70):
+            avatar.hp.cur = hp
+            save_game(world, sim, [], save_path)
+        assert len(get_journal_path(save_path).read_text(encoding="utf-8").splitlines()) == 2
+
+        avatar.hp.cur = 60
+        save_game(world, sim, [], save_path)
+    assert not get_journal_path(save_path).exists()
+    data = json.loads(save_path.read_text(encoding="utf-8"))
+    assert data["avatars"][0]["hp"]["cur"] == 60
+
+    loaded_world, _, _ = load(save_path)
+    assert loaded_world.avatar_manager.avatars[avatar.id].hp.cur == 60
+    loaded_world.event_manager.close()
+
+
+def test_stale_and_truncated_journal_lines_are_ignored(world, tmp_path):
+    avatar = add_avatar(world, "Alive")
+    sim = Simulator(world)
+    save_path = tmp_path / "game.json"
+    save_game(world, sim, [], save_path)
+    avatar.hp.cur = 33
+    save_game(world, sim, [], save_path)
+
+    journal = get_journal_path(save_path)
+    stale = json.loads(journal.read_text(encoding="utf-8"))
+    stale["snapshot_id"] = "other"
+    stale["avatars"][0]["hp"] = {"cur": 1, "max": 100}
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write(json.dumps(stale) + "\n")
+        f.write('{"snapshot_id": "trunc')
+
+    loaded_world, _, _ = load(save_path)
+    assert loaded_world.avatar_manager.avatars[avatar.id].hp.cur == 33
+    loaded_world.event_manager.close()
+
+
+def test_save_after_torn_append_is_not_lost(world, tmp_path):
+    avatar = add_avatar(world, "Alive")
+    sim = Simulator(world)
+    save_path = tmp_path / "game.json"
+    save_game(world, sim, [], save_path)
+    avatar.hp.cur = 33
+    save_game(world, sim, [], save_path)
+
+    # 上一次追加失败（如磁盘已满），末尾留下半行；随后的存档仍然报告成功
+    journal = get_journal_path(save_path)
+    with open(journal, "ab") as f:
+        f.write('{"snapshot_id": "半行'.encode("utf-8")[:-1])
+    avatar.hp.cur = 44
+    assert save_game(world, sim, [], save_path)[0]
+    avatar.hp.cur = 55
+    assert save_game(world, sim, [], save_path)[0]
+
+    lines = journal.read_bytes().split(b"\n")
+    assert all(json.loads(line) for line in lines if line)
+    loaded_world, _, _ = load(save_path)
+    assert loaded_world.avatar_manager.avatars[avatar.id].hp.cur == 55
+    loaded_world.event_manager.close()
+
+
+def test_undecodable_line_in_the_middle_is_skipped(world, tmp_path):
+    avatar = add_avatar(world, "Alive")
+    sim = Simulator(world)
+    save_path = tmp_path / "game.json"
+    save_game(world, sim, [], save_path)
+    avatar.hp.cur = 33
+    save_game(world, sim, [], save_path)
+
+    journal = get_journal_path(save_path)
+    with open(journal, "ab") as f:
+        f.write(b'{"snapshot_id": "garbage\n')
+    avatar.hp.cur = 44
+    save_game(world, sim, [], save_path)
+
+    loaded_world, _, _ = load(save_path)
+    assert loaded_world.avatar_manager.avatars[avatar.id].hp.cur == 44
+    loaded_world.event_manager.close()
+
+
+def test_full_save_when_incremental_disabled(world, tmp_path):
+    add_avatar(world, "Alive")
+    sim = Simulator(world)
+    save_path = tmp_path / "game.json"
+    save_game(world, sim, [], save_path)
+    save_game(world, sim, [], save_path, incremental=False)
+    assert not get_journal_path(save_path).exists()
+
+
+def test_save_as_backs_up_event_db(tmp_path):
+    world = World.create_with_db(
+        map=create_test_map(),
+        month_stamp=create_month_stamp(Year(100), Month.JANUARY),
+        events_db_path=tmp_path / "live_events.db",
+    )
+    for i in range(5):
+        world.event_manager.add_event(Event(world.month_stamp, f"event {i}", related_avatars=[]))
+    sim = Simulator(world)
+    save_path = tmp_path / "saves" / "copy.json"
+
+    # 目标位置残留的 WAL 不能被回放到新数据库上
+    db_path = get_events_db_path(save_path)
+    db_path.parent.mkdir(parents=True)
+    db_path.with_name(db_path.name + "-wal").write_bytes(b"garbage")
+
+    assert save_game(world, sim, [], save_path)[0]
+    world.event_manager.close()
+
+    loaded_world, _, _ = load(save_path)
+    assert loaded_world.event_manager.count() == 5
+    loaded_world.event_manager.close()
@@ -0,0 +1,100 @@
+"""
+Tests for the simulation scheduler (pacing modes and publishing).
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.sim.scheduler import SimScheduler
+
+
+def make_step(duration=0.0, log=None):
+    counter = {"n": 0}
+
+    async def step():
+        counter["n"] += 1
+        if log is not None:
+            log.append(f"step{counter['n']}")
+        if duration:
+            await asyncio.sleep(duration)
+        return counter["n"]
+
+    return step
+
+
+async def test_target_rate_subtracts_step_time():
+    scheduler = SimScheduler(mode="target_rate", interval=0.1)
+    start = time.monotonic()
+    stats = await scheduler.run(make_step(0.06), max_steps=3)
+    elapsed = time.monotonic() - start
+
+    assert stats.steps == 3
+    # 旧实现为 (0.1 + 0.06) * 3
+    assert 0.29 <= elapsed < 0.4
+    assert stats.last_step_seconds >= 0.06
+
+
+async def test_fast_mode_has_no_wall_clock_floor():
+    scheduler = SimScheduler(mode="fast", interval=1.0)
+    start = time.monotonic()
+    stats = await scheduler.run(make_step(), max_steps=200)
+    assert stats.steps == 200
+    assert time.monotonic() - start < 0.5
+    assert stats.to_dict()["months_per_second"] > 400
+
+
+async def test_budget_mode_runs_several_months_per_slice():
+    scheduler = SimScheduler(mode="budget", interval=0.2, budget=0.05)
+    start = time.monotonic()
+    stats = await scheduler.run(make_step(0.02), max_steps=6)
+    elapsed = time.monotonic() - start
+
+    # 每 0.2 秒周期内约 3 个月（0.05 秒预算），6 个月约两个周期
+    assert stats.steps == 6
+    assert 0.2 <= elapsed < 0.45
+
+
+async def test_delivery_finishes_before_next_step():
+    log = []
+
+    async def deliver(n):
+        await asyncio.sleep(0.01)
+        log.append(f"deliver{n}")
+
+    scheduler = SimScheduler(mode="fast")
+    await scheduler.run(make_step(0, log), publish=deliver, max_steps=2)
+    assert log == ["step1", "deliver1", "step2", "deliver2"]
+
+
+async def test_should_run_pauses_stepping():
+    state = {"checks": 0}
+
+    def should_run():
+        state["checks"] += 1
+        return state["checks"] > 3
+
+    scheduler = SimScheduler(mode="fast", idle_interval=0.01)
+    stats = await scheduler.run(make_step(), should_run=should_run, max_steps=2)
+    assert stats.steps == 2
+    assert state["checks"] == 5
+
+
+async def test_step_errors_do_not_stop_loop():
+    calls = {"n": 0}
+
+    async def step():
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise RuntimeError("boom")
+        return calls["n"]
+
+    stats = await SimScheduler(mode="fast").run(step, max_steps=2)
+    assert stats.steps == 2
+    assert calls["n"] == 3
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        SimScheduler(mode="warp")
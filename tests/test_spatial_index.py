@@ -0,0 +1,122 @@
+"""
+测试 AvatarManager 的空间索引。
+
+验证：
+1. 半径 / 同区域查询结果与线性扫描一致（包括顺序）
+2. 移动、死亡、删除、直接改写 avatars 字典时索引增量同步
+"""
+import random
+
+import pytest
+
+from src.classes.avatar import Avatar, Gender
+from src.classes.age import Age
+from src.classes.cultivation import Realm
+from src.classes.calendar import Month, Year, create_month_stamp
+from src.classes.map import Map
+from src.classes.observe import get_observable_avatars
+from src.classes.region import NormalRegion
+from src.classes.tile import TileType
+from src.classes.world import World
+from src.utils.id_generator import get_avatar_id
+
+
+@pytest.fixture
+def region_world():
+    """30x30 平原，左半边属于区域 101"""
+    game_map = Map(width=30, height=30)
+    for x in range(30):
+        for y in range(30):
+            game_map.create_tile(x, y, TileType.PLAIN)
+    region = NormalRegion(id=101, name="左原", desc="测试区域",
+                          cors=[(x, y) for x in range(15) for y in range(30)])
+    game_map.regions[region.id] = region
+    for x, y in region.cors:
+        game_map.get_tile(x, y).region = region
+    return World(map=game_map, month_stamp=create_month_stamp(Year(1), Month.JANUARY))
+
+
+def _make_avatar(world: World, x: int, y: int) -> Avatar:
+    av = Avatar(
+        world=world,
+        name=f"A{x}_{y}",
+        id=get_avatar_id(),
+        birth_month_stamp=create_month_stamp(Year(1), Month.JANUARY),
+        age=Age(20, Realm.Qi_Refinement),
+        gender=Gender.MALE,
+        pos_x=x,
+        pos_y=y,
+        personas=[],
+    )
+    world.avatar_manager.register_avatar(av)
+    return av
+
+
+def _linear_same_region(manager, avatar):
+    region = avatar.tile.region
+    return [o for o in manager.avatars.values()
+            if o is not avatar and o.tile is not None and o.tile.region == region]
+
+
+def test_queries_match_linear_scan(region_world):
+    manager = region_world.avatar_manager
+    rng = random.Random(7)
+    avatars = [_make_avatar(region_world, rng.randrange(30), rng.randrange(30)) for _ in range(60)]
+
+    for av in avatars:
+        assert manager.get_observable_avatars(av) == get_observable_avatars(av, manager.avatars.values())
+        if av.tile.region is not None:
+            assert manager.get_avatars_in_same_region(av) == _linear_same_region(manager, av)
+
+
+def test_index_follows_moves(region_world):
+    manager = region_world.avatar_manager
+    a = _make_avatar(region_world, 0, 0)
+    b = _make_avatar(region_world, 20, 20)
+
+    assert manager.get_observable_avatars(a) == []
+    assert manager.get_avatars_in_same_region(a) == []
+
+    # 跨网格、跨区域移动
+    b.pos_x, b.pos_y = 1, 1
+    b.tile = region_world.map.get_tile(1, 1)
+
+    assert manager.get_observable_avatars(a) == [b]
+    assert manager.get_avatars_in_same_region(a) == [b]
+
+
+def test_index_drops_dead_and_removed(region_world):
+    manager = region_world.avatar_manager
+    a = _make_avatar(region_world, 2, 2)
+    b = _make_avatar(region_world, 3, 2)
+    c = _make_avatar(region_world, 2, 3)
+
+    manager.handle_death(b.id)
+    assert manager.get_observable_avatars(a) == [c]
+
+    # 死者 tile 被置空后仍不应回到索引
+    b.pos_x = 2
+    assert b.id not in manager.spatial_index
+
+    manager.remove_avatar(c.id)
+    assert manager.get_observable_avatars(a) == []
+    assert manager.get_avatars_in_same_region(a) == []
+
+
+def test_direct_dict_writes_are_indexed(region_world):
+    manager = region_world.avatar_manager
+    a = _make_avatar(region_world, 5, 5)
+    b = _make_avatar(region_world, 6, 5)
+
+    manager.avatars.pop(b.id)
+    assert manager.get_observable_avatars(a) == []
+
+    manager.avatars[b.id] = b
+    assert manager.get_observable_avatars(a) == [b]
+
+    # 整体替换（读档路径）
+    manager.avatars = {a.id: a}
+    assert len(manager.spatial_index) == 1
+    assert manager.get_observable_avatars(a) == []
+    b.pos_x = 5
+    assert manager.get_observable_avatars(a) == []
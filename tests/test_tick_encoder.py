@@ -0,0 +1,174 @@
+"""
+Tests for the delta-encoded websocket tick protocol.
+"""
+
+import json
+
+import pytest
+
+from src.server.tick_encoder import (
+    DEAD_ACTION,
+    TickEncoder,
+    decode_binary_tick,
+)
+
+HEADER = {"type": "tick", "year": 100, "month": 1, "events": [], "phenomenon": None}
+
+
+def describe_from(states):
+    def describe(aid):
+        x, y, action, emoji = states[aid]
+        return {"id": aid, "name": f"N-{aid}", "x": x, "y": y, "action": action, "action_emoji": emoji}
+    return describe
+
+
+def encode(encoder, states, world="w1"):
+    return dict(encoder.encode_tick(HEADER, states, describe_from(states), world_token=world))
+
+
+def many_states(n):
+    return {f"a{i}": (i % 50, i // 50, "修炼", "🧘") for i in range(n)}
+
+
+class TestJsonTicks:
+    def test_first_tick_is_full_snapshot(self):
+        encoder = TickEncoder()
+        encoder.register("c1")
+        states = many_states(120)
+
+        msg = json.loads(encode(encoder, states)["c1"])
+        assert msg["type"] == "tick" and msg["full"] is True
+        # 不再只发前 50 个角色
+        assert len(msg["avatars"]) == 120
+        assert msg["avatars"][0]["name"] == "N-a0"
+
+    def test_delta_contains_only_changed_fields(self):
+        encoder = TickEncoder()
+        encoder.register("c1")
+        states = many_states(120)
+        encode(encoder, states)
+
+        states = dict(states)
+        states["a5"] = (7, 7, "修炼", "🧘")
+        states["a99"] = (49, 1, "闭关", "🧘")
+        del states["a3"]
+        states["new"] = (1, 2, "思考", "🤔")
+
+        msg = json.loads(encode(encoder, states)["c1"])
+        assert msg["full"] is False
+        by_id = {r["id"]: r for r in msg["avatars"]}
+        assert by_id["a5"] == {"id": "a5", "x": 7, "y": 7}
+        assert by_id["a99"] == {"id": "a99", "action": "闭关"}
+        assert by_id["a3"] == {"id": "a3", "is_dead": True, "action": DEAD_ACTION}
+        assert by_id["new"]["name"] == "N-new"
+        assert len(by_id) == 4
+
+    def test_unchanged_world_sends_empty_delta(self):
+        encoder = TickEncoder()
+        encoder.register("c1")
+        states = many_states(1000)
+        first = encode(encoder, states)["c1"]
+        second = encode(encoder, states)["c1"]
+        assert json.loads(second)["avatars"] == []
+        assert len(second) < len(first) / 100
+
+
+class TestResync:
+    def test_new_client_gets_full_while_others_get_delta(self):
+        encoder = TickEncoder()
+        encoder.register("old")
+        states = many_states(10)
+        encode(encoder, states)
+
+        encoder.register("new")
+        payloads = encode(encoder, states)
+        assert json.loads(payloads["old"])["full"] is False
+        assert json.loads(payloads["new"])["full"] is True
+        assert len(json.loads(payloads["new"])["avatars"]) == 10
+
+    def test_request_resync(self):
+        encoder = TickEncoder()
+        encoder.register("c1")
+        states = many_states(10)
+        encode(encoder, states)
+        encoder.request_resync("c1")
+        assert json.loads(encode(encoder, states)["c1"])["full"] is True
+        assert json.loads(encode(encoder, states)["c1"])["full"] is False
+
+    def test_world_change_forces_full_snapshot(self):
+        encoder = TickEncoder()
+        encoder.register("c1")
+        encode(encoder, many_states(10), world="w1")
+        msg = json.loads(encode(encoder, many_states(3), world="w2")["c1"])
+        assert msg["full"] is True
+        assert [r["id"] for r in msg["avatars"]] == ["a0", "a1", "a2"]
+
+    def test_clients_in_same_state_share_payload(self):
+        encoder = TickEncoder()
+        encoder.register("c1")
+        encoder.register("c2")
+        payloads = encode(encoder, many_states(10))
+        assert payloads["c1"] is payloads["c2"]
+
+    def test_unknown_encoding_rejected(self):
+        with pytest.raises(ValueError):
+            TickEncoder().register("c1", "xml")
+
+
+class TestBinaryTicks:
+    def test_roundtrip_matches_client_state(self):
+        encoder = TickEncoder()
+        encoder.register("bin", "binary")
+        index = {}
+        client = {}
+
+        def apply(frame):
+            msg = decode_binary_tick(frame, index)
+            for record in msg["avatars"]:
+                client.setdefault(record["id"], {}).update(record)
+            return msg
+
+        states = many_states(200)
+        msg = apply(encode(encoder, states)["bin"])
+        assert msg["full"] is True and msg["year"] == 100
+
+        states = dict(states)
+        states["a150"] = (3, 4, "修炼", "🧘")
+        states["a7"] = (7, 9, "修炼", "🧘")  # 只有 y 变化
+        states["born"] = (10, 11, "思考", "🤔")
+        apply(encode(encoder, states)["bin"])
+
+        for aid, (x, y, action, emoji) in states.items():
+            assert (client[aid]["x"], client[aid]["y"], client[aid]["action"]) == (x, y, action)
+        assert client["born"]["name"] == "N-born"
+
+    def test_binary_delta_is_compact(self):
+        encoder = TickEncoder()
+        encoder.register("bin", "binary")
+        encoder.register("txt", "json")
+        states = many_states(2000)
+        encode(encoder, states)
+
+        moved = {aid: ((x + 1) % 50, y, a, e) for aid, (x, y, a, e) in states.items()}
+        payloads = encode(encoder, moved)
+        assert isinstance(payloads["bin"], bytes)
+        # 每个移动条目 8 字节
+        assert len(payloads["bin"]) < 2000 * 8 + 200
+        assert len(payloads["bin"]) < len(payloads["txt"]) / 2
+
+
+def test_websocket_endpoint_registers_encoding():
+    from fastapi.testclient import TestClient
+    from src.server.main import app, manager
+
+    client = TestClient(app)
+    with client.websocket_connect("/ws?encoding=binary") as ws:
+        ws.send_text("ping")
+        assert ws.receive_json() == {"type": "pong"}
+        state = manager.tick_encoder._clients[manager.active_connections[-1]]
+        assert state.encoding == "binary" and state.version is None
+    with client.websocket_connect("/ws?encoding=bogus") as ws:
+        ws.send_text("ping")
+        ws.receive_json()
+        state = manager.tick_encoder._clients[manager.active_connections[-1]]
+        assert state.encoding == "json"
@@ -0,0 +1,169 @@
+"""
+Tests for per-connection websocket send queues and the concurrent broadcast path.
+"""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+from src.server.main import ConnectionManager
+from src.server.ws_channel import KIND_TICK, ClientChannel
+from src.utils.config import CONFIG
+
+
+class FakeSocket:
+    """send 阻塞到 gate 打开，用于模拟慢客户端。"""
+
+    def __init__(self, blocked=False):
+        self.gate = asyncio.Event()
+        if not blocked:
+            self.gate.set()
+        self.received = []
+        self.closed_with = None
+
+    async def send_text(self, data):
+        await self.gate.wait()
+        self.received.append(data)
+
+    async def send_bytes(self, data):
+        await self.gate.wait()
+        self.received.append(data)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def test_slow_client_does_not_block_broadcast():
+    manager = ConnectionManager()
+    fast, slow = FakeSocket(), FakeSocket(blocked=True)
+    manager.active_connections.extend([fast, slow])
+
+    await asyncio.wait_for(manager.broadcast({"type": "a"}), timeout=1)
+    await asyncio.wait_for(manager.broadcast({"type": "b"}), timeout=1)
+
+    assert [json.loads(m)["type"] for m in fast.received] == ["a", "b"]
+    assert slow.received == []
+    metrics = manager.get_connection_metrics()
+    assert metrics[1]["queue_depth"] == 1  # 另一条正在发送
+
+    slow.gate.set()
+    await asyncio.sleep(0.01)
+    assert [json.loads(m)["type"] for m in slow.received] == ["a", "b"]
+    # 所有连接共享同一个序列化结果
+    assert fast.received[0] is slow.received[0]
+
+
+async def test_replies_go_through_the_connection_queue():
+    manager = ConnectionManager()
+    ws = FakeSocket(blocked=True)
+    manager.active_connections.append(ws)
+
+    await asyncio.wait_for(manager.broadcast({"type": "a"}), timeout=1)
+    # 不直接写 websocket：慢客户端不阻塞接收循环，且与发送任务不并发写
+    manager.send_to(ws, '{"type":"pong"}')
+    assert manager.get_connection_metrics()[0]["queue_depth"] == 1
+
+    ws.gate.set()
+    await asyncio.sleep(0.01)
+    assert [json.loads(m)["type"] for m in ws.received] == ["a", "pong"]
+
+
+async def test_full_queue_coalesces_ticks_and_keeps_their_events():
+    ws = FakeSocket(blocked=True)
+    drops = []
+    channel = ClientChannel(ws, max_queue=3, on_drop=lambda ch, kind: drops.append(kind))
+
+    channel.send("t0", KIND_TICK, [{"id": "e0"}])
+    await asyncio.sleep(0)  # t0 正在发送
+    channel.send("toast", None)
+    assert channel.begin_tick() == (False, [])
+    channel.send("t1", KIND_TICK, [{"id": "e1"}])
+    channel.send("t2", KIND_TICK, [{"id": "e2"}])
+
+    # 队列已满：编码 t3 之前合并排队中的 tick，t3 应为全量快照并带上 e1、e2
+    assert channel.begin_tick() == (True, [{"id": "e1"}, {"id": "e2"}])
+    assert drops == [KIND_TICK]
+    assert channel.dropped == 2
+    channel.send("t3-full", KIND_TICK)
+    ws.gate.set()
+    await asyncio.sleep(0.01)
+    assert ws.received == ["t0", "toast", "t3-full"]
+
+
+async def test_control_messages_are_not_evicted_for_ticks():
+    ws = FakeSocket(blocked=True)
+    channel = ClientChannel(ws, max_queue=2)
+    channel.send("t0", KIND_TICK)
+    await asyncio.sleep(0)
+    channel.send("toast1")
+    channel.send("toast2")
+
+    assert channel.begin_tick() == (False, [])
+    channel.send("t1", KIND_TICK)  # 只有控制消息时 tick 仍然入队
+    # 控制消息遇到满队列时丢弃最旧的控制消息，而不是 tick
+    channel.send("toast3")
+    ws.gate.set()
+    await asyncio.sleep(0.01)
+    assert ws.received == ["t0", "toast2", "t1", "toast3"]
+
+
+async def test_full_queue_drops_oldest_message():
+    ws = FakeSocket(blocked=True)
+    channel = ClientChannel(ws, max_queue=2)
+    for msg in ["m0", "m1", "m2", "m3"]:
+        channel.send(msg)
+        await asyncio.sleep(0)
+
+    ws.gate.set()
+    await asyncio.sleep(0.01)
+    assert ws.received == ["m0", "m2", "m3"]
+    assert channel.metrics()["dropped"] == 1
+
+
+async def test_lagging_client_is_disconnected():
+    manager = ConnectionManager()
+    slow = FakeSocket(blocked=True)
+    manager.active_connections.append(slow)
+
+    with patch.object(manager, "_set_pause_state"), \
+         patch.object(CONFIG.websocket, "max_lag", 0.05):
+        await manager.broadcast({"type": "a"})
+        assert manager.get_connection_metrics()[0]["lag_seconds"] >= 0
+        await asyncio.sleep(0.1)
+        await manager.broadcast({"type": "b"})
+        await asyncio.sleep(0)
+
+    assert slow not in manager.active_connections
+    assert slow not in manager.channels
+    assert slow.closed_with == 1013
+
+
+async def test_coalesced_client_gets_full_snapshot_with_dropped_events():
+    from src.classes.world import World
+    from src.run.load_map import load_cultivation_world_map
+    from src.classes.calendar import MonthStamp
+
+    manager = ConnectionManager()
+    fast, slow = FakeSocket(), FakeSocket(blocked=True)
+    manager.active_connections.extend([fast, slow])
+    manager.tick_encoder.register(fast)
+    manager.tick_encoder.register(slow)
+    world = World(map=load_cultivation_world_map(), month_stamp=MonthStamp(100 * 12))
+
+    with patch.object(CONFIG.websocket, "max_queue", 1):
+        for month in range(4):
+            header = {"type": "tick", "year": 100, "month": month, "events": [{"id": f"e{month}"}]}
+            await manager.deliver_tick(manager.prepare_tick(world, header))
+            await asyncio.sleep(0)
+
+    slow.gate.set()
+    await asyncio.sleep(0.01)
+    world.event_manager.close()
+
+    fast_ticks = [json.loads(m) for m in fast.received]
+    assert [t["full"] for t in fast_ticks] == [True, False, False, False]
+    slow_ticks = [json.loads(m) for m in slow.received]
+    # 月 0 正在发送，月 1、2 被合并进月 3 的全量快照，事件一条不少
+    assert [t["month"] for t in slow_ticks] == [0, 3]
+    assert slow_ticks[1]["full"] is True
+    assert [e["id"] for t in slow_ticks for e in t["events"]] == ["e0", "e1", "e2", "e3"]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""对比动作调度表（预先计算参数名）与每次 inspect.signature 的动作执行开销
+
+在真实地图上生成 N 个角色（默认 5000），每月给空闲角色排入动作计划（修炼 / 定向移动），
+计时 Simulator._phase_commit_next_plans + _phase_execute_actions：
+- before: 每次调用 can_start/start/step/finish/_execute 前都解析签名（调度表之前的行为）
+- after:  使用注册时构建的 ActionDispatch
+
+使用方法:
+    python tools/benchmark/bench_actions.py
+    python tools/benchmark/bench_actions.py --avatars 5000 --months 12
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.classes.action.registry import ActionDispatch
+from src.classes.action_runtime import ActionPlan
+from src.classes.calendar import MonthStamp
+from src.classes.world import World
+from src.run.load_map import load_cultivation_world_map
+from src.sim.new_avatar import make_avatars
+from src.sim.simulator import Simulator
+from src.utils.params import filter_kwargs, get_allowed_kwarg_names
+
+DIRECTIONS = ("North", "South", "East", "West")
+
+
+def _uncached_kwargs_for(self: ActionDispatch, method: str, params):
+    """调度表之前的行为：每次都解析签名"""
+    fn = getattr(self.action_cls, method)
+    return filter_kwargs(params, get_allowed_kwarg_names(fn, skip_first=True))
+
+
+def _plan_idle(world: World) -> None:
+    for avatar in world.avatar_manager.avatars.values():
+        if avatar.current_action is None and not avatar.planned_actions:
+            avatar.planned_actions = [
+                ActionPlan("Cultivate", {}),
+                ActionPlan("MoveToDirection", {"direction": random.choice(DIRECTIONS)}),
+            ]
+
+
+def _run(world: World, sim: Simulator, months: int) -> float:
+    total = 0.0
+    for _ in range(months):
+        _plan_idle(world)
+        start = time.perf_counter()
+        sim._phase_commit_next_plans()
+        asyncio.run(sim._phase_execute_actions())
+        total += time.perf_counter() - start
+        world.month_stamp = world.month_stamp + 1
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Action dispatch benchmark.")
+    parser.add_argument("--avatars", type=int, default=5000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("before", "after"):
+        random.seed(args.seed)
+        world = World(map=load_cultivation_world_map(), month_stamp=MonthStamp(100 * 12))
+        world.avatar_manager.avatars.update(
+            make_avatars(world, count=args.avatars, current_month_stamp=world.month_stamp)
+        )
+        sim = Simulator(world)
+        if mode == "before":
+            with patch.object(ActionDispatch, "kwargs_for", _uncached_kwargs_for):
+                results[mode] = _run(world, sim, args.months)
+        else:
+            results[mode] = _run(world, sim, args.months)
+        world.event_manager.close()
+
+    before = results["before"] / args.months
+    after = results["after"] / args.months
+    print(f"avatars={args.avatars} months={args.months}")
+    print(f"before (signature per call): {before * 1000:8.2f} ms/month")
+    print(f"after  (dispatch table):     {after * 1000:8.2f} ms/month")
+    print(f"speedup:                     {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
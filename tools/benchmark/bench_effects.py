@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""对比效果表达式预编译前后的每月 effects 求值开销
+
+在真实地图上生成 N 个角色（默认 2000），模拟每月一次的全员 effects 重算
+（即 effects 缓存按月失效后的那次计算）：
+- before: 每次求值都对原始字符串调用 eval()（预编译前的行为）
+- after:  执行配表加载时预编译好的 code object
+
+使用方法:
+    python tools/benchmark/bench_effects.py
+    python tools/benchmark/bench_effects.py --avatars 2000 --months 12
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.classes.calendar import MonthStamp
+from src.classes.world import World
+from src.run.load_map import load_cultivation_world_map
+from src.sim.new_avatar import make_avatars
+
+
+def _run_months(avatars, months: int) -> float:
+    start = time.perf_counter()
+    for _ in range(months):
+        for av in avatars:
+            av._compute_effects()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Effect expression evaluation benchmark.")
+    parser.add_argument("--avatars", type=int, default=2000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    world = World(map=load_cultivation_world_map(), month_stamp=MonthStamp(100 * 12))
+    avatars = list(make_avatars(world, count=args.avatars, current_month_stamp=world.month_stamp).values())
+
+    # 预热，并确认两种路径结果一致
+    after_results = [av._compute_effects() for av in avatars]
+    # 返回原始字符串即等价于旧实现：eval(str) 每次重新解析
+    with patch("src.classes.effect.process.compile_expression", side_effect=lambda expr: expr), \
+         patch("src.classes.effect.mixin.compile_expression", side_effect=lambda expr: expr):
+        before_results = [av._compute_effects() for av in avatars]
+        before = _run_months(avatars, args.months)
+    assert before_results == after_results
+
+    after = _run_months(avatars, args.months)
+
+    per_month_before = before / args.months
+    per_month_after = after / args.months
+    print(f"avatars={args.avatars} months={args.months}")
+    print(f"before (eval str):  {per_month_before * 1000:8.2f} ms/month")
+    print(f"after  (compiled):  {per_month_after * 1000:8.2f} ms/month")
+    print(f"speedup:            {per_month_before / per_month_after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
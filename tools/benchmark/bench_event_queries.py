@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""对比 prompt 构建时按角色 / 角色对查询事件的开销：最近事件内存索引 vs 每次查 SQLite
+
+先向事件库写入 N 个角色（默认 500）、M 个月（默认 60）的事件（每人每月约 1 条，
+部分为两人事件），然后模拟一个月的 prompt 构建：
+- 每个角色查询最近 10 条大事与 10 条小事（get_expanded_info）
+- 每个角色与一名相识者查询共同的大事 / 小事与最近 10 条事件（关系结算）
+分别在关闭索引（recent_index_size=0，每次查库）与开启索引时计时。
+
+使用方法:
+    python tools/benchmark/bench_event_queries.py
+    python tools/benchmark/bench_event_queries.py --avatars 1000 --months 120
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.classes.calendar import MonthStamp
+from src.classes.event import Event
+from src.classes.event_index import RecentEventIndex
+from src.classes.event_manager import EventManager
+from src.classes.event_storage import EventStorage
+
+
+def _populate(db_path: Path, avatars: list[str], months: int, rng: random.Random) -> None:
+    manager = EventManager.create_with_db(db_path, write_behind=False)
+    for month in range(months):
+        events = []
+        for aid in avatars:
+            related = [aid, rng.choice(avatars)] if rng.random() < 0.3 else [aid]
+            events.append(Event(MonthStamp(month), f"{aid} 第{month}月", related_avatars=related,
+                                is_major=rng.random() < 0.1))
+        manager.add_events(events)
+    manager.close()
+
+
+def _prompt_month(manager: EventManager, avatars: list[str], partners: dict[str, str]) -> float:
+    start = time.perf_counter()
+    for aid in avatars:
+        manager.get_major_events_by_avatar(aid, limit=10)
+        manager.get_minor_events_by_avatar(aid, limit=10)
+        other = partners[aid]
+        manager.get_major_events_between(aid, other, limit=10)
+        manager.get_minor_events_between(aid, other, limit=10)
+        manager.get_events_between(aid, other, limit=10)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recent event index benchmark.")
+    parser.add_argument("--avatars", type=int, default=500)
+    parser.add_argument("--months", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    avatars = [f"av{i}" for i in range(args.avatars)]
+    partners = {aid: rng.choice(avatars) for aid in avatars}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "events.db"
+        _populate(db_path, avatars, args.months, rng)
+
+        results = {}
+        for mode in ("sqlite", "index"):
+            start = time.perf_counter()
+            recent_index = RecentEventIndex() if mode == "index" else None
+            manager = EventManager(EventStorage(db_path), recent_index=recent_index)
+            open_time = time.perf_counter() - start
+            best = min(_prompt_month(manager, avatars, partners) for _ in range(args.repeat))
+            results[mode] = (open_time, best)
+            manager.close()
+
+    print(f"avatars={args.avatars} months={args.months} events={args.avatars * args.months}")
+    for mode, (open_time, best) in results.items():
+        print(f"{mode:7s} open {open_time * 1000:8.1f} ms  prompt queries {best * 1000:8.1f} ms/month")
+    print(f"speedup: {results['sqlite'][1] / results['index'][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测量大存档的读档耗时：已故角色懒加载 vs 读档即全部反序列化
+
+在真实地图上生成 N 个角色（默认 10000），其中 --dead-ratio 比例的角色已故，写一份完整存档，
+然后分别用两种模式读档：
+- lazy:  已故角色以压缩数据休眠，首次访问时才物化（CONFIG.save.lazy_dead_avatars=true）
+- eager: 读档时物化全部已故角色
+
+另外给出懒加载模式下逐个访问已故角色（物化）的平均耗时。
+
+使用方法:
+    python tools/benchmark/bench_load.py
+    python tools/benchmark/bench_load.py --avatars 20000 --dead-ratio 0.9 --repeat 3
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.classes.calendar import MonthStamp
+from src.classes.death import handle_death
+from src.classes.world import World
+from src.run.load_map import load_cultivation_world_map
+from src.sim.load.load_game import load_game
+from src.sim.new_avatar import make_avatars
+from src.sim.save.save_game import save_game
+from src.sim.simulator import Simulator
+from src.utils.config import CONFIG
+
+
+def _build_world(count: int, dead_ratio: float) -> World:
+    world = World(map=load_cultivation_world_map(), month_stamp=MonthStamp(100 * 12))
+    avatars = list(make_avatars(world, count=count, current_month_stamp=world.month_stamp).values())
+    world.avatar_manager.avatars.update({av.id: av for av in avatars})
+    for av in avatars[: int(count * dead_ratio)]:
+        handle_death(world, av, "benchmark")
+    return world
+
+
+def _load(path: Path, lazy: bool, repeat: int) -> tuple[float, World]:
+    """返回 (最快一次读档耗时, 最后一次读档得到的世界)；地图构建不计入。"""
+    game_map = load_cultivation_world_map()
+    best = float("inf")
+    world = None
+    for _ in range(repeat):
+        if world is not None:
+            world.event_manager.close()
+        with patch.object(CONFIG.save, "lazy_dead_avatars", lazy), \
+                patch("src.run.load_map.load_cultivation_world_map", return_value=game_map):
+            start = time.perf_counter()
+            world, _, _ = load_game(path)
+            best = min(best, time.perf_counter() - start)
+    return best, world
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lazy vs eager save loading benchmark.")
+    parser.add_argument("--avatars", type=int, default=10000)
+    parser.add_argument("--dead-ratio", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    world = _build_world(args.avatars, args.dead_ratio)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.json"
+        save_game(world, Simulator(world), [], path, incremental=False)
+        size_mb = path.stat().st_size / 1024 / 1024
+        world.event_manager.close()
+
+        eager_time, eager_world = _load(path, False, args.repeat)
+        eager_world.event_manager.close()
+        lazy_time, lazy_world = _load(path, True, args.repeat)
+
+        store = lazy_world.avatar_manager.dead_avatars
+        dormant = store.dormant_ids()
+        start = time.perf_counter()
+        for aid in dormant:
+            lazy_world.avatar_manager.get_avatar(aid)
+        hydrate_time = time.perf_counter() - start
+        lazy_world.event_manager.close()
+
+    alive = len(world.avatar_manager.avatars)
+    print(f"avatars={args.avatars} (alive={alive}) save={size_mb:.1f} MB")
+    print(f"eager:        {eager_time * 1000:9.1f} ms")
+    print(f"lazy:         {lazy_time * 1000:9.1f} ms  (dormant after load: {len(dormant)})")
+    print(f"speedup:      {eager_time / lazy_time:9.2f}x")
+    if dormant:
+        print(f"hydrate:      {hydrate_time / len(dormant) * 1e6:9.1f} us/dead avatar on first access")
+
+
+if __name__ == "__main__":
+    main()
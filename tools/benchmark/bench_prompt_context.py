@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""对比决策提示词中世界信息 / 动作说明的渲染开销：逐个角色重新构建 vs 按月缓存的 PromptContext
+
+在真实地图上生成 N 个角色（默认 500），模拟 M 个月（默认 12）里每个角色各决策一次：
+- before: world.get_info(avatar, detailed=True) + intentify_prompt_infos（每次重新构建与 JSON 编码）
+- after:  world.get_prompt_context().render_world_info + get_action_infos_prompt
+每月之间让角色随机移动，使距离后缀发生变化。报告每月的 CPU 耗时与实际经过 JSON 编码的字节数。
+
+使用方法:
+    python tools/benchmark/bench_prompt_context.py
+    python tools/benchmark/bench_prompt_context.py --avatars 2000 --months 24
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.classes.actions import ACTION_INFOS_STR
+from src.classes.calendar import MonthStamp
+from src.classes.prompt_context import get_action_infos_prompt
+from src.classes.world import World
+from src.run.load_map import load_cultivation_world_map
+from src.sim.new_avatar import make_avatars
+from src.utils.strings import intentify_prompt_infos
+
+
+def _before(world: World, avatars) -> tuple[float, int]:
+    start = time.process_time()
+    encoded = 0
+    for avatar in avatars:
+        processed = intentify_prompt_infos({
+            "world_info": world.get_info(avatar=avatar, detailed=True),
+            "general_action_infos": ACTION_INFOS_STR,
+        })
+        encoded += len(processed["world_info"].encode("utf-8"))
+        encoded += len(processed["general_action_infos"].encode("utf-8"))
+    return time.process_time() - start, encoded
+
+
+def _after(world: World, avatars) -> tuple[float, int]:
+    start = time.process_time()
+    context = world.get_prompt_context()
+    for avatar in avatars:
+        intentify_prompt_infos({
+            "world_info": context.render_world_info(world, avatar=avatar, detailed=True),
+            "general_action_infos": get_action_infos_prompt(),
+        })
+    return time.process_time() - start, context.stats.encoded_bytes
+
+
+def _wander(world: World, avatars) -> None:
+    for avatar in avatars:
+        avatar.pos_x = max(0, min(world.map.width - 1, avatar.pos_x + random.randint(-3, 3)))
+        avatar.pos_y = max(0, min(world.map.height - 1, avatar.pos_y + random.randint(-3, 3)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prompt context cache benchmark.")
+    parser.add_argument("--avatars", type=int, default=500)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    world = World(map=load_cultivation_world_map(), month_stamp=MonthStamp(100 * 12))
+    avatars = list(make_avatars(world, count=args.avatars, current_month_stamp=world.month_stamp).values())
+    world.avatar_manager.avatars.update({av.id: av for av in avatars})
+
+    totals = {"before": [0.0, 0], "after": [0.0, 0]}
+    for _ in range(args.months):
+        for name, run in (("before", _before), ("after", _after)):
+            cpu, encoded = run(world, avatars)
+            totals[name][0] += cpu
+            totals[name][1] += encoded
+        _wander(world, avatars)
+        world.month_stamp = world.month_stamp + 1
+    world.event_manager.close()
+
+    print(f"avatars={args.avatars} months={args.months}")
+    for name, (cpu, encoded) in totals.items():
+        print(f"{name:6s}  cpu {cpu / args.months * 1000:8.1f} ms/month  "
+              f"json-encoded {encoded / args.months / 1024:9.1f} KiB/month")
+    (cpu_b, enc_b), (cpu_a, enc_a) = totals["before"], totals["after"]
+    print(f"saved   cpu {(cpu_b - cpu_a) / args.months * 1000:8.1f} ms/month  "
+          f"json-encoded {(enc_b - enc_a) / args.months / 1024:9.1f} KiB/month  ({cpu_b / cpu_a:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
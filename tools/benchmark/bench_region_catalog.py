@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""对比按已知区域分组列出区域及旅行月数的开销：逐次过滤 map.regions vs 角色的已知区域目录
+
+在真实地图上生成 N 个角色（默认 500），每个角色随机认识一部分区域，模拟 M 个月（默认 12），
+每月每个角色构建 Q 次（默认 3，对应决策 / 长期目标等提示词）分组列表与距离：
+- before: 对每个分组遍历 map.regions，用 isinstance 与 known_regions 过滤，逐个计算旅行月数
+- after:  region_catalog.view + region_catalog.travel_months
+每月一半角色移动、少数角色新认识一个区域。
+
+使用方法:
+    python tools/benchmark/bench_region_catalog.py
+    python tools/benchmark/bench_region_catalog.py --avatars 2000 --months 24
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.classes.calendar import MonthStamp
+from src.classes.region_catalog import REGION_CATEGORIES
+from src.classes.world import World
+from src.run.load_map import load_cultivation_world_map
+from src.sim.new_avatar import make_avatars
+
+
+def _before(world: World, avatars, queries: int) -> float:
+    start = time.process_time()
+    regions = world.map.regions
+    for avatar in avatars:
+        known = avatar.known_regions
+        loc = (avatar.pos_x, avatar.pos_y)
+        for _ in range(queries):
+            for cls in REGION_CATEGORIES:
+                [
+                    (r, r.get_travel_months(loc, avatar.move_step_length))
+                    for rid, r in regions.items()
+                    if isinstance(r, cls) and rid in known
+                ]
+    return time.process_time() - start
+
+
+def _after(world: World, avatars, queries: int) -> float:
+    start = time.process_time()
+    for avatar in avatars:
+        catalog = avatar.region_catalog
+        for _ in range(queries):
+            months = catalog.travel_months(avatar)
+            for group in catalog.view(avatar):
+                [(r, months[r.id]) for r in group]
+    return time.process_time() - start
+
+
+def _step(world: World, avatars, regions) -> None:
+    for avatar in avatars:
+        if random.random() < 0.5:
+            avatar.pos_x = max(0, min(world.map.width - 1, avatar.pos_x + random.randint(-3, 3)))
+            avatar.pos_y = max(0, min(world.map.height - 1, avatar.pos_y + random.randint(-3, 3)))
+        if random.random() < 0.1:
+            avatar.learn_region(random.choice(regions))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Known-region catalog benchmark.")
+    parser.add_argument("--avatars", type=int, default=500)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--queries", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    world = World(map=load_cultivation_world_map(), month_stamp=MonthStamp(100 * 12))
+    avatars = list(make_avatars(world, count=args.avatars, current_month_stamp=world.month_stamp).values())
+    world.avatar_manager.avatars.update({av.id: av for av in avatars})
+    regions = list(world.map.regions.values())
+    for avatar in avatars:
+        for region in random.sample(regions, len(regions) // 3):
+            avatar.learn_region(region)
+
+    totals = {"before": 0.0, "after": 0.0}
+    for _ in range(args.months):
+        totals["before"] += _before(world, avatars, args.queries)
+        totals["after"] += _after(world, avatars, args.queries)
+        _step(world, avatars, regions)
+    world.event_manager.close()
+
+    print(f"avatars={args.avatars} months={args.months} queries={args.queries} regions={len(regions)}")
+    for name, cpu in totals.items():
+        print(f"{name:6s}  cpu {cpu / args.months * 1000:8.2f} ms/month")
+    print(f"speedup      {totals['before'] / totals['after']:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""对比完整存档与增量存档的耗时和写入量
+
+在真实地图上生成 N 个角色（默认 5000），其中 --dead-ratio 比例的角色已故（模拟长期运行的世界），
+先写一次基础快照，然后每"月"修改 --changed 个存活角色的状态并存档：
+- full:        每次重写完整 JSON（incremental=False，旧行为）
+- incremental: 只向差分日志追加变化的角色
+
+使用方法:
+    python tools/benchmark/bench_save.py
+    python tools/benchmark/bench_save.py --avatars 10000 --dead-ratio 0.8 --saves 12
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.classes.calendar import MonthStamp
+from src.classes.death import handle_death
+from src.classes.world import World
+from src.run.load_map import load_cultivation_world_map
+from src.sim.new_avatar import make_avatars
+from src.sim.save.save_game import save_game
+from src.sim.save.save_journal import get_journal_path
+from src.sim.simulator import Simulator
+
+
+def _build_world(count: int, dead_ratio: float) -> World:
+    world = World(map=load_cultivation_world_map(), month_stamp=MonthStamp(100 * 12))
+    avatars = list(make_avatars(world, count=count, current_month_stamp=world.month_stamp).values())
+    world.avatar_manager.avatars.update({av.id: av for av in avatars})
+    for av in avatars[: int(count * dead_ratio)]:
+        handle_death(world, av, "benchmark")
+    return world
+
+
+def _run(world: World, sim: Simulator, path: Path, saves: int, changed: int, incremental: bool) -> tuple[float, int]:
+    """返回 (每次存档平均耗时, 累计写入字节数)"""
+    save_game(world, sim, [], path, incremental=False)
+    living = world.avatar_manager.get_living_avatars()
+    total = 0.0
+    written = 0
+    for _ in range(saves):
+        for av in random.sample(living, min(changed, len(living))):
+            av.hp.cur = max(1, av.hp.cur - 1)
+        journal = get_journal_path(path)
+        before = path.stat().st_size if not incremental else (journal.stat().st_size if journal.exists() else 0)
+        start = time.perf_counter()
+        save_game(world, sim, [], path, incremental=incremental)
+        total += time.perf_counter() - start
+        written += path.stat().st_size if not incremental else journal.stat().st_size - before
+    return total / saves, written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Full vs incremental save benchmark.")
+    parser.add_argument("--avatars", type=int, default=5000)
+    parser.add_argument("--dead-ratio", type=float, default=0.8)
+    parser.add_argument("--changed", type=int, default=100, help="每次存档之间状态变化的存活角色数")
+    parser.add_argument("--saves", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    world = _build_world(args.avatars, args.dead_ratio)
+    sim = Simulator(world)
+    with tempfile.TemporaryDirectory() as tmp:
+        full_time, full_bytes = _run(world, sim, Path(tmp) / "full.json", args.saves, args.changed, False)
+        world.save_tracker = None
+        inc_time, inc_bytes = _run(world, sim, Path(tmp) / "inc.json", args.saves, args.changed, True)
+
+    alive = len(world.avatar_manager.avatars)
+    print(f"avatars={args.avatars} (alive={alive}) changed/save={args.changed} saves={args.saves}")
+    print(f"full:         {full_time * 1000:9.1f} ms/save  {full_bytes / args.saves / 1024:9.1f} KB/save")
+    print(f"incremental:  {inc_time * 1000:9.1f} ms/save  {inc_bytes / args.saves / 1024:9.1f} KB/save")
+    print(f"speedup:      {full_time / inc_time:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""对比 JSON 与紧凑格式（.sav）存档的体积、存档耗时与读档耗时
+
+模拟运行约 100 年后的世界：在真实地图上生成 N 个角色（默认 10000），其中 --dead-ratio
+比例的角色已故（长期运行中人口不断更替，死者累积），然后分别以两种格式写完整存档并读档。
+
+使用方法:
+    python tools/benchmark/bench_save_format.py
+    python tools/benchmark/bench_save_format.py --avatars 20000 --dead-ratio 0.9 --repeat 3
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.classes.calendar import MonthStamp
+from src.classes.death import handle_death
+from src.classes.world import World
+from src.run.load_map import load_cultivation_world_map
+from src.sim.load.load_game import load_game
+from src.sim.new_avatar import make_avatars
+from src.sim.save.save_game import save_game
+from src.sim.simulator import Simulator
+
+
+def _build_world(count: int, dead_ratio: float) -> World:
+    world = World(map=load_cultivation_world_map(), month_stamp=MonthStamp(200 * 12))
+    avatars = list(make_avatars(world, count=count, current_month_stamp=world.month_stamp).values())
+    world.avatar_manager.avatars.update({av.id: av for av in avatars})
+    for av in avatars[: int(count * dead_ratio)]:
+        handle_death(world, av, "benchmark")
+    return world
+
+
+def _measure(world: World, sim: Simulator, path: Path, repeat: int) -> tuple[float, float, int]:
+    """返回 (最快存档耗时, 最快读档耗时, 文件字节数)；读档不计地图构建。"""
+    save_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        save_game(world, sim, [], path, incremental=False)
+        save_time = min(save_time, time.perf_counter() - start)
+    size = path.stat().st_size
+
+    game_map = load_cultivation_world_map()
+    load_time = float("inf")
+    for _ in range(repeat):
+        with patch("src.run.load_map.load_cultivation_world_map", return_value=game_map):
+            start = time.perf_counter()
+            loaded, _, _ = load_game(path)
+            load_time = min(load_time, time.perf_counter() - start)
+        loaded.event_manager.close()
+    return save_time, load_time, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JSON vs compact save format benchmark.")
+    parser.add_argument("--avatars", type=int, default=10000)
+    parser.add_argument("--dead-ratio", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    world = _build_world(args.avatars, args.dead_ratio)
+    sim = Simulator(world)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, filename in (("json", "bench.json"), ("compact", "bench_c.sav")):
+            world.save_tracker = None
+            results[name] = _measure(world, sim, Path(tmp) / filename, args.repeat)
+    world.event_manager.close()
+
+    alive = len(world.avatar_manager.avatars)
+    print(f"avatars={args.avatars} (alive={alive})")
+    for name, (save_time, load_time, size) in results.items():
+        print(f"{name:8s}  save {save_time * 1000:8.1f} ms  load {load_time * 1000:8.1f} ms  "
+              f"size {size / 1024 / 1024:7.2f} MB")
+    json_size, compact_size = results["json"][2], results["compact"][2]
+    print(f"size ratio: {json_size / compact_size:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
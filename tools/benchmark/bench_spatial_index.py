@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""对比角色空间索引与线性扫描的查询开销
+
+在真实地图上生成 N 个角色，分别用线性扫描与 AvatarManager 的空间索引
+执行“感知范围内角色”和“同区域角色”查询，并按每月每个角色查询一次折算整月开销。
+线性扫描为 O(N) / 次，N 较大时只抽样部分角色计时再折算。
+
+使用方法:
+    python tools/benchmark/bench_spatial_index.py
+    python tools/benchmark/bench_spatial_index.py --sizes 1000 5000 20000 --sample 50
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.classes.calendar import MonthStamp
+from src.classes.observe import get_observable_avatars
+from src.classes.world import World
+from src.run.load_map import load_cultivation_world_map
+from src.sim.new_avatar import make_avatars
+
+
+def _linear_same_region(avatars, avatar):
+    region = avatar.tile.region if avatar.tile is not None else None
+    if region is None:
+        return []
+    return [o for o in avatars if o is not avatar and o.tile is not None and o.tile.region == region]
+
+
+def _time_per_query(fn, queriers) -> float:
+    start = time.perf_counter()
+    for av in queriers:
+        fn(av)
+    return (time.perf_counter() - start) / len(queriers)
+
+
+def run(size: int, sample: int, seed: int) -> dict:
+    random.seed(seed)
+    world = World(map=load_cultivation_world_map(), month_stamp=MonthStamp(100 * 12))
+    world.avatar_manager.avatars.update(make_avatars(world, count=size, current_month_stamp=world.month_stamp))
+    manager = world.avatar_manager
+    living = list(manager.avatars.values())
+    queriers = random.sample(living, min(sample, len(living)))
+
+    linear_obs = _time_per_query(lambda av: get_observable_avatars(av, living), queriers)
+    index_obs = _time_per_query(manager.get_observable_avatars, queriers)
+    linear_region = _time_per_query(lambda av: _linear_same_region(living, av), queriers)
+    index_region = _time_per_query(manager.get_avatars_in_same_region, queriers)
+
+    # 正确性抽查
+    for av in queriers[:20]:
+        assert manager.get_observable_avatars(av) == get_observable_avatars(av, living)
+        assert manager.get_avatars_in_same_region(av) == _linear_same_region(living, av)
+
+    # 每月每个角色查询一次
+    return {
+        "size": size,
+        "linear_obs": linear_obs * size,
+        "index_obs": index_obs * size,
+        "linear_region": linear_region * size,
+        "index_region": index_region * size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Spatial index vs linear scan benchmark.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--sample", type=int, default=50, help="每个规模下计时的查询角色数")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'avatars':>8} | {'observe linear':>14} | {'observe index':>13} | {'region linear':>13} | {'region index':>12}")
+    print("-" * 73)
+    for size in args.sizes:
+        r = run(size, args.sample, args.seed)
+        print(
+            f"{r['size']:>8} | {r['linear_obs']:>13.3f}s | {r['index_obs']:>12.3f}s | "
+            f"{r['linear_region']:>12.3f}s | {r['index_region']:>11.3f}s"
+        )
+    print("\n(数值为折算后每月一轮全员查询的耗时)")
+
+
+if __name__ == "__main__":
+    main()
@@ -131,6 +131,38 @@ describe('useWorldStore', () => {
       expect(store.avatars.get('avatar-1')?.age).toBe(30)
     })
 
+    it('should mark avatars missing from a full snapshot as dead', () => {
+      store.isLoaded = true
+      store.avatars = new Map([
+        ['a1', createMockAvatar({ id: 'a1', name: 'Alive' })],
+        ['a2', createMockAvatar({ id: 'a2', name: 'Died during resync gap' })],
+      ])
+
+      const payload: TickPayloadDTO = {
+        type: 'tick',
+        year: 101,
+        month: 3,
+        avatars: [{ id: 'a1', name: 'Alive', x: 11 }],
+        events: [],
+        full: true,
+      }
+
+      store.handleTick(payload)
+
+      expect(store.avatars.get('a1')?.is_dead).toBeFalsy()
+      expect(store.avatars.get('a1')?.x).toBe(11)
+      expect(store.avatars.get('a2')?.is_dead).toBe(true)
+    })
+
+    it('should keep avatars missing from a delta tick unchanged', () => {
+      store.isLoaded = true
+      store.avatars = new Map([['a2', createMockAvatar({ id: 'a2' })]])
+
+      store.handleTick({ type: 'tick', year: 101, month: 3, avatars: [{ id: 'a1', name: 'New' }], events: [] })
+
+      expect(store.avatars.get('a2')?.is_dead).toBeFalsy()
+    })
+
     it('should add new avatars with name', () => {
       store.isLoaded = true
       store.avatars = new Map()
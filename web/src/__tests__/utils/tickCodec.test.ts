@@ -0,0 +1,44 @@
+import { describe, it, expect } from 'vitest'
+import { TickDecoder } from '@/utils/tickCodec'
+
+function makeFrame(json: object, positions: Array<[number, number, number]>): ArrayBuffer {
+  const body = new TextEncoder().encode(JSON.stringify(json))
+  const buffer = new ArrayBuffer(12 + body.length + positions.length * 8)
+  const view = new DataView(buffer)
+  'CWT1'.split('').forEach((c, i) => view.setUint8(i, c.charCodeAt(0)))
+  view.setUint32(4, body.length, true)
+  view.setUint32(8, positions.length, true)
+  new Uint8Array(buffer, 12, body.length).set(body)
+  positions.forEach(([idx, x, y], i) => {
+    const offset = 12 + body.length + i * 8
+    view.setUint32(offset, idx, true)
+    view.setUint16(offset + 4, x, true)
+    view.setUint16(offset + 6, y, true)
+  })
+  return buffer
+}
+
+describe('TickDecoder', () => {
+  it('should map position entries to avatar ids', () => {
+    const decoder = new TickDecoder()
+    const full = decoder.decode(makeFrame(
+      { type: 'tick', year: 1, month: 2, full: true, index: [['a', 0], ['b', 1]], avatars: [{ id: 'a', name: 'A' }] },
+      [[0, 3, 4], [1, 5, 6]],
+    ))
+    expect(full.type).toBe('tick')
+    expect(full.index).toBeUndefined()
+    expect(full.avatars).toEqual([
+      { id: 'a', name: 'A' },
+      { id: 'a', x: 3, y: 4 },
+      { id: 'b', x: 5, y: 6 },
+    ])
+
+    const delta = decoder.decode(makeFrame({ type: 'tick', full: false, avatars: [] }, [[1, 7, 8], [9, 0, 0]]))
+    expect(delta.avatars).toEqual([{ id: 'b', x: 7, y: 8 }])
+  })
+
+  it('should reject unknown frames', () => {
+    const decoder = new TickDecoder()
+    expect(() => decoder.decode(new ArrayBuffer(12))).toThrow()
+  })
+})
@@ -3,6 +3,8 @@
  * 纯粹的 Socket 封装，不依赖 Store
  */
 
+import { TickDecoder } from '../utils/tickCodec';
+
 export type MessageHandler = (data: any) => void;
 
 export interface SocketOptions {
@@ -20,6 +22,7 @@ export class GameSocket {
   private attempts = 0;
   private isIntentionalClose = false;
   private options: SocketOptions;
+  private tickDecoder = new TickDecoder();
 
   constructor(options: SocketOptions = {}) {
     this.options = options;
@@ -31,10 +34,13 @@ export class GameSocket {
 
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
     const host = window.location.host;
-    const url = this.options.url || `${protocol}//${host}/ws`;
+    // tick 使用二进制增量编码
+    const url = this.options.url || `${protocol}//${host}/ws?encoding=binary`;
 
     try {
+      this.tickDecoder.reset();
       this.ws = new WebSocket(url);
+      this.ws.binaryType = 'arraybuffer';
       this.ws.onopen = this.onOpen.bind(this);
       this.ws.onmessage = this.onMessage.bind(this);
       this.ws.onclose = this.onClose.bind(this);
@@ -51,6 +57,13 @@ export class GameSocket {
     this.notifyStatus(false);
   }
 
+  /** 请求服务端在下一次 tick 时发送全量快照 */
+  public requestResync() {
+    if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+      this.ws.send('resync');
+    }
+  }
+
   public on(handler: MessageHandler) {
     this.handlers.add(handler);
     return () => this.handlers.delete(handler);
@@ -68,7 +81,9 @@ export class GameSocket {
 
   private onMessage(event: MessageEvent) {
     try {
-      const data = JSON.parse(event.data);
+      const data = event.data instanceof ArrayBuffer
+        ? this.tickDecoder.decode(event.data)
+        : JSON.parse(event.data);
       this.handlers.forEach(h => h(data));
     } catch (e) {
       console.warn('Failed to parse WS message', e);
@@ -4,6 +4,7 @@ import type { AvatarSummary, GameEvent, MapMatrix, RegionSummary, CelestialPheno
 import type { TickPayloadDTO, InitialStateDTO } from '../types/api';
 import type { FetchEventsParams } from '../types/api';
 import { worldApi, eventApi } from '../api';
+import { gameSocket } from '../api/socket';
 import { processNewEvents, mergeAndSortEvents } from '../utils/eventHelper';
 
 export const useWorldStore = defineStore('world', () => {
@@ -49,10 +50,21 @@ export const useWorldStore = defineStore('world', () => {
     month.value = m;
   }
 
-  function updateAvatars(list: Partial<AvatarSummary>[]) {
+  // full: 全量快照（只包含存活角色），快照中缺少的角色在同步间隔中已故
+  function updateAvatars(list: Partial<AvatarSummary>[], full = false) {
     const next = new Map(avatars.value);
     let changed = false;
 
+    if (full) {
+      const alive = new Set(list.map(av => av.id));
+      for (const [id, existing] of next) {
+        if (!alive.has(id) && !existing.is_dead) {
+          next.set(id, { ...existing, is_dead: true });
+          changed = true;
+        }
+      }
+    }
+
     for (const av of list) {
       if (!av.id) continue;
       const existing = next.get(av.id);
@@ -105,7 +117,7 @@ export const useWorldStore = defineStore('world', () => {
     
     setTime(payload.year, payload.month);
 
-    if (payload.avatars) updateAvatars(payload.avatars);
+    if (payload.avatars) updateAvatars(payload.avatars, payload.full === true);
     if (payload.events) addEvents(payload.events);
     if (payload.phenomenon !== undefined) {
         currentPhenomenon.value = payload.phenomenon;
@@ -190,6 +202,9 @@ export const useWorldStore = defineStore('world', () => {
         applyStateSnapshot(stateRes);
       }
 
+      // 快照可能早于已收到的 tick（且不含全部角色），请求一次全量 tick 对齐。
+      gameSocket.requestResync();
+
       // 从分页 API 加载事件。
       await resetEvents({});
 
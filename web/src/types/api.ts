@@ -39,6 +39,8 @@ export interface TickPayloadDTO {
   avatars?: Array<Partial<InitialStateDTO['avatars'] extends (infer U)[] ? U : never>>;
   events?: unknown[];
   phenomenon?: CelestialPhenomenon | null;
+  /** 是否为全量快照（新连接或请求 resync 后） */
+  full?: boolean;
 }
 
 export interface MapResponseDTO {
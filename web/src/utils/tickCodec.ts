@@ -0,0 +1,57 @@
+/**
+ * 二进制 tick 帧解码（与 src/server/tick_encoder.py 对应）
+ *
+ * 帧格式（小端）：
+ *   magic "CWT1" | uint32 json 长度 | uint32 位置条目数 | json | 条目 * (uint32 索引, uint16 x, uint16 y)
+ * 角色 id 首次出现时通过 json 中的 index 字段下发 [id, 索引]。
+ */
+
+const MAGIC = 'CWT1';
+const HEADER_SIZE = 12;
+const POSITION_SIZE = 8;
+
+export class TickDecoder {
+  private ids = new Map<number, string>();
+  private textDecoder = new TextDecoder();
+
+  /** 新连接时清空索引表 */
+  public reset() {
+    this.ids.clear();
+  }
+
+  public decode(buffer: ArrayBuffer): any {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(
+      view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3)
+    );
+    if (magic !== MAGIC) {
+      throw new Error('Unknown binary frame');
+    }
+    const jsonLen = view.getUint32(4, true);
+    const count = view.getUint32(8, true);
+    const data = JSON.parse(
+      this.textDecoder.decode(new Uint8Array(buffer, HEADER_SIZE, jsonLen))
+    );
+
+    if (data.full) this.ids.clear();
+    for (const [id, idx] of data.index ?? []) {
+      this.ids.set(idx, id);
+    }
+    delete data.index;
+
+    // 位置条目追加在完整信息之后，按 id 合并即可
+    const avatars: any[] = data.avatars ?? [];
+    let offset = HEADER_SIZE + jsonLen;
+    for (let i = 0; i < count; i++, offset += POSITION_SIZE) {
+      const id = this.ids.get(view.getUint32(offset, true));
+      if (id === undefined) continue;
+      avatars.push({
+        id,
+        x: view.getUint16(offset + 4, true),
+        y: view.getUint16(offset + 6, true),
+      });
+    }
+    data.avatars = avatars;
+    return data;
+  }
+}